@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+服务端分析包
+"""
+
+from .market_store import MarketSnapshot, MarketStore, market_store
+from .summary import compute_market_aggregates, get_market_summary
+from .screener import ScreenerError, compile_expression, run_screener
+from .indicators import IndicatorEngine, indicator_engine
+from .alerts import AlertEngine, AlertRuleError, alert_engine
+from .correlation import CorrelationTracker, correlation_tracker
+from .search import SearchIndex, search_index
+from .deltas import MarketDeltaFeed, diff_snapshots, diff_symbols, market_feed
+
+__all__ = [
+    'MarketSnapshot', 'MarketStore', 'market_store', 'compute_market_aggregates', 'get_market_summary',
+    'ScreenerError', 'compile_expression', 'run_screener', 'IndicatorEngine', 'indicator_engine',
+    'AlertEngine', 'AlertRuleError', 'alert_engine', 'CorrelationTracker', 'correlation_tracker',
+    'SearchIndex', 'search_index', 'MarketDeltaFeed', 'diff_snapshots', 'diff_symbols', 'market_feed'
+]
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+行情告警规则引擎
+
+规则格式: {field, op, threshold, coin?, note?}
+- field: price / market_cap / volume / change_24h / change_7d / volume_spike / rank / rank_change
+- op: above（向上穿越阈值）或 below（向下穿越阈值）
+- coin: CoinGecko id 或 symbol；省略时对所有币种生效
+
+告警为边沿触发：只有当某个值在相邻两轮爬取之间穿越阈值时才触发一次，
+持续高于（低于）阈值不会重复触发。
+
+每轮爬取后对所有规则做批量数组运算：
+- 指定币种的规则按 (字段, 方向) 分组，用行号 gather 后逐元素比较
+- 全部币种的规则按 (字段, 方向) 分组为有序阈值数组，对每个币种用
+  searchsorted 找出 (上一轮值, 本轮值) 区间内的阈值，命中规则是数组中的连续区间
+规则编译只在规则变化时进行，评估耗时与规则数量基本无关。
+"""
+
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .market_store import MarketSnapshot
+
+# 告警字段 -> 快照列（None 表示派生字段）
+ALERT_FIELDS = {
+    'price': 'price_usd',
+    'market_cap': 'market_cap',
+    'volume': 'volume_24h',
+    'change_24h': 'price_change_percentage_24h',
+    'change_7d': 'price_change_percentage_7d',
+    'volume_spike': None,  # 24h 成交量 / 滚动平均成交量
+    'rank': 'rank',
+    'rank_change': None,  # 上一轮排名 - 本轮排名（正数表示排名上升）
+}
+ALERT_OPS = {'above': 'above', '>': 'above', 'below': 'below', '<': 'below'}
+
+MAX_ALERTS_PER_RUN = 1000
+RECENT_ALERTS = 200
+
+
+class AlertRuleError(ValueError):
+    """告警规则错误"""
+    pass
+
+
+def normalize_rule(data: Dict[str, Any]) -> Dict[str, Any]:
+    """校验并规范化规则，返回可存储的规则文档"""
+    if not isinstance(data, dict):
+        raise AlertRuleError('规则必须是对象')
+    field = str(data.get('field', '')).strip().lower()
+    if field not in ALERT_FIELDS:
+        raise AlertRuleError(f"未知字段: {field or None}，可选: {', '.join(ALERT_FIELDS)}")
+    op = ALERT_OPS.get(str(data.get('op', '')).strip().lower())
+    if op is None:
+        raise AlertRuleError('op 必须是 above 或 below')
+    try:
+        threshold = float(data.get('threshold'))
+    except (TypeError, ValueError):
+        raise AlertRuleError('threshold 必须是数字')
+    if threshold != threshold or threshold in (float('inf'), float('-inf')):
+        raise AlertRuleError('threshold 必须是有限数字')
+    coin = data.get('coin')
+    coin = str(coin).strip() if coin not in (None, '') else None
+    return {
+        'rule_id': str(data.get('rule_id') or uuid.uuid4().hex),
+        'field': field,
+        'op': op,
+        'threshold': threshold,
+        'coin': coin,
+        'note': data.get('note'),
+        'enabled': bool(data.get('enabled', True)),
+        'created_at': data.get('created_at') or datetime.utcnow(),
+    }
+
+
+class _CompiledRules:
+    """按 (字段, 方向) 分组的规则数组"""
+
+    def __init__(self, rules: List[Dict[str, Any]]):
+        self.rules = rules
+        self.fields = set()
+        # (field, op) -> (有序阈值, 规则下标)
+        self.global_groups: Dict[tuple, tuple] = {}
+        # (field, op) -> (币种键去重数组, 每条规则对应的去重下标, 阈值, 规则下标)
+        self.coin_groups: Dict[tuple, tuple] = {}
+
+        buckets: Dict[tuple, List[int]] = {}
+        for index, rule in enumerate(rules):
+            buckets.setdefault((rule['field'], rule['op'], rule['coin'] is None), []).append(index)
+
+        for (field, op, is_global), indices in buckets.items():
+            self.fields.add(field)
+            indices = np.array(indices, dtype=np.int64)
+            thresholds = np.array([rules[i]['threshold'] for i in indices], dtype=np.float64)
+            if is_global:
+                order = np.argsort(thresholds, kind='stable')
+                self.global_groups[(field, op)] = (thresholds[order], indices[order])
+            else:
+                keys, inverse = np.unique(np.array([rules[i]['coin'] for i in indices], dtype=object),
+                                          return_inverse=True)
+                self.coin_groups[(field, op)] = (keys, inverse, thresholds, indices)
+
+
+def _crossed(previous: np.ndarray, current: np.ndarray, threshold, op: str) -> np.ndarray:
+    """边沿触发：上一轮未满足、本轮满足（NaN 比较结果为 False）"""
+    if op == 'above':
+        return (previous <= threshold) & (current > threshold)
+    return (previous >= threshold) & (current < threshold)
+
+
+def _range_hits(thresholds: np.ndarray, previous: np.ndarray, current: np.ndarray, op: str):
+    """每个币种穿越的阈值在有序数组中的区间 [lo, hi)"""
+    valid = ~(np.isnan(previous) | np.isnan(current))
+    previous = np.where(valid, previous, 0.0)
+    current = np.where(valid, current, 0.0)
+    if op == 'above':
+        # previous <= t < current
+        lo = np.searchsorted(thresholds, previous, side='left')
+        hi = np.searchsorted(thresholds, current, side='left')
+    else:
+        # current < t <= previous
+        lo = np.searchsorted(thresholds, current, side='right')
+        hi = np.searchsorted(thresholds, previous, side='right')
+    counts = np.where(valid, np.maximum(hi - lo, 0), 0)
+    return lo, counts
+
+
+class AlertEngine:
+    """告警规则的内存索引与批量评估"""
+
+    def __init__(self, manager=None, max_alerts: int = MAX_ALERTS_PER_RUN):
+        self._manager = manager
+        self.max_alerts = max_alerts
+        self._rules: Dict[str, Dict[str, Any]] = {}
+        self._compiled: Optional[_CompiledRules] = None
+        self._loaded = False
+        self._previous: Optional[tuple] = None
+        self._lock = threading.RLock()
+        self.recent = deque(maxlen=RECENT_ALERTS)
+        self.evaluations = 0
+        self.fired = 0
+        self.last_duration_ms = None
+
+    @property
+    def manager(self):
+        if self._manager is None:
+            from ..database.db import AlertRuleManager
+            self._manager = AlertRuleManager()
+        return self._manager
+
+    # ---- 规则管理 ----
+
+    def load_rules(self, docs: List[Dict[str, Any]]):
+        """替换内存中的规则（不写数据库）"""
+        with self._lock:
+            self._rules = {}
+            for doc in docs:
+                doc = normalize_rule(doc)
+                self._rules[doc['rule_id']] = doc
+            self._compiled = None
+            self._loaded = True
+
+    def ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if not self._loaded:
+                self.load_rules(self.manager.get_rules())
+                print(f"🔔 已加载 {len(self._rules)} 条告警规则")
+
+    def invalidate(self):
+        """规则在其他进程中被修改后调用，下次使用时重新从数据库加载"""
+        with self._lock:
+            self._loaded = False
+
+    def list_rules(self) -> List[Dict[str, Any]]:
+        self.ensure_loaded()
+        with self._lock:
+            return list(self._rules.values())
+
+    def get_rule(self, rule_id: str) -> Optional[Dict[str, Any]]:
+        self.ensure_loaded()
+        return self._rules.get(rule_id)
+
+    def add_rules(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """校验、保存并启用新规则"""
+        docs = [normalize_rule({**item, 'rule_id': None} if isinstance(item, dict) else item) for item in items]
+        self.ensure_loaded()
+        with self._lock:
+            if docs:
+                self.manager.insert_rules([dict(doc) for doc in docs])
+            for doc in docs:
+                self._rules[doc['rule_id']] = doc
+            self._compiled = None
+        return docs
+
+    def update_rule(self, rule_id: str, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """修改规则（阈值、启用状态等）"""
+        self.ensure_loaded()
+        with self._lock:
+            rule = self._rules.get(rule_id)
+            if rule is None:
+                return None
+            doc = normalize_rule({**rule, **changes, 'rule_id': rule_id, 'created_at': rule['created_at']})
+            self.manager.update_rule(dict(doc))
+            self._rules[rule_id] = doc
+            self._compiled = None
+            return doc
+
+    def delete_rule(self, rule_id: str) -> bool:
+        self.ensure_loaded()
+        with self._lock:
+            if rule_id not in self._rules:
+                return False
+            self.manager.delete_rule(rule_id)
+            del self._rules[rule_id]
+            self._compiled = None
+            return True
+
+    def _get_compiled(self) -> _CompiledRules:
+        if self._compiled is None:
+            self._compiled = _CompiledRules([rule for rule in self._rules.values() if rule['enabled']])
+        return self._compiled
+
+    # ---- 评估 ----
+
+    def _field_values(self, snapshot: MarketSnapshot, fields, previous_rank: np.ndarray) -> Dict[str, np.ndarray]:
+        values = {}
+        for field in fields:
+            column = ALERT_FIELDS[field]
+            if column is not None:
+                values[field] = snapshot.column(column)
+            elif field == 'rank_change':
+                values[field] = previous_rank - snapshot.column('rank')
+            elif field == 'volume_spike':
+                from .indicators import indicator_engine
+                average = indicator_engine.all_indicators(snapshot.column('id'))['volume_avg']
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    values[field] = np.where(average > 0, snapshot.column('volume_24h') / average, np.nan)
+        return values
+
+    def evaluate(self, snapshot: MarketSnapshot) -> Dict[str, Any]:
+        """用新快照评估所有规则，返回 {generation, timestamp, total, alerts}"""
+        self.ensure_loaded()
+        start = time.perf_counter()
+        with self._lock:
+            compiled = self._get_compiled()
+            ids = snapshot.column('id')
+            n = len(snapshot)
+
+            # 上一轮的值按本轮币种顺序对齐（新出现的币种为 NaN，不会触发）
+            if self._previous is not None:
+                previous_index, previous_values = self._previous
+                aligned = np.fromiter((previous_index.get(coin_id, -1) for coin_id in ids), dtype=np.int64, count=n)
+                known = aligned >= 0
+            else:
+                previous_values, aligned, known = {}, np.full(n, -1, dtype=np.int64), np.zeros(n, dtype=bool)
+
+            def previous(field):
+                values = previous_values.get(field)
+                if values is None:
+                    return np.full(n, np.nan)
+                return np.where(known, values[aligned], np.nan)
+
+            fields = compiled.fields | {'rank'}
+            current = self._field_values(snapshot, fields, previous('rank'))
+
+            hits_rules, hits_coins = [], []
+            total = 0
+            budget = self.max_alerts
+
+            for (field, op), (thresholds, rule_indices) in compiled.global_groups.items():
+                lo, counts = _range_hits(thresholds, previous(field), current[field], op)
+                group_total = int(counts.sum())
+                total += group_total
+                if not group_total or budget <= 0:
+                    continue
+                # 只展开预算内的命中
+                coins = np.flatnonzero(counts)
+                ends = np.cumsum(counts[coins])
+                coins = coins[:np.searchsorted(ends, budget, side='left') + 1]
+                coin_counts = counts[coins]
+                starts = np.repeat(lo[coins], coin_counts)
+                offsets = np.arange(coin_counts.sum()) - np.repeat(np.cumsum(coin_counts) - coin_counts, coin_counts)
+                positions = (starts + offsets)[:budget]
+                hits_rules.append(rule_indices[positions])
+                hits_coins.append(np.repeat(coins, coin_counts)[:budget])
+                budget -= len(positions)
+
+            for (field, op), (keys, inverse, thresholds, rule_indices) in compiled.coin_groups.items():
+                key_rows = [snapshot.locate(key) for key in keys]
+                key_rows = np.array([-1 if row is None else row for row in key_rows], dtype=np.int64)
+                rows = key_rows[inverse]
+                found = rows >= 0
+                rows_safe = np.where(found, rows, 0)
+                fired = found & _crossed(previous(field)[rows_safe], current[field][rows_safe], thresholds, op)
+                fired_idx = np.flatnonzero(fired)
+                total += len(fired_idx)
+                if budget > 0 and len(fired_idx):
+                    fired_idx = fired_idx[:budget]
+                    hits_rules.append(rule_indices[fired_idx])
+                    hits_coins.append(rows[fired_idx])
+                    budget -= len(fired_idx)
+
+            alerts = self._build_alerts(snapshot, compiled, hits_rules, hits_coins, previous, current)
+
+            index = snapshot.index_by_id if n else {}
+            self._previous = (index, current)
+            self.evaluations += 1
+            self.fired += total
+            self.last_duration_ms = (time.perf_counter() - start) * 1000
+            self.recent.extend(alerts)
+
+        return {
+            'generation': snapshot.generation,
+            'timestamp': snapshot.timestamp.isoformat(),
+            'total': total,
+            'alerts': alerts,
+        }
+
+    def _build_alerts(self, snapshot, compiled, hits_rules, hits_coins, previous, current) -> List[Dict[str, Any]]:
+        if not hits_rules:
+            return []
+        rule_indices = np.concatenate(hits_rules)
+        coin_rows = np.concatenate(hits_coins)
+        rows = snapshot.rows(np.unique(coin_rows), ['id', 'symbol', 'name'])
+        coins = dict(zip(np.unique(coin_rows).tolist(), rows))
+        previous_cache = {}
+        timestamp = snapshot.timestamp.isoformat()
+        alerts = []
+        for rule_index, row in zip(rule_indices.tolist(), coin_rows.tolist()):
+            rule = compiled.rules[rule_index]
+            field = rule['field']
+            if field not in previous_cache:
+                previous_cache[field] = previous(field)
+            coin = coins[row]
+            alerts.append({
+                'rule_id': rule['rule_id'],
+                'field': field,
+                'op': rule['op'],
+                'threshold': rule['threshold'],
+                'note': rule['note'],
+                'coin': coin['id'],
+                'symbol': coin['symbol'],
+                'name': coin['name'],
+                'previous': float(previous_cache[field][row]),
+                'value': float(current[field][row]),
+                'timestamp': timestamp,
+            })
+        return alerts
+
+    def stats(self) -> Dict[str, Any]:
+        compiled = self._compiled
+        return {
+            'rules': len(self._rules),
+            'global_groups': len(compiled.global_groups) if compiled else None,
+            'coin_groups': len(compiled.coin_groups) if compiled else None,
+            'evaluations': self.evaluations,
+            'fired': self.fired,
+            'last_duration_ms': self.last_duration_ms,
+        }
+
+
+alert_engine = AlertEngine()
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+收益率相关性 / 协方差矩阵
+
+每轮爬取把各币种价格推入环形缓冲区，记录相邻两轮快照之间的对数收益率
+（缺失的币种沿用上一轮价格，即收益率为 0；首次出现的币种没有收益率）。
+
+每个 (top, window) 维护一组共同矩累加器：收益率之和 S 与叉积和 P = XᵀX。
+新快照到达时只加上新的一行、减去离开窗口的一行（O(N²)），不必对整个窗口
+重新计算（O(N²·W)）。Top N 成员变化、错过更新或每隔 RESYNC_TICKS 轮时按
+窗口重新计算。计算结果按 (top, window, 代际) 缓存。
+
+服务启动后第一次使用时，从 market_snapshots 历史集合回放最近的快照预热。
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+MAX_TOP = 200
+MAX_WINDOW = 288
+DEFAULT_TOP = 20
+DEFAULT_WINDOW = 60
+RESYNC_TICKS = 500
+MAX_ACCUMULATORS = 16
+MAX_RESULTS = 64
+
+_NEVER = np.iinfo(np.int64).max
+
+
+def _to_list(values: np.ndarray, decimals: Optional[int] = None) -> list:
+    """数组转 JSON 列表（NaN 转为 None）"""
+    if decimals is not None:
+        values = np.round(values, decimals)
+    missing = np.isnan(values)
+    if missing.any():
+        values = values.astype(object)
+        values[missing] = None
+    return values.tolist()
+
+
+class _CoMoments:
+    """一组币种在窗口内的收益率之和与叉积和"""
+
+    __slots__ = ('members', 'samples', 'sums', 'cross', 'tick')
+
+    def __init__(self, members: np.ndarray, samples: int, sums: np.ndarray, cross: np.ndarray, tick: int):
+        self.members = members
+        self.samples = samples
+        self.sums = sums
+        self.cross = cross
+        self.tick = tick
+
+
+class CorrelationTracker:
+    """收益率环形缓冲区与增量共同矩"""
+
+    def __init__(self, window_capacity: int = MAX_WINDOW, coin_capacity: int = 512):
+        # 多保留一行，窗口已满时离开窗口的收益率尚未被覆盖
+        self.capacity = window_capacity + 1
+        self.rows: Dict[str, int] = {}
+        self.ids: List[str] = []
+        self.symbols: List[str] = []
+        self.returns = np.full((self.capacity, coin_capacity), np.nan)
+        self.last_price = np.full(coin_capacity, np.nan)
+        self.first_return = np.full(coin_capacity, _NEVER, dtype=np.int64)
+        self.latest_rows = np.empty(0, dtype=np.int64)
+        self.snapshots = 0
+        self.ticks = 0
+        self.generation = 0
+        self.timestamp: Optional[datetime] = None
+        self._accumulators: 'OrderedDict[tuple, _CoMoments]' = OrderedDict()
+        self._results: 'OrderedDict[tuple, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.RLock()
+        self._warmed = False
+        self._last_ids: List[str] = []
+        self._last_rows = np.empty(0, dtype=np.int64)
+
+    # ---- 存储 ----
+
+    def _grow(self, needed: int):
+        capacity = self.returns.shape[1]
+        while capacity < needed:
+            capacity *= 2
+        returns = np.full((self.capacity, capacity), np.nan)
+        returns[:, :self.returns.shape[1]] = self.returns
+        last_price = np.full(capacity, np.nan)
+        last_price[:len(self.last_price)] = self.last_price
+        first_return = np.full(capacity, _NEVER, dtype=np.int64)
+        first_return[:len(self.first_return)] = self.first_return
+        self.returns, self.last_price, self.first_return = returns, last_price, first_return
+
+    def _rows_for(self, ids: List[str], symbols: Sequence[str]) -> np.ndarray:
+        # 连续几轮的币种列表通常相同，直接复用上一轮的映射
+        if ids == self._last_ids:
+            return self._last_rows
+        rows = np.full(len(ids), -1, dtype=np.int64)
+        for i, coin_id in enumerate(ids):
+            if not coin_id:
+                continue
+            row = self.rows.get(coin_id)
+            if row is None:
+                row = len(self.ids)
+                self.rows[coin_id] = row
+                self.ids.append(coin_id)
+                self.symbols.append(symbols[i] if i < len(symbols) else '')
+            rows[i] = row
+        if len(self.ids) > self.returns.shape[1]:
+            self._grow(len(self.ids))
+        self._last_ids, self._last_rows = ids, rows
+        return rows
+
+    # ---- 更新 ----
+
+    def push_arrays(self, ids: Sequence[str], symbols: Sequence[str], prices: np.ndarray,
+                    generation: int = 0, timestamp: Optional[datetime] = None):
+        """推入一轮快照（ids 按排名排序）"""
+        with self._lock:
+            rows = self._rows_for(list(ids), symbols)
+            prices = np.asarray(prices, dtype=np.float64)
+            present = (rows >= 0) & (prices > 0)
+            rows, prices = rows[present], prices[present]
+            # 同一轮中重复的币种只保留第一条
+            rows, first = np.unique(rows, return_index=True)
+            order = np.argsort(first)
+            rows, prices = rows[order], prices[first[order]]
+
+            if self.snapshots:
+                t = self.ticks
+                n = len(self.ids)
+                row = np.where(np.isnan(self.last_price[:n]), np.nan, 0.0)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    row[rows] = np.log(prices / self.last_price[rows])
+                fresh = ~np.isnan(row) & (self.first_return[:n] == _NEVER)
+                self.first_return[:n][fresh] = t
+                self.returns[t % self.capacity, :n] = row
+                self.ticks += 1
+
+            self.last_price[rows] = prices
+            self.latest_rows = rows
+            self.snapshots += 1
+            self.generation = generation
+            self.timestamp = timestamp or datetime.utcnow()
+            self._results.clear()
+
+            for key in list(self._accumulators):
+                self._advance(key)
+
+    def push(self, snapshot):
+        """推入 MarketSnapshot（每次爬取调用一次）"""
+        self.ensure_warm(before=snapshot.timestamp)
+        self.push_arrays(snapshot.column('id'), snapshot.column('symbol'), snapshot.column('price_usd'),
+                         snapshot.generation, snapshot.timestamp)
+
+    # ---- 共同矩 ----
+
+    def _samples(self, window: int) -> int:
+        return min(window, self.ticks, self.capacity - 1)
+
+    def _members(self, top: int, samples: int) -> np.ndarray:
+        """按最新排名取窗口内收益率完整的前 top 个币种"""
+        rows = self.latest_rows
+        eligible = self.first_return[rows] <= self.ticks - samples
+        return rows[eligible][:top]
+
+    def _window(self, members: np.ndarray, samples: int) -> np.ndarray:
+        index = (self.ticks - 1 - np.arange(samples)) % self.capacity
+        return self.returns[np.ix_(index, members)]
+
+    def _rebuild(self, top: int, window: int) -> _CoMoments:
+        samples = self._samples(window)
+        members = self._members(top, samples)
+        matrix = self._window(members, samples)
+        return _CoMoments(members, samples, matrix.sum(axis=0), matrix.T @ matrix, self.ticks)
+
+    def _advance(self, key: tuple):
+        """新快照到达后增量更新一组累加器"""
+        top, window = key
+        acc = self._accumulators[key]
+        samples = self._samples(window)
+        members = self._members(top, samples)
+        t = self.ticks - 1
+        if (acc.tick != t or len(members) != len(acc.members)
+                or not np.array_equal(np.sort(members), np.sort(acc.members))
+                or self.ticks % RESYNC_TICKS == 0):
+            self._accumulators[key] = self._rebuild(top, window)
+            return
+        new = self.returns[t % self.capacity, acc.members]
+        acc.sums += new
+        acc.cross += np.outer(new, new)
+        if samples == acc.samples:
+            old = self.returns[(t - window) % self.capacity, acc.members]
+            acc.sums -= old
+            acc.cross -= np.outer(old, old)
+        acc.samples = samples
+        acc.tick = self.ticks
+
+    def _accumulator(self, top: int, window: int) -> _CoMoments:
+        key = (top, window)
+        acc = self._accumulators.get(key)
+        if acc is None or acc.tick != self.ticks:
+            acc = self._rebuild(top, window)
+            self._accumulators[key] = acc
+        self._accumulators.move_to_end(key)
+        while len(self._accumulators) > MAX_ACCUMULATORS:
+            self._accumulators.popitem(last=False)
+        return acc
+
+    # ---- 预热 ----
+
+    def warm_up(self, docs: Iterable[Dict[str, Any]]) -> int:
+        """按时间顺序回放 market_snapshots 文档"""
+        replayed = 0
+        for doc in docs:
+            prices = np.array([np.nan if v is None else v for v in doc.get('price_usd', [])], dtype=np.float64)
+            self.push_arrays(doc.get('ids', []), doc.get('symbols', []), prices, 0, doc.get('timestamp'))
+            replayed += 1
+        return replayed
+
+    def ensure_warm(self, before: Optional[datetime] = None):
+        """首次使用时从历史快照预热（只执行一次）
+
+        before 为即将推入的快照时间：该快照在推入前可能已写入历史集合，
+        只回放时间早于它的快照，避免同一快照被计入两次。
+        """
+        if self._warmed:
+            return
+        with self._lock:
+            if self._warmed:
+                return
+            self._warmed = True
+            try:
+                from ..database.db import MarketSnapshotManager
+
+                docs = MarketSnapshotManager().get_recent_snapshots(limit=self.capacity, before=before)
+                replayed = self.warm_up(docs)
+                if replayed:
+                    print(f"🔗 相关性矩阵已从 {replayed} 个历史快照预热")
+            except Exception as e:
+                print(f"⚠️  相关性矩阵预热失败: {e}")
+
+    # ---- 查询 ----
+
+    def matrices(self, top: int, window: int) -> Dict[str, Any]:
+        """由累加器得到 (按最新排名排序的) 成员、均值、波动率、协方差和相关性数组"""
+        with self._lock:
+            acc = self._accumulator(top, window)
+            n = acc.samples
+            members, sums, cross = acc.members, acc.sums, acc.cross
+            # 输出按最新排名排序（成员未变动名次时无需重排）
+            position = np.empty(len(self.ids), dtype=np.int64)
+            position[self.latest_rows] = np.arange(len(self.latest_rows))
+            order = np.argsort(position[members], kind='stable')
+            if np.any(order != np.arange(len(order))):
+                members, sums, cross = members[order], sums[order], cross[np.ix_(order, order)]
+
+        if n < 2 or not len(members):
+            empty = np.empty((0, 0))
+            return {'members': members[:0], 'samples': n, 'mean': np.empty(0), 'std': np.empty(0),
+                    'covariance': empty, 'correlation': empty}
+        covariance = (cross - np.outer(sums, sums) / n) / (n - 1)
+        std = np.sqrt(np.maximum(np.diag(covariance), 0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlation = np.clip(covariance / np.outer(std, std), -1, 1)
+        return {'members': members, 'samples': n, 'mean': sums / n, 'std': std,
+                'covariance': covariance, 'correlation': correlation}
+
+    def compute(self, top: int = DEFAULT_TOP, window: int = DEFAULT_WINDOW) -> Dict[str, Any]:
+        """Top N 币种在最近 window 个收益率上的相关性与协方差矩阵"""
+        self.ensure_warm()
+        top = max(2, min(int(top), MAX_TOP))
+        window = max(2, min(int(window), self.capacity - 1))
+        with self._lock:
+            key = (top, window, self.generation, self.ticks)
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                return result
+
+            data = self.matrices(top, window)
+            result = {
+                'generation': self.generation,
+                'timestamp': self.timestamp.isoformat() if self.timestamp else None,
+                'top': top,
+                'window': window,
+                'samples': data['samples'],
+                'coins': [{'id': self.ids[row], 'symbol': self.symbols[row]} for row in data['members'].tolist()],
+                'mean_return': _to_list(data['mean']),
+                'volatility': _to_list(data['std']),
+                'correlation': _to_list(data['correlation'], decimals=6),
+                'covariance': _to_list(data['covariance']),
+            }
+            self._results[key] = result
+            while len(self._results) > MAX_RESULTS:
+                self._results.popitem(last=False)
+            return result
+
+
+correlation_tracker = CorrelationTracker()
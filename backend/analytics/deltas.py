@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+行情增量推送
+
+每轮爬取后对比新旧 MarketSnapshot，只把变化的币种和变化的字段打包成增量：
+
+- 前 N 名（N 取 buckets 中的档位，默认 10/50/100/250，前端表格订阅 100）:
+
+      {generation, base, timestamp, count, changed: {id: {字段: 新值}}, added: [完整行], removed: [id]}
+
+  每个档位保留最近 DELTA_HISTORY 个增量，客户端持有的代际与增量的 base 不一致时可从
+  since 连续补发，无法衔接时返回完整的前 N 名数据
+- 单个 symbol（不论排名）:
+
+      {generation, base, timestamp, symbol, id, changed: {字段: 新值}}
+
+  symbol 对应的币种换成另一个 id（或上一轮不存在）时 changed 为完整行
+
+推送与房间的对应关系见 api/realtime.py。推送流量随行情变化量和订阅范围增长，
+而不是随客户端数 × 轮询频率增长。
+"""
+
+import threading
+from collections import deque
+from datetime import timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from .market_store import MarketSnapshot
+
+# 推送给前端的字段（id 作为行的键）
+FEED_FIELDS = (
+    'id', 'symbol', 'name', 'image', 'price_usd', 'market_cap', 'volume_24h',
+    'price_change_percentage_24h', 'price_change_percentage_7d', 'circulating_supply', 'rank',
+)
+DEFAULT_TOP_N = 100
+DEFAULT_TOP_BUCKETS = (10, 50, 100, 250)
+DELTA_HISTORY = 32
+
+
+def _clean(field: str, value: Any) -> Any:
+    if isinstance(value, float):
+        if value != value:
+            return None
+        if field == 'rank':
+            return int(value)
+    return value
+
+
+def _timestamp(snapshot: MarketSnapshot) -> str:
+    timestamp = snapshot.timestamp
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.isoformat()
+
+
+def _changed_fields(previous: MarketSnapshot, current: MarketSnapshot,
+                    cur_rows: np.ndarray, prev_rows: np.ndarray) -> List[Dict[str, Any]]:
+    """逐字段比较两组已对齐的行，返回每行变化的字段（NaN 与 NaN 视为相同）"""
+    changed: List[Dict[str, Any]] = [{} for _ in range(len(cur_rows))]
+    if not len(cur_rows):
+        return changed
+    for field in FEED_FIELDS[1:]:
+        new = current.column(field)[cur_rows]
+        old = previous.column(field)[prev_rows]
+        if new.dtype == object:
+            diff = np.asarray(new != old, dtype=bool)
+        else:
+            diff = ~((new == old) | (np.isnan(new) & np.isnan(old)))
+        rows = np.flatnonzero(diff)
+        for i, value in zip(rows.tolist(), new[rows].tolist()):
+            changed[i][field] = _clean(field, value)
+    return changed
+
+
+def diff_snapshots(previous: MarketSnapshot, current: MarketSnapshot,
+                   top_n: int = DEFAULT_TOP_N) -> Dict[str, Any]:
+    """前 top_n 行的字段级差异（按 id 对齐）"""
+    n_cur = min(top_n, len(current))
+    n_prev = min(top_n, len(previous))
+    cur_ids = current.column('id')[:n_cur].tolist()
+    prev_pos = {coin_id: i for i, coin_id in enumerate(previous.column('id')[:n_prev].tolist())}
+
+    matched = np.fromiter((prev_pos.get(coin_id, -1) for coin_id in cur_ids), dtype=np.intp, count=n_cur)
+    present = np.flatnonzero(matched >= 0)
+    fields = _changed_fields(previous, current, present, matched[present])
+    changed = {cur_ids[i]: row for i, row in zip(present.tolist(), fields) if row}
+
+    current_ids = set(cur_ids)
+    added = np.flatnonzero(matched < 0)
+    return {
+        'generation': current.generation,
+        'base': previous.generation,
+        'timestamp': _timestamp(current),
+        'count': n_cur,
+        'changed': changed,
+        'added': current.rows(added, FEED_FIELDS) if len(added) else [],
+        'removed': [coin_id for coin_id in prev_pos if coin_id not in current_ids],
+    }
+
+
+def diff_symbols(previous: MarketSnapshot, current: MarketSnapshot,
+                 symbols: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """指定 symbol 的字段级差异，没有变化（或本轮已不存在）的 symbol 不出现在结果中"""
+    header = {'generation': current.generation, 'base': previous.generation, 'timestamp': _timestamp(current)}
+    result: Dict[str, Dict[str, Any]] = {}
+    matched_symbols, cur_rows, prev_rows = [], [], []
+    for symbol in symbols:
+        cur = current.index_by_symbol.get(symbol)
+        if cur is None:
+            continue
+        prev = previous.index_by_symbol.get(symbol)
+        if prev is None or previous.column('id')[prev] != current.column('id')[cur]:
+            row = current.rows([cur], FEED_FIELDS)[0]
+            result[symbol] = dict(header, symbol=symbol, id=row['id'], changed=row)
+            continue
+        matched_symbols.append(symbol)
+        cur_rows.append(cur)
+        prev_rows.append(prev)
+
+    fields = _changed_fields(previous, current, np.asarray(cur_rows, dtype=np.intp),
+                             np.asarray(prev_rows, dtype=np.intp))
+    for symbol, row, changed in zip(matched_symbols, cur_rows, fields):
+        if changed:
+            result[symbol] = dict(header, symbol=symbol, id=current.column('id')[row], changed=changed)
+    return result
+
+
+class MarketDeltaFeed:
+    """最近一次推送的快照与各档位的增量历史"""
+
+    def __init__(self, buckets: Sequence[int] = DEFAULT_TOP_BUCKETS, default_top: int = DEFAULT_TOP_N,
+                 history: int = DELTA_HISTORY):
+        self._snapshot: Optional[MarketSnapshot] = None
+        self._previous: Optional[MarketSnapshot] = None
+        self._history = history
+        self._lock = threading.Lock()
+        self.published = 0
+        self.last_stats: Optional[Dict[str, int]] = None
+        self.configure(buckets, default_top)
+
+    def configure(self, buckets: Sequence[int], default_top: int = DEFAULT_TOP_N):
+        """设置前 N 名档位（default_top 总会包含在内），清空增量历史"""
+        self.buckets = tuple(sorted({int(n) for n in buckets if int(n) > 0} | {int(default_top)}))
+        self.default_top = int(default_top)
+        self._deltas = {n: deque(maxlen=self._history) for n in self.buckets}
+
+    def bucket_for(self, top: Any = None) -> int:
+        """把客户端请求的 N 归到不小于它的最小档位（超过最大档位时取最大档位）"""
+        if top is None:
+            return self.default_top
+        try:
+            top = int(top)
+        except (TypeError, ValueError):
+            return self.default_top
+        for n in self.buckets:
+            if n >= top:
+                return n
+        return self.buckets[-1]
+
+    def publish(self, snapshot: MarketSnapshot,
+                previous: Optional[MarketSnapshot] = None) -> Optional[Dict[int, Dict[str, Any]]]:
+        """记录新快照并返回各档位相对上一次推送的增量 {N: 增量}
+
+        本进程还没有推送过时以 previous（刷新前的快照）为基准；都没有时返回 None，
+        客户端收到下一个增量后发现 base 不匹配会自行重新同步。
+        """
+        with self._lock:
+            base = self._snapshot or previous
+            if base is not None and snapshot.generation <= base.generation:
+                return None
+            self._snapshot = snapshot
+            self._previous = base
+            if base is None:
+                return None
+            deltas = {n: diff_snapshots(base, snapshot, n) for n in self.buckets}
+            for n, delta in deltas.items():
+                self._deltas[n].append(delta)
+            self.published += 1
+            delta = deltas[self.default_top]
+            self.last_stats = {
+                'changed': len(delta['changed']),
+                'fields': sum(len(fields) for fields in delta['changed'].values()),
+                'added': len(delta['added']),
+                'removed': len(delta['removed']),
+            }
+        return deltas
+
+    def symbol_deltas(self, symbols: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """最近一次推送中指定 symbol 的增量 {symbol: 增量}"""
+        with self._lock:
+            previous, snapshot = self._previous, self._snapshot
+        if previous is None or snapshot is None:
+            return {}
+        return diff_symbols(previous, snapshot, symbols)
+
+    def since(self, generation: Any, top: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+        """从 generation 衔接到最新的增量列表（已是最新时为空列表），无法衔接时返回 None"""
+        try:
+            generation = int(generation)
+        except (TypeError, ValueError):
+            return None
+        with self._lock:
+            deltas = list(self._deltas.get(self.bucket_for(top), ()))
+        if deltas and deltas[-1]['generation'] == generation:
+            return []
+        for i, delta in enumerate(deltas):
+            if delta['base'] == generation:
+                return deltas[i:]
+        return None
+
+    @staticmethod
+    def _current(snapshot: Optional[MarketSnapshot]) -> Optional[MarketSnapshot]:
+        if snapshot is None:
+            from .market_store import market_store
+            snapshot = market_store.get_snapshot()
+        return snapshot
+
+    def full(self, snapshot: Optional[MarketSnapshot] = None, top: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """完整的前 N 名数据（结果随快照缓存）"""
+        snapshot = self._current(snapshot)
+        if snapshot is None:
+            return None
+        top_n = self.bucket_for(top)
+
+        def build():
+            n = min(top_n, len(snapshot))
+            return {
+                'generation': snapshot.generation,
+                'timestamp': _timestamp(snapshot),
+                'top': top_n,
+                'count': n,
+                'data': snapshot.rows(np.arange(n), FEED_FIELDS),
+            }
+
+        return snapshot.memoize(('feed_full', top_n), build)
+
+    def symbol_rows(self, symbols: Sequence[str], snapshot: Optional[MarketSnapshot] = None) -> Optional[Dict[str, Any]]:
+        """指定 symbol 的当前完整行（不存在的 symbol 列在 not_found 中）"""
+        snapshot = self._current(snapshot)
+        if snapshot is None:
+            return None
+        found = [(symbol, snapshot.index_by_symbol.get(symbol)) for symbol in symbols]
+        rows = [row for _, row in found if row is not None]
+        return {
+            'generation': snapshot.generation,
+            'timestamp': _timestamp(snapshot),
+            'data': snapshot.rows(rows, FEED_FIELDS) if rows else [],
+            'not_found': [symbol for symbol, row in found if row is None],
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            'buckets': list(self.buckets),
+            'default_top': self.default_top,
+            'generation': snapshot.generation if snapshot is not None else None,
+            'published': self.published,
+            'history': len(self._deltas[self.default_top]),
+            'last': self.last_stats,
+        }
+
+
+market_feed = MarketDeltaFeed()
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+逐币种增量技术指标
+
+每次 CoinGecko 爬取得到一轮价格后，对所有币种一次性做向量化更新：
+- SMA（多个窗口）、EMA（多个跨度）
+- 对数收益率滚动波动率
+- 24h 涨跌幅的滚动 z-score
+- 成交量加权均价（VWAP 近似，按每轮快照的价格 × 24h 成交量加权）
+
+每个币种占用固定长度的环形缓冲区（NumPy 二维数组的一行），各窗口维护
+滚动和 / 平方和，单次更新对每个币种是 O(1)。为避免浮点累积误差，每隔
+RESYNC_TICKS 轮用缓冲区重新计算一次滚动和。
+
+服务启动后第一次使用时，从 market_snapshots 历史集合回放最近的快照预热。
+"""
+
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+SMA_WINDOWS = (5, 20, 60)
+EMA_SPANS = (12, 26)
+VOLATILITY_WINDOW = 20
+ZSCORE_WINDOW = 60
+VWAP_WINDOW = 20
+RESYNC_TICKS = 500
+
+BUFFER_SIZE = max(SMA_WINDOWS + (VOLATILITY_WINDOW, ZSCORE_WINDOW, VWAP_WINDOW))
+
+
+def _none_if_nan(value: float) -> Optional[float]:
+    value = float(value)
+    return None if value != value else value
+
+
+class IndicatorEngine:
+    """所有币种的环形缓冲区与滚动统计"""
+
+    def __init__(self, capacity: int = 1024, buffer_size: int = BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        self.rows: Dict[str, int] = {}
+        self.ids: List[str] = []
+        self.symbols: List[str] = []
+        self.symbol_rows: Dict[str, int] = {}
+        self.ticks = 0
+        self.updated_at: Optional[datetime] = None
+        self._lock = threading.RLock()
+        self._warmed = False
+        self._last_ids: List[str] = []
+        self._last_rows = np.empty(0, dtype=np.int64)
+        self._allocate(capacity)
+
+    # ---- 存储 ----
+
+    def _allocate(self, capacity: int):
+        W = self.buffer_size
+        self.capacity = capacity
+        self.price = np.zeros((capacity, W))
+        self.returns = np.zeros((capacity, W))
+        self.change = np.zeros((capacity, W))
+        self.volume = np.zeros((capacity, W))
+        self.pv = np.zeros((capacity, W))
+        self.pos = np.zeros(capacity, dtype=np.int64)
+        self.count = np.zeros(capacity, dtype=np.int64)
+        self.last_price = np.full(capacity, np.nan)
+        self.sma_sum = {w: np.zeros(capacity) for w in SMA_WINDOWS}
+        self.ema = {s: np.full(capacity, np.nan) for s in EMA_SPANS}
+        self.ret_sum = np.zeros(capacity)
+        self.ret_sq = np.zeros(capacity)
+        self.chg_sum = np.zeros(capacity)
+        self.chg_sq = np.zeros(capacity)
+        self.pv_sum = np.zeros(capacity)
+        self.v_sum = np.zeros(capacity)
+
+    def _grow(self, needed: int):
+        """容量不足时按倍数扩容，保留已有数据"""
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        old = {name: getattr(self, name) for name in (
+            'price', 'returns', 'change', 'volume', 'pv', 'pos', 'count', 'last_price',
+            'ret_sum', 'ret_sq', 'chg_sum', 'chg_sq', 'pv_sum', 'v_sum')}
+        old_sma, old_ema = self.sma_sum, self.ema
+        n = self.capacity
+        self._allocate(capacity)
+        for name, array in old.items():
+            getattr(self, name)[:n] = array
+        for w in SMA_WINDOWS:
+            self.sma_sum[w][:n] = old_sma[w]
+        for s in EMA_SPANS:
+            self.ema[s][:n] = old_ema[s]
+
+    def _rows_for(self, ids: List[str], symbols: Sequence[str]) -> np.ndarray:
+        """币种 id 对应的行号（空 id 为 -1），同一轮中重复出现的 id 只保留第一条"""
+        # 连续几轮的币种列表通常相同，直接复用上一轮的映射
+        if ids == self._last_ids:
+            return self._last_rows
+        rows = np.full(len(ids), -1, dtype=np.int64)
+        seen = set()
+        for i, coin_id in enumerate(ids):
+            if not coin_id or coin_id in seen:
+                continue
+            seen.add(coin_id)
+            row = self.rows.get(coin_id)
+            if row is None:
+                row = len(self.ids)
+                symbol = symbols[i] if i < len(symbols) else ''
+                self.rows[coin_id] = row
+                self.ids.append(coin_id)
+                self.symbols.append(symbol)
+                # 同名 symbol 保留首次出现的（快照按排名排序，即排名最高的）
+                self.symbol_rows.setdefault((symbol or '').upper(), row)
+            rows[i] = row
+        if len(self.ids) > self.capacity:
+            self._grow(len(self.ids))
+        self._last_ids, self._last_rows = ids, rows
+        return rows
+
+    # ---- 更新 ----
+
+    def update_arrays(self, ids: Sequence[str], symbols: Sequence[str], price: np.ndarray,
+                      volume: np.ndarray, change: np.ndarray, timestamp: Optional[datetime] = None):
+        """用一轮价格更新所有币种（缺少价格的币种本轮跳过）"""
+        with self._lock:
+            rows = self._rows_for(list(ids), symbols)
+            price = np.asarray(price, dtype=np.float64)
+            keep = np.flatnonzero((rows >= 0) & (price > 0))
+            if not len(keep):
+                return 0
+            rows = rows[keep]
+            price = price[keep]
+            volume = np.nan_to_num(np.asarray(volume, dtype=np.float64)[keep])
+            change = np.nan_to_num(np.asarray(change, dtype=np.float64)[keep])
+
+            W = self.buffer_size
+            p = self.pos[rows]
+            c = self.count[rows]
+            has_prev = c > 0
+
+            prev = np.where(has_prev, self.last_price[rows], price)
+            ret = np.log(price / prev)
+            pv = price * volume
+
+            def leaving(buffer, w):
+                # 窗口已满时，写入前离开窗口的旧值
+                old = buffer[rows, (p - w) % W]
+                return np.where(c >= w, old, 0.0)
+
+            for w in SMA_WINDOWS:
+                self.sma_sum[w][rows] += price - leaving(self.price, w)
+            for s in EMA_SPANS:
+                alpha = 2.0 / (s + 1)
+                self.ema[s][rows] = np.where(has_prev, alpha * price + (1 - alpha) * self.ema[s][rows], price)
+
+            old_ret = leaving(self.returns, VOLATILITY_WINDOW)
+            self.ret_sum[rows] += ret - old_ret
+            self.ret_sq[rows] += ret * ret - old_ret * old_ret
+
+            old_chg = leaving(self.change, ZSCORE_WINDOW)
+            self.chg_sum[rows] += change - old_chg
+            self.chg_sq[rows] += change * change - old_chg * old_chg
+
+            self.pv_sum[rows] += pv - leaving(self.pv, VWAP_WINDOW)
+            self.v_sum[rows] += volume - leaving(self.volume, VWAP_WINDOW)
+
+            self.price[rows, p] = price
+            self.returns[rows, p] = ret
+            self.change[rows, p] = change
+            self.volume[rows, p] = volume
+            self.pv[rows, p] = pv
+            self.pos[rows] = (p + 1) % W
+            self.count[rows] = c + 1
+            self.last_price[rows] = price
+
+            self.ticks += 1
+            self.updated_at = timestamp or datetime.utcnow()
+            if self.ticks % RESYNC_TICKS == 0:
+                self._resync()
+            return len(rows)
+
+    def update(self, snapshot) -> int:
+        """用 MarketSnapshot 更新（每次爬取调用一次）"""
+        self.ensure_warm(before=snapshot.timestamp)
+        return self.update_arrays(
+            snapshot.column('id'), snapshot.column('symbol'), snapshot.column('price_usd'),
+            snapshot.column('volume_24h'), snapshot.column('price_change_percentage_24h'),
+            snapshot.timestamp,
+        )
+
+    def _window_sum(self, buffer: np.ndarray, w: int, square: bool = False) -> np.ndarray:
+        """用缓冲区精确计算每行最近 w 个值之和"""
+        n = len(self.ids)
+        W = self.buffer_size
+        offsets = np.arange(1, w + 1)
+        index = (self.pos[:n, None] - offsets[None, :]) % W
+        values = np.take_along_axis(buffer[:n], index, axis=1)
+        values = np.where(offsets[None, :] <= self.count[:n, None], values, 0.0)
+        if square:
+            values = values * values
+        return values.sum(axis=1)
+
+    def _resync(self):
+        """重新计算滚动和，消除浮点累积误差"""
+        n = len(self.ids)
+        for w in SMA_WINDOWS:
+            self.sma_sum[w][:n] = self._window_sum(self.price, w)
+        self.ret_sum[:n] = self._window_sum(self.returns, VOLATILITY_WINDOW)
+        self.ret_sq[:n] = self._window_sum(self.returns, VOLATILITY_WINDOW, square=True)
+        self.chg_sum[:n] = self._window_sum(self.change, ZSCORE_WINDOW)
+        self.chg_sq[:n] = self._window_sum(self.change, ZSCORE_WINDOW, square=True)
+        self.pv_sum[:n] = self._window_sum(self.pv, VWAP_WINDOW)
+        self.v_sum[:n] = self._window_sum(self.volume, VWAP_WINDOW)
+
+    # ---- 预热 ----
+
+    def warm_up(self, docs: Iterable[Dict[str, Any]]) -> int:
+        """按时间顺序回放 market_snapshots 文档"""
+        replayed = 0
+        for doc in docs:
+            self.update_arrays(
+                doc.get('ids', []), doc.get('symbols', []),
+                np.array(doc.get('price_usd', []), dtype=np.float64),
+                np.array(doc.get('volume_24h', []), dtype=np.float64),
+                np.array(doc.get('price_change_percentage_24h', []), dtype=np.float64),
+                doc.get('timestamp'),
+            )
+            replayed += 1
+        return replayed
+
+    def ensure_warm(self, before: Optional[datetime] = None):
+        """首次使用时从历史快照预热（只执行一次）
+
+        before 为即将推入的快照时间：该快照在推入前可能已写入历史集合，
+        只回放时间早于它的快照，避免同一快照被计入两次。
+        """
+        if self._warmed:
+            return
+        with self._lock:
+            if self._warmed:
+                return
+            self._warmed = True
+            try:
+                from ..database.db import MarketSnapshotManager
+
+                docs = MarketSnapshotManager().get_recent_snapshots(limit=self.buffer_size, before=before)
+                replayed = self.warm_up(docs)
+                if replayed:
+                    print(f"📈 技术指标已从 {replayed} 个历史快照预热 ({len(self.ids)} 个币种)")
+            except Exception as e:
+                print(f"⚠️  技术指标预热失败: {e}")
+
+    # ---- 查询 ----
+
+    def _stats(self, rows: np.ndarray) -> Dict[str, np.ndarray]:
+        """按行计算指标（向量化）"""
+        c = self.count[rows].astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result = {}
+            for w in SMA_WINDOWS:
+                result[f'sma_{w}'] = np.where(c > 0, self.sma_sum[w][rows] / np.minimum(c, w), np.nan)
+            for s in EMA_SPANS:
+                result[f'ema_{s}'] = self.ema[s][rows]
+
+            n = np.minimum(c - 1, VOLATILITY_WINDOW)
+            var = (self.ret_sq[rows] - self.ret_sum[rows] ** 2 / n) / (n - 1)
+            result['volatility'] = np.where(n >= 2, np.sqrt(np.maximum(var, 0)) * 100, np.nan)
+
+            n = np.minimum(c, ZSCORE_WINDOW)
+            mean = self.chg_sum[rows] / n
+            std = np.sqrt(np.maximum((self.chg_sq[rows] - n * mean ** 2) / (n - 1), 0))
+            latest = self.change[rows, (self.pos[rows] - 1) % self.buffer_size]
+            result['zscore_change_24h'] = np.where((n >= 2) & (std > 0), (latest - mean) / std, np.nan)
+
+            result['vwap'] = np.where(self.v_sum[rows] > 0, self.pv_sum[rows] / self.v_sum[rows], np.nan)
+            result['volume_avg'] = np.where(c > 0, self.v_sum[rows] / np.minimum(c, VWAP_WINDOW), np.nan)
+        return result
+
+    def all_indicators(self, ids: Sequence[str]) -> Dict[str, np.ndarray]:
+        """按给定 id 顺序返回所有指标列（未知币种为 NaN），供批量规则计算使用"""
+        with self._lock:
+            rows = np.array([self.rows.get(coin_id, -1) for coin_id in ids], dtype=np.int64)
+            known = rows >= 0
+            stats = self._stats(rows[known])
+            result = {}
+            for name, values in stats.items():
+                column = np.full(len(ids), np.nan)
+                column[known] = values
+                result[name] = column
+            return result
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """单个币种的指标（key 为 CoinGecko id 或 symbol）"""
+        self.ensure_warm()
+        with self._lock:
+            row = self.rows.get(key)
+            if row is None:
+                row = self.symbol_rows.get(key.upper())
+            if row is None:
+                return None
+            stats = self._stats(np.array([row]))
+            return {
+                'id': self.ids[row],
+                'symbol': self.symbols[row],
+                'samples': int(self.count[row]),
+                'price': _none_if_nan(self.last_price[row]),
+                'sma': {str(w): _none_if_nan(stats[f'sma_{w}'][0]) for w in SMA_WINDOWS},
+                'ema': {str(s): _none_if_nan(stats[f'ema_{s}'][0]) for s in EMA_SPANS},
+                'volatility': _none_if_nan(stats['volatility'][0]),
+                'zscore_change_24h': _none_if_nan(stats['zscore_change_24h'][0]),
+                'vwap': _none_if_nan(stats['vwap'][0]),
+                'volume_avg': _none_if_nan(stats['volume_avg'][0]),
+                'windows': {
+                    'volatility': VOLATILITY_WINDOW,
+                    'zscore': ZSCORE_WINDOW,
+                    'vwap': VWAP_WINDOW,
+                },
+                'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            }
+
+
+indicator_engine = IndicatorEngine()
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+最新行情的 NumPy 列式存储
+
+每次 CoinGecko 爬取完成后，由 _save_scraped_data 用本轮的 CryptoData 列表
+构建一个不可变的 MarketSnapshot：
+- 数值字段各为一列连续的 float64 数组（缺失值为 NaN）
+- id / symbol / name / image 为 object 数组，另有 id、symbol -> 行号的索引
+- 行按市值排名升序排列（无排名的排在最后）
+
+排序、过滤、Top-N、分位数、市值加权等分析都在列上做向量化运算，
+不再为每次分析把数千个文档转换成 Python 字典。快照整体替换，
+读取方拿到的引用在使用期间不会被修改。
+"""
+
+import math
+import threading
+from datetime import datetime
+from operator import attrgetter
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from ..utils.generation import MARKET_GENERATION, bump_generation, get_generation
+
+# 数值列（float64）
+NUMERIC_FIELDS = (
+    'price_usd',
+    'market_cap',
+    'volume_24h',
+    'price_change_24h',
+    'price_change_percentage_24h',
+    'price_change_percentage_7d',
+    'price_change_percentage_30d',
+    'circulating_supply',
+    'total_supply',
+    'max_supply',
+    'fully_diluted_valuation',
+    'ath',
+    'ath_change_percentage',
+    'atl',
+    'atl_change_percentage',
+    'rank',
+)
+
+# 字符串列（object）
+TEXT_FIELDS = ('id', 'symbol', 'name', 'image')
+
+# 写入 market_snapshots 历史集合的数值列
+HISTORY_FIELDS = ('price_usd', 'market_cap', 'volume_24h', 'price_change_percentage_24h')
+
+_get_numeric = attrgetter(*NUMERIC_FIELDS)
+_get_text = attrgetter(*TEXT_FIELDS)
+
+
+def _to_float_matrix(rows: List[tuple], width: int) -> np.ndarray:
+    """把数值元组转换为 (n, width) 的 float64 矩阵，None 转为 NaN"""
+    if not rows:
+        return np.empty((0, width), dtype=np.float64)
+    try:
+        return np.array(rows, dtype=np.float64)
+    except (TypeError, ValueError):
+        # 个别取值无法转换时逐个处理
+        def _value(v):
+            try:
+                return float(v) if v is not None else math.nan
+            except (TypeError, ValueError):
+                return math.nan
+        return np.array([[_value(v) for v in row] for row in rows], dtype=np.float64)
+
+
+class MarketSnapshot:
+    """一轮爬取的列式快照（只读）"""
+
+    def __init__(self, columns: Dict[str, np.ndarray], generation: int = 0,
+                 timestamp: Optional[datetime] = None, global_data: Optional[Dict[str, Any]] = None):
+        self.columns = columns
+        self.generation = generation
+        self.timestamp = timestamp or datetime.utcnow()
+        # 与本轮爬取一起获取的 CoinGecko /global 数据
+        self.global_data = global_data
+        self.size = len(columns['id']) if 'id' in columns else 0
+        self._memo: Dict[Any, Any] = {}
+        self._memo_lock = threading.Lock()
+
+        self.index_by_id: Dict[str, int] = {}
+        self.index_by_symbol: Dict[str, int] = {}
+        for i, (coin_id, symbol) in enumerate(zip(columns['id'], columns['symbol'])):
+            if coin_id:
+                self.index_by_id.setdefault(coin_id, i)
+            if symbol:
+                # 行按排名排序，重复 symbol 保留排名最高的一行
+                self.index_by_symbol.setdefault(symbol, i)
+
+        for array in columns.values():
+            array.setflags(write=False)
+
+    @classmethod
+    def from_cryptos(cls, cryptos: Sequence[Any], generation: int = 0,
+                     timestamp: Optional[datetime] = None) -> 'MarketSnapshot':
+        """由 CryptoData 对象（或具有相同属性的对象）构建快照"""
+        numeric = _to_float_matrix([_get_numeric(c) for c in cryptos], len(NUMERIC_FIELDS))
+        text = [_get_text(c) for c in cryptos]
+
+        # 按排名升序排列，NaN 排在最后（argsort 稳定，同排名保持原顺序）
+        order = np.argsort(numeric[:, NUMERIC_FIELDS.index('rank')], kind='stable')
+        numeric = numeric[order]
+
+        columns = {}
+        for j, field in enumerate(NUMERIC_FIELDS):
+            columns[field] = np.ascontiguousarray(numeric[:, j])
+        for j, field in enumerate(TEXT_FIELDS):
+            column = np.empty(len(text), dtype=object)
+            column[:] = [text[i][j] for i in order]
+            columns[field] = column
+        return cls(columns, generation, timestamp)
+
+    @classmethod
+    def from_documents(cls, docs: Iterable[Dict[str, Any]], generation: int = 0,
+                       timestamp: Optional[datetime] = None) -> 'MarketSnapshot':
+        """由数据库文档构建快照（同一 id 只保留第一条）"""
+        from ..models.crypto import CryptoData
+
+        seen = set()
+        cryptos = []
+        for doc in docs:
+            coin_id = doc.get('id') or doc.get('symbol')
+            if coin_id in seen:
+                continue
+            seen.add(coin_id)
+            cryptos.append(CryptoData(doc))
+        return cls.from_cryptos(cryptos, generation, timestamp)
+
+    def __len__(self):
+        return self.size
+
+    def to_history_doc(self) -> Dict[str, Any]:
+        """转换为 market_snapshots 集合的列式文档（NaN 存为 None）"""
+        doc = {
+            'timestamp': self.timestamp,
+            'ids': self.columns['id'].tolist(),
+            'symbols': self.columns['symbol'].tolist(),
+        }
+        for field in HISTORY_FIELDS:
+            doc[field] = [None if v != v else v for v in self.columns[field].tolist()]
+        if self.global_data:
+            doc['global_data'] = self.global_data
+        return doc
+
+    def memoize(self, key: Any, compute):
+        """按 key 缓存基于本快照的计算结果（快照不可变，结果随快照一起失效）"""
+        try:
+            return self._memo[key]
+        except KeyError:
+            pass
+        with self._memo_lock:
+            if key not in self._memo:
+                self._memo[key] = compute()
+            return self._memo[key]
+
+    # ---- 访问 ----
+
+    def column(self, field: str) -> np.ndarray:
+        """返回只读列数组"""
+        try:
+            return self.columns[field]
+        except KeyError:
+            raise ValueError(f'未知字段: {field}')
+
+    def locate(self, key: str) -> Optional[int]:
+        """按 CoinGecko id 或 symbol 查找行号"""
+        if key in self.index_by_id:
+            return self.index_by_id[key]
+        return self.index_by_symbol.get(str(key).upper())
+
+    def rows(self, indices: Optional[Iterable[int]] = None,
+             fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """把指定行转换为字典列表（NaN 转为 None）"""
+        fields = tuple(fields) if fields else TEXT_FIELDS + NUMERIC_FIELDS
+        if indices is None:
+            indices = np.arange(self.size)
+        indices = np.asarray(indices, dtype=np.intp)
+        selected = [self.column(field)[indices].tolist() for field in fields]
+        result = []
+        for values in zip(*selected):
+            row = {}
+            for field, value in zip(fields, values):
+                if isinstance(value, float):
+                    if value != value:
+                        value = None
+                    elif field == 'rank':
+                        value = int(value)
+                row[field] = value
+            result.append(row)
+        return result
+
+    # ---- 向量化运算 ----
+
+    def mask(self, field: str, op: str, value: float) -> np.ndarray:
+        """单字段比较生成布尔掩码（NaN 永远不满足）"""
+        column = self.column(field)
+        if op == '>':
+            return column > value
+        if op == '>=':
+            return column >= value
+        if op == '<':
+            return column < value
+        if op == '<=':
+            return column <= value
+        if op == '==':
+            return column == value
+        if op == '!=':
+            known = ~np.isnan(column)
+            if isinstance(value, np.ndarray):
+                known &= ~np.isnan(value)
+            return (column != value) & known
+        raise ValueError(f'不支持的比较运算: {op}')
+
+    def top_n(self, field: str, n: int = 10, descending: bool = True,
+              mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """按字段取前 N 行的行号（忽略 NaN），O(size) 选择 + O(N log N) 排序"""
+        column = self.column(field)
+        candidates = ~np.isnan(column)
+        if mask is not None:
+            candidates &= mask
+        indices = np.flatnonzero(candidates)
+        if n <= 0 or not len(indices):
+            return indices[:0]
+        values = column[indices]
+        keys = -values if descending else values
+        if n < len(indices):
+            part = np.argpartition(keys, n - 1)[:n]
+            indices, keys = indices[part], keys[part]
+        return indices[np.argsort(keys, kind='stable')]
+
+    def sort(self, field: str, descending: bool = False, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """按字段排序后的行号（NaN 排在最后）"""
+        column = self.column(field)
+        indices = np.flatnonzero(mask) if mask is not None else np.arange(self.size)
+        values = column[indices]
+        keys = np.where(np.isnan(values), np.inf, -values if descending else values)
+        return indices[np.argsort(keys, kind='stable')]
+
+    def percentiles(self, field: str, qs: Sequence[float] = (25, 50, 75),
+                    mask: Optional[np.ndarray] = None) -> Dict[str, Optional[float]]:
+        """字段分位数（忽略 NaN）"""
+        column = self.column(field)
+        if mask is not None:
+            column = column[mask]
+        column = column[~np.isnan(column)]
+        if not len(column):
+            return {f'p{q:g}': None for q in qs}
+        values = np.percentile(column, qs)
+        return {f'p{q:g}': float(v) for q, v in zip(qs, values)}
+
+    def weighted_mean(self, field: str, weights: str = 'market_cap',
+                      mask: Optional[np.ndarray] = None) -> Optional[float]:
+        """加权平均（默认市值加权），只统计字段与权重都有效的行"""
+        values = self.column(field)
+        w = self.column(weights)
+        valid = ~np.isnan(values) & ~np.isnan(w) & (w > 0)
+        if mask is not None:
+            valid &= mask
+        total = w[valid].sum()
+        if not total:
+            return None
+        return float(np.dot(values[valid], w[valid]) / total)
+
+    def total(self, field: str, mask: Optional[np.ndarray] = None) -> float:
+        """字段求和（忽略 NaN）"""
+        column = self.column(field)
+        if mask is not None:
+            column = column[mask]
+        return float(np.nansum(column))
+
+
+class MarketStore:
+    """持有最新 MarketSnapshot，刷新时整体替换并推进 'market' 代际"""
+
+    def __init__(self):
+        self._snapshot: Optional[MarketSnapshot] = None
+        self._lock = threading.Lock()
+
+    def refresh(self, cryptos: Sequence[Any], timestamp: Optional[datetime] = None,
+                global_data: Optional[Dict[str, Any]] = None) -> MarketSnapshot:
+        """用一轮爬取结果重建快照（未获取到 /global 数据时沿用上一轮）"""
+        with self._lock:
+            if not global_data and self._snapshot is not None:
+                global_data = self._snapshot.global_data
+            snapshot = MarketSnapshot.from_cryptos(cryptos, bump_generation(MARKET_GENERATION), timestamp)
+            snapshot.global_data = global_data or None
+            self._snapshot = snapshot
+        return snapshot
+
+    def load_from_backend(self, manager=None) -> MarketSnapshot:
+        """服务重启后从数据库恢复快照（每个币取最新一条）"""
+        from ..database.db import CryptoDataManager
+
+        manager = manager or CryptoDataManager()
+        docs = manager.get_latest_data(limit=None)
+        global_data = self._latest_global_data()
+        with self._lock:
+            if self._snapshot is not None:
+                # 加载期间已有爬取刷新了快照
+                return self._snapshot
+            # 代际号已非 0（启动后数据库有过写入，或多进程部署中从集群同步而来）时沿用，不再递增
+            generation = get_generation(MARKET_GENERATION) or bump_generation(MARKET_GENERATION)
+            snapshot = MarketSnapshot.from_documents(docs, generation)
+            snapshot.global_data = global_data
+            self._snapshot = snapshot
+        return snapshot
+
+    @staticmethod
+    def _latest_global_data() -> Optional[Dict[str, Any]]:
+        """最近一条历史快照中保存的 /global 数据"""
+        from ..database.db import MarketSnapshotManager
+
+        try:
+            history = MarketSnapshotManager().get_recent_snapshots(limit=1)
+        except Exception as e:
+            print(f"⚠️  读取全球市场数据失败: {e}")
+            return None
+        return history[-1].get('global_data') if history else None
+
+    def reload_from_backend(self, generation: int, manager=None) -> MarketSnapshot:
+        """其他进程刷新行情后重新加载快照，使用同步来的代际号（不递增）"""
+        from ..database.db import CryptoDataManager
+
+        manager = manager or CryptoDataManager()
+        docs = manager.get_latest_data(limit=None)
+        snapshot = MarketSnapshot.from_documents(docs, generation)
+        with self._lock:
+            current = self._snapshot
+            if current is not None:
+                if current.generation >= generation:
+                    return current
+                snapshot.global_data = current.global_data
+            self._snapshot = snapshot
+        return snapshot
+
+    def set_global_data(self, global_data: Dict[str, Any]) -> Optional[MarketSnapshot]:
+        """替换当前快照的 /global 数据（列数据共享，基于快照的缓存结果随旧对象丢弃）"""
+        with self._lock:
+            current = self._snapshot
+            if current is None or current.global_data == global_data:
+                return current
+            snapshot = MarketSnapshot(current.columns, current.generation, current.timestamp, global_data)
+            self._snapshot = snapshot
+        return snapshot
+
+    def get_snapshot(self, load: bool = True) -> Optional[MarketSnapshot]:
+        """当前快照；尚未刷新过时按需从数据库加载"""
+        snapshot = self._snapshot
+        if snapshot is None and load:
+            try:
+                snapshot = self.load_from_backend()
+            except Exception as e:
+                print(f"⚠️  从数据库加载行情快照失败: {e}")
+                return None
+        return snapshot
+
+    @property
+    def generation(self) -> int:
+        return get_generation(MARKET_GENERATION)
+
+
+market_store = MarketStore()
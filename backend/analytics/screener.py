@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+行情筛选器
+
+在最新行情快照上执行筛选表达式，例如:
+
+    market_cap > 1e9 and price_change_percentage_24h < -5 sort volume_24h desc limit 20
+
+语法:
+    expr    := or_expr [sort <field> [asc|desc]] [limit <n>]
+    or_expr := and_expr (or and_expr)*
+    and_expr:= not_expr (and not_expr)*
+    not_expr:= not not_expr | '(' or_expr ')' | <field> <op> (<number> | <field>)
+    op      := > >= < <= == = !=
+数字支持 1e9、2.5m、3b 等写法；字段为 CryptoData 的数值字段。
+缺失值（NaN）不满足任何比较，取反也不会使其满足：not <expr> 只在 <expr> 引用的字段
+全部有值的行上取反，例如 not price > 10 不会选出没有价格的币种。
+
+表达式编译为一组向量化掩码运算，编译结果按表达式原文 LRU 缓存；执行结果按
+(行情代际, 规范化表达式, limit, 字段) 缓存，新一轮爬取后自动失效。
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .market_store import NUMERIC_FIELDS, TEXT_FIELDS, MarketSnapshot
+
+# 字段别名
+FIELD_ALIASES = {
+    'price': 'price_usd',
+    'volume': 'volume_24h',
+    'mcap': 'market_cap',
+    'change_24h': 'price_change_percentage_24h',
+    'change_7d': 'price_change_percentage_7d',
+    'change_30d': 'price_change_percentage_30d',
+    'fdv': 'fully_diluted_valuation',
+}
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+DEFAULT_FIELDS = ('id', 'symbol', 'name', 'rank', 'price_usd', 'market_cap', 'volume_24h',
+                  'price_change_percentage_24h', 'price_change_percentage_7d')
+
+_TOKEN_RE = re.compile(
+    r'\s*(?:'
+    r'(?P<number>[+-]?(?:\d+\.?\d*|\.\d+)(?:e[+-]?\d+)?[kmbt]?)(?![\w.])'
+    r'|(?P<op>>=|<=|==|!=|>|<|=)'
+    r'|(?P<paren>[()])'
+    r'|(?P<name>[A-Za-z_][A-Za-z0-9_]*)'
+    r')',
+    re.I
+)
+_MULTIPLIERS = {'k': 1e3, 'm': 1e6, 'b': 1e9, 't': 1e12}
+_KEYWORDS = ('and', 'or', 'not', 'sort', 'by', 'asc', 'desc', 'limit')
+
+Mask = Callable[[MarketSnapshot], np.ndarray]
+
+
+class ScreenerError(ValueError):
+    """筛选表达式错误"""
+    pass
+
+
+def _tokenize(text: str) -> List[Tuple[str, Any]]:
+    tokens = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        m = _TOKEN_RE.match(text, pos)
+        if not m or m.end() == pos:
+            raise ScreenerError(f'无法解析: {text[pos:pos + 20]!r}')
+        pos = m.end()
+        kind = m.lastgroup
+        value = m.group(kind)
+        if kind == 'number':
+            suffix = value[-1].lower()
+            if suffix in _MULTIPLIERS:
+                value = float(value[:-1]) * _MULTIPLIERS[suffix]
+            else:
+                value = float(value)
+        elif kind == 'name':
+            value = value.lower()
+            if value in _KEYWORDS:
+                kind = 'keyword'
+        elif kind == 'op' and value == '=':
+            value = '=='
+        tokens.append((kind, value))
+    return tokens
+
+
+def _resolve_field(name: str) -> str:
+    field = FIELD_ALIASES.get(name, name)
+    if field not in NUMERIC_FIELDS:
+        raise ScreenerError(f'未知或不可比较的字段: {name}')
+    return field
+
+
+class CompiledQuery:
+    """编译后的筛选表达式"""
+
+    __slots__ = ('canonical', 'mask', 'sort_field', 'descending', 'limit')
+
+    def __init__(self, canonical: str, mask: Optional[Mask], sort_field: Optional[str],
+                 descending: bool, limit: Optional[int]):
+        self.canonical = canonical
+        self.mask = mask
+        self.sort_field = sort_field
+        self.descending = descending
+        self.limit = limit
+
+    def execute(self, snapshot: MarketSnapshot) -> np.ndarray:
+        """返回满足条件的行号（已排序）"""
+        mask = self.mask(snapshot) if self.mask is not None else None
+        if self.sort_field:
+            return snapshot.sort(self.sort_field, descending=self.descending, mask=mask)
+        # 未指定排序时保持快照的排名顺序
+        return np.flatnonzero(mask) if mask is not None else np.arange(len(snapshot))
+
+
+class _Parser:
+    """递归下降解析，生成掩码函数和规范化文本"""
+
+    def __init__(self, tokens: List[Tuple[str, Any]]):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self) -> Tuple[Optional[str], Any]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, kind: str = None, value: Any = None) -> Tuple[str, Any]:
+        token = self.peek()
+        if token[0] is None or (kind and token[0] != kind) or (value is not None and token[1] != value):
+            expected = value or kind or '表达式'
+            raise ScreenerError(f'缺少 {expected}，实际为 {token[1]!r}')
+        self.pos += 1
+        return token
+
+    def parse(self) -> CompiledQuery:
+        mask, text = None, ''
+        if self.peek()[0] not in (None, 'keyword') or self.peek()[1] == 'not':
+            mask, text, _ = self.parse_or()
+
+        sort_field, descending, limit = None, False, None
+        if self.peek() == ('keyword', 'sort'):
+            self.take()
+            if self.peek() == ('keyword', 'by'):
+                self.take()
+            sort_field = _resolve_field(self.take('name')[1])
+            if self.peek()[0] == 'keyword' and self.peek()[1] in ('asc', 'desc'):
+                descending = self.take()[1] == 'desc'
+        if self.peek() == ('keyword', 'limit'):
+            self.take()
+            limit = int(self.take('number')[1])
+        if self.peek()[0] is not None:
+            raise ScreenerError(f'多余的内容: {self.peek()[1]!r}')
+
+        canonical = text
+        if sort_field:
+            canonical += f' sort {sort_field} {"desc" if descending else "asc"}'
+        if limit is not None:
+            canonical += f' limit {limit}'
+        return CompiledQuery(canonical.strip(), mask, sort_field, descending, limit)
+
+    # 各 parse_* 返回 (掩码函数, 规范化文本, 引用的字段)
+
+    def parse_or(self) -> Tuple[Mask, str, Tuple[str, ...]]:
+        mask, text, fields = self.parse_and()
+        while self.peek() == ('keyword', 'or'):
+            self.take()
+            right, right_text, right_fields = self.parse_and()
+            mask = (lambda a, b: lambda s: a(s) | b(s))(mask, right)
+            text = f'{text} or {right_text}'
+            fields += right_fields
+        return mask, text, fields
+
+    def parse_and(self) -> Tuple[Mask, str, Tuple[str, ...]]:
+        mask, text, fields = self.parse_not()
+        while self.peek() == ('keyword', 'and'):
+            self.take()
+            right, right_text, right_fields = self.parse_not()
+            mask = (lambda a, b: lambda s: a(s) & b(s))(mask, right)
+            text = f'{text} and {right_text}'
+            fields += right_fields
+        return mask, text, fields
+
+    def parse_not(self) -> Tuple[Mask, str, Tuple[str, ...]]:
+        if self.peek() == ('keyword', 'not'):
+            self.take()
+            inner, text, fields = self.parse_not()
+            # 只在引用字段全部有值的行上取反，缺失值取反后仍不满足
+            known = tuple(dict.fromkeys(fields))
+            return (lambda a: lambda s: ~a(s) & _known(s, known))(inner), f'not {text}', fields
+        if self.peek() == ('paren', '('):
+            self.take()
+            mask, text, fields = self.parse_or()
+            self.take('paren', ')')
+            return mask, f'({text})', fields
+        return self.parse_comparison()
+
+    def parse_comparison(self) -> Tuple[Mask, str, Tuple[str, ...]]:
+        field = _resolve_field(self.take('name')[1])
+        op = self.take('op')[1]
+        kind, value = self.peek()
+        if kind == 'number':
+            self.take()
+            return (lambda s: s.mask(field, op, value)), f'{field} {op} {value!r}', (field,)
+        if kind == 'name':
+            other = _resolve_field(self.take()[1])
+            return (lambda s: s.mask(field, op, s.column(other))), f'{field} {op} {other}', (field, other)
+        raise ScreenerError(f'{field} {op} 后缺少数字或字段')
+
+
+def _known(snapshot: MarketSnapshot, fields: Sequence[str]) -> np.ndarray:
+    """给定字段全部非 NaN 的行"""
+    mask = np.ones(len(snapshot), dtype=bool)
+    for field in fields:
+        mask &= ~np.isnan(snapshot.column(field))
+    return mask
+
+
+@lru_cache(maxsize=512)
+def compile_expression(text: str) -> CompiledQuery:
+    """编译筛选表达式（按原文 LRU 缓存）"""
+    if len(text) > 1000:
+        raise ScreenerError('表达式过长')
+    return _Parser(_tokenize(text)).parse()
+
+
+class _ResultCache:
+    """按 (代际, 表达式, limit, 字段) 缓存的 LRU，代际变化时丢弃旧结果"""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._data: 'OrderedDict[tuple, Dict[str, Any]]' = OrderedDict()
+        self._generation = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            result = self._data.get(key) if key[0] == self._generation else None
+            if result is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key: tuple, value: Dict[str, Any]):
+        with self._lock:
+            if key[0] != self._generation:
+                self._data.clear()
+                self._generation = key[0]
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {'size': len(self._data), 'hits': self.hits, 'misses': self.misses,
+                'generation': self._generation}
+
+
+_results = _ResultCache()
+
+
+def _normalize_fields(fields: Optional[Sequence[str]]) -> Tuple[str, ...]:
+    if not fields:
+        return DEFAULT_FIELDS
+    resolved = []
+    for name in fields:
+        name = name.strip().lower()
+        if not name:
+            continue
+        field = FIELD_ALIASES.get(name, name)
+        if field not in NUMERIC_FIELDS and field not in TEXT_FIELDS:
+            raise ScreenerError(f'未知字段: {name}')
+        resolved.append(field)
+    return tuple(resolved) or DEFAULT_FIELDS
+
+
+def run_screener(snapshot: MarketSnapshot, expression: str, limit: Optional[int] = None,
+                 fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """在快照上执行筛选，返回 {query, generation, total, count, data}"""
+    query = compile_expression(expression.strip())
+    limit = limit or query.limit or DEFAULT_LIMIT
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    fields = _normalize_fields(fields)
+
+    key = (snapshot.generation, query.canonical, limit, fields)
+    result = _results.get(key)
+    if result is not None:
+        return result
+
+    indices = query.execute(snapshot)
+    rows = snapshot.rows(indices[:limit], fields)
+    result = {
+        'query': query.canonical,
+        'generation': snapshot.generation,
+        'total': int(len(indices)),
+        'count': len(rows),
+        'data': rows,
+    }
+    _results.put(key, result)
+    return result
+
+
+def screener_cache_stats() -> Dict[str, Any]:
+    """编译缓存与结果缓存的命中统计"""
+    info = compile_expression.cache_info()
+    return {
+        'compiled': {'size': info.currsize, 'hits': info.hits, 'misses': info.misses},
+        'results': _results.stats(),
+    }
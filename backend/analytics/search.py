@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+币种 / 投资者搜索索引
+
+索引币种的 symbol、名称和投资者的名称、slug，供 /api/search 的输入联想使用：
+- 前缀索引: 所有词项（完整名称、去空格名称、名称中的单词）与条目号组成的
+  有序数组，相当于展开的前缀树，任一前缀对应数组中的一个连续区间，
+  用二分查找定位，区间内按排名用 argpartition 取前 N 个
+- 三元组索引: 词项三元组 -> 条目集合，前缀命中不足时做容错（拼写错误）匹配，
+  用 bincount 统计每个条目命中的查询三元组数
+
+排序: 完全匹配 > 前缀匹配 > 模糊匹配，同一级别内按排名（市值排名 / 投资者排名）。
+
+每轮爬取后按条目比对增量更新：词项未变的条目只更新排名，变化的条目只
+替换自己的词项。查询使用的 NumPy 视图和查询结果按索引版本缓存。
+"""
+
+import re
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..utils.generation import INVESTOR_GENERATION, MARKET_GENERATION, get_generation
+
+SEARCH_TYPES = ('crypto', 'investor')
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+FUZZY_MIN_LENGTH = 3
+FUZZY_THRESHOLD = 0.5  # 查询三元组命中比例下限
+MAX_CACHED_QUERIES = 2048
+# 单次更新的词项变化超过该数量时整体重排，否则逐条二分插入 / 删除
+BULK_THRESHOLD = 2000
+
+_UNRANKED = 1e9
+_PREFIX_PENALTY = 1e12  # 前缀匹配排在所有完全匹配之后
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+_END = '\uffff'
+
+
+def normalize(text: Any) -> str:
+    """小写并把非字母数字字符折叠为单个空格"""
+    return _NON_ALNUM.sub(' ', str(text or '').lower()).strip()
+
+
+def _terms(*labels: Any) -> Tuple[str, ...]:
+    """条目的全部词项：完整名称、去空格名称和其中长度 >= 2 的单词"""
+    terms = set()
+    for label in labels:
+        text = normalize(label)
+        if not text:
+            continue
+        terms.add(text)
+        words = text.split()
+        if len(words) > 1:
+            terms.add(''.join(words))
+            terms.update(word for word in words if len(word) >= 2)
+    return tuple(sorted(terms))
+
+
+def _trigrams(terms: Iterable[str]) -> frozenset:
+    grams = set()
+    for term in terms:
+        padded = f' {term} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def _rank_score(value: Any) -> float:
+    try:
+        rank = float(value)
+    except (TypeError, ValueError):
+        return _UNRANKED
+    return rank if rank > 0 else _UNRANKED
+
+
+class SearchIndex:
+    """前缀 + 三元组搜索索引（增量更新）"""
+
+    def __init__(self):
+        self._postings: List[Tuple[str, int]] = []  # 按 (词项, 条目号) 排序
+        self._grams: Dict[str, set] = {}
+        self._payloads: List[Optional[Dict[str, Any]]] = []
+        self._scores: List[float] = []
+        self._entry_terms: List[Tuple[str, ...]] = []
+        self._entry_grams: List[frozenset] = []
+        self._keys: Dict[str, Dict[Any, int]] = {kind: {} for kind in SEARCH_TYPES}
+        self._free: List[int] = []
+        self._cache: 'OrderedDict[tuple, List[Dict[str, Any]]]' = OrderedDict()
+        self._lock = threading.RLock()
+        self.version = 0
+        self.market_generation: Optional[int] = None
+        self.investor_generation: Optional[int] = None
+        self._snapshot_generation: Optional[int] = None
+        self._arrays_version = -1
+        self._post_terms: List[str] = []
+        self._post_eids = np.empty(0, dtype=np.int64)
+        self._score_array = np.empty(0)
+        self._kind_array = np.empty(0, dtype=np.int8)
+        self._gram_arrays: Dict[str, np.ndarray] = {}
+
+    def __len__(self):
+        return sum(len(keys) for keys in self._keys.values())
+
+    # ---- 条目维护 ----
+
+    def _alloc(self, payload: Dict[str, Any], terms: Tuple[str, ...], score: float) -> int:
+        grams = _trigrams(terms)
+        if self._free:
+            eid = self._free.pop()
+            self._payloads[eid], self._scores[eid] = payload, score
+            self._entry_terms[eid], self._entry_grams[eid] = terms, grams
+        else:
+            eid = len(self._payloads)
+            self._payloads.append(payload)
+            self._scores.append(score)
+            self._entry_terms.append(terms)
+            self._entry_grams.append(grams)
+        for gram in grams:
+            self._grams.setdefault(gram, set()).add(eid)
+        return eid
+
+    def _drop(self, eid: int) -> List[Tuple[str, int]]:
+        for gram in self._entry_grams[eid]:
+            ids = self._grams.get(gram)
+            if ids is not None:
+                ids.discard(eid)
+                if not ids:
+                    del self._grams[gram]
+        removed = [(term, eid) for term in self._entry_terms[eid]]
+        self._payloads[eid] = None
+        self._entry_terms[eid] = ()
+        self._entry_grams[eid] = frozenset()
+        self._free.append(eid)
+        return removed
+
+    def _apply(self, removed: List[Tuple[str, int]], added: List[Tuple[str, int]]):
+        """把词项变化应用到有序前缀数组"""
+        if len(removed) + len(added) > BULK_THRESHOLD:
+            gone = set(removed)
+            postings = [p for p in self._postings if p not in gone] if gone else self._postings
+            postings.extend(added)
+            postings.sort()
+            self._postings = postings
+            return
+        for posting in removed:
+            i = bisect_left(self._postings, posting)
+            if i < len(self._postings) and self._postings[i] == posting:
+                del self._postings[i]
+        for posting in added:
+            insort(self._postings, posting)
+
+    def _sync(self, kind: str, desired: Dict[Any, Tuple[Dict[str, Any], Tuple[str, ...], float]]) -> Dict[str, int]:
+        """把某一类条目同步为 desired（key -> (payload, terms, score)）"""
+        keys = self._keys[kind]
+        stats = {'added': 0, 'updated': 0, 'removed': 0}
+        removed, added = [], []
+        with self._lock:
+            for key, (payload, terms, score) in desired.items():
+                eid = keys.get(key)
+                if eid is not None and self._entry_terms[eid] == terms:
+                    if self._scores[eid] != score or self._payloads[eid] != payload:
+                        self._payloads[eid], self._scores[eid] = payload, score
+                        stats['updated'] += 1
+                    continue
+                if eid is not None:
+                    removed.extend(self._drop(eid))
+                    stats['updated'] += 1
+                else:
+                    stats['added'] += 1
+                eid = self._alloc(payload, terms, score)
+                keys[key] = eid
+                added.extend((term, eid) for term in terms)
+            for key in [key for key in keys if key not in desired]:
+                removed.extend(self._drop(keys.pop(key)))
+                stats['removed'] += 1
+            self._apply(removed, added)
+            if any(stats.values()):
+                self.version += 1
+                self._cache.clear()
+        return stats
+
+    # ---- 数据源 ----
+
+    def update_cryptos(self, snapshot) -> Dict[str, int]:
+        """由 MarketSnapshot 增量更新币种条目（同一快照只处理一次）"""
+        if snapshot.generation == self._snapshot_generation:
+            return {'added': 0, 'updated': 0, 'removed': 0}
+        ids, symbols = snapshot.column('id'), snapshot.column('symbol')
+        names, images = snapshot.column('name'), snapshot.column('image')
+        ranks = snapshot.column('rank').tolist()
+        desired = {}
+        for coin_id, symbol, name, image, rank in zip(ids, symbols, names, images, ranks):
+            if not coin_id or coin_id in desired:
+                continue
+            payload = {
+                'type': 'crypto', 'id': coin_id, 'symbol': symbol, 'name': name,
+                'rank': int(rank) if rank == rank else None, 'image': image,
+            }
+            desired[coin_id] = (payload, _terms(symbol, name, coin_id), _rank_score(rank))
+        stats = self._sync('crypto', desired)
+        self._snapshot_generation = snapshot.generation
+        return stats
+
+    def update_investors(self, docs: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """由投资者文档（当前结构）增量更新投资者条目"""
+        desired = {}
+        for doc in docs:
+            investor_id, name = doc.get('investor_id'), doc.get('name')
+            key = investor_id if investor_id not in (None, '') else name
+            if not key or key in desired:
+                continue
+            slug = doc.get('investor_slug')
+            payload = {
+                'type': 'investor', 'id': investor_id, 'name': name, 'slug': slug,
+                'rank': doc.get('rank'), 'tier': doc.get('tier'), 'venture_type': doc.get('venture_type'),
+                'logo': doc.get('logo') or doc.get('image'),
+            }
+            desired[key] = (payload, _terms(name, slug), _rank_score(doc.get('rank')))
+        return self._sync('investor', desired)
+
+    def refresh_investors(self) -> Dict[str, int]:
+        """从数据库重新读取投资者并增量更新（投资者爬取完成后调用）"""
+        from ..database.db import InvestorDataManager
+
+        generation = get_generation(INVESTOR_GENERATION)
+        docs = InvestorDataManager().get_latest_data(limit=None)
+        stats = self.update_investors(docs)
+        self.investor_generation = generation
+        return stats
+
+    def ensure_current(self):
+        """数据代际变化后按需同步（覆盖未经爬取流程的写入和服务重启）"""
+        market = get_generation(MARKET_GENERATION)
+        if market != self.market_generation:
+            from .market_store import market_store
+
+            snapshot = market_store.get_snapshot()
+            if snapshot is not None:
+                self.update_cryptos(snapshot)
+            self.market_generation = get_generation(MARKET_GENERATION)
+        if get_generation(INVESTOR_GENERATION) != self.investor_generation:
+            try:
+                self.refresh_investors()
+            except Exception as e:
+                self.investor_generation = get_generation(INVESTOR_GENERATION)
+                print(f"⚠️  加载投资者搜索索引失败: {e}")
+
+    # ---- 查询 ----
+
+    def _arrays(self):
+        """查询使用的 NumPy 视图（索引版本变化后首次查询时重建）"""
+        if self._arrays_version != self.version:
+            postings = self._postings
+            self._post_terms = [term for term, _ in postings]
+            self._post_eids = np.fromiter((eid for _, eid in postings), dtype=np.int64, count=len(postings))
+            self._score_array = np.array(self._scores, dtype=np.float64)
+            self._kind_array = np.array(
+                [SEARCH_TYPES.index(p['type']) if p else -1 for p in self._payloads], dtype=np.int8
+            )
+            self._gram_arrays = {}
+            self._arrays_version = self.version
+
+    def _allowed(self, eids: np.ndarray, kinds: Sequence[str]) -> np.ndarray:
+        if len(kinds) == len(SEARCH_TYPES):
+            return self._kind_array[eids] >= 0
+        return np.isin(self._kind_array[eids], [SEARCH_TYPES.index(kind) for kind in kinds])
+
+    def _prefix_matches(self, q: str, kinds: Sequence[str], limit: int) -> List[Tuple[int, bool]]:
+        """前缀命中的前 limit 个条目 -> [(条目号, 是否完全匹配)]
+
+        同一条目可能有多个词项命中，先按 (匹配级别, 排名) 取出若干倍候选再去重。
+        """
+        terms = self._post_terms
+        lo = bisect_left(terms, q)
+        hi = bisect_left(terms, q + _END, lo)
+        if lo == hi:
+            return []
+        exact_hi = bisect_right(terms, q, lo, hi)
+        eids = self._post_eids[lo:hi]
+        keys = self._score_array[eids].copy()
+        keys[exact_hi - lo:] += _PREFIX_PENALTY
+        keys[~self._allowed(eids, kinds)] = np.inf
+
+        want = limit * 4
+        while True:
+            if want < len(keys):
+                candidates = np.argpartition(keys, want)[:want]
+                candidates = candidates[np.argsort(keys[candidates], kind='stable')]
+            else:
+                candidates = np.argsort(keys, kind='stable')
+            matches, seen = [], set()
+            for i in candidates.tolist():
+                if keys[i] == np.inf or len(matches) == limit:
+                    break
+                eid = int(eids[i])
+                if eid not in seen:
+                    seen.add(eid)
+                    matches.append((eid, i < exact_hi - lo))
+            if len(matches) == limit or want >= len(keys):
+                return matches
+            want *= 4
+
+    def _fuzzy_matches(self, q: str, kinds: Sequence[str], exclude: Iterable[int], limit: int) -> List[int]:
+        """三元组容错匹配，按 (查询三元组命中比例, 排名) 返回前 limit 个条目号"""
+        grams = _trigrams((q,))
+        arrays = []
+        for gram in grams:
+            array = self._gram_arrays.get(gram)
+            if array is None:
+                ids = self._grams.get(gram, ())
+                array = np.fromiter(ids, dtype=np.int64, count=len(ids))
+                self._gram_arrays[gram] = array
+            if len(array):
+                arrays.append(array)
+        if not arrays:
+            return []
+        counts = np.bincount(np.concatenate(arrays), minlength=len(self._payloads))
+        counts[list(exclude)] = 0
+        eids = np.flatnonzero(counts >= FUZZY_THRESHOLD * len(grams))
+        eids = eids[self._allowed(eids, kinds)]
+        order = np.lexsort((self._score_array[eids], -counts[eids]))
+        return eids[order[:limit]].tolist()
+
+    def _search(self, q: str, kinds: Sequence[str], limit: int) -> List[Dict[str, Any]]:
+        self._arrays()
+        payloads = self._payloads
+        matches = self._prefix_matches(q, kinds, limit)
+        results = [dict(payloads[eid], match='exact' if exact else 'prefix') for eid, exact in matches]
+        if len(results) < limit and len(q) >= FUZZY_MIN_LENGTH:
+            fuzzy = self._fuzzy_matches(q, kinds, [eid for eid, _ in matches], limit - len(results))
+            results.extend(dict(payloads[eid], match='fuzzy') for eid in fuzzy)
+        return results
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT,
+               types: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """搜索币种和投资者，返回按匹配级别和排名排序的结果"""
+        self.ensure_current()
+        q = normalize(query)
+        if not q:
+            return []
+        limit = max(1, min(int(limit), MAX_LIMIT))
+        kinds = tuple(kind for kind in SEARCH_TYPES if not types or kind in types)
+        key = (q, kinds, limit)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+            results = self._search(q, kinds, limit)
+            self._cache[key] = results
+            while len(self._cache) > MAX_CACHED_QUERIES:
+                self._cache.popitem(last=False)
+            return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'version': self.version,
+            'cryptos': len(self._keys['crypto']),
+            'investors': len(self._keys['investor']),
+            'terms': len(self._postings),
+            'trigrams': len(self._grams),
+        }
+
+
+search_index = SearchIndex()
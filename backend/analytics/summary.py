@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+市场概览
+
+在最新行情快照上做向量化聚合（总市值、BTC/ETH 占比、涨跌家数、市值加权涨跌幅、
+成交量集中度），并与同一轮爬取获取的 CoinGecko /global 数据合并。
+结果按快照缓存，每个爬取代际只计算一次。
+"""
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .market_store import MarketSnapshot
+
+# 计算 BTC / ETH 占比时使用的 CoinGecko id（找不到时按 symbol 查找）
+DOMINANCE_COINS = {'btc': 'bitcoin', 'eth': 'ethereum'}
+
+
+def _share(part: float, total: float) -> Optional[float]:
+    return float(part / total * 100) if total else None
+
+
+def _dominance(snapshot: MarketSnapshot, total_cap: float) -> Dict[str, Optional[float]]:
+    caps = snapshot.column('market_cap')
+    dominance = {}
+    for symbol, coin_id in DOMINANCE_COINS.items():
+        index = snapshot.locate(coin_id)
+        if index is None:
+            index = snapshot.locate(symbol)
+        cap = caps[index] if index is not None else np.nan
+        dominance[symbol] = None if np.isnan(cap) else _share(cap, total_cap)
+    return dominance
+
+
+def _breadth(snapshot: MarketSnapshot) -> Dict[str, Any]:
+    change = snapshot.column('price_change_percentage_24h')
+    advancers = int(np.count_nonzero(change > 0))
+    decliners = int(np.count_nonzero(change < 0))
+    unchanged = int(np.count_nonzero(change == 0))
+    return {
+        'advancers': advancers,
+        'decliners': decliners,
+        'unchanged': unchanged,
+        'advance_decline_ratio': float(advancers / decliners) if decliners else None,
+    }
+
+
+def _volume_concentration(snapshot: MarketSnapshot) -> Dict[str, Optional[float]]:
+    volume = snapshot.column('volume_24h')
+    volume = volume[~np.isnan(volume)]
+    total = volume.sum()
+    if not total:
+        return {'top10_share': None, 'top50_share': None, 'hhi': None}
+    ordered = -np.sort(-volume)
+    shares = volume / total
+    return {
+        'top10_share': _share(ordered[:10].sum(), total),
+        'top50_share': _share(ordered[:50].sum(), total),
+        # Herfindahl-Hirschman 指数（0-10000），越大越集中
+        'hhi': float(np.dot(shares, shares) * 10000),
+    }
+
+
+def compute_market_aggregates(snapshot: MarketSnapshot) -> Dict[str, Any]:
+    """在快照上计算本地聚合指标"""
+    total_cap = snapshot.total('market_cap')
+    return {
+        'coins': len(snapshot),
+        'total_market_cap': total_cap,
+        'total_volume_24h': snapshot.total('volume_24h'),
+        'dominance': _dominance(snapshot, total_cap),
+        'breadth': _breadth(snapshot),
+        'cap_weighted_change_24h': snapshot.weighted_mean('price_change_percentage_24h'),
+        'cap_weighted_change_7d': snapshot.weighted_mean('price_change_percentage_7d'),
+        'median_change_24h': snapshot.percentiles('price_change_percentage_24h', (50,))['p50'],
+        'volume_concentration': _volume_concentration(snapshot),
+    }
+
+
+def build_market_summary(snapshot: MarketSnapshot) -> Dict[str, Any]:
+    """组合 /global 数据与本地聚合，得到 /api/market/summary 的响应数据"""
+    return {
+        'generation': snapshot.generation,
+        'timestamp': snapshot.timestamp.isoformat(),
+        'global': snapshot.global_data,
+        'local': compute_market_aggregates(snapshot),
+    }
+
+
+def get_market_summary(snapshot: MarketSnapshot) -> Dict[str, Any]:
+    """市场概览（每个快照只计算一次）"""
+    return snapshot.memoize('market_summary', lambda: build_market_summary(snapshot))
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP 条件请求（ETag / 304）与服务端响应缓存
+
+列表类接口的响应只在对应数据集刷新（代际变化）时才会改变。ETag 由进程
+epoch、相关数据集的代际号和请求路径 + 查询参数的摘要组成：
+- 请求带 If-None-Match 且与当前 ETag 一致（弱比较，压缩后的弱 ETag 同样匹配）
+  时直接返回 304，不查询数据库
+- 否则正常执行视图，并在 200 响应上设置 ETag 和 Cache-Control
+
+读多写少的接口另外在服务端缓存响应体（ResponseCache，cached 装饰器）：
+- 缓存键为 (路由, 路径, 规范化的查询参数, 相关数据集代际号)，爬虫写入推进代际后旧条目
+  不再命中，并在该路由写入新代际的条目时清除
+- 按响应体总字节数（RESPONSE_CACHE_BYTES）LRU 淘汰
+- 同一键的并发未命中只有第一个请求执行视图，其余请求等待并复用其结果（single-flight）
+- 按路由统计命中、未命中、合并的请求数和节省的查询耗时（GET /api/cache/stats）
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+from flask import current_app, request
+
+from ..utils.generation import generations
+
+
+def normalized_query() -> str:
+    """按参数名排序后的查询字符串（参数顺序不同的相同请求得到同一结果）"""
+    return urlencode(sorted(request.args.items(multi=True)))
+
+
+def compute_etag(*names: str) -> str:
+    """当前请求在给定数据集代际下的 ETag"""
+    digest = hashlib.sha1(f'{request.path}?{normalized_query()}'.encode('utf-8')).hexdigest()[:16]
+    versions = '.'.join(str(generations.get(name)) for name in names)
+    return f'{generations.epoch}-{versions}-{digest}'
+
+
+def cache_control_header() -> str:
+    """API_CACHE_MAX_AGE 为 0 时要求每次重新验证"""
+    max_age = current_app.config.get('API_CACHE_MAX_AGE', 0)
+    if max_age > 0:
+        return f'public, max-age={max_age}, must-revalidate'
+    return 'no-cache'
+
+
+def conditional(*names: str):
+    """按数据集代际支持 If-None-Match / 304 的视图装饰器"""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = compute_etag(*names)
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = cache_control_header()
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+# 可缓存的状态码（404 也缓存：不存在的投资者在下次爬取前仍然不存在）
+CACHEABLE_STATUS = (200, 404)
+
+
+class _Flight:
+    """一次正在执行的查询，同一键的后续请求等待其结果"""
+
+    __slots__ = ('done', 'entry')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.entry: Optional[Tuple[bytes, int, str, float]] = None
+
+
+class ResponseCache:
+    """按 (路由, 路径, 查询参数, 代际) 缓存响应体，按总字节数 LRU 淘汰，并合并并发的未命中"""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, wait_timeout: float = 30.0):
+        self.max_bytes = max_bytes
+        self.wait_timeout = wait_timeout
+        # 键 -> (响应体, 状态码, mimetype, 查询耗时秒)
+        self._data: 'OrderedDict[Tuple, Tuple[bytes, int, str, float]]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._inflight: Dict[Tuple, _Flight] = {}
+        self._versions: Dict[str, Tuple[int, ...]] = {}
+        self._routes: Dict[str, Dict[str, float]] = {}
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _route_stats(self, route: str) -> Dict[str, float]:
+        stats = self._routes.get(route)
+        if stats is None:
+            stats = self._routes[route] = {'hits': 0, 'misses': 0, 'coalesced': 0,
+                                           'query_seconds': 0.0, 'saved_seconds': 0.0}
+        return stats
+
+    def fetch(self, route: str, key: Tuple, versions: Tuple[int, ...], compute):
+        """返回 (响应体, 状态码, mimetype)；compute() 执行视图并返回 Response"""
+        with self._lock:
+            stats = self._route_stats(route)
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+                stats['hits'] += 1
+                stats['saved_seconds'] += entry[3]
+                return entry[:3]
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+
+        if not leader:
+            if flight.done.wait(self.wait_timeout) and flight.entry is not None:
+                with self._lock:
+                    stats['coalesced'] += 1
+                    stats['saved_seconds'] += flight.entry[3]
+                return flight.entry[:3]
+            # 第一个请求抛出异常或等待超时：自行执行（结果不写入缓存）
+            response = compute()
+            return response.get_data(), response.status_code, response.mimetype
+
+        try:
+            start = time.perf_counter()
+            response = compute()
+            entry = (response.get_data(), response.status_code, response.mimetype, time.perf_counter() - start)
+            flight.entry = entry
+            with self._lock:
+                stats['misses'] += 1
+                stats['query_seconds'] += entry[3]
+            if entry[1] in CACHEABLE_STATUS:
+                self.put(route, key, versions, entry)
+            return entry[:3]
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def put(self, route: str, key: Tuple, versions: Tuple[int, ...], entry: Tuple[bytes, int, str, float]):
+        size = len(entry[0])
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            current = self._versions.get(route)
+            if current is not None and versions < current:
+                return  # 查询期间代际已推进，结果已过期
+            if current != versions:
+                # 代际推进：清除该路由旧代际的条目
+                self._versions[route] = versions
+                for stale in [k for k in self._data if k[0] == route and k[-1] != versions]:
+                    self._size -= len(self._data.pop(stale)[0])
+                    self.invalidations += 1
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._size -= len(old[0])
+            self._data[key] = entry
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self._size -= len(evicted[0])
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._versions.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            routes = {}
+            totals = {'hits': 0, 'misses': 0, 'coalesced': 0, 'query_seconds': 0.0, 'saved_seconds': 0.0}
+            for route, stats in self._routes.items():
+                requests = stats['hits'] + stats['misses'] + stats['coalesced']
+                routes[route] = dict(stats, requests=requests,
+                                     query_seconds=round(stats['query_seconds'], 4),
+                                     saved_seconds=round(stats['saved_seconds'], 4),
+                                     hit_ratio=round((stats['hits'] + stats['coalesced']) / requests, 4)
+                                     if requests else 0.0)
+                for name in totals:
+                    totals[name] += stats[name]
+            requests = totals['hits'] + totals['misses'] + totals['coalesced']
+            return dict(
+                totals,
+                query_seconds=round(totals['query_seconds'], 4),
+                saved_seconds=round(totals['saved_seconds'], 4),
+                requests=requests,
+                hit_ratio=round((totals['hits'] + totals['coalesced']) / requests, 4) if requests else 0.0,
+                entries=len(self._data),
+                bytes=self._size,
+                max_bytes=self.max_bytes,
+                evictions=self.evictions,
+                invalidations=self.invalidations,
+                inflight=len(self._inflight),
+                routes=routes,
+            )
+
+
+def cached(*names: str):
+    """按数据集代际在服务端缓存响应体的视图装饰器（放在 conditional 之下）"""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache: Optional[ResponseCache] = current_app.extensions.get('response_cache')
+            if cache is None:
+                return view(*args, **kwargs)
+            # 代际在执行视图之前读取：查询期间写入的新数据最多让条目提前失效，不会以新代际返回旧数据
+            versions = tuple(generations.get(name) for name in names)
+            route = request.endpoint
+            key = (route, request.path, normalized_query(), versions)
+            body, status, mimetype = cache.fetch(
+                route, key, versions, lambda: current_app.make_response(view(*args, **kwargs))
+            )
+            return current_app.response_class(body, status=status, mimetype=mimetype)
+
+        return wrapper
+
+    return decorator
+
+
+def init_response_cache(app) -> Optional[ResponseCache]:
+    """按配置启用服务端响应缓存"""
+    if not app.config.get('ENABLE_RESPONSE_CACHE', True):
+        return None
+    cache = ResponseCache(
+        max_bytes=app.config.get('RESPONSE_CACHE_BYTES', 64 * 1024 * 1024),
+        wait_timeout=app.config.get('RESPONSE_CACHE_WAIT', 30.0),
+    )
+    app.extensions['response_cache'] = cache
+    return cache
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+API 响应压缩
+
+after_request 中按 Accept-Encoding 协商压缩 JSON / 文本响应：
+- 优先 brotli（可选依赖，pip install brotli），其次 gzip
+- 小于 COMPRESS_MIN_SIZE 的响应、流式响应和已编码的响应不压缩
+- 带 ETag 的响应（ETag 已包含数据代际，见 caching.py）按 (ETag, 编码) 缓存
+  压缩结果，热点接口在同一代际内只压缩一次
+压缩后的强 ETag 转为弱 ETag，If-None-Match 使用弱比较，304 仍然有效。
+"""
+
+import gzip
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from flask import request
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/', 'application/javascript', 'application/x-ndjson')
+
+
+def _load_brotli():
+    """延迟导入 brotli（可选依赖）"""
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        return None
+
+
+class CompressedCache:
+    """按 (ETag, 编码) 缓存压缩后的响应体，按总字节数淘汰"""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._data: 'OrderedDict[Tuple[str, str], bytes]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, str]) -> Optional[bytes]:
+        with self._lock:
+            body = self._data.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key: Tuple[str, str], body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._data[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self._size -= len(evicted)
+
+    def stats(self):
+        return {'entries': len(self._data), 'bytes': self._size, 'hits': self.hits, 'misses': self.misses}
+
+
+class Compressor:
+    """压缩协商与执行"""
+
+    def __init__(self, min_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5,
+                 cache_bytes: int = 32 * 1024 * 1024):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.brotli = _load_brotli()
+        self.cache = CompressedCache(cache_bytes)
+
+    def choose_encoding(self) -> Optional[str]:
+        accepted = request.accept_encodings
+        if self.brotli is not None and accepted['br']:
+            return 'br'
+        if accepted['gzip']:
+            return 'gzip'
+        return None
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == 'br':
+            return self.brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    def after_request(self, response):
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or not response.mimetype.startswith(COMPRESSIBLE_TYPES)):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = self.choose_encoding()
+        if encoding is None or (response.content_length or 0) < self.min_size:
+            return response
+
+        etag, weak = response.get_etag()
+        key = (etag, encoding) if etag and not weak else None
+        body = self.cache.get(key) if key else None
+        if body is None:
+            body = self.compress(response.get_data(), encoding)
+            if key:
+                self.cache.put(key, body)
+
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        if etag:
+            response.set_etag(etag, weak=True)
+        return response
+
+
+def init_compression(app) -> Optional[Compressor]:
+    """按配置注册响应压缩"""
+    if not app.config.get('ENABLE_COMPRESSION', True):
+        return None
+    compressor = Compressor(
+        min_size=app.config.get('COMPRESS_MIN_SIZE', 1024),
+        gzip_level=app.config.get('COMPRESS_GZIP_LEVEL', 6),
+        brotli_quality=app.config.get('COMPRESS_BROTLI_QUALITY', 5),
+        cache_bytes=app.config.get('COMPRESS_CACHE_BYTES', 32 * 1024 * 1024),
+    )
+    app.after_request(compressor.after_request)
+    app.extensions['compressor'] = compressor
+    return compressor
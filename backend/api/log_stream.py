@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+爬虫日志推送
+
+log_and_emit 只把日志追加到内存队列（不做控制台或网络 I/O，爬虫循环不会被阻塞），
+后台线程每 LOG_FLUSH_INTERVAL 秒把积累的日志打包成一帧：
+- 一次写入控制台
+- 按级别房间各发送一个 'scraper_logs' 事件 {level, entries: [...], dropped}，
+  每个房间每帧最多 LOG_MAX_PER_FRAME 条（超出的只发送最新的部分并计入 dropped，
+  仍保留在环形缓冲中）
+
+日志级别 debug < info < success < warning < error。客户端发送
+'logs_subscribe' {level, replay: 条数} 加入 logs:<level> 房间，只收到不低于该级别的日志，
+并立即收到各爬虫环形缓冲（每个爬虫最近 LOG_BUFFER_SIZE 条）中符合级别的最近日志。
+
+集群模式下日志产生在调度进程，其他进程的回放读取调度进程写入 cluster_state 的
+缓冲副本（每个爬虫最近 SHARED_BUFFER_SIZE 条）。
+"""
+
+import atexit
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from functools import wraps
+from typing import Any, Dict, List, Optional
+
+from flask_socketio import emit, join_room, leave_room, rooms
+
+LEVELS = ('debug', 'info', 'success', 'warning', 'error')
+LEVEL_RANK = {level: i for i, level in enumerate(LEVELS)}
+LOG_ROOM_PREFIX = 'logs:'
+SYSTEM_SCRAPER = 'system'
+SHARED_BUFFER_KEY = 'log_buffer'
+SHARED_BUFFER_SIZE = 100
+SHARED_SYNC_INTERVAL = 2.0
+
+
+def normalize_level(level: Any, default: str = 'info') -> str:
+    level = str(level or '').lower()
+    return level if level in LEVEL_RANK else default
+
+
+class LogStreamer:
+    """日志队列、按爬虫的环形缓冲与后台发送线程"""
+
+    def __init__(self, flush_interval: float = 0.5, max_per_frame: int = 200, buffer_size: int = 500):
+        self.flush_interval = flush_interval
+        self.max_per_frame = max_per_frame
+        self.buffer_size = buffer_size
+        self.default_level = 'info'
+        self.socketio = None
+        self.share = None
+        self._pending = deque()
+        self._buffers: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+        # 序号从启动时刻（微秒）开始递增：调度进程切换后新日志的序号仍大于旧日志
+        self._seq = time.time_ns() // 1000
+        self._scope = threading.local()
+        self._thread: Optional[threading.Thread] = None
+        self._last_share = 0.0
+        self._share_dirty = False
+        self.frames = 0
+        self.pushed = 0
+        self.dropped = 0
+
+    # ---- 写入（爬虫线程调用，不做 I/O） ----
+
+    def push(self, message: str, log_type: str = 'info', scraper: Optional[str] = None, console: bool = True):
+        """追加一条日志"""
+        scraper = scraper or getattr(self._scope, 'scraper', None) or SYSTEM_SCRAPER
+        with self._lock:
+            self._seq += 1
+            entry = {
+                'seq': self._seq,
+                'message': message,
+                'type': normalize_level(log_type),
+                'scraper': scraper,
+                'timestamp': datetime.now().isoformat(),
+            }
+            buffer = self._buffers.get(scraper)
+            if buffer is None:
+                buffer = self._buffers[scraper] = deque(maxlen=self.buffer_size)
+            buffer.append(entry)
+            self.pushed += 1
+        self._pending.append((entry, console))
+        if self._thread is None:
+            self.start()
+
+    def scope(self, scraper: str):
+        """装饰器：被装饰函数执行期间（同一线程）写入的日志归属 scraper"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                previous = getattr(self._scope, 'scraper', None)
+                self._scope.scraper = scraper
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self._scope.scraper = previous
+            return wrapper
+        return decorator
+
+    # ---- 后台发送 ----
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='log-stream', daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        # 每个间隔最多发送一帧，日志再多也不会提高发送频率
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+                self._sync_shared()
+            except Exception as e:
+                print(f"发送日志到前端失败: {e}")
+
+    def flush(self) -> int:
+        """发送积累的日志，返回本帧条数"""
+        batch = []
+        while self._pending:
+            batch.append(self._pending.popleft())
+        if not batch:
+            return 0
+
+        lines = [entry['message'] for entry, console in batch if console]
+        if lines:
+            sys.stdout.write('\n'.join(lines) + '\n')
+            sys.stdout.flush()
+
+        entries = [entry for entry, _ in batch]
+        frame_dropped = 0
+        for level in LEVELS:
+            rank = LEVEL_RANK[level]
+            selected = [entry for entry in entries if LEVEL_RANK[entry['type']] >= rank]
+            if not selected:
+                continue
+            # 先按级别过滤再截断，大量 debug 日志不会挤掉高级别日志；超出上限时保留最新的
+            dropped = max(0, len(selected) - self.max_per_frame)
+            frame_dropped = max(frame_dropped, dropped)
+            if self.socketio is not None:
+                self.socketio.emit('scraper_logs',
+                                   {'level': level, 'entries': selected[dropped:], 'dropped': dropped},
+                                   to=f'{LOG_ROOM_PREFIX}{level}')
+        self.dropped += frame_dropped
+        self.frames += 1
+        self._share_dirty = True
+        return len(batch)
+
+    def _sync_shared(self):
+        """集群模式下把缓冲副本写入 cluster_state（供其他进程回放）"""
+        if self.share is None or not self._share_dirty:
+            return
+        now = time.monotonic()
+        if now - self._last_share < SHARED_SYNC_INTERVAL:
+            return
+        self._last_share = now
+        self._share_dirty = False
+        with self._lock:
+            buffers = {scraper: list(buffer)[-SHARED_BUFFER_SIZE:] for scraper, buffer in self._buffers.items()}
+        self.share(buffers)
+
+    # ---- 回放 ----
+
+    def recent(self, level: str = 'debug', limit: int = 100, scraper: Optional[str] = None,
+               buffers: Optional[Dict[str, List[Dict[str, Any]]]] = None) -> List[Dict[str, Any]]:
+        """各爬虫缓冲中不低于 level 的最近 limit 条日志（按写入顺序）"""
+        rank = LEVEL_RANK[normalize_level(level)]
+        if buffers is None:
+            with self._lock:
+                buffers = {name: list(buffer) for name, buffer in self._buffers.items()}
+        entries = [
+            entry for name, buffer in buffers.items() if scraper is None or name == scraper
+            for entry in buffer if LEVEL_RANK.get(entry.get('type'), 0) >= rank
+        ]
+        entries.sort(key=lambda entry: entry['seq'])
+        return entries[-limit:] if limit > 0 else []
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            buffered = {name: len(buffer) for name, buffer in self._buffers.items()}
+        return {
+            'pushed': self.pushed,
+            'pending': len(self._pending),
+            'frames': self.frames,
+            'dropped': self.dropped,
+            'buffered': buffered,
+        }
+
+
+log_stream = LogStreamer()
+
+
+def _shared_buffers() -> Optional[Dict[str, List[Dict[str, Any]]]]:
+    """非调度进程读取调度进程写入的缓冲副本"""
+    from ..cluster import cluster
+
+    if not cluster.enabled or cluster.is_scheduler_owner:
+        return None
+    doc = cluster.manager.get(SHARED_BUFFER_KEY)
+    return doc.get('buffers', {}) if doc else {}
+
+
+def handle_logs_subscribe(data=None):
+    """选择最低日志级别并回放最近的日志"""
+    data = data if isinstance(data, dict) else {}
+    level = normalize_level(data.get('level'), log_stream.default_level)
+    room = f'{LOG_ROOM_PREFIX}{level}'
+    for current in rooms():
+        if isinstance(current, str) and current.startswith(LOG_ROOM_PREFIX) and current != room:
+            leave_room(current)
+    join_room(room)
+
+    try:
+        replay = max(0, min(int(data.get('replay', 100)), log_stream.buffer_size))
+    except (TypeError, ValueError):
+        replay = 100
+    if replay:
+        entries = log_stream.recent(level, replay, data.get('scraper'), _shared_buffers())
+        emit('scraper_logs', {'level': level, 'entries': entries, 'dropped': 0, 'replay': True})
+    return {'success': True, 'level': level}
+
+
+def handle_logs_unsubscribe(data=None):
+    """停止接收日志"""
+    for current in rooms():
+        if isinstance(current, str) and current.startswith(LOG_ROOM_PREFIX):
+            leave_room(current)
+    return {'success': True}
+
+
+def init_log_stream(app, socketio):
+    """读取日志推送配置并注册 Socket.IO 事件"""
+    log_stream.socketio = socketio
+    log_stream.flush_interval = float(app.config.get('LOG_FLUSH_INTERVAL', 0.5))
+    log_stream.max_per_frame = int(app.config.get('LOG_MAX_PER_FRAME', 200))
+    log_stream.buffer_size = int(app.config.get('LOG_BUFFER_SIZE', 500))
+    log_stream.default_level = normalize_level(app.config.get('LOG_DEFAULT_LEVEL', 'info'))
+    if app.config.get('CLUSTER_MODE'):
+        def share(buffers):
+            from ..cluster import cluster
+            if cluster.is_scheduler_owner:
+                with app.app_context():
+                    cluster.manager.set(SHARED_BUFFER_KEY, buffers=buffers)
+        log_stream.share = share
+    socketio.on_event('logs_subscribe', handle_logs_subscribe)
+    socketio.on_event('logs_unsubscribe', handle_logs_unsubscribe)
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Socket.IO 实时事件
+
+行情增量按房间推送，客户端只收到自己展示或关注的币种：
+- top:N     前 N 名（N 为 REALTIME_TOP_BUCKETS 中的档位），事件 crypto_update
+- symbol:X  单个 symbol（不论排名），事件 symbol_update
+
+客户端事件：
+- subscribe {top: N, since: 代际号, symbols: [...]}: 加入房间（一个连接只属于一个
+  top 档位，N 会归到不小于它的最小档位）。top 档位按 since 补发增量或回复
+  crypto_snapshot，symbol 回复 symbol_snapshot（当前完整行）；ack 返回当前订阅
+- unsubscribe {top: true, symbols: [...]}: 离开房间，不带参数时离开全部行情房间
+- crypto_resync {since, top}: 补发 since 之后的增量，无法衔接时回复 crypto_snapshot
+- alerts_subscribe {rules: [rule_id, ...]}: 加入 alerts:<rule_id> 房间，只收到这些规则触发的
+  告警（事件 alerts）；不存在的规则放入 ack 的 rejected
+- alerts_unsubscribe {rules: [...]}: 离开告警房间，不带参数时离开全部告警房间
+
+每轮行情更新后 broadcast_market 按房间分发：每个有成员的房间只生成并编码一次载荷
+（同一房间的连接共用编码结果），没有成员的房间不计算也不发送。多 worker 部署时
+每个 worker 用自己重新加载的快照计算增量，只发给本 worker 上的连接（不经消息队列）。
+详见 analytics/deltas.py。
+
+告警只在调度进程评估，push_alerts 按规则分组后发到各自的 alerts:<rule_id> 房间
+（经消息队列到达所有 worker），没有订阅者的规则不会发给任何连接。
+"""
+
+from typing import Any, Dict, List, Optional
+
+from flask_socketio import emit, join_room, leave_room, rooms
+
+from ..analytics.alerts import alert_engine
+from ..analytics.deltas import market_feed
+
+TOP_ROOM_PREFIX = 'top:'
+SYMBOL_ROOM_PREFIX = 'symbol:'
+ALERT_ROOM_PREFIX = 'alerts:'
+MAX_SYMBOL_LENGTH = 32
+
+_socketio = None
+_max_symbols = 200
+_max_alert_rules = 100
+
+
+def _symbols(raw) -> List[str]:
+    """解析订阅的符号列表（逗号分隔字符串或列表），转为大写、去重并保持顺序"""
+    if isinstance(raw, str):
+        raw = raw.split(',')
+    if not isinstance(raw, (list, tuple)):
+        return []
+    symbols = []
+    for item in raw:
+        symbol = str(item).strip().upper()
+        if symbol and len(symbol) <= MAX_SYMBOL_LENGTH and symbol not in symbols:
+            symbols.append(symbol)
+    return symbols
+
+
+def _subscriptions() -> Dict[str, Any]:
+    """当前连接订阅的档位和 symbol"""
+    top, symbols = None, []
+    for room in rooms():
+        if not isinstance(room, str):
+            continue
+        if room.startswith(TOP_ROOM_PREFIX):
+            top = int(room[len(TOP_ROOM_PREFIX):])
+        elif room.startswith(SYMBOL_ROOM_PREFIX):
+            symbols.append(room[len(SYMBOL_ROOM_PREFIX):])
+    return {'top': top, 'symbols': sorted(symbols)}
+
+
+def _sync_top(top: int, since: Any = None):
+    """补发 since 之后的增量，无法衔接时发送完整的前 N 名数据"""
+    deltas = market_feed.since(since, top) if since is not None else None
+    if deltas is not None:
+        for delta in deltas:
+            emit('crypto_update', delta)
+        return
+    payload = market_feed.full(top=top)
+    if payload is not None and payload['generation'] != since:
+        emit('crypto_snapshot', payload)
+
+
+def handle_subscribe(data=None):
+    """加入前 N 名档位和/或 symbol 房间"""
+    data = data if isinstance(data, dict) else {}
+    rejected = []
+
+    if data.get('top') is not None:
+        top = market_feed.bucket_for(data.get('top'))
+        room = f'{TOP_ROOM_PREFIX}{top}'
+        for current in rooms():
+            if isinstance(current, str) and current.startswith(TOP_ROOM_PREFIX) and current != room:
+                leave_room(current)
+        join_room(room)
+        _sync_top(top, data.get('since'))
+
+    symbols = _symbols(data.get('symbols'))
+    if symbols:
+        joined = set(_subscriptions()['symbols'])
+        accepted = []
+        for symbol in symbols:
+            if symbol in joined or len(joined) < _max_symbols:
+                joined.add(symbol)
+                accepted.append(symbol)
+                join_room(f'{SYMBOL_ROOM_PREFIX}{symbol}')
+            else:
+                rejected.append(symbol)
+        payload = market_feed.symbol_rows(accepted)
+        if payload is not None:
+            emit('symbol_snapshot', payload)
+
+    result = {'success': True, **_subscriptions()}
+    if rejected:
+        result['rejected'] = rejected
+        result['error'] = f'每个连接最多订阅 {_max_symbols} 个符号'
+    return result
+
+
+def handle_unsubscribe(data=None):
+    """离开房间（不带参数时离开全部行情房间）"""
+    data = data if isinstance(data, dict) and data else {'top': True, 'symbols': '*'}
+    leave_top = bool(data.get('top'))
+    raw = data.get('symbols')
+    symbols = None if raw == '*' else set(_symbols(raw))
+    for room in rooms():
+        if not isinstance(room, str):
+            continue
+        if leave_top and room.startswith(TOP_ROOM_PREFIX):
+            leave_room(room)
+        elif room.startswith(SYMBOL_ROOM_PREFIX) and (symbols is None or room[len(SYMBOL_ROOM_PREFIX):] in symbols):
+            leave_room(room)
+    return {'success': True, **_subscriptions()}
+
+
+def handle_crypto_resync(data=None):
+    """客户端落后时请求同步（默认按所在的 top 档位）"""
+    data = data if isinstance(data, dict) else {}
+    top = data.get('top') or _subscriptions()['top']
+    _sync_top(market_feed.bucket_for(top), data.get('since'))
+
+
+def _rule_ids(raw) -> List[str]:
+    """解析订阅的规则 id 列表（逗号分隔字符串或列表），去重并保持顺序"""
+    if isinstance(raw, str):
+        raw = raw.split(',')
+    if not isinstance(raw, (list, tuple)):
+        return []
+    rule_ids = []
+    for item in raw:
+        rule_id = str(item).strip()
+        if rule_id and rule_id not in rule_ids:
+            rule_ids.append(rule_id)
+    return rule_ids
+
+
+def _alert_subscriptions() -> List[str]:
+    """当前连接订阅的告警规则"""
+    return sorted(room[len(ALERT_ROOM_PREFIX):] for room in rooms()
+                  if isinstance(room, str) and room.startswith(ALERT_ROOM_PREFIX))
+
+
+def handle_alerts_subscribe(data=None):
+    """加入告警规则房间"""
+    data = data if isinstance(data, dict) else {}
+    joined = set(_alert_subscriptions())
+    rejected = []
+    for rule_id in _rule_ids(data.get('rules')):
+        if alert_engine.get_rule(rule_id) is None:
+            rejected.append(rule_id)
+        elif rule_id in joined or len(joined) < _max_alert_rules:
+            joined.add(rule_id)
+            join_room(f'{ALERT_ROOM_PREFIX}{rule_id}')
+        else:
+            rejected.append(rule_id)
+
+    result = {'success': True, 'rules': _alert_subscriptions()}
+    if rejected:
+        result['rejected'] = rejected
+        result['error'] = f'规则不存在或超过每个连接 {_max_alert_rules} 条的订阅上限'
+    return result
+
+
+def handle_alerts_unsubscribe(data=None):
+    """离开告警规则房间（不带参数时离开全部告警房间）"""
+    data = data if isinstance(data, dict) else {}
+    rule_ids = set(_rule_ids(data.get('rules'))) if data.get('rules') not in (None, '*') else None
+    for room in rooms():
+        if isinstance(room, str) and room.startswith(ALERT_ROOM_PREFIX) \
+                and (rule_ids is None or room[len(ALERT_ROOM_PREFIX):] in rule_ids):
+            leave_room(room)
+    return {'success': True, 'rules': _alert_subscriptions()}
+
+
+def _active_rooms(namespace: str = '/') -> List[str]:
+    """本进程上有成员的行情房间"""
+    if _socketio is None or _socketio.server is None:
+        return []
+    manager = _socketio.server.manager
+    active = []
+    for room, members in list(manager.rooms.get(namespace, {}).items()):
+        if isinstance(room, str) and members and room.startswith((TOP_ROOM_PREFIX, SYMBOL_ROOM_PREFIX)):
+            active.append(room)
+    return active
+
+
+def broadcast_market(snapshot, previous=None) -> Optional[Dict[str, int]]:
+    """记录新快照并把增量按房间发给本进程上的连接，返回各类房间的发送次数"""
+    deltas = market_feed.publish(snapshot, previous)
+    if deltas is None:
+        return None
+    active = _active_rooms()
+    sent = {'top': 0, 'symbol': 0}
+    if not active:
+        return sent
+
+    symbols = []
+    for room in active:
+        if room.startswith(TOP_ROOM_PREFIX):
+            delta = deltas.get(int(room[len(TOP_ROOM_PREFIX):]))
+            if delta is not None:
+                # ignore_queue: 其他 worker 会用自己的快照给各自的连接推送
+                _socketio.emit('crypto_update', delta, to=room, ignore_queue=True)
+                sent['top'] += 1
+        else:
+            symbols.append(room[len(SYMBOL_ROOM_PREFIX):])
+    for symbol, delta in market_feed.symbol_deltas(symbols).items():
+        _socketio.emit('symbol_update', delta, to=f'{SYMBOL_ROOM_PREFIX}{symbol}', ignore_queue=True)
+        sent['symbol'] += 1
+    return sent
+
+
+def push_alerts(result: Dict[str, Any]) -> int:
+    """把一轮评估触发的告警按规则发到 alerts:<rule_id> 房间，返回发送的事件数"""
+    if _socketio is None or not result.get('alerts'):
+        return 0
+    by_rule: Dict[str, List[Dict[str, Any]]] = {}
+    for alert in result['alerts']:
+        by_rule.setdefault(alert['rule_id'], []).append(alert)
+    for rule_id, alerts in by_rule.items():
+        # 告警只在调度进程产生，经消息队列发给所有 worker 上订阅了该规则的连接
+        _socketio.emit('alerts', {
+            'generation': result['generation'],
+            'timestamp': result['timestamp'],
+            'rule_id': rule_id,
+            'total': len(alerts),
+            'alerts': alerts,
+        }, to=f'{ALERT_ROOM_PREFIX}{rule_id}')
+    return len(by_rule)
+
+
+def init_realtime(app, socketio):
+    """注册 Socket.IO 事件并读取推送配置"""
+    global _socketio, _max_symbols, _max_alert_rules
+    _socketio = socketio
+    _max_symbols = app.config.get('REALTIME_MAX_SYMBOLS', 200)
+    _max_alert_rules = app.config.get('REALTIME_MAX_ALERT_RULES', 100)
+    buckets = [int(n) for n in str(app.config.get('REALTIME_TOP_BUCKETS', '')).split(',') if n.strip()]
+    market_feed.configure(buckets or market_feed.buckets, app.config.get('REALTIME_TOP_N', 100))
+    socketio.on_event('subscribe', handle_subscribe)
+    socketio.on_event('unsubscribe', handle_unsubscribe)
+    socketio.on_event('crypto_resync', handle_crypto_resync)
+    socketio.on_event('alerts_subscribe', handle_alerts_subscribe)
+    socketio.on_event('alerts_unsubscribe', handle_alerts_unsubscribe)
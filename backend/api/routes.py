@@ -4,19 +4,31 @@
 API 路由
 """
 
-from flask import Blueprint, jsonify, request
-from ..database.db import CryptoDataManager
+from flask import Blueprint, current_app, jsonify, request
+from ..database.db import CryptoDataManager, get_index_status
 from ..models.crypto import CryptoData
-from ..app import scheduler
-from datetime import datetime
+from datetime import datetime, timedelta
 # 在文件顶部添加导入
-from ..database.db import InvestorDataManager
-from ..models.investor import InvestorData
+from ..database.db import InvestorDataManager, InvestorPortfolioManager, MarketSnapshotManager, TokenUnlockManager
+from ..models.investor import INVESTOR_SCHEMA, InvestorData
+from ..analytics.market_store import market_store
+from ..analytics.summary import get_market_summary
+from ..analytics.screener import ScreenerError, run_screener
+from ..analytics.indicators import indicator_engine
+from ..analytics.alerts import AlertRuleError, alert_engine
+from ..analytics.correlation import DEFAULT_TOP, DEFAULT_WINDOW, correlation_tracker
+from ..analytics.search import DEFAULT_LIMIT as SEARCH_DEFAULT_LIMIT, SEARCH_TYPES, search_index
+from ..utils.generation import INVESTOR_GENERATION, MARKET_GENERATION
+from ..cluster import cluster
+from .log_stream import log_stream
+from .caching import cached, conditional
+from .streaming import stream_format, stream_records
 
 api_bp = Blueprint('api', __name__)
 crypto_manager = CryptoDataManager()
 
 @api_bp.route('/cryptos', methods=['GET'])
+@conditional(MARKET_GENERATION)
 def get_all_cryptos():
     """获取所有加密货币数据"""
     try:
@@ -37,7 +49,64 @@ def get_all_cryptos():
             'error': str(e)
         }), 500
 
+MAX_BATCH_SYMBOLS = 500
+
+def _batch_symbols(raw):
+    """解析批量查询的符号列表（逗号分隔字符串或列表），去重并保持顺序"""
+    if isinstance(raw, str):
+        raw = raw.split(',')
+    if not isinstance(raw, (list, tuple)):
+        raise ValueError('symbols 必须是逗号分隔的字符串或字符串数组')
+    symbols = []
+    for item in raw:
+        symbol = str(item).strip().upper()
+        if symbol and symbol not in symbols:
+            symbols.append(symbol)
+    if not symbols:
+        raise ValueError('缺少 symbols 参数')
+    if len(symbols) > MAX_BATCH_SYMBOLS:
+        raise ValueError(f'一次最多查询 {MAX_BATCH_SYMBOLS} 个符号')
+    return symbols
+
+def _batch_lookup(raw):
+    """批量查询，返回 {symbol: data | None}，未找到的符号显式返回 None"""
+    try:
+        symbols = _batch_symbols(raw)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    try:
+        found = crypto_manager.get_cryptos_by_symbols(symbols)
+        data = {symbol: CryptoData(found[symbol]).to_dict() if symbol in found else None for symbol in symbols}
+        return jsonify({
+            'success': True,
+            'data': data,
+            'count': len(found),
+            'not_found': [symbol for symbol in symbols if symbol not in found]
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@api_bp.route('/cryptos/batch', methods=['GET'])
+@conditional(MARKET_GENERATION)
+def get_cryptos_batch():
+    """批量获取多个加密货币数据（symbols=BTC,ETH,...）"""
+    return _batch_lookup(request.args.get('symbols', ''))
+
+@api_bp.route('/cryptos/batch', methods=['POST'])
+def post_cryptos_batch():
+    """批量获取多个加密货币数据（请求体 {"symbols": [...]}，适合较长的列表）"""
+    body = request.get_json(silent=True)
+    raw = body.get('symbols', []) if isinstance(body, dict) else body
+    return _batch_lookup(raw if raw is not None else [])
+
 @api_bp.route('/cryptos/<symbol>', methods=['GET'])
+@conditional(MARKET_GENERATION)
 def get_crypto_by_symbol(symbol):
     """获取特定加密货币数据"""
     try:
@@ -62,6 +131,7 @@ def get_crypto_by_symbol(symbol):
         }), 500
 
 @api_bp.route('/cryptos/<symbol>/history', methods=['GET'])
+@cached(MARKET_GENERATION)
 def get_crypto_history(symbol):
     """获取加密货币历史数据"""
     try:
@@ -82,7 +152,78 @@ def get_crypto_history(symbol):
             'error': str(e)
         }), 500
 
+HISTORY_EXPORT_COLUMNS = ('timestamp', 'id', 'symbol', 'price_usd', 'market_cap', 'volume_24h',
+                          'price_change_percentage_24h')
+
+def _snapshot_history(batches, symbol):
+    """market_snapshots 快照批次 -> 单个币种的历史记录批次（先按 id，再按符号匹配）"""
+    upper = symbol.upper()
+    try:
+        for docs in batches:
+            records = []
+            for doc in docs:
+                ids, symbols = doc.get('ids') or [], doc.get('symbols') or []
+                if symbol in ids:
+                    i = ids.index(symbol)
+                elif upper in symbols:
+                    i = symbols.index(upper)
+                else:
+                    continue
+                record = {'timestamp': doc.get('timestamp'), 'id': ids[i], 'symbol': symbols[i]}
+                for field in HISTORY_EXPORT_COLUMNS[3:]:
+                    values = doc.get(field) or []
+                    record[field] = values[i] if i < len(values) else None
+                records.append(record)
+            yield records
+    finally:
+        batches.close()
+
+@api_bp.route('/cryptos/<symbol>/history/export', methods=['GET'])
+def export_crypto_history(symbol):
+    """流式导出单个币种的行情快照历史（NDJSON / CSV）"""
+    try:
+        fmt = stream_format()
+        hours = request.args.get('hours', 24, type=int)
+        since = datetime.utcnow() - timedelta(hours=hours)
+        batches = MarketSnapshotManager().iter_snapshots(since=since)
+        return stream_records(_snapshot_history(batches, symbol), fmt, HISTORY_EXPORT_COLUMNS,
+                              filename=f'{symbol.upper()}-history')
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@api_bp.route('/cryptos/<symbol>/indicators', methods=['GET'])
+def get_crypto_indicators(symbol):
+    """获取加密货币的滚动技术指标（SMA/EMA/波动率/z-score/VWAP）"""
+    try:
+        data = indicator_engine.get(symbol)
+
+        if not data:
+            return jsonify({
+                'success': False,
+                'error': f'No indicators for {symbol}'
+            }), 404
+
+        return jsonify({
+            'success': True,
+            'data': data
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @api_bp.route('/symbols', methods=['GET'])
+@conditional(MARKET_GENERATION)
+@cached(MARKET_GENERATION)
 def get_all_symbols():
     """获取所有支持的加密货币符号"""
     try:
@@ -105,31 +246,65 @@ def health_check():
     return jsonify({
         'success': True,
         'message': 'API is running',
-        'database': 'MongoDB'
+        'database': crypto_manager.backend.name,
+        'indexes': get_index_status(),
+        'cluster': cluster.status(),
+        'logs': log_stream.stats()
+    })
+
+@api_bp.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """服务端响应缓存与压缩缓存的统计"""
+    response_cache = current_app.extensions.get('response_cache')
+    compressor = current_app.extensions.get('compressor')
+    return jsonify({
+        'success': True,
+        'data': {
+            'response': response_cache.stats() if response_cache else None,
+            'compression': compressor.cache.stats() if compressor else None
+        }
     })
 
 # 独立爬虫控制API
+def _scraper_command(action, scraper_type=None):
+    """在持有调度器的进程中执行爬虫控制命令（多进程部署时其他进程经命令队列转发）"""
+    result = cluster.dispatch(action, scraper_type, app=current_app._get_current_object())
+    if result is None:
+        return jsonify({
+            'success': True,
+            'queued': True,
+            'message': '命令已提交给调度进程，稍后生效'
+        }), 202
+    return jsonify(result)
+
+@api_bp.route('/scraper/status', methods=['GET'])
+def get_all_scraper_status():
+    """获取全部爬虫状态（idle / scheduled / running、当前页、上次耗时、上次错误、下次运行时间）"""
+    try:
+        return jsonify({
+            'success': True,
+            'data': cluster.scraper_statuses()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @api_bp.route('/scraper/<scraper_type>/status', methods=['GET'])
 def get_scraper_status_by_type(scraper_type):
     """获取特定爬虫状态"""
     try:
-        jobs = scheduler.get_jobs()
-        active_jobs = [job for job in jobs if scraper_type in job.id.lower()]
-        
-        is_running = len(active_jobs) > 0
-        next_run = None
-        
-        if is_running and active_jobs:
-            next_run = active_jobs[0].next_run_time.isoformat() if active_jobs[0].next_run_time else None
+        data = cluster.scraper_statuses()['scrapers'].get(scraper_type)
+        if data is None:
+            return jsonify({
+                'success': False,
+                'error': f'未知的爬虫类型: {scraper_type}'
+            }), 404
         
         return jsonify({
             'success': True,
-            'data': {
-                'running': is_running,
-                'active_jobs': len(active_jobs),
-                'next_run': next_run,
-                'scraper_type': scraper_type
-            }
+            'data': data
         })
     except Exception as e:
         return jsonify({
@@ -141,37 +316,58 @@ def get_scraper_status_by_type(scraper_type):
 def start_scraper_by_type(scraper_type):
     """启动特定爬虫"""
     try:
-        from flask import current_app
-        
-        # 检查是否已经在运行
-        jobs = scheduler.get_jobs()
-        active_jobs = [job for job in jobs if scraper_type in job.id.lower()]
+        from ..scrapers.status import SCRAPER_TYPES
         
-        if active_jobs:
+        if scraper_type not in SCRAPER_TYPES:
             return jsonify({
                 'success': False,
-                'message': f'{scraper_type} 爬虫已经在运行中'
-            })
+                'error': f'未知的爬虫类型: {scraper_type}'
+            }), 400
         
-        if scraper_type == 'coingecko':
-            from ..scrapers.scheduler import start_crypto_scraping_jobs
-            start_crypto_scraping_jobs(current_app)
-        elif scraper_type == 'dropstab':
-            from ..scrapers.scheduler import start_investor_scraping_jobs
-            start_investor_scraping_jobs(current_app)
-        elif scraper_type == 'tokenomist':
-            # 新增：启动 tokenomist 爬虫
-            from ..scrapers.scheduler import start_tokenomist_scraping_jobs
-            start_tokenomist_scraping_jobs(current_app)
-        else:
+        return _scraper_command('start', scraper_type)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@api_bp.route('/scraper/<scraper_type>/stop', methods=['POST'])
+def stop_scraper_by_type(scraper_type):
+    """停止特定爬虫"""
+    try:
+        return _scraper_command('stop', scraper_type)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@api_bp.route('/scraper/run-once', methods=['POST'])
+def run_scraper_once():
+    """手动执行一次爬取"""
+    try:
+        return _scraper_command('run-once')
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+# 市场分析API接口
+@api_bp.route('/market/summary', methods=['GET'])
+def get_market_summary_api():
+    """市场概览：CoinGecko /global 数据 + 最新快照上的向量化聚合"""
+    try:
+        snapshot = market_store.get_snapshot()
+        if snapshot is None or not len(snapshot):
             return jsonify({
                 'success': False,
-                'error': f'未知的爬虫类型: {scraper_type}'
-            }), 400
+                'message': '暂无行情数据'
+            }), 404
         
         return jsonify({
             'success': True,
-            'message': f'{scraper_type} 爬虫已启动'
+            'data': get_market_summary(snapshot)
         })
     except Exception as e:
         return jsonify({
@@ -179,57 +375,195 @@ def start_scraper_by_type(scraper_type):
             'error': str(e)
         }), 500
 
-@api_bp.route('/scraper/<scraper_type>/stop', methods=['POST'])
-def stop_scraper_by_type(scraper_type):
-    """停止特定爬虫"""
+@api_bp.route('/analytics/correlation', methods=['GET'])
+def get_correlation_matrix():
+    """Top N 币种在最近 window 轮快照上的收益率相关性 / 协方差矩阵"""
     try:
-        from ..scrapers.scheduler import set_scraper_stop_flag
+        top = request.args.get('top', DEFAULT_TOP, type=int)
+        window = request.args.get('window', DEFAULT_WINDOW, type=int)
+        result = correlation_tracker.compute(top, window)
         
-        # 设置停止标志
-        set_scraper_stop_flag(scraper_type, True)
+        if result['samples'] < 2:
+            return jsonify({
+                'success': False,
+                'message': '历史快照不足，至少需要 3 轮爬取数据'
+            }), 404
         
-        # 移除特定爬虫相关任务
-        jobs = scheduler.get_jobs()
-        removed_count = 0
+        return jsonify({
+            'success': True,
+            'data': result
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@api_bp.route('/search', methods=['GET'])
+@conditional(MARKET_GENERATION, INVESTOR_GENERATION)
+def search():
+    """按前缀 / 模糊匹配搜索币种和投资者（q=关键词, type=crypto,investor, limit=10）"""
+    query = request.args.get('q', '').strip()
+    types = [t.strip().lower() for t in request.args.get('type', '').split(',') if t.strip()]
+    invalid = [t for t in types if t not in SEARCH_TYPES]
+    if not query or invalid:
+        return jsonify({
+            'success': False,
+            'error': f'未知类型: {", ".join(invalid)}' if invalid else '缺少 q 参数'
+        }), 400
+    try:
+        limit = request.args.get('limit', SEARCH_DEFAULT_LIMIT, type=int)
+        results = search_index.search(query, limit=limit, types=types or None)
+        return jsonify({
+            'success': True,
+            'query': query,
+            'data': results,
+            'count': len(results)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@api_bp.route('/screener', methods=['GET', 'POST'])
+def screener():
+    """按筛选表达式在最新快照上选币，例如 market_cap > 1e9 and change_24h < -5 sort volume desc"""
+    try:
+        if request.method == 'POST':
+            params = request.get_json(silent=True) or {}
+            limit = params.get('limit')
+        else:
+            params = request.args
+            limit = params.get('limit', type=int)
+        expression = params.get('q') or params.get('query') or ''
+        fields = params.get('fields') or None
+        if isinstance(fields, str):
+            fields = fields.split(',')
         
-        for job in jobs:
-            if scraper_type in job.id.lower():
-                scheduler.remove_job(job.id)
-                removed_count += 1
+        snapshot = market_store.get_snapshot()
+        if snapshot is None or not len(snapshot):
+            return jsonify({
+                'success': False,
+                'message': '暂无行情数据'
+            }), 404
         
+        result = run_screener(snapshot, expression, limit=limit, fields=fields)
         return jsonify({
             'success': True,
-            'message': f'{scraper_type} 爬虫停止信号已发送，移除了 {removed_count} 个任务'
+            **result
         })
+    except ScreenerError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
-@api_bp.route('/scraper/run-once', methods=['POST'])
-def run_scraper_once():
-    """手动执行一次爬取"""
+# 告警规则API接口
+@api_bp.route('/alerts/rules', methods=['GET'])
+def get_alert_rules():
+    """获取全部告警规则"""
     try:
-        from flask import current_app
-        from ..scrapers.scheduler import scrape_crypto_data, set_app_instance
+        rules = alert_engine.list_rules()
+        return jsonify({
+            'success': True,
+            'data': rules,
+            'count': len(rules)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@api_bp.route('/alerts/rules', methods=['POST'])
+def create_alert_rules():
+    """创建告警规则，请求体为单条规则、规则列表或 {"rules": [...]}"""
+    try:
+        payload = request.get_json(silent=True)
+        if isinstance(payload, dict) and 'rules' in payload:
+            payload = payload['rules']
+        items = payload if isinstance(payload, list) else [payload]
         
-        # 设置全局应用实例
-        set_app_instance(current_app)
+        rules = alert_engine.add_rules(items)
+        return jsonify({
+            'success': True,
+            'data': rules,
+            'count': len(rules)
+        }), 201
+    except AlertRuleError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@api_bp.route('/alerts/rules/<rule_id>', methods=['PATCH'])
+def update_alert_rule(rule_id):
+    """修改告警规则（threshold、enabled、note 等）"""
+    try:
+        rule = alert_engine.update_rule(rule_id, request.get_json(silent=True) or {})
+        if not rule:
+            return jsonify({
+                'success': False,
+                'error': f'Alert rule {rule_id} not found'
+            }), 404
         
-        # 添加一次性爬取任务
-        scheduler.add_job(
-            func=scrape_crypto_data,
-            trigger="date",
-            run_date=datetime.now(),
-            id=f'crypto_scraper_manual_{datetime.now().timestamp()}',
-            name='手动加密货币数据爬取',
-            replace_existing=False
-        )
+        return jsonify({
+            'success': True,
+            'data': rule
+        })
+    except AlertRuleError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@api_bp.route('/alerts/rules/<rule_id>', methods=['DELETE'])
+def delete_alert_rule(rule_id):
+    """删除告警规则"""
+    try:
+        if not alert_engine.delete_rule(rule_id):
+            return jsonify({
+                'success': False,
+                'error': f'Alert rule {rule_id} not found'
+            }), 404
         
         return jsonify({
             'success': True,
-            'message': '手动爬取任务已启动'
+            'message': f'Alert rule {rule_id} deleted'
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@api_bp.route('/alerts/recent', methods=['GET'])
+def get_recent_alerts():
+    """最近触发的告警（最新在前）及引擎统计"""
+    try:
+        limit = request.args.get('limit', 50, type=int)
+        alerts = list(alert_engine.recent)[::-1][:limit]
+        return jsonify({
+            'success': True,
+            'data': alerts,
+            'count': len(alerts),
+            'stats': alert_engine.stats()
         })
     except Exception as e:
         return jsonify({
@@ -238,7 +572,33 @@ def run_scraper_once():
         }), 500
 
 # 添加投资者数据相关API接口
+def _include_portfolio():
+    """请求参数 include=portfolio 时才加载投资组合明细"""
+    include = request.args.get('include', '')
+    return 'portfolio' in [part.strip() for part in include.split(',')]
+
+def _load_portfolios(objects, portfolio_manager=None):
+    """批量加载投资组合明细，返回与 objects 对应的明细列表
+
+    尚未迁移的旧文档（带内嵌数组）直接使用内嵌数据，其余按 portfolio_key 一次查询。
+    """
+    keys = {investor.portfolio_key for investor in objects
+            if investor.portfolio_key is not None and not investor.has_embedded_portfolio}
+    stored = (portfolio_manager or InvestorPortfolioManager()).get_portfolios(keys) if keys else {}
+    return [investor.portfolio_entries() if investor.has_embedded_portfolio
+            else stored.get(investor.portfolio_key, []) for investor in objects]
+
+def _serialize_portfolio(entries):
+    """投资组合明细 -> {'projects': [...], 'sales': [...]}"""
+    portfolio = {'projects': [], 'sales': []}
+    for entry in entries:
+        item = {'project': entry['project'], 'data': entry.get('data') or {}}
+        portfolio['projects' if entry['kind'] == 'project' else 'sales'].append(item)
+    return portfolio
+
 @api_bp.route('/investors', methods=['GET'])
+@conditional(INVESTOR_GENERATION)
+@cached(INVESTOR_GENERATION)
 def get_investors():
     """获取投资者数据"""
     try:
@@ -253,10 +613,12 @@ def get_investors():
             data = investor_manager.get_latest_data(limit=limit)
         
         # 转换为InvestorData对象并序列化
-        investors = []
-        for item in data:
-            investor = InvestorData.from_dict(item)
-            investors.append(investor.to_dict())
+        objects = [InvestorData.from_dict(item) for item in data]
+        investors = [investor.to_dict() for investor in objects]
+        
+        if _include_portfolio():
+            for item, entries in zip(investors, _load_portfolios(objects)):
+                item['portfolio'] = _serialize_portfolio(entries)
         
         return jsonify({
             'success': True,
@@ -269,7 +631,49 @@ def get_investors():
             'error': str(e)
         }), 500
 
+INVESTOR_EXPORT_COLUMNS = ('_id',) + tuple(
+    attr for attr, _ in INVESTOR_SCHEMA if attr not in ('portfolio_projects', 'sale_ids')
+)
+
+def _investor_records(batches, include_portfolio):
+    """投资者文档批次 -> API 记录批次（按批加载投资组合明细）"""
+    portfolio_manager = InvestorPortfolioManager()
+    try:
+        for docs in batches:
+            objects = [InvestorData.from_dict(item) for item in docs]
+            investors = [investor.to_dict() for investor in objects]
+            if include_portfolio:
+                for item, entries in zip(investors, _load_portfolios(objects, portfolio_manager)):
+                    item['portfolio'] = _serialize_portfolio(entries)
+            yield investors
+    finally:
+        batches.close()
+
+@api_bp.route('/investors/export', methods=['GET'])
+def export_investors():
+    """流式导出投资者数据（NDJSON / CSV，limit 为 0 时导出全部）"""
+    try:
+        fmt = stream_format()
+        limit = request.args.get('limit', 0, type=int)
+        investor_type = request.args.get('type')
+        include_portfolio = _include_portfolio()
+        batches = InvestorDataManager().iter_investors(investor_type)
+        columns = INVESTOR_EXPORT_COLUMNS + (('portfolio',) if include_portfolio else ())
+        return stream_records(_investor_records(batches, include_portfolio), fmt, columns,
+                              filename='investors', limit=limit)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @api_bp.route('/investors/stats', methods=['GET'])
+@conditional(INVESTOR_GENERATION)
 def get_investor_stats():
     """获取投资者统计信息"""
     try:
@@ -287,6 +691,7 @@ def get_investor_stats():
         }), 500
 
 @api_bp.route('/investors/<name>', methods=['GET'])
+@cached(INVESTOR_GENERATION)
 def get_investor_by_name(name):
     """根据名称获取投资者信息"""
     try:
@@ -295,15 +700,108 @@ def get_investor_by_name(name):
         
         if data:
             investor = InvestorData.from_dict(data)
+            result = investor.to_dict()
+            if _include_portfolio():
+                entries = investor.portfolio_entries() if investor.has_embedded_portfolio else \
+                    InvestorPortfolioManager().get_portfolio(investor.portfolio_key)
+                result['portfolio'] = _serialize_portfolio(entries)
             return jsonify({
                 'success': True,
-                'data': investor.to_dict()
+                'data': result
             })
         else:
             return jsonify({
                 'success': False,
                 'message': '投资者不存在'
             }), 404
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@api_bp.route('/investors/<name>/portfolio', methods=['GET'])
+def get_investor_portfolio(name):
+    """获取投资者的投资组合明细"""
+    try:
+        kind = request.args.get('kind')
+        data = InvestorDataManager().get_investor_by_name(name)
+        
+        if not data:
+            return jsonify({
+                'success': False,
+                'message': '投资者不存在'
+            }), 404
+        
+        investor = InvestorData.from_dict(data)
+        if investor.has_embedded_portfolio:
+            # 尚未迁移的旧文档
+            entries = [entry for entry in investor.portfolio_entries() if not kind or entry['kind'] == kind]
+        else:
+            entries = InvestorPortfolioManager().get_portfolio(investor.portfolio_key, kind=kind)
+        return jsonify({
+            'success': True,
+            'data': _serialize_portfolio(entries),
+            'count': len(entries)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@api_bp.route('/projects/<project>/investors', methods=['GET'])
+def get_project_investors(project):
+    """获取持有指定项目的投资者（按 investor_portfolio 的 project 索引查询）"""
+    try:
+        kind = request.args.get('kind', 'project')
+        limit = request.args.get('limit', 100, type=int)
+        
+        entries = InvestorPortfolioManager().get_investors_for_project(project, kind=kind, limit=limit)
+        names = [entry['investor_name'] for entry in entries if entry.get('investor_name')]
+        docs = {doc['name']: doc for doc in InvestorDataManager().get_investors_by_names(names)}
+        
+        investors = []
+        for entry in entries:
+            doc = docs.get(entry.get('investor_name'))
+            if doc is None:
+                continue
+            item = InvestorData.from_dict(doc).to_dict()
+            item['portfolio_entry'] = entry.get('data') or {}
+            investors.append(item)
+        
+        return jsonify({
+            'success': True,
+            'data': investors,
+            'count': len(investors)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+# 代币解锁相关API接口
+@api_bp.route('/unlocks/upcoming', methods=['GET'])
+def get_upcoming_unlocks():
+    """获取未来 N 天内按美元价值排序的最大代币解锁"""
+    try:
+        days = request.args.get('days', 7, type=int)
+        limit = request.args.get('limit', 20, type=int)
+        
+        unlock_manager = TokenUnlockManager()
+        data = unlock_manager.get_largest_upcoming_unlocks(days=days, limit=limit)
+        
+        unlocks = []
+        for item in data:
+            item['_id'] = str(item.get('_id'))
+            unlocks.append(item)
+        
+        return jsonify({
+            'success': True,
+            'data': unlocks,
+            'count': len(unlocks)
+        })
     except Exception as e:
         return jsonify({
             'success': False,
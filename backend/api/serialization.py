@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+API JSON 序列化
+
+提供两种 Flask JSON provider，输出格式一致：
+- OrjsonProvider: 使用 orjson（可选依赖，pip install orjson），直接生成 bytes
+- StdJSONProvider: 标准库 json，作为未安装 orjson 时的回退
+
+两者都原生支持 datetime（ISO 8601，无时区的按 UTC 处理，与 Flask 默认的
+RFC 822 格式语义一致）、ObjectId、NumPy 标量 / 数组、Decimal 和 set。
+通过配置 JSON_PROVIDER 选择: auto（默认，有 orjson 时使用）/ orjson / std。
+"""
+
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import numpy as np
+from bson import ObjectId
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+
+
+def _default(obj):
+    """标准库和 orjson 都不支持的类型"""
+    if isinstance(obj, datetime):
+        if obj.tzinfo is None:
+            obj = obj.replace(tzinfo=timezone.utc)
+        return obj.isoformat()
+    if isinstance(obj, date):
+        return obj.isoformat()
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+class StdJSONProvider(DefaultJSONProvider):
+    """标准库 json，扩展支持的类型"""
+
+    default = staticmethod(_default)
+
+
+class OrjsonProvider(JSONProvider):
+    """orjson 实现，响应体直接使用 orjson 生成的 bytes"""
+
+    def __init__(self, app):
+        super().__init__(app)
+        import orjson
+
+        self._orjson = orjson
+        self._options = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(self, obj, **kwargs) -> str:
+        return self._orjson.dumps(obj, default=_default, option=self._options).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return self._orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = self._orjson.dumps(obj, default=_default, option=self._options)
+        return self._app.response_class(body, mimetype='application/json')
+
+
+def _orjson_available() -> bool:
+    try:
+        import orjson  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def init_json_provider(app) -> str:
+    """按 JSON_PROVIDER 配置安装 JSON provider，返回实际使用的名称"""
+    choice = str(app.config.get('JSON_PROVIDER', 'auto')).lower()
+    if choice in ('auto', 'orjson') and _orjson_available():
+        app.json = OrjsonProvider(app)
+        return 'orjson'
+    if choice == 'orjson':
+        print("⚠️  未安装 orjson，回退到标准库 JSON（pip install orjson）")
+    app.json = StdJSONProvider(app)
+    return 'std'
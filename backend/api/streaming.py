@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式批量导出（NDJSON / CSV）
+
+把按批次读取的游标（StorageBackend.iter_find）直接转换为生成器响应：
+- 每批记录序列化为一个输出块后立即发送，内存占用只与批大小有关
+- 首批读出即开始发送，不必等待整个结果集
+- 客户端断开时 WSGI 服务器关闭响应生成器，finally 中随之关闭上游游标
+- 响应已开始发送后出错无法再改状态码，NDJSON 最后输出一行错误对象
+
+格式由 format=ndjson|csv 参数或 Accept: text/csv 决定，默认 NDJSON。
+"""
+
+import csv
+import io
+import json
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from flask import Response, current_app, request, stream_with_context
+
+from .serialization import _default
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+CSV_MIMETYPE = 'text/csv'
+STREAM_FORMATS = ('ndjson', 'csv')
+
+
+def stream_format() -> str:
+    """请求的导出格式，不支持时抛出 ValueError"""
+    fmt = request.args.get('format')
+    if fmt is None:
+        best = request.accept_mimetypes.best_match([NDJSON_MIMETYPE, CSV_MIMETYPE])
+        return 'csv' if best == CSV_MIMETYPE else 'ndjson'
+    fmt = fmt.lower()
+    if fmt not in STREAM_FORMATS:
+        raise ValueError(f'不支持的导出格式: {fmt}（可选 {", ".join(STREAM_FORMATS)}）')
+    return fmt
+
+
+def _csv_value(value: Any) -> Any:
+    """CSV 单元格：嵌套结构写为 JSON 字符串，时间与 JSON 输出一致写为 ISO 8601 UTC"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=_default)
+    if isinstance(value, date):
+        return _default(value)
+    return value
+
+
+def _limited(batches: Iterable[List[Dict[str, Any]]], limit: Optional[int]) -> Iterator[List[Dict[str, Any]]]:
+    """最多输出 limit 条记录（None 或 <= 0 表示不限）"""
+    if not limit or limit <= 0:
+        yield from batches
+        return
+    remaining = limit
+    for batch in batches:
+        if len(batch) >= remaining:
+            yield batch[:remaining]
+            return
+        remaining -= len(batch)
+        yield batch
+
+
+def _ndjson_chunks(batches, dumps: Callable[[Any], str]) -> Iterator[str]:
+    for batch in batches:
+        if batch:
+            yield ''.join(dumps(record) + '\n' for record in batch)
+
+
+def _csv_chunks(batches, columns: Sequence[str]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for batch in batches:
+        for record in batch:
+            writer.writerow([_csv_value(record.get(column)) for column in columns])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def stream_records(batches: Iterable[List[Dict[str, Any]]], fmt: str, columns: Sequence[str],
+                   filename: str, limit: Optional[int] = None) -> Response:
+    """按批次的记录 -> NDJSON / CSV 流式响应
+
+    batches 为生成器时，响应结束或客户端断开后会被关闭（从而关闭数据库游标）。
+    columns 为 CSV 表头（NDJSON 输出完整记录）。
+    """
+    dumps = current_app.json.dumps
+    source = _limited(batches, limit)
+
+    def generate():
+        try:
+            if fmt == 'csv':
+                yield from _csv_chunks(source, columns)
+            else:
+                yield from _ndjson_chunks(source, dumps)
+        except GeneratorExit:
+            raise
+        except Exception as e:
+            print(f"❌ 流式导出 {filename} 失败: {e}")
+            if fmt != 'csv':
+                yield dumps({'success': False, 'error': str(e)}) + '\n'
+        finally:
+            source.close()
+            close = getattr(batches, 'close', None)
+            if close is not None:
+                close()
+
+    mimetype = CSV_MIMETYPE if fmt == 'csv' else NDJSON_MIMETYPE
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
+    response.headers['Cache-Control'] = 'no-store'
+    # 关闭反向代理缓冲，逐块转发
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
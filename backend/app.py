@@ -5,6 +5,7 @@ Flask 应用工厂
 """
 
 import os
+import time
 import atexit
 from flask import Flask, render_template, send_from_directory
 from flask_socketio import SocketIO
@@ -18,6 +19,7 @@ mongo = PyMongo()
 
 def create_app():
     """应用工厂函数"""
+    start_time = time.perf_counter()
     app = Flask(__name__)
     
     # 加载配置
@@ -25,8 +27,23 @@ def create_app():
     env = os.getenv('FLASK_ENV', 'development')
     app.config.from_object(config[env])
     
-    # 初始化扩展
-    socketio.init_app(app)
+    # JSON 序列化、响应压缩与服务端响应缓存
+    from .api.serialization import init_json_provider
+    from .api.compression import init_compression
+    from .api.caching import init_response_cache
+    print(f"🧾 JSON provider: {init_json_provider(app)}")
+    init_compression(app)
+    init_response_cache(app)
+    
+    # 初始化扩展（多进程部署时通过消息队列在各进程间转发 Socket.IO 事件）
+    message_queue = app.config.get('SOCKETIO_MESSAGE_QUEUE') or None
+    socketio.init_app(app, message_queue=message_queue)
+    if message_queue:
+        print(f"📡 Socket.IO 消息队列: {message_queue}")
+    from .api.realtime import init_realtime
+    from .api.log_stream import init_log_stream
+    init_realtime(app, socketio)
+    init_log_stream(app, socketio)
     mongo.init_app(app)
     
     # 注册蓝图
@@ -52,14 +69,41 @@ def create_app():
         frontend_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'frontend')
         return send_from_directory(os.path.join(frontend_dir, 'js'), filename)
     
-    # 初始化数据库索引
-    with app.app_context():
-        from .database.db import create_indexes
-        create_indexes()
+    # 初始化数据库索引（默认在后台线程创建，不阻塞启动）
+    index_mode = app.config.get('INDEX_BUILD_MODE', 'background')
+    if index_mode == 'sync':
+        with app.app_context():
+            from .database.db import create_indexes
+            create_indexes()
+    elif index_mode == 'off':
+        print("⏭️  已跳过启动时创建索引 (INDEX_BUILD_MODE=off)")
+    else:
+        from .database.db import create_indexes_in_background
+        create_indexes_in_background(app)
+    
+    # 调度器只在一个进程中运行（多进程部署时由 cluster 选出）
+    from .cluster import cluster
+    cluster.init_app(app)
     
-    # 启动调度器但不自动启动爬虫任务
+    print(f"⏱️  应用初始化完成: {(time.perf_counter() - start_time) * 1000:.0f}ms")
+    return app
+
+
+def start_scheduler(app):
+    """启动调度器但不自动启动爬虫任务（只在持有调度器的进程中调用）"""
     if not scheduler.running:
         scheduler.start()
         atexit.register(lambda: scheduler.shutdown())
+        # 爬虫状态机跟随调度器任务事件更新，并经 Socket.IO 推送变化
+        from .scrapers.status import scraper_states
+        scraper_states.attach(scheduler, socketio)
+    
+    # 可选：定时增量导出 Parquet
+    if app.config.get('ENABLE_SCHEDULED_EXPORT'):
+        from .scrapers.scheduler import start_export_jobs
+        start_export_jobs(app)
     
-    return app
\ No newline at end of file
+    # 后台迁移旧结构的投资者文档
+    if app.config.get('ENABLE_SCHEMA_MIGRATION'):
+        from .scrapers.scheduler import start_migration_jobs
+        start_migration_jobs(app)
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多进程部署协调
+
+gunicorn 多 worker 部署时每个 worker 进程都会调用 create_app，本模块负责：
+- 调度器归属：RUN_SCHEDULER=auto 时通过 SCHEDULER_LOCK_FILE 上的文件锁（flock）
+  选出唯一一个运行 APScheduler 的进程；锁随进程退出释放，其余进程定期重试接管，
+  接管时恢复上一个调度进程正在运行的爬虫（同一 gunicorn master 下）
+- 代际同步：开启 GenerationRegistry 共享模式，代际号和 epoch 写入 cluster_state
+  集合；其他进程轮询跟进，重新加载行情快照（并向本进程的订阅连接推送增量）、
+  回放新的历史快照到技术指标和相关性矩阵、按需重新加载告警规则，各进程对同一数据
+  给出相同的 ETag
+- 爬虫控制：非调度进程收到的启动/停止/手动爬取请求写入 scheduler_commands，
+  由调度进程轮询执行；调度进程在任务或爬虫状态变化时发布到 cluster_state，供其他进程查询
+
+CLUSTER_MODE=false（默认，python run.py 单进程运行）时只决定是否启动调度器，
+不读写 cluster_state，行为与之前一致。
+"""
+
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from .utils.generation import ALERT_RULES_GENERATION, MARKET_GENERATION, generations
+
+try:
+    import fcntl
+except ImportError:  # Windows 没有 fcntl，只能通过 RUN_SCHEDULER 指定调度进程
+    fcntl = None
+
+GENERATION_PREFIX = 'generation:'
+COMMAND_WAIT_SECONDS = 5.0
+HISTORY_REPLAY_LIMIT = 64
+
+
+class ClusterCoordinator:
+    """本进程在多进程部署中的角色与同步状态"""
+
+    def __init__(self):
+        self.app = None
+        self.enabled = False
+        self.mode = 'auto'
+        self.is_scheduler_owner = False
+        self.interval = 1.0
+        self.process_id = f'{socket.gethostname()}:{os.getpid()}'
+        self.last_sync = None
+        self.syncs = 0
+        self._lock_handle = None
+        self._history_primed = False
+        self._history_since: Optional[datetime] = None
+        self._published_jobs = None
+        self._published_status_version = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # ---- 初始化 ----
+
+    def init_app(self, app):
+        """按配置决定本进程是否持有调度器；集群模式下开启代际共享并启动同步线程"""
+        self.app = app
+        self.enabled = bool(app.config.get('CLUSTER_MODE'))
+        self.mode = str(app.config.get('RUN_SCHEDULER', 'auto')).lower()
+        self.interval = float(app.config.get('GENERATION_SYNC_INTERVAL', 1.0))
+
+        if not self.enabled:
+            if self.mode != 'false':
+                self._become_owner(resume=False)
+            return
+
+        generations.shared = True
+        generations.publisher = self._publish_generation
+
+        if self.mode == 'true' or (self.mode == 'auto' and self._try_lock()):
+            self._become_owner(resume=True)
+        elif self.mode == 'auto':
+            print(f"👥 调度器由其他进程持有，本进程 ({self.process_id}) 只处理请求")
+
+        self._thread = threading.Thread(target=self._run, name='cluster-sync', daemon=True)
+        self._thread.start()
+
+    def _try_lock(self) -> bool:
+        """尝试获取调度器文件锁（非阻塞）"""
+        if fcntl is None:
+            print("⚠️  当前平台不支持文件锁，请通过 RUN_SCHEDULER=true/false 指定调度进程")
+            return False
+        path = self.app.config.get('SCHEDULER_LOCK_FILE', 'data/scheduler.lock')
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        handle = open(path, 'a+')
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        handle.seek(0)
+        handle.truncate()
+        handle.write(self.process_id)
+        handle.flush()
+        self._lock_handle = handle
+        return True
+
+    def _become_owner(self, resume: bool):
+        from .app import start_scheduler
+
+        self.is_scheduler_owner = True
+        start_scheduler(self.app)
+        print(f"🗓️  调度器运行在本进程 ({self.process_id})")
+        if resume:
+            self._resume_scrapers()
+
+    def _resume_scrapers(self):
+        """接管调度器时恢复上一个调度进程正在运行的爬虫
+
+        只在同一 gunicorn master 下接管时恢复（worker 崩溃或被回收）；整体重启部署后
+        与单进程一样不自动启动爬虫。
+        """
+        from .scrapers.scheduler import scraper_status, start_scraper
+        from .scrapers.status import SCRAPER_TYPES
+
+        try:
+            with self.app.app_context():
+                state = self.manager.get('scheduler')
+                if not state or state.get('owner') == self.process_id:
+                    return
+                if state.get('host') != socket.gethostname() or state.get('parent_pid') != os.getppid():
+                    return
+                for scraper_type in SCRAPER_TYPES:
+                    if scraper_status(scraper_type, state.get('jobs', []))['running']:
+                        start_scraper(self.app, scraper_type)
+                        print(f"🔁 已从 {state.get('owner')} 接管 {scraper_type} 爬虫")
+        except Exception as e:
+            print(f"⚠️  恢复爬虫任务失败: {e}")
+
+    @property
+    def manager(self):
+        from .database.db import ClusterStateManager
+        return ClusterStateManager()
+
+    # ---- 同步线程 ----
+
+    def _run(self):
+        with self.app.app_context():
+            self._prime()
+            while not self._stop.wait(self.interval):
+                self.tick()
+
+    def _prime(self):
+        """首次同步：统一 epoch，记录已有历史快照位置（之前的快照由各引擎自行预热）"""
+        try:
+            epoch = self.manager.get('epoch')
+            if epoch:
+                generations.epoch = epoch['value']
+            else:
+                self.manager.set('epoch', value=generations.epoch)
+            if not self.is_scheduler_owner:
+                self._prime_history()
+            self.sync_generations()
+        except Exception as e:
+            print(f"⚠️  集群状态初始化失败: {e}")
+
+    def _prime_history(self):
+        from .analytics.correlation import correlation_tracker
+        from .analytics.indicators import indicator_engine
+        from .database.db import MarketSnapshotManager
+
+        indicator_engine.ensure_warm()
+        correlation_tracker.ensure_warm()
+        latest = MarketSnapshotManager().get_recent_snapshots(limit=1)
+        self._history_since = latest[-1]['timestamp'] if latest else None
+        self._history_primed = True
+
+    def tick(self):
+        """一轮同步（由同步线程按 GENERATION_SYNC_INTERVAL 调用）"""
+        try:
+            self.sync_generations()
+            if self.is_scheduler_owner:
+                self.process_commands()
+                self.publish_scheduler_state()
+            else:
+                self.replay_history()
+                if self.mode == 'auto' and self._try_lock():
+                    print(f"🗓️  调度进程已退出，由本进程 ({self.process_id}) 接管调度器")
+                    self._become_owner(resume=True)
+            self.last_sync = datetime.utcnow()
+            self.syncs += 1
+        except Exception as e:
+            print(f"⚠️  集群状态同步失败: {e}")
+
+    # ---- 代际号 ----
+
+    def _publish_generation(self, name: str, value: int):
+        self.manager.set(GENERATION_PREFIX + name, value=value)
+
+    def sync_generations(self) -> List[str]:
+        """跟进其他进程发布的代际号，返回发生变化的数据集"""
+        state = self.manager.get_all()
+        epoch = state.get('epoch')
+        if epoch and epoch['value'] != generations.epoch:
+            generations.epoch = epoch['value']
+
+        changed = []
+        for key, doc in state.items():
+            if not key.startswith(GENERATION_PREFIX):
+                continue
+            name = key[len(GENERATION_PREFIX):]
+            value = int(doc['value'])
+            if value <= generations.get(name):
+                continue
+            if name == MARKET_GENERATION:
+                # 先替换快照再推进代际号，读到新代际号的请求一定能拿到新快照
+                self._reload_market(value)
+            if generations.advance(name, value):
+                changed.append(name)
+
+        if ALERT_RULES_GENERATION in changed:
+            from .analytics.alerts import alert_engine
+            alert_engine.invalidate()
+        return changed
+
+    def _reload_market(self, generation: int):
+        from .analytics.market_store import market_store
+        from .api.realtime import broadcast_market
+
+        previous = market_store.get_snapshot(load=False)
+        if previous is not None:
+            # 本进程上的 Socket.IO 连接由本进程按房间推送增量
+            broadcast_market(market_store.reload_from_backend(generation), previous)
+
+    def replay_history(self) -> int:
+        """把调度进程新保存的历史快照回放到本进程的技术指标和相关性矩阵"""
+        if not self._history_primed:
+            return 0
+        from .analytics.correlation import correlation_tracker
+        from .analytics.indicators import indicator_engine
+        from .analytics.market_store import market_store
+        from .database.db import MarketSnapshotManager
+
+        since = self._history_since
+        docs = MarketSnapshotManager().get_recent_snapshots(limit=HISTORY_REPLAY_LIMIT, since=since)
+        docs = [doc for doc in docs if since is None or doc['timestamp'] > since]
+        if not docs:
+            return 0
+        indicator_engine.warm_up(docs)
+        correlation_tracker.warm_up(docs)
+        self._history_since = docs[-1]['timestamp']
+        if docs[-1].get('global_data'):
+            market_store.set_global_data(docs[-1]['global_data'])
+        return len(docs)
+
+    # ---- 爬虫控制命令 ----
+
+    def dispatch(self, action: str, scraper_type: Optional[str] = None, app=None,
+                 wait: float = COMMAND_WAIT_SECONDS) -> Optional[Dict[str, Any]]:
+        """执行爬虫控制命令：本进程持有调度器时直接执行，否则写入命令队列并等待结果
+
+        等待超时返回 None（命令仍会被调度进程执行）。
+        """
+        if self.is_scheduler_owner:
+            return self.execute(action, scraper_type, app)
+
+        from .database.db import SchedulerCommandManager
+
+        commands = SchedulerCommandManager()
+        command_id = uuid.uuid4().hex
+        commands.enqueue({
+            'command_id': command_id, 'action': action, 'scraper_type': scraper_type,
+            'status': 'pending', 'requested_by': self.process_id, 'created_at': datetime.utcnow(),
+        })
+        deadline = time.monotonic() + wait
+        while time.monotonic() < deadline:
+            time.sleep(0.2)
+            doc = commands.get_command(command_id)
+            if doc and doc.get('status') != 'pending':
+                return doc.get('result')
+        return None
+
+    def execute(self, action: str, scraper_type: Optional[str] = None, app=None) -> Dict[str, Any]:
+        """在本进程的调度器上执行命令"""
+        from .scrapers.scheduler import run_scraper_once, start_scraper, stop_scraper
+
+        app = app or self.app
+        if action == 'start':
+            result = start_scraper(app, scraper_type)
+        elif action == 'stop':
+            result = stop_scraper(scraper_type)
+        elif action == 'run-once':
+            result = run_scraper_once(app)
+        else:
+            raise ValueError(f'未知的命令: {action}')
+        if self.enabled:
+            self.publish_scheduler_state()
+        return result
+
+    def process_commands(self) -> int:
+        """执行命令队列中的待处理命令（调度进程调用）"""
+        from .database.db import SchedulerCommandManager
+
+        commands = SchedulerCommandManager()
+        processed = 0
+        for doc in commands.get_pending():
+            try:
+                result = self.execute(doc['action'], doc.get('scraper_type'))
+                status = 'done'
+            except Exception as e:
+                result = {'success': False, 'error': str(e)}
+                status = 'failed'
+            commands.complete(doc['command_id'], status, result)
+            processed += 1
+        return processed
+
+    # ---- 调度器状态 ----
+
+    def publish_scheduler_state(self):
+        """任务列表或爬虫状态变化时写入 cluster_state，供其他进程查询爬虫状态"""
+        from .scrapers.scheduler import describe_jobs
+        from .scrapers.status import scraper_states
+
+        jobs = describe_jobs()
+        if jobs != self._published_jobs:
+            self.manager.set('scheduler', owner=self.process_id, host=socket.gethostname(),
+                             parent_pid=os.getppid(), jobs=jobs)
+            self._published_jobs = jobs
+        if scraper_states.version != self._published_status_version:
+            status = scraper_states.snapshot()
+            self.manager.set('scraper_status', **status)
+            self._published_status_version = status['version']
+
+    def scheduler_jobs(self) -> List[Dict[str, Any]]:
+        """调度进程发布的任务列表"""
+        state = self.manager.get('scheduler')
+        return state.get('jobs', []) if state else []
+
+    def scraper_statuses(self) -> Dict[str, Any]:
+        """爬虫状态 {version, scrapers}：本进程持有调度器时直接读取，否则读取调度进程发布的状态"""
+        from .scrapers.status import scraper_states
+
+        if not self.enabled or self.is_scheduler_owner:
+            return scraper_states.snapshot()
+        doc = self.manager.get('scraper_status')
+        if not doc:
+            return scraper_states.snapshot()
+        return {'version': doc.get('version', 0), 'scrapers': doc.get('scrapers', {})}
+
+    def status(self) -> Dict[str, Any]:
+        """健康检查中展示的集群信息"""
+        return {
+            'enabled': self.enabled,
+            'process': self.process_id,
+            'scheduler_owner': self.is_scheduler_owner,
+            'epoch': generations.epoch,
+            'generations': generations.snapshot(),
+            'last_sync': self.last_sync.isoformat() if self.last_sync else None,
+        }
+
+
+cluster = ClusterCoordinator()
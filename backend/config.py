@@ -20,6 +20,21 @@ class Config:
     # MongoDB 配置
     MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/crypto_db')
     
+    # 存储后端配置: mongo（默认）或 sqlite（单节点/边缘部署/基准测试）
+    STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'mongo')
+    SQLITE_PATH = os.getenv('SQLITE_PATH', 'data/scrapecoins.db')
+    # 启动时创建索引的方式: background（后台线程，不阻塞启动）/ sync / off
+    INDEX_BUILD_MODE = os.getenv('INDEX_BUILD_MODE', 'background')
+    
+    # 多进程部署（gunicorn 多 worker，见 gunicorn.conf.py）
+    CLUSTER_MODE = os.getenv('CLUSTER_MODE', 'false').lower() == 'true'
+    # Socket.IO 跨进程消息队列，如 redis://localhost:6379/0（单进程时留空）
+    SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE', '')
+    # 调度器归属: auto（文件锁选出一个进程）/ true（本进程必定运行）/ false（不运行）
+    RUN_SCHEDULER = os.getenv('RUN_SCHEDULER', 'auto').lower()
+    SCHEDULER_LOCK_FILE = os.getenv('SCHEDULER_LOCK_FILE', 'data/scheduler.lock')
+    GENERATION_SYNC_INTERVAL = float(os.getenv('GENERATION_SYNC_INTERVAL', 1.0))  # 集群状态同步间隔（秒）
+    
     # API 配置
     API_HOST = os.getenv('API_HOST', '0.0.0.0')
     API_PORT = int(os.getenv('API_PORT', 5000))
@@ -44,6 +59,51 @@ class Config:
     MAX_RETRIES = int(os.getenv('MAX_RETRIES', 3))
     REQUEST_TIMEOUT = int(os.getenv('REQUEST_TIMEOUT', 30))
     
+    # Parquet 导出配置
+    EXPORT_DIR = os.getenv('EXPORT_DIR', 'data/exports')
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 5000))
+    EXPORT_INTERVAL = int(os.getenv('EXPORT_INTERVAL', 3600))  # 定时增量导出间隔（秒）
+    ENABLE_SCHEDULED_EXPORT = os.getenv('ENABLE_SCHEDULED_EXPORT', 'false').lower() == 'true'
+    
+    # 投资者文档结构迁移配置
+    ENABLE_SCHEMA_MIGRATION = os.getenv('ENABLE_SCHEMA_MIGRATION', 'true').lower() == 'true'
+    MIGRATION_INTERVAL = int(os.getenv('MIGRATION_INTERVAL', 300))  # 后台迁移间隔（秒）
+    MIGRATION_BATCH_SIZE = int(os.getenv('MIGRATION_BATCH_SIZE', 200))
+    MIGRATION_BATCHES_PER_RUN = int(os.getenv('MIGRATION_BATCHES_PER_RUN', 10))
+    MIGRATION_BATCH_PAUSE = float(os.getenv('MIGRATION_BATCH_PAUSE', 1.0))  # 批次间暂停（秒）
+    
+    # 行情快照历史保留天数（技术指标预热、相关性分析使用）
+    MARKET_HISTORY_DAYS = int(os.getenv('MARKET_HISTORY_DAYS', 7))
+    
+    # API 响应缓存：0 表示客户端每次用 ETag 重新验证（未变化时返回 304）
+    API_CACHE_MAX_AGE = int(os.getenv('API_CACHE_MAX_AGE', 0))
+    
+    # Socket.IO 行情增量推送：前 N 名档位（逗号分隔）、未指定时的默认档位（与前端表格一致）、
+    # 每个连接最多订阅的 symbol 数和告警规则数
+    REALTIME_TOP_BUCKETS = os.getenv('REALTIME_TOP_BUCKETS', '10,50,100,250')
+    REALTIME_TOP_N = int(os.getenv('REALTIME_TOP_N', 100))
+    REALTIME_MAX_SYMBOLS = int(os.getenv('REALTIME_MAX_SYMBOLS', 200))
+    REALTIME_MAX_ALERT_RULES = int(os.getenv('REALTIME_MAX_ALERT_RULES', 100))
+    
+    # 爬虫日志推送：发送间隔（秒，每个间隔最多一帧）、每帧最多条数、每个爬虫的回放缓冲条数、默认最低级别
+    LOG_FLUSH_INTERVAL = float(os.getenv('LOG_FLUSH_INTERVAL', 0.5))
+    LOG_MAX_PER_FRAME = int(os.getenv('LOG_MAX_PER_FRAME', 200))
+    LOG_BUFFER_SIZE = int(os.getenv('LOG_BUFFER_SIZE', 500))
+    LOG_DEFAULT_LEVEL = os.getenv('LOG_DEFAULT_LEVEL', 'info')
+    
+    # JSON 序列化（auto / orjson / std）与响应压缩
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'auto')
+    ENABLE_COMPRESSION = os.getenv('ENABLE_COMPRESSION', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))  # 小于该字节数的响应不压缩
+    COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 5))
+    COMPRESS_CACHE_BYTES = int(os.getenv('COMPRESS_CACHE_BYTES', 32 * 1024 * 1024))  # 压缩结果缓存上限
+    
+    # 服务端响应缓存（按数据集代际失效）：总字节上限、并发相同请求等待第一个请求的最长秒数
+    ENABLE_RESPONSE_CACHE = os.getenv('ENABLE_RESPONSE_CACHE', 'true').lower() == 'true'
+    RESPONSE_CACHE_BYTES = int(os.getenv('RESPONSE_CACHE_BYTES', 64 * 1024 * 1024))
+    RESPONSE_CACHE_WAIT = float(os.getenv('RESPONSE_CACHE_WAIT', 30))
+    
     # 全量爬取配置
     CRYPTO_PER_PAGE = int(os.getenv('CRYPTO_PER_PAGE', 250))  # 每页最大数量
     MAX_PAGES = int(os.getenv('MAX_PAGES', 20))  # 最大页数，可获取5000个币种
@@ -4,6 +4,7 @@
 数据库包
 """
 
-from .db import get_db, create_indexes
+from .db import get_db, get_backend, create_indexes
+from .backends import StorageBackend, MongoBackend, SQLiteBackend
 
-__all__ = ['get_db', 'create_indexes']
\ No newline at end of file
+__all__ = ['get_db', 'get_backend', 'create_indexes', 'StorageBackend', 'MongoBackend', 'SQLiteBackend']
\ No newline at end of file
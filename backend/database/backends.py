@@ -0,0 +1,648 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+存储后端抽象
+
+数据管理器（CryptoDataManager / InvestorDataManager / InvestorPortfolioManager /
+TokenUnlockManager）
+只通过 StorageBackend 接口读写数据，具体实现可以是：
+
+- MongoBackend: 生产环境默认使用的 MongoDB
+- SQLiteBackend: 嵌入式 SQLite（WAL 模式），适合单节点、边缘设备和基准测试
+
+查询条件使用 MongoDB 风格的一个子集：
+    {'field': value}                          等值
+    {'field': {'$gt' / '$gte' / '$lt' / '$lte' / '$ne': value}}
+    {'field': {'$in': [v1, v2]}}
+    {'field': {'$exists': True / False}}
+排序使用 [(field, ASCENDING / DESCENDING)] 列表。
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+ASCENDING = 1
+DESCENDING = -1
+
+# 各集合的索引定义（两个后端共用）；{'keys': [...], 'unique': True} 表示唯一索引
+INDEX_SPECS = {
+    'crypto_data': [
+        [('symbol', ASCENDING), ('timestamp', DESCENDING)],
+        [('symbol', ASCENDING)],
+        [('timestamp', ASCENDING)],
+        [('source', ASCENDING)],
+        [('rank', ASCENDING)],
+        [('id', ASCENDING)],
+    ],
+    'investor_data': [
+        [('name', ASCENDING), ('timestamp', DESCENDING)],
+        [('name', ASCENDING)],
+        [('type', ASCENDING)],
+        [('tier', ASCENDING)],
+        [('timestamp', ASCENDING)],
+        [('source', ASCENDING)],
+        [('rank', ASCENDING)],
+        [('investor_id', ASCENDING)],
+        [('schema_version', ASCENDING)],
+    ],
+    'market_snapshots': [
+        [('timestamp', ASCENDING)],
+    ],
+    'alert_rules': [
+        [('rule_id', ASCENDING)],
+        [('created_at', ASCENDING)],
+    ],
+    'cluster_state': [
+        [('key', ASCENDING)],
+    ],
+    'scheduler_commands': [
+        [('command_id', ASCENDING)],
+        [('status', ASCENDING), ('created_at', ASCENDING)],
+    ],
+    'investor_portfolio': [
+        {'keys': [('investor_id', ASCENDING), ('kind', ASCENDING), ('project', ASCENDING)], 'unique': True},
+        [('project', ASCENDING), ('investor_id', ASCENDING)],
+    ],
+    'token_unlocks': [
+        [('token_name', ASCENDING), ('timestamp', DESCENDING)],
+        [('source', ASCENDING), ('token_name', ASCENDING)],
+        [('unlock_time', ASCENDING)],
+        [('source', ASCENDING)],
+        [('unlock_at', ASCENDING), ('unlock_usd_value', DESCENDING)],
+        [('unlock_usd_value', DESCENDING)],
+    ],
+}
+
+# 需要按 datetime 还原的字段（SQLite 中以定宽 ISO 字符串存储）
+DATETIME_FIELDS = ('timestamp', 'scraped_at', 'last_round_date', 'unlock_at')
+
+_DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+_FIELD_RE = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+Filters = Optional[Dict[str, Any]]
+Sort = Optional[Sequence[Tuple[str, int]]]
+UpsertKey = Union[Sequence[str], Callable[[Dict[str, Any]], Dict[str, Any]]]
+
+
+def _index_spec(spec) -> Tuple[List[Tuple[str, int]], bool]:
+    """INDEX_SPECS 中的一项 -> (键列表, 是否唯一)"""
+    if isinstance(spec, dict):
+        return list(spec['keys']), bool(spec.get('unique'))
+    return list(spec), False
+
+
+def _key_filter(key: UpsertKey) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """把 upsert 键（字段列表或函数）统一成 doc -> filter 的函数"""
+    if callable(key):
+        return key
+    fields = tuple(key)
+    return lambda doc: {f: doc.get(f) for f in fields}
+
+
+def _safe_key(key_fn: Callable[[Dict[str, Any]], Dict[str, Any]], doc: Dict[str, Any]) -> Any:
+    try:
+        return key_fn(doc)
+    except Exception:
+        return doc.get('_id')
+
+
+def _log_failed_writes(collection: str, failed: List[Tuple[Any, Optional[str]]]):
+    """记录批量写入中失败的文档（按 upsert 键标识）"""
+    if not failed:
+        return
+    print(f"⚠️  {collection} 批量写入 {len(failed)} 条文档失败，其余文档已保存")
+    for key, error in failed[:20]:
+        print(f"   - {key}: {error}")
+    if len(failed) > 20:
+        print(f"   ... 另有 {len(failed) - 20} 条")
+
+
+class StorageBackend(ABC):
+    """存储后端抽象类"""
+
+    name = 'base'
+
+    @abstractmethod
+    def create_indexes(self):
+        """按 INDEX_SPECS 创建索引"""
+        pass
+
+    @abstractmethod
+    def ping(self) -> bool:
+        """测试连接是否可用"""
+        pass
+
+    @abstractmethod
+    def insert_many(self, collection: str, docs: List[Dict[str, Any]]) -> int:
+        """批量插入，返回插入条数"""
+        pass
+
+    @abstractmethod
+    def upsert_many(self, collection: str, docs: List[Dict[str, Any]], key: UpsertKey) -> Dict[str, int]:
+        """按 key 批量 upsert（$set 语义），返回 inserted/modified/matched/failed 计数
+
+        单条文档写入失败不影响同批其他文档，失败的文档记录日志并计入 failed
+        """
+        pass
+
+    @abstractmethod
+    def replace_many(self, collection: str, docs: List[Dict[str, Any]], key: UpsertKey) -> Dict[str, int]:
+        """按 key 批量整文档替换（不存在则插入），未出现在新文档中的字段会被移除；失败处理同 upsert_many"""
+        pass
+
+    @abstractmethod
+    def find(self, collection: str, filters: Filters = None, sort: Sort = None,
+             limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """查询文档列表"""
+        pass
+
+    def find_one(self, collection: str, filters: Filters = None, sort: Sort = None) -> Optional[Dict[str, Any]]:
+        """查询单个文档"""
+        docs = self.find(collection, filters, sort=sort, limit=1)
+        return docs[0] if docs else None
+
+    @abstractmethod
+    def iter_find(self, collection: str, filters: Filters = None, sort: Sort = None,
+                  batch_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+        """按批次流式读取文档（每批最多 batch_size 条），内存占用与集合大小无关"""
+        pass
+
+    @abstractmethod
+    def distinct(self, collection: str, field: str, filters: Filters = None) -> List[Any]:
+        """字段去重取值"""
+        pass
+
+    @abstractmethod
+    def count(self, collection: str, filters: Filters = None) -> int:
+        """统计文档数"""
+        pass
+
+    @abstractmethod
+    def count_by(self, collection: str, field: str) -> List[Dict[str, Any]]:
+        """按字段分组计数，返回 [{'_id': value, 'count': n}]，按 count 降序"""
+        pass
+
+    @abstractmethod
+    def delete_many(self, collection: str, filters: Filters = None) -> int:
+        """删除文档，返回删除条数"""
+        pass
+
+    @abstractmethod
+    def drop(self, collection: str):
+        """删除整个集合"""
+        pass
+
+    def close(self):
+        """释放连接"""
+        pass
+
+
+class MongoBackend(StorageBackend):
+    """MongoDB 存储后端"""
+
+    name = 'MongoDB'
+
+    def __init__(self, db=None, db_getter=None):
+        # 传入 pymongo Database，或返回 Database 的函数（配合 Flask-PyMongo 延迟初始化）
+        self._db = db
+        self._db_getter = db_getter
+
+    @property
+    def db(self):
+        return self._db if self._db is not None else self._db_getter()
+
+    def collection(self, name: str):
+        """返回原始 pymongo 集合"""
+        return self.db[name]
+
+    def create_indexes(self):
+        from pymongo import IndexModel
+        from pymongo.errors import OperationFailure
+
+        # 每个集合一次 createIndexes 命令，已存在的索引由服务端跳过
+        for name, specs in INDEX_SPECS.items():
+            collection = self.collection(name)
+            models = []
+            for spec in specs:
+                keys, unique = _index_spec(spec)
+                if unique:
+                    # 同样键的普通索引会与唯一索引冲突，先删除旧索引
+                    for index_name, info in collection.index_information().items():
+                        if [tuple(k) for k in info['key']] == keys and not info.get('unique'):
+                            collection.drop_index(index_name)
+                models.append(IndexModel(keys, unique=True) if unique else IndexModel(keys))
+            try:
+                collection.create_indexes(models)
+            except OperationFailure as e:
+                # 已有重复数据时唯一索引无法创建，改建普通索引
+                print(f"⚠️  {name} 创建唯一索引失败: {e}")
+                collection.create_indexes([IndexModel(_index_spec(spec)[0]) for spec in specs])
+
+    def ping(self) -> bool:
+        self.db.command('ping')
+        return True
+
+    def insert_many(self, collection, docs):
+        if not docs:
+            return 0
+        result = self.collection(collection).insert_many(docs)
+        return len(result.inserted_ids)
+
+    def upsert_many(self, collection, docs, key):
+        from pymongo import UpdateOne
+
+        counts = {'inserted': 0, 'modified': 0, 'matched': 0, 'failed': 0}
+        if not docs:
+            return counts
+        key_fn = _key_filter(key)
+        ops = [UpdateOne(key_fn(doc), {'$set': doc}, upsert=True) for doc in docs]
+        return self._bulk_write(collection, ops, docs, key_fn)
+
+    def replace_many(self, collection, docs, key):
+        from pymongo import ReplaceOne
+
+        counts = {'inserted': 0, 'modified': 0, 'matched': 0, 'failed': 0}
+        if not docs:
+            return counts
+        key_fn = _key_filter(key)
+        ops = [
+            ReplaceOne(key_fn(doc), {k: v for k, v in doc.items() if k != '_id'}, upsert=True)
+            for doc in docs
+        ]
+        return self._bulk_write(collection, ops, docs, key_fn)
+
+    def _bulk_write(self, collection, ops, docs, key_fn) -> Dict[str, int]:
+        """无序批量写入：单条文档失败不影响其余文档，失败的文档记录日志并计入 failed"""
+        from pymongo.errors import BulkWriteError
+
+        try:
+            result = self.collection(collection).bulk_write(ops, ordered=False)
+        except BulkWriteError as e:
+            details = e.details
+            errors = details.get('writeErrors', [])
+            _log_failed_writes(collection, [(key_fn(docs[error['index']]), error.get('errmsg')) for error in errors])
+            return {'inserted': details.get('nUpserted', 0), 'modified': details.get('nModified', 0),
+                    'matched': details.get('nMatched', 0), 'failed': len(errors)}
+        return {'inserted': result.upserted_count, 'modified': result.modified_count,
+                'matched': result.matched_count, 'failed': 0}
+
+    def find(self, collection, filters=None, sort=None, limit=None):
+        cursor = self.collection(collection).find(filters or {})
+        if sort:
+            cursor = cursor.sort(list(sort))
+        if limit:
+            cursor = cursor.limit(limit)
+        return list(cursor)
+
+    def find_one(self, collection, filters=None, sort=None):
+        return self.collection(collection).find_one(filters or {}, sort=list(sort) if sort else None)
+
+    def iter_find(self, collection, filters=None, sort=None, batch_size=1000):
+        cursor = self.collection(collection).find(filters or {}, batch_size=batch_size)
+        if sort:
+            cursor = cursor.sort(list(sort))
+        try:
+            batch = []
+            for doc in cursor:
+                batch.append(doc)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+        finally:
+            cursor.close()
+
+    def distinct(self, collection, field, filters=None):
+        return self.collection(collection).distinct(field, filters or {})
+
+    def count(self, collection, filters=None):
+        return self.collection(collection).count_documents(filters or {})
+
+    def count_by(self, collection, field):
+        return list(self.collection(collection).aggregate([
+            {'$group': {'_id': f'${field}', 'count': {'$sum': 1}}},
+            {'$sort': {'count': -1}}
+        ]))
+
+    def delete_many(self, collection, filters=None):
+        return self.collection(collection).delete_many(filters or {}).deleted_count
+
+    def drop(self, collection):
+        self.collection(collection).drop()
+
+
+class SQLiteBackend(StorageBackend):
+    """嵌入式 SQLite 存储后端（WAL 模式）
+
+    每个集合对应一张 (id INTEGER PRIMARY KEY, doc TEXT) 表，文档以 JSON 存储，
+    INDEX_SPECS 中的索引建为 json_extract 表达式索引。每个线程使用独立连接，
+    写操作在 BEGIN IMMEDIATE 事务中执行。
+    """
+
+    name = 'SQLite'
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._tables = set()
+        self._tables_lock = threading.Lock()
+
+    # ---- 连接与编码 ----
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _table(self, collection: str) -> str:
+        if not _FIELD_RE.match(collection):
+            raise ValueError(f'非法集合名: {collection}')
+        if collection not in self._tables:
+            with self._tables_lock:
+                self._conn().execute(
+                    f'CREATE TABLE IF NOT EXISTS "{collection}" (id INTEGER PRIMARY KEY, doc TEXT NOT NULL)'
+                )
+                self._tables.add(collection)
+        return f'"{collection}"'
+
+    @staticmethod
+    def _expr(field: str) -> str:
+        if field == '_id':
+            return 'id'
+        if not _FIELD_RE.match(field):
+            raise ValueError(f'非法字段名: {field}')
+        return f"json_extract(doc, '$.{field}')"
+
+    @staticmethod
+    def _encode_value(value):
+        if isinstance(value, datetime):
+            if value.tzinfo is not None:
+                value = value.astimezone(timezone.utc).replace(tzinfo=None)
+            return value.strftime(_DATETIME_FORMAT)
+        if isinstance(value, bool):
+            return int(value)
+        return value
+
+    @classmethod
+    def _json_default(cls, value):
+        if isinstance(value, datetime):
+            return cls._encode_value(value)
+        return str(value)
+
+    @classmethod
+    def _dumps(cls, doc: Dict[str, Any]) -> str:
+        return json.dumps({k: v for k, v in doc.items() if k != '_id'},
+                          default=cls._json_default, ensure_ascii=False)
+
+    @staticmethod
+    def _loads(row_id: int, text: str) -> Dict[str, Any]:
+        doc = json.loads(text)
+        for field in DATETIME_FIELDS:
+            value = doc.get(field)
+            if isinstance(value, str):
+                try:
+                    doc[field] = datetime.strptime(value, _DATETIME_FORMAT)
+                except ValueError:
+                    pass
+        doc['_id'] = row_id
+        return doc
+
+    def _where(self, filters: Filters) -> Tuple[str, List[Any]]:
+        if not filters:
+            return '', []
+        clauses, params = [], []
+        for field, cond in filters.items():
+            expr = self._expr(field)
+            if isinstance(cond, dict):
+                for op, value in cond.items():
+                    if op in ('$gt', '$gte', '$lt', '$lte'):
+                        sql_op = {'$gt': '>', '$gte': '>=', '$lt': '<', '$lte': '<='}[op]
+                        clauses.append(f'{expr} {sql_op} ?')
+                        params.append(self._encode_value(value))
+                    elif op == '$ne':
+                        if value is None:
+                            clauses.append(f'{expr} IS NOT NULL')
+                        else:
+                            clauses.append(f'({expr} IS NULL OR {expr} != ?)')
+                            params.append(self._encode_value(value))
+                    elif op == '$in':
+                        values = list(value)
+                        if not values:
+                            clauses.append('0')
+                            continue
+                        clauses.append(f'{expr} IN ({",".join("?" * len(values))})')
+                        params.extend(self._encode_value(v) for v in values)
+                    elif op == '$exists':
+                        clauses.append(f'{expr} IS {"NOT " if value else ""}NULL')
+                    else:
+                        raise ValueError(f'不支持的查询操作符: {op}')
+            elif cond is None:
+                clauses.append(f'{expr} IS NULL')
+            else:
+                clauses.append(f'{expr} = ?')
+                params.append(self._encode_value(cond))
+        return ' WHERE ' + ' AND '.join(clauses), params
+
+    def _order(self, sort: Sort) -> str:
+        if not sort:
+            return ''
+        parts = []
+        for field, direction in sort:
+            parts.append(f'{self._expr(field)} {"DESC" if direction == DESCENDING else "ASC"}')
+        return ' ORDER BY ' + ', '.join(parts)
+
+    # ---- StorageBackend 接口 ----
+
+    def create_indexes(self):
+        conn = self._conn()
+        for name, specs in INDEX_SPECS.items():
+            table = self._table(name)
+            for spec in specs:
+                keys, unique = _index_spec(spec)
+                suffix = f'{name}_' + '_'.join(f'{f}_{d}'.replace('-', 'm') for f, d in keys)
+                columns = ', '.join(
+                    f'{self._expr(f)}{" DESC" if d == DESCENDING else ""}' for f, d in keys
+                )
+                if not unique:
+                    conn.execute(f'CREATE INDEX IF NOT EXISTS "ix_{suffix}" ON {table} ({columns})')
+                    continue
+                try:
+                    conn.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS "ux_{suffix}" ON {table} ({columns})')
+                except sqlite3.IntegrityError as e:
+                    # 已有重复数据时保留普通索引
+                    print(f"⚠️  {name} 创建唯一索引失败: {e}")
+                    conn.execute(f'CREATE INDEX IF NOT EXISTS "ix_{suffix}" ON {table} ({columns})')
+                else:
+                    conn.execute(f'DROP INDEX IF EXISTS "ix_{suffix}"')
+
+    def ping(self) -> bool:
+        self._conn().execute('SELECT 1')
+        return True
+
+    def insert_many(self, collection, docs):
+        if not docs:
+            return 0
+        table = self._table(collection)
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(f'INSERT INTO {table} (doc) VALUES (?)', [(self._dumps(d),) for d in docs])
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return len(docs)
+
+    def upsert_many(self, collection, docs, key):
+        counts = {'inserted': 0, 'modified': 0, 'matched': 0, 'failed': 0}
+        if not docs:
+            return counts
+        table = self._table(collection)
+        key_fn = _key_filter(key)
+        conn = self._conn()
+        failed = []
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for doc in docs:
+                try:
+                    text = self._dumps(doc)
+                    where, params = self._where(key_fn(doc))
+                    row = conn.execute(f'SELECT id, doc FROM {table}{where} LIMIT 1', params).fetchone()
+                    if row is None:
+                        conn.execute(f'INSERT INTO {table} (doc) VALUES (?)', (text,))
+                        counts['inserted'] += 1
+                        continue
+                    counts['matched'] += 1
+                    merged = json.loads(row[1])
+                    merged.update(json.loads(text))
+                    merged_text = json.dumps(merged, ensure_ascii=False)
+                    if merged_text != row[1]:
+                        conn.execute(f'UPDATE {table} SET doc = ? WHERE id = ?', (merged_text, row[0]))
+                        counts['modified'] += 1
+                except (TypeError, ValueError, sqlite3.Error) as e:
+                    failed.append((_safe_key(key_fn, doc), str(e)))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        counts['failed'] = len(failed)
+        _log_failed_writes(collection, failed)
+        return counts
+
+    def replace_many(self, collection, docs, key):
+        counts = {'inserted': 0, 'modified': 0, 'matched': 0, 'failed': 0}
+        if not docs:
+            return counts
+        table = self._table(collection)
+        key_fn = _key_filter(key)
+        conn = self._conn()
+        failed = []
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for doc in docs:
+                try:
+                    text = self._dumps(doc)
+                    where, params = self._where(key_fn(doc))
+                    row = conn.execute(f'SELECT id, doc FROM {table}{where} LIMIT 1', params).fetchone()
+                    if row is None:
+                        conn.execute(f'INSERT INTO {table} (doc) VALUES (?)', (text,))
+                        counts['inserted'] += 1
+                        continue
+                    counts['matched'] += 1
+                    if text != row[1]:
+                        conn.execute(f'UPDATE {table} SET doc = ? WHERE id = ?', (text, row[0]))
+                        counts['modified'] += 1
+                except (TypeError, ValueError, sqlite3.Error) as e:
+                    failed.append((_safe_key(key_fn, doc), str(e)))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        counts['failed'] = len(failed)
+        _log_failed_writes(collection, failed)
+        return counts
+
+    def find(self, collection, filters=None, sort=None, limit=None):
+        table = self._table(collection)
+        where, params = self._where(filters)
+        sql = f'SELECT id, doc FROM {table}{where}{self._order(sort)}'
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(int(limit))
+        return [self._loads(row_id, text) for row_id, text in self._conn().execute(sql, params)]
+
+    def iter_find(self, collection, filters=None, sort=None, batch_size=1000):
+        table = self._table(collection)
+        where, params = self._where(filters)
+        # 使用独立连接，避免生成器挂起期间占用线程共享连接
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        try:
+            cursor = conn.execute(f'SELECT id, doc FROM {table}{where}{self._order(sort)}', params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield [self._loads(row_id, text) for row_id, text in rows]
+        finally:
+            conn.close()
+
+    def distinct(self, collection, field, filters=None):
+        table = self._table(collection)
+        where, params = self._where(filters)
+        expr = self._expr(field)
+        extra = f' AND {expr} IS NOT NULL' if where else f' WHERE {expr} IS NOT NULL'
+        rows = self._conn().execute(f'SELECT DISTINCT {expr} FROM {table}{where}{extra}', params)
+        return [row[0] for row in rows]
+
+    def count(self, collection, filters=None):
+        table = self._table(collection)
+        where, params = self._where(filters)
+        return self._conn().execute(f'SELECT COUNT(*) FROM {table}{where}', params).fetchone()[0]
+
+    def count_by(self, collection, field):
+        table = self._table(collection)
+        expr = self._expr(field)
+        rows = self._conn().execute(
+            f'SELECT {expr} AS value, COUNT(*) AS n FROM {table} GROUP BY value ORDER BY n DESC'
+        )
+        return [{'_id': value, 'count': n} for value, n in rows]
+
+    def delete_many(self, collection, filters=None):
+        table = self._table(collection)
+        where, params = self._where(filters)
+        return self._conn().execute(f'DELETE FROM {table}{where}', params).rowcount
+
+    def drop(self, collection):
+        table = self._table(collection)
+        self._conn().execute(f'DROP TABLE IF EXISTS {table}')
+        with self._tables_lock:
+            self._tables.discard(collection)
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def create_backend(backend_type: str, **options) -> StorageBackend:
+    """根据类型创建存储后端"""
+    backend_type = (backend_type or 'mongo').lower()
+    if backend_type in ('mongo', 'mongodb'):
+        return MongoBackend(db=options.get('db'), db_getter=options.get('db_getter'))
+    if backend_type == 'sqlite':
+        return SQLiteBackend(options.get('path', 'data/scrapecoins.db'))
+    raise ValueError(f'未知的存储后端: {backend_type}')
@@ -1,220 +1,472 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-MongoDB 数据库连接和操作
+数据库连接和操作
+
+数据管理器通过 StorageBackend 访问数据，后端由配置项 STORAGE_BACKEND 决定
+（mongo / sqlite），默认使用 MongoDB。
 """
 
-from flask import current_app
-from pymongo import ASCENDING, DESCENDING
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app, has_app_context
+from .backends import ASCENDING, DESCENDING, create_backend
+from ..models.investor import SCHEMA_VERSION, upgrade_investor_doc
+from ..utils.generation import ALERT_RULES_GENERATION, INVESTOR_GENERATION, MARKET_GENERATION, bump_generation
+
+_backend = None
+_backend_lock = threading.Lock()
+
 
 def get_db():
-    """获取数据库连接"""
+    """获取 MongoDB 数据库连接"""
     from ..app import mongo
     return mongo.db
 
+
+def _backend_config():
+    """读取存储后端配置（优先使用应用配置）"""
+    if has_app_context():
+        return current_app.config
+    from ..config import Config
+    return {k: getattr(Config, k) for k in dir(Config) if k.isupper()}
+
+
+def get_backend():
+    """获取进程内共享的存储后端实例"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                cfg = _backend_config()
+                _backend = create_backend(
+                    cfg.get('STORAGE_BACKEND', 'mongo'),
+                    db_getter=get_db,
+                    path=cfg.get('SQLITE_PATH', 'data/scrapecoins.db'),
+                )
+    return _backend
+
+
+def set_backend(backend):
+    """替换存储后端（用于脚本和基准测试）"""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+_index_status = {'state': 'pending', 'duration_ms': None, 'error': None}
+
+
 def create_indexes():
     """创建数据库索引"""
-    db = get_db()
-    
-    # 为crypto_data集合创建索引
-    crypto_collection = db.crypto_data
-    
-    # 创建复合索引
-    crypto_collection.create_index([
-        ('symbol', ASCENDING),
-        ('timestamp', DESCENDING)
-    ])
-    
-    # 创建单字段索引
-    crypto_collection.create_index('symbol')
-    crypto_collection.create_index('timestamp')
-    crypto_collection.create_index('source')
-    crypto_collection.create_index('rank')
-    
-    # 为investor_data集合创建索引
-    investor_collection = db.investor_data
-    
-    # 创建投资者数据索引
-    investor_collection.create_index([
-        ('name', ASCENDING),
-        ('timestamp', DESCENDING)
-    ])
-    
-    investor_collection.create_index('name')
-    investor_collection.create_index('type')
-    investor_collection.create_index('tier')
-    investor_collection.create_index('timestamp')
-    investor_collection.create_index('source')
-    investor_collection.create_index('rank')
-    
-    print("MongoDB索引创建完成")
-
-class CryptoDataManager:
+    _index_status.update(state='building', error=None)
+    start = time.perf_counter()
+    try:
+        backend = get_backend()
+        backend.create_indexes()
+    except Exception as e:
+        _index_status.update(state='failed', error=str(e))
+        raise
+    duration_ms = (time.perf_counter() - start) * 1000
+    _index_status.update(state='ready', duration_ms=round(duration_ms, 1))
+    print(f"{backend.name}索引创建完成 ({duration_ms:.0f}ms)")
+
+
+def create_indexes_in_background(app):
+    """在后台线程中创建索引，不阻塞应用启动（索引就绪前查询照常执行，只是可能较慢）"""
+
+    def run():
+        with app.app_context():
+            try:
+                create_indexes()
+            except Exception as e:
+                print(f"⚠️  后台创建索引失败: {e}")
+
+    thread = threading.Thread(target=run, name='create-indexes', daemon=True)
+    thread.start()
+    return thread
+
+
+def get_index_status():
+    """索引创建状态: pending / building / ready / failed"""
+    return dict(_index_status)
+
+
+class _BaseDataManager:
+    """数据管理器基类：延迟解析存储后端"""
+
+    collection_name = None
+
+    def __init__(self, backend=None):
+        self._backend = backend
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = get_backend()
+        return self._backend
+
+    def count(self, filters=None):
+        """统计记录数"""
+        return self.backend.count(self.collection_name, filters)
+
+
+class CryptoDataManager(_BaseDataManager):
     """加密货币数据管理器"""
-    
-    def __init__(self):
-        self.collection = get_db().crypto_data
-    
+
+    collection_name = 'crypto_data'
+
     def insert_crypto_data(self, data):
         """插入加密货币数据"""
-        if isinstance(data, list):
-            return self.collection.insert_many(data)
-        else:
-            return self.collection.insert_one(data)
-    
+        docs = data if isinstance(data, list) else [data]
+        return self.backend.insert_many(self.collection_name, docs)
+
+    def upsert_crypto_data(self, docs):
+        """按 CoinGecko id 批量 upsert，返回 inserted/modified/matched 计数"""
+        return self.backend.upsert_many(self.collection_name, docs, key=('id',))
+
     def get_latest_data(self, symbol=None, limit=100):
         """获取最新数据"""
         query = {}
         if symbol:
             query['symbol'] = symbol.upper()
-        
-        cursor = self.collection.find(query).sort('timestamp', DESCENDING).limit(limit)
-        return list(cursor)
-    
+
+        return self.backend.find(self.collection_name, query, sort=[('timestamp', DESCENDING)], limit=limit)
+
+    def get_top_by_rank(self, limit=100):
+        """按市值排名获取最新数据"""
+        return self.backend.find(
+            self.collection_name,
+            {'rank': {'$ne': None}},
+            sort=[('rank', ASCENDING)],
+            limit=limit
+        )
+
     def get_crypto_by_symbol(self, symbol):
         """根据符号获取最新的加密货币数据"""
-        return self.collection.find_one(
+        return self.backend.find_one(
+            self.collection_name,
             {'symbol': symbol.upper()},
             sort=[('timestamp', DESCENDING)]
         )
-    
+
+    def get_cryptos_by_symbols(self, symbols):
+        """按符号批量获取最新数据（一次 $in 查询），返回 {symbol: doc}，未找到的符号不在结果中"""
+        symbols = list({symbol.upper() for symbol in symbols})
+        if not symbols:
+            return {}
+        docs = self.backend.find(
+            self.collection_name, {'symbol': {'$in': symbols}}, sort=[('timestamp', DESCENDING)]
+        )
+        latest = {}
+        for doc in docs:
+            latest.setdefault(doc['symbol'], doc)
+        return latest
+
     def get_price_history(self, symbol, hours=24):
         """获取价格历史数据"""
-        from datetime import datetime, timedelta
-        
         start_time = datetime.utcnow() - timedelta(hours=hours)
-        
-        return list(self.collection.find({
-            'symbol': symbol.upper(),
-            'timestamp': {'$gte': start_time}
-        }).sort('timestamp', ASCENDING))
-    
+
+        return self.backend.find(
+            self.collection_name,
+            {'symbol': symbol.upper(), 'timestamp': {'$gte': start_time}},
+            sort=[('timestamp', ASCENDING)]
+        )
+
     def get_all_symbols(self):
         """获取所有加密货币符号"""
-        return self.collection.distinct('symbol')
-    
+        return self.backend.distinct(self.collection_name, 'symbol')
+
     def delete_old_data(self, days=30):
         """删除旧数据"""
-        from datetime import datetime, timedelta
-        
         cutoff_date = datetime.utcnow() - timedelta(days=days)
-        result = self.collection.delete_many({
-            'timestamp': {'$lt': cutoff_date}
-        })
-        return result.deleted_count
-    
+        deleted_count = self.backend.delete_many(self.collection_name, {'timestamp': {'$lt': cutoff_date}})
+        if deleted_count:
+            bump_generation(MARKET_GENERATION)
+        return deleted_count
+
     def delete_all_data(self):
         """删除所有加密货币数据"""
-        result = self.collection.delete_many({})
-        print(f"已删除 {result.deleted_count} 条记录")
-        return result.deleted_count
-    
+        deleted_count = self.backend.delete_many(self.collection_name)
+        bump_generation(MARKET_GENERATION)
+        print(f"已删除 {deleted_count} 条记录")
+        return deleted_count
+
     def delete_by_symbol(self, symbol):
         """删除指定符号的所有数据"""
-        result = self.collection.delete_many({'symbol': symbol.upper()})
-        print(f"已删除 {symbol.upper()} 的 {result.deleted_count} 条记录")
-        return result.deleted_count
-    
+        deleted_count = self.backend.delete_many(self.collection_name, {'symbol': symbol.upper()})
+        bump_generation(MARKET_GENERATION)
+        print(f"已删除 {symbol.upper()} 的 {deleted_count} 条记录")
+        return deleted_count
+
     def clear_collection(self):
         """清空整个集合"""
-        result = self.collection.drop()
+        result = self.backend.drop(self.collection_name)
+        bump_generation(MARKET_GENERATION)
         print("crypto_data 集合已清空")
         return result
-    
+
     def test_connection(self):
         """测试数据库连接"""
         try:
-            # 尝试执行一个简单的查询
-            self.collection.find_one()
-            return True
+            return self.backend.ping()
         except Exception as e:
             print(f"数据库连接测试失败: {e}")
             return False
 
-class InvestorDataManager:
+
+class MarketSnapshotManager(_BaseDataManager):
+    """行情快照历史管理器
+
+    每次爬取保存一条列式文档 {timestamp, ids, symbols, price_usd, market_cap, volume_24h,
+    price_change_percentage_24h}，供指标预热和相关性分析读取。
+    """
+
+    collection_name = 'market_snapshots'
+
+    def save_snapshot(self, doc):
+        """保存一轮快照"""
+        return self.backend.insert_many(self.collection_name, [doc])
+
+    def get_recent_snapshots(self, limit=100, since=None, before=None):
+        """按时间升序返回最近的快照（可限定 since <= timestamp < before）"""
+        bounds = {}
+        if since:
+            bounds['$gte'] = since
+        if before:
+            bounds['$lt'] = before
+        filters = {'timestamp': bounds} if bounds else None
+        docs = self.backend.find(self.collection_name, filters, sort=[('timestamp', DESCENDING)], limit=limit)
+        docs.reverse()
+        return docs
+
+    def iter_snapshots(self, since=None, batch_size=16):
+        """按时间升序分批读取快照（每条快照包含全部币种，批次宜小）"""
+        filters = {'timestamp': {'$gte': since}} if since else None
+        return self.backend.iter_find(self.collection_name, filters, sort=[('timestamp', ASCENDING)],
+                                      batch_size=batch_size)
+
+    def delete_old_snapshots(self, days=7):
+        """删除超过保留天数的快照"""
+        cutoff_date = datetime.utcnow() - timedelta(days=days)
+        return self.backend.delete_many(self.collection_name, {'timestamp': {'$lt': cutoff_date}})
+
+
+class ClusterStateManager(_BaseDataManager):
+    """多进程部署的共享状态（epoch、各数据集代际号、调度器任务状态），每个 key 一条文档"""
+
+    collection_name = 'cluster_state'
+
+    def get(self, key):
+        """读取一条状态文档"""
+        return self.backend.find_one(self.collection_name, {'key': key})
+
+    def get_all(self):
+        """读取全部状态，返回 {key: doc}"""
+        return {doc['key']: doc for doc in self.backend.find(self.collection_name)}
+
+    def set(self, key, **fields):
+        """写入（覆盖）一条状态文档的字段"""
+        doc = dict(fields, key=key, updated_at=datetime.utcnow())
+        return self.backend.upsert_many(self.collection_name, [doc], key=('key',))
+
+
+class SchedulerCommandManager(_BaseDataManager):
+    """爬虫控制命令队列：非调度进程写入，持有调度器的进程轮询执行"""
+
+    collection_name = 'scheduler_commands'
+
+    def enqueue(self, doc):
+        """写入一条待执行命令"""
+        return self.backend.insert_many(self.collection_name, [doc])
+
+    def get_pending(self, limit=20):
+        """按创建时间获取待执行命令"""
+        return self.backend.find(
+            self.collection_name, {'status': 'pending'}, sort=[('created_at', ASCENDING)], limit=limit
+        )
+
+    def get_command(self, command_id):
+        """根据 command_id 获取命令"""
+        return self.backend.find_one(self.collection_name, {'command_id': command_id})
+
+    def complete(self, command_id, status, result):
+        """记录命令执行结果"""
+        return self.backend.upsert_many(
+            self.collection_name,
+            [{'command_id': command_id, 'status': status, 'result': result, 'finished_at': datetime.utcnow()}],
+            key=('command_id',)
+        )
+
+    def delete_old_commands(self, hours=24):
+        """删除已执行完的旧命令"""
+        cutoff = datetime.utcnow() - timedelta(hours=hours)
+        return self.backend.delete_many(
+            self.collection_name, {'status': {'$ne': 'pending'}, 'created_at': {'$lt': cutoff}}
+        )
+
+
+class AlertRuleManager(_BaseDataManager):
+    """告警规则管理器"""
+
+    collection_name = 'alert_rules'
+
+    def get_rules(self):
+        """获取全部规则（按创建时间排序）"""
+        return self.backend.find(self.collection_name, sort=[('created_at', ASCENDING)])
+
+    def get_rule(self, rule_id):
+        """根据 rule_id 获取规则"""
+        return self.backend.find_one(self.collection_name, {'rule_id': rule_id})
+
+    def insert_rules(self, docs):
+        """批量插入规则"""
+        inserted = self.backend.insert_many(self.collection_name, docs)
+        bump_generation(ALERT_RULES_GENERATION)
+        return inserted
+
+    def update_rule(self, doc):
+        """按 rule_id 整文档替换规则"""
+        result = self.backend.replace_many(self.collection_name, [doc], key=lambda d: {'rule_id': d['rule_id']})
+        bump_generation(ALERT_RULES_GENERATION)
+        return result
+
+    def delete_rule(self, rule_id):
+        """删除规则，返回删除条数"""
+        deleted_count = self.backend.delete_many(self.collection_name, {'rule_id': rule_id})
+        bump_generation(ALERT_RULES_GENERATION)
+        return deleted_count
+
+
+class InvestorDataManager(_BaseDataManager):
     """投资者数据管理器"""
-    
-    def __init__(self):
-        self.collection = get_db().investor_data
-    
+
+    collection_name = 'investor_data'
+
     def insert_investor_data(self, data):
         """插入投资者数据"""
-        if isinstance(data, list):
-            return self.collection.insert_many(data)
-        else:
-            return self.collection.insert_one(data)
-    
+        docs = data if isinstance(data, list) else [data]
+        inserted = self.backend.insert_many(self.collection_name, docs)
+        bump_generation(INVESTOR_GENERATION)
+        return inserted
+
+    def upsert_investor_data(self, docs):
+        """批量写入投资者数据（有 investor_id 按 id，否则按 name 整文档替换，旧结构的多余字段随之移除）"""
+        result = self.backend.replace_many(
+            self.collection_name,
+            docs,
+            key=lambda doc: {'investor_id': doc['investor_id']} if doc.get('investor_id') else {'name': doc['name']}
+        )
+        if result['inserted'] or result['modified']:
+            bump_generation(INVESTOR_GENERATION)
+        return result
+
     def get_latest_data(self, name=None, limit=100):
         """获取最新投资者数据"""
         query = {}
         if name:
             query['name'] = name
-        
-        cursor = self.collection.find(query).sort('timestamp', DESCENDING).limit(limit)
-        return list(cursor)
-    
+
+        docs = self.backend.find(self.collection_name, query, sort=[('timestamp', DESCENDING)], limit=limit)
+        return [upgrade_investor_doc(doc) for doc in docs]
+
     def get_investor_by_name(self, name):
         """根据名称获取投资者数据"""
-        return self.collection.find_one({'name': name})
-    
+        return upgrade_investor_doc(self.backend.find_one(self.collection_name, {'name': name}))
+
+    def get_investors_by_names(self, names):
+        """按名称批量获取投资者数据"""
+        if not names:
+            return []
+        docs = self.backend.find(self.collection_name, {'name': {'$in': list(names)}})
+        return [upgrade_investor_doc(doc) for doc in docs]
+
+    def iter_investors(self, investor_type=None, batch_size=500):
+        """按时间倒序分批读取投资者数据（已升级为当前结构），供流式导出使用"""
+        filters = {'type': investor_type} if investor_type else None
+        batches = self.backend.iter_find(
+            self.collection_name, filters, sort=[('timestamp', DESCENDING)], batch_size=batch_size
+        )
+        try:
+            for docs in batches:
+                yield [upgrade_investor_doc(doc) for doc in docs]
+        finally:
+            batches.close()
+
     def get_investors_by_type(self, investor_type, limit=100):
         """根据类型获取投资者数据"""
-        cursor = self.collection.find({'type': investor_type}).sort('timestamp', DESCENDING).limit(limit)
-        return list(cursor)
-    
+        docs = self.backend.find(
+            self.collection_name, {'type': investor_type}, sort=[('timestamp', DESCENDING)], limit=limit
+        )
+        return [upgrade_investor_doc(doc) for doc in docs]
+
+    def get_outdated_documents(self, limit=200):
+        """获取结构版本低于当前版本的原始文档（供后台迁移使用）"""
+        return self.backend.find(
+            self.collection_name, {'schema_version': {'$ne': SCHEMA_VERSION}}, limit=limit
+        )
+
+    def count_outdated(self):
+        """统计待迁移的文档数"""
+        return self.backend.count(self.collection_name, {'schema_version': {'$ne': SCHEMA_VERSION}})
+
+    def replace_documents(self, docs):
+        """按 _id 整文档替换（迁移使用）"""
+        result = self.backend.replace_many(self.collection_name, docs, key=lambda doc: {'_id': doc['_id']})
+        if result['inserted'] or result['modified']:
+            bump_generation(INVESTOR_GENERATION)
+        return result
+
     def get_all_names(self):
         """获取所有投资者名称"""
-        return self.collection.distinct('name')
-    
+        return self.backend.distinct(self.collection_name, 'name')
+
     def delete_old_data(self, days=30):
         """删除旧数据"""
-        from datetime import datetime, timedelta
         cutoff_date = datetime.now() - timedelta(days=days)
-        result = self.collection.delete_many({'timestamp': {'$lt': cutoff_date}})
-        return result.deleted_count
-    
+        deleted_count = self.backend.delete_many(self.collection_name, {'timestamp': {'$lt': cutoff_date}})
+        if deleted_count:
+            bump_generation(INVESTOR_GENERATION)
+        return deleted_count
+
     def delete_all_data(self):
         """删除所有数据"""
-        result = self.collection.delete_many({})
-        return result.deleted_count
-    
+        deleted_count = self.backend.delete_many(self.collection_name)
+        bump_generation(INVESTOR_GENERATION)
+        return deleted_count
+
     def delete_by_name(self, name):
         """根据名称删除投资者数据"""
-        result = self.collection.delete_many({'name': name})
-        return result.deleted_count
-    
+        deleted_count = self.backend.delete_many(self.collection_name, {'name': name})
+        bump_generation(INVESTOR_GENERATION)
+        return deleted_count
+
     def clear_collection(self):
         """清空集合"""
-        self.collection.drop()
+        self.backend.drop(self.collection_name)
+        bump_generation(INVESTOR_GENERATION)
         return True
-    
+
     def test_connection(self):
         """测试数据库连接"""
         try:
-            # 尝试执行一个简单的查询
-            self.collection.find_one()
-            return True
+            return self.backend.ping()
         except Exception as e:
             print(f"投资者数据库连接测试失败: {e}")
             return False
-    
+
     def get_statistics(self):
         """获取投资者数据统计信息"""
         try:
-            total_count = self.collection.count_documents({})
-            
+            total_count = self.backend.count(self.collection_name)
+
             # 按类型统计
-            type_stats = list(self.collection.aggregate([
-                {'$group': {'_id': '$type', 'count': {'$sum': 1}}},
-                {'$sort': {'count': -1}}
-            ]))
-            
+            type_stats = self.backend.count_by(self.collection_name, 'type')
+
             # 按层级统计
-            tier_stats = list(self.collection.aggregate([
-                {'$group': {'_id': '$tier', 'count': {'$sum': 1}}},
-                {'$sort': {'count': -1}}
-            ]))
-            
+            tier_stats = self.backend.count_by(self.collection_name, 'tier')
+
             return {
                 'total_count': total_count,
                 'type_distribution': type_stats,
@@ -222,4 +474,121 @@ class InvestorDataManager:
             }
         except Exception as e:
             print(f"获取统计信息失败: {e}")
-            return None
\ No newline at end of file
+            return None
+
+
+class InvestorPortfolioManager(_BaseDataManager):
+    """投资者投资组合明细管理器
+
+    每条记录: {investor_id, investor_name, project, kind: 'project' | 'sale', data}，
+    按 (investor_id, kind, project) 唯一（由唯一索引保证）。同步时与库中已有明细做差异比较，
+    只写入新增或变化的记录，并删除已不在组合中的记录。
+    """
+
+    collection_name = 'investor_portfolio'
+
+    @staticmethod
+    def _entry_key(entry):
+        return entry['investor_id'], entry['kind'], entry['project']
+
+    def sync_portfolios(self, investors):
+        """同步一批 InvestorData 的投资组合，返回 inserted/modified/deleted 计数"""
+        counts = {'inserted': 0, 'modified': 0, 'deleted': 0}
+        investors = [inv for inv in investors if inv.portfolio_key is not None]
+        if not investors:
+            return counts
+
+        desired = {}
+        for investor in investors:
+            for entry in investor.portfolio_entries():
+                desired[self._entry_key(entry)] = entry
+
+        existing = {}
+        investor_keys = list({inv.portfolio_key for inv in investors})
+        for doc in self.backend.find(self.collection_name, {'investor_id': {'$in': investor_keys}}):
+            existing[self._entry_key(doc)] = doc
+
+        changed = []
+        for key, entry in desired.items():
+            current = existing.get(key)
+            if current is None or current.get('data') != entry['data'] or \
+                    current.get('investor_name') != entry['investor_name']:
+                changed.append(entry)
+        if changed:
+            result = self.backend.upsert_many(self.collection_name, changed, key=('investor_id', 'kind', 'project'))
+            counts['inserted'] = result['inserted']
+            counts['modified'] = result['modified']
+
+        # 删除已不在组合中的明细（按投资者和类型分组批量删除）
+        removed = {}
+        for investor_key, kind, project in existing.keys() - desired.keys():
+            removed.setdefault((investor_key, kind), []).append(project)
+        for (investor_key, kind), projects in removed.items():
+            counts['deleted'] += self.backend.delete_many(
+                self.collection_name,
+                {'investor_id': investor_key, 'kind': kind, 'project': {'$in': projects}}
+            )
+        if any(counts.values()):
+            bump_generation(INVESTOR_GENERATION)
+        return counts
+
+    def get_portfolio(self, investor_key, kind=None):
+        """获取单个投资者的投资组合明细"""
+        filters = {'investor_id': investor_key}
+        if kind:
+            filters['kind'] = kind
+        return self.backend.find(
+            self.collection_name, filters, sort=[('kind', ASCENDING), ('project', ASCENDING)]
+        )
+
+    def get_portfolios(self, investor_keys):
+        """批量获取多个投资者的投资组合明细，返回 {investor_key: [entry, ...]}"""
+        portfolios = {}
+        if not investor_keys:
+            return portfolios
+        docs = self.backend.find(self.collection_name, {'investor_id': {'$in': list(investor_keys)}})
+        for doc in docs:
+            portfolios.setdefault(doc['investor_id'], []).append(doc)
+        return portfolios
+
+    def get_investors_for_project(self, project, kind='project', limit=None):
+        """持有指定项目的投资者明细（走 project 索引）"""
+        filters = {'project': project}
+        if kind:
+            filters['kind'] = kind
+        return self.backend.find(
+            self.collection_name, filters, sort=[('investor_id', ASCENDING)], limit=limit
+        )
+
+    def delete_by_investor(self, investor_key):
+        """删除指定投资者的全部明细"""
+        deleted_count = self.backend.delete_many(self.collection_name, {'investor_id': investor_key})
+        bump_generation(INVESTOR_GENERATION)
+        return deleted_count
+
+
+class TokenUnlockManager(_BaseDataManager):
+    """代币解锁数据管理器"""
+
+    collection_name = 'token_unlocks'
+
+    def upsert_unlocks(self, docs):
+        """按 source + token_name 批量 upsert"""
+        return self.backend.upsert_many(self.collection_name, docs, key=('source', 'token_name'))
+
+    def get_latest_unlocks(self, limit=100):
+        """获取最新解锁数据"""
+        return self.backend.find(self.collection_name, sort=[('timestamp', DESCENDING)], limit=limit)
+
+    def get_largest_upcoming_unlocks(self, days=7, limit=20):
+        """未来 N 天内按美元价值排序的最大解锁"""
+        now = datetime.utcnow()
+        return self.backend.find(
+            self.collection_name,
+            {
+                'unlock_at': {'$gte': now, '$lte': now + timedelta(days=days)},
+                'unlock_usd_value': {'$ne': None},
+            },
+            sort=[('unlock_usd_value', DESCENDING)],
+            limit=limit
+        )
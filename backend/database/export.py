@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parquet 列式导出
+
+把 crypto_data / investor_data / token_unlocks 按批次从游标流式读出，
+写成按日期和来源分区的压缩 Parquet 文件：
+
+    <output_dir>/<collection>/date=YYYY-MM-DD/source=<source>/part-<run>-<seq>.parquet
+
+每个集合在 <output_dir>/_watermarks.json 中记录已导出的最大 timestamp，
+下次运行只导出水位线之后的新数据。内存占用只与 batch_size 有关。
+
+每个集合使用固定的列定义（EXPORT_FIELDS）：所有批次写出相同的 Arrow schema，
+某批中整列为空或数值类型不一致不会改变列类型，同一分区的文件可以直接合并读取。
+无法转换为列类型的值写为 null，列定义之外的字段以 JSON 字符串写入 _extra 列。
+
+依赖安装:
+pip install pyarrow
+
+命令行:
+python -m backend.database.export --output data/exports [--full] [--collections crypto_data ...]
+"""
+
+import argparse
+import json
+import os
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from .backends import ASCENDING, StorageBackend
+
+EXPORT_COLLECTIONS = ('crypto_data', 'investor_data', 'token_unlocks')
+WATERMARK_FILE = '_watermarks.json'
+
+_PARTITION_RE = re.compile(r'[^A-Za-z0-9._-]+')
+
+
+def _load_pyarrow():
+    """延迟导入 pyarrow（可选依赖）"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError('Parquet 导出需要 pyarrow，请先执行: pip install pyarrow') from e
+    return pa, pq
+
+
+def _partition_value(value: Any) -> str:
+    text = str(value) if value not in (None, '') else 'unknown'
+    return _PARTITION_RE.sub('_', text)
+
+
+# 各集合导出的列: (字段名, 类型)，类型为 string / float / int / bool / timestamp。
+# 嵌套结构（字典、列表）序列化为 JSON 字符串
+_CRYPTO_FLOAT_FIELDS = (
+    'price_usd', 'price_change_24h', 'price_change_percentage_24h', 'price_change_percentage_7d',
+    'price_change_percentage_30d', 'market_cap', 'volume_24h', 'circulating_supply', 'total_supply',
+    'max_supply', 'ath', 'ath_change_percentage', 'atl', 'atl_change_percentage', 'fully_diluted_valuation',
+)
+_UNLOCK_TEXT_FIELDS = (
+    'token_name', 'unlock_time', 'unlock_amount', 'unlock_percentage', 'current_price', 'price_change_24h',
+    'market_cap', 'circulating_supply', 'released_percentage', 'next_7d_emission',
+)
+EXPORT_FIELDS = {
+    'crypto_data': (
+        (('id', 'string'), ('symbol', 'string'), ('name', 'string'))
+        + tuple((name, 'float') for name in _CRYPTO_FLOAT_FIELDS)
+        + (('rank', 'int'), ('ath_date', 'string'), ('atl_date', 'string'), ('last_updated', 'string'),
+           ('image', 'string'), ('source', 'string'), ('timestamp', 'timestamp'))
+    ),
+    'investor_data': (
+        ('investor_id', 'string'), ('name', 'string'), ('investor_slug', 'string'), ('logo', 'string'),
+        ('image', 'string'), ('country', 'string'), ('venture_type', 'string'), ('rank', 'int'),
+        ('rating', 'float'), ('tier', 'string'), ('lead', 'bool'), ('description', 'string'),
+        ('twitter_url', 'string'), ('links', 'string'), ('twitter_score', 'float'),
+        ('total_investments', 'int'), ('lead_investments', 'int'), ('rounds_per_year', 'float'),
+        ('public_sales_count', 'int'), ('last_round_date', 'string'), ('avg_public_roi', 'string'),
+        ('avg_private_roi', 'string'), ('binance_listed', 'string'), ('rounds_distribution', 'string'),
+        ('portfolio_projects', 'string'), ('sale_ids', 'string'), ('portfolio_count', 'int'),
+        ('sale_ids_count', 'int'), ('source', 'string'), ('scraped_at', 'timestamp'), ('timestamp', 'timestamp'),
+        ('type', 'string'), ('success_rate', 'string'), ('success_rate_numeric', 'float'),
+        ('avg_return', 'string'), ('avg_return_numeric', 'float'), ('median_return', 'string'),
+        ('median_return_numeric', 'float'), ('investments_count', 'string'),
+        ('investments_count_numeric', 'float'), ('last_investment', 'string'), ('days_ago', 'string'),
+        ('schema_version', 'int'),
+    ),
+    'token_unlocks': (
+        (('source', 'string'),)
+        + tuple((name, 'string') for name in _UNLOCK_TEXT_FIELDS)
+        + tuple((f'{name}_value', 'float') for name in _UNLOCK_TEXT_FIELDS[2:])
+        + (('unlock_amount_unit', 'string'), ('unlock_at', 'timestamp'), ('unlock_usd_value', 'float'),
+           ('timestamp', 'timestamp'))
+    ),
+}
+EXTRA_COLUMN = '_extra'
+
+
+def export_schema(pa, collection: str):
+    """集合的固定 Arrow schema（_id、EXPORT_FIELDS 中的列和 _extra）"""
+    types = {'string': pa.string(), 'float': pa.float64(), 'int': pa.int64(), 'bool': pa.bool_(),
+             'timestamp': pa.timestamp('us')}
+    fields = [pa.field('_id', pa.string())]
+    fields += [pa.field(name, types[kind]) for name, kind in EXPORT_FIELDS[collection]]
+    fields.append(pa.field(EXTRA_COLUMN, pa.string()))
+    return pa.schema(fields)
+
+
+def _json(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def _coerce(kind: str, value: Any) -> Any:
+    """把文档中的值转换为列类型，无法转换时返回 None"""
+    if value is None:
+        return None
+    if kind == 'string':
+        if isinstance(value, (dict, list)):
+            return _json(value)
+        return value if isinstance(value, str) else str(value)
+    if kind == 'timestamp':
+        if isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                return None
+        if not isinstance(value, datetime):
+            return None
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+    if kind == 'bool':
+        return value if isinstance(value, bool) else None
+    if isinstance(value, bool) or value == '':
+        return None
+    try:
+        if kind == 'float':
+            return float(value)
+        number = float(value)
+        return int(number) if number.is_integer() else None
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def _normalize(doc: Dict[str, Any], fields) -> Dict[str, Any]:
+    """按集合列定义把文档转换成扁平行，列定义之外的字段合并到 _extra"""
+    row = {'_id': None if doc.get('_id') is None else str(doc['_id'])}
+    for name, kind in fields:
+        row[name] = _coerce(kind, doc.get(name))
+    known = {name for name, _ in fields}
+    extra = {key: value for key, value in doc.items() if key != '_id' and key not in known}
+    row[EXTRA_COLUMN] = _json(extra) if extra else None
+    return row
+
+
+def _write_json_atomic(path: str, data: Dict[str, Any]):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+class ParquetExporter:
+    """批量游标 -> 分区 Parquet 导出器"""
+
+    def __init__(self, backend: StorageBackend, output_dir: str = 'data/exports',
+                 batch_size: int = 5000, compression: str = 'zstd'):
+        self.backend = backend
+        self.output_dir = output_dir
+        self.batch_size = batch_size
+        self.compression = compression
+        self.watermark_path = os.path.join(output_dir, WATERMARK_FILE)
+
+    # ---- 水位线 ----
+
+    def load_watermarks(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.watermark_path):
+            return {}
+        with open(self.watermark_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_watermark(self, collection: str, timestamp: datetime, boundary_ids: List[str]):
+        watermarks = self.load_watermarks()
+        watermarks[collection] = {
+            'timestamp': timestamp.isoformat(),
+            # 与水位线时间戳相同的文档 id，下次运行时跳过，避免重复导出
+            'boundary_ids': sorted(boundary_ids),
+            'updated_at': datetime.utcnow().isoformat(),
+        }
+        _write_json_atomic(self.watermark_path, watermarks)
+
+    # ---- 导出 ----
+
+    def export_collection(self, collection: str, full: bool = False) -> Dict[str, Any]:
+        """导出单个集合，返回导出统计"""
+        pa, pq = _load_pyarrow()
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        filters = None
+        watermark_ts: Optional[datetime] = None
+        boundary_ids = set()
+        if not full:
+            mark = self.load_watermarks().get(collection)
+            if mark:
+                watermark_ts = datetime.fromisoformat(mark['timestamp'])
+                boundary_ids = set(mark.get('boundary_ids', []))
+                filters = {'timestamp': {'$gte': watermark_ts}}
+
+        fields = EXPORT_FIELDS[collection]
+        schema = export_schema(pa, collection)
+        run_id = datetime.utcnow().strftime('%Y%m%dT%H%M%S')
+        stats = {'collection': collection, 'rows': 0, 'files': 0, 'bytes': 0}
+        seq = 0
+
+        for batch in self.backend.iter_find(collection, filters, sort=[('timestamp', ASCENDING)],
+                                            batch_size=self.batch_size):
+            partitions: Dict[tuple, List[Dict[str, Any]]] = {}
+            for doc in batch:
+                doc_id = str(doc.get('_id'))
+                ts = doc.get('timestamp')
+                if watermark_ts is not None and ts == watermark_ts and doc_id in boundary_ids:
+                    continue
+                date = ts.strftime('%Y-%m-%d') if isinstance(ts, datetime) else 'unknown'
+                key = (date, _partition_value(doc.get('source')))
+                partitions.setdefault(key, []).append(_normalize(doc, fields))
+
+                if isinstance(ts, datetime):
+                    if watermark_ts is None or ts > watermark_ts:
+                        watermark_ts = ts
+                        boundary_ids = set()
+                    if ts == watermark_ts:
+                        boundary_ids.add(doc_id)
+
+            for (date, source), rows in partitions.items():
+                directory = os.path.join(self.output_dir, collection, f'date={date}', f'source={source}')
+                os.makedirs(directory, exist_ok=True)
+                path = os.path.join(directory, f'part-{run_id}-{seq:05d}.parquet')
+                seq += 1
+                pq.write_table(pa.Table.from_pylist(rows, schema=schema), path, compression=self.compression)
+                stats['rows'] += len(rows)
+                stats['files'] += 1
+                stats['bytes'] += os.path.getsize(path)
+
+            # 每批写完后推进水位线，中途失败也不会重复导出已落盘的数据
+            if watermark_ts is not None:
+                self._save_watermark(collection, watermark_ts, list(boundary_ids))
+
+        return stats
+
+    def export_all(self, collections=EXPORT_COLLECTIONS, full: bool = False) -> List[Dict[str, Any]]:
+        """导出多个集合"""
+        results = []
+        for collection in collections:
+            stats = self.export_collection(collection, full=full)
+            print(f"📦 {collection}: 导出 {stats['rows']} 行, {stats['files']} 个文件, {stats['bytes'] / 1024:.1f} KB")
+            results.append(stats)
+        return results
+
+
+def _backend_from_config():
+    """命令行模式下直接按配置创建后端，不启动 Flask 应用"""
+    from ..config import Config
+    from .backends import MongoBackend, SQLiteBackend
+
+    if Config.STORAGE_BACKEND.lower() == 'sqlite':
+        return SQLiteBackend(Config.SQLITE_PATH)
+    from pymongo import MongoClient
+    return MongoBackend(db=MongoClient(Config.MONGO_URI).get_default_database('crypto_db'))
+
+
+def main(argv=None):
+    from ..config import Config
+
+    parser = argparse.ArgumentParser(description='导出历史数据为分区 Parquet 文件')
+    parser.add_argument('--output', default=Config.EXPORT_DIR, help='输出目录')
+    parser.add_argument('--collections', nargs='+', default=list(EXPORT_COLLECTIONS), choices=EXPORT_COLLECTIONS)
+    parser.add_argument('--batch-size', type=int, default=Config.EXPORT_BATCH_SIZE)
+    parser.add_argument('--compression', default='zstd')
+    parser.add_argument('--full', action='store_true', help='忽略水位线，全量导出')
+    args = parser.parse_args(argv)
+
+    exporter = ParquetExporter(_backend_from_config(), args.output, args.batch_size, args.compression)
+    exporter.export_all(args.collections, full=args.full)
+
+
+if __name__ == '__main__':
+    main()
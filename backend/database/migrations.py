@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+投资者文档结构迁移
+
+把 schema_version 低于当前版本的投资者文档按批次改写为紧凑结构：
+- 省略空字符串 / 空字典等兼容字段
+- 内嵌的 portfolio_projects / sale_ids 移入 investor_portfolio 集合（只保留数量）
+
+每批之间暂停一段时间，单次运行处理的批数有上限，避免迁移占满数据库写入。
+读取路径（InvestorDataManager）会即时升级旧文档，因此迁移可以在后台慢慢完成。
+
+命令行（迁移全部剩余文档）:
+python -m backend.database.migrations [--batch-size 200] [--pause 1.0]
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Dict
+
+from .db import InvestorDataManager, InvestorPortfolioManager
+from ..models.investor import InvestorData
+
+
+def _doc_size(doc: Dict[str, Any]) -> int:
+    """文档序列化后的近似字节数"""
+    return len(json.dumps(doc, default=str, ensure_ascii=False).encode('utf-8'))
+
+
+class InvestorSchemaMigrator:
+    """按批次、限速迁移投资者文档结构"""
+
+    def __init__(self, backend=None, batch_size: int = 200, pause: float = 1.0):
+        self.investor_manager = InvestorDataManager(backend)
+        self.portfolio_manager = InvestorPortfolioManager(backend)
+        self.batch_size = batch_size
+        self.pause = pause
+
+    def migrate_batch(self) -> Dict[str, int]:
+        """迁移一批文档，返回 migrated / bytes_before / bytes_after"""
+        stats = {'migrated': 0, 'bytes_before': 0, 'bytes_after': 0}
+        docs = self.investor_manager.get_outdated_documents(limit=self.batch_size)
+        if not docs:
+            return stats
+
+        upgraded = []
+        portfolio_sources = []
+        for doc in docs:
+            investor = InvestorData.from_dict(doc)
+            # 从未按新结构写入过的文档，内嵌数组就是最新的投资组合
+            if 'portfolio_count' not in doc and (investor.portfolio_projects or investor.sale_ids):
+                portfolio_sources.append(investor)
+            new_doc = investor.to_mongo_dict()
+            new_doc['_id'] = doc['_id']
+            upgraded.append(new_doc)
+            stats['bytes_before'] += _doc_size(doc)
+            stats['bytes_after'] += _doc_size(new_doc)
+
+        if portfolio_sources:
+            self.portfolio_manager.sync_portfolios(portfolio_sources)
+        self.investor_manager.replace_documents(upgraded)
+        stats['migrated'] = len(upgraded)
+        return stats
+
+    def run(self, max_batches: int = None) -> Dict[str, int]:
+        """连续迁移多批（max_batches 为空时直到没有旧文档），返回累计统计和剩余数量"""
+        totals = {'migrated': 0, 'bytes_before': 0, 'bytes_after': 0, 'batches': 0}
+        while max_batches is None or totals['batches'] < max_batches:
+            stats = self.migrate_batch()
+            if not stats['migrated']:
+                break
+            totals['batches'] += 1
+            for key in ('migrated', 'bytes_before', 'bytes_after'):
+                totals[key] += stats[key]
+            if stats['migrated'] < self.batch_size:
+                break
+            if self.pause:
+                time.sleep(self.pause)
+        totals['remaining'] = self.investor_manager.count_outdated()
+        return totals
+
+
+def main(argv=None):
+    from .db import set_backend
+    from .export import _backend_from_config
+
+    parser = argparse.ArgumentParser(description='把投资者文档迁移到当前结构版本')
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--pause', type=float, default=1.0, help='批次间暂停秒数')
+    parser.add_argument('--max-batches', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    backend = _backend_from_config()
+    set_backend(backend)
+    migrator = InvestorSchemaMigrator(backend, batch_size=args.batch_size, pause=args.pause)
+    totals = migrator.run(max_batches=args.max_batches)
+    print(f"🔧 已迁移 {totals['migrated']} 个投资者文档 ({totals['batches']} 批), 剩余 {totals['remaining']} 个")
+    if totals['bytes_before']:
+        print(f"📉 文档大小: {totals['bytes_before'] / 1024:.1f} KB -> {totals['bytes_after'] / 1024:.1f} KB")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,199 +5,262 @@
 """
 
 from datetime import datetime
+from operator import attrgetter
 from typing import Dict, Any, Optional, List
 from bson import ObjectId
 
+# 投资者文档结构版本
+# 1: 无 schema_version 字段，保存全部兼容字段（含空字符串）并内嵌投资组合数组
+# 2: 紧凑结构，省略空值和可由其他字段推导的兼容字段，投资组合存放在 investor_portfolio
+SCHEMA_VERSION = 2
+
+# 字段定义: (属性名 / MongoDB 键, API 键)，与 __init__ 中的赋值一一对应
+INVESTOR_SCHEMA = (
+    # 基础信息
+    ('investor_id', 'id'),
+    ('name', 'name'),
+    ('investor_slug', 'investorSlug'),
+    ('logo', 'logo'),
+    ('image', 'image'),
+    ('country', 'country'),
+    ('venture_type', 'ventureType'),
+    ('rank', 'rank'),
+    ('rating', 'rating'),
+    ('tier', 'tier'),
+    ('lead', 'lead'),
+    ('description', 'description'),
+
+    # 社交媒体和链接
+    ('twitter_url', 'twitterUrl'),
+    ('links', 'links'),
+    ('twitter_score', 'twitterScore'),
+
+    # 投资统计
+    ('total_investments', 'totalInvestments'),
+    ('lead_investments', 'leadInvestments'),
+    ('rounds_per_year', 'roundsPerYear'),
+    ('public_sales_count', 'publicSalesCount'),
+    ('last_round_date', 'lastRoundDate'),
+
+    # ROI数据
+    ('avg_public_roi', 'avgPublicRoi'),
+    ('avg_private_roi', 'avgPrivateRoi'),
+
+    # 币安上市数据
+    ('binance_listed', 'binanceListed'),
+
+    # 投资分布
+    ('rounds_distribution', 'roundsDistribution'),
+
+    # 投资组合项目和销售ID（明细存放在 investor_portfolio 集合，投资者文档只保存数量）
+    ('portfolio_projects', 'portfolioProjects'),
+    ('sale_ids', 'saleIds'),
+    ('portfolio_count', 'portfolio_count'),
+    ('sale_ids_count', 'sale_ids_count'),
+
+    # 元数据
+    ('source', 'source'),
+    ('scraped_at', 'scraped_at'),
+    ('timestamp', 'timestamp'),
+
+    # 兼容旧字段
+    ('type', 'type'),
+    ('success_rate', 'success_rate'),
+    ('success_rate_numeric', 'success_rate_numeric'),
+    ('avg_return', 'avg_return'),
+    ('avg_return_numeric', 'avg_return_numeric'),
+    ('median_return', 'median_return'),
+    ('median_return_numeric', 'median_return_numeric'),
+    ('investments_count', 'investments_count'),
+    ('investments_count_numeric', 'investments_count_numeric'),
+    ('last_investment', 'last_investment'),
+    ('days_ago', 'days_ago'),
+)
+
+# MongoDB 文档键 -> API 键（仅列出两者不同的字段），from_dict 读取数据库文档时使用
+_MONGO_TO_API = {attr: api_key for attr, api_key in INVESTOR_SCHEMA if attr != api_key}
+# 不写入投资者文档的字段
+_PORTFOLIO_FIELDS = ('portfolio_projects', 'sale_ids')
+_MONGO_FIELDS = tuple(attr for attr, _ in INVESTOR_SCHEMA if attr not in _PORTFOLIO_FIELDS)
+_get_fields = attrgetter(*_MONGO_FIELDS)
+# 与 total_investments 相同时省略的兼容字段（读取时由 __init__ 补回）
+_DERIVED_FIELDS = ('investments_count', 'investments_count_numeric')
+
+
+def portfolio_project_key(item: Any) -> Optional[str]:
+    """投资组合项目 / 销售ID 的标识：字典取 slug / key / id / name，其余转为字符串"""
+    if isinstance(item, dict):
+        for field in ('slug', 'key', 'id', 'name'):
+            value = item.get(field)
+            if value not in (None, ''):
+                return str(value)
+        return None
+    if item in (None, ''):
+        return None
+    return str(item)
+
+
 class InvestorData:
-    """投资者数据模型"""
-    
+    """投资者数据模型（__slots__，无实例 __dict__）"""
+
+    __slots__ = ('_id',) + _PORTFOLIO_FIELDS + _MONGO_FIELDS
+
     def __init__(self, data: Dict[str, Any] = None):
-        if data:
-            self._id = data.get('_id')
-            # 基础信息
-            self.investor_id = data.get('id')
-            self.name = data.get('name', '')
-            self.investor_slug = data.get('investorSlug', '')
-            self.logo = data.get('logo', '')
-            self.image = data.get('image', '')
-            self.country = data.get('country', {})
-            self.venture_type = data.get('ventureType', '')
-            self.rank = data.get('rank')
-            self.rating = data.get('rating')
-            self.tier = data.get('tier', '')
-            self.lead = data.get('lead', False)
-            self.description = data.get('description', '')
-            
-            # 社交媒体和链接
-            self.twitter_url = data.get('twitterUrl', '')
-            self.links = data.get('links', [])
-            self.twitter_score = data.get('twitterScore')
-            
-            # 投资统计
-            self.total_investments = data.get('totalInvestments')
-            self.lead_investments = data.get('leadInvestments')
-            self.rounds_per_year = data.get('roundsPerYear')
-            self.public_sales_count = data.get('publicSalesCount')
-            self.last_round_date = data.get('lastRoundDate')
-            
-            # ROI数据
-            self.avg_public_roi = data.get('avgPublicRoi', {})
-            self.avg_private_roi = data.get('avgPrivateRoi', {})
-            
-            # 币安上市数据
-            self.binance_listed = data.get('binanceListed', {})
-            
-            # 投资分布
-            self.rounds_distribution = data.get('roundsDistribution', {})
-            
-            # 投资组合项目
-            self.portfolio_projects = data.get('portfolioProjects', [])
-            
-            # 销售ID
-            self.sale_ids = data.get('saleIds', [])
-            
-            # 元数据
-            self.source = data.get('source', 'icodrops_api')
-            self.scraped_at = data.get('scraped_at', datetime.utcnow())
-            self.timestamp = data.get('timestamp', datetime.utcnow())
-            
-            # 兼容旧字段
-            self.type = data.get('type', '') or self.venture_type
-            self.success_rate = data.get('success_rate', '')
-            self.success_rate_numeric = data.get('success_rate_numeric')
-            self.avg_return = data.get('avg_return', '')
-            self.avg_return_numeric = data.get('avg_return_numeric')
-            self.median_return = data.get('median_return', '')
-            self.median_return_numeric = data.get('median_return_numeric')
-            self.investments_count = data.get('investments_count', '') or self.total_investments
-            self.investments_count_numeric = data.get('investments_count_numeric') or self.total_investments
-            self.last_investment = data.get('last_investment', '')
-            self.days_ago = data.get('days_ago', '')
-        else:
-            # 初始化默认值
-            self._id = None
-            self.investor_id = None
-            self.name = ''
-            self.investor_slug = ''
-            self.logo = ''
-            self.image = ''
-            self.country = {}
-            self.venture_type = ''
-            self.rank = None
-            self.rating = None
-            self.tier = ''
-            self.lead = False
-            self.description = ''
-            self.twitter_url = ''
-            self.links = []
-            self.twitter_score = None
-            self.total_investments = None
-            self.lead_investments = None
-            self.rounds_per_year = None
-            self.public_sales_count = None
-            self.last_round_date = None
-            self.avg_public_roi = {}
-            self.avg_private_roi = {}
-            self.binance_listed = {}
-            self.rounds_distribution = {}
-            self.portfolio_projects = []
-            self.sale_ids = []
-            self.source = 'icodrops_api'
-            self.scraped_at = datetime.utcnow()
-            self.timestamp = datetime.utcnow()
-            # 兼容旧字段
-            self.type = ''
-            self.success_rate = ''
-            self.success_rate_numeric = None
-            self.avg_return = ''
-            self.avg_return_numeric = None
-            self.median_return = ''
-            self.median_return_numeric = None
-            self.investments_count = ''
-            self.investments_count_numeric = None
-            self.last_investment = ''
-            self.days_ago = ''
-    
+        data = data or {}
+        get = data.get
+        self._id = get('_id')
+        # 基础信息
+        self.investor_id = get('id')
+        self.name = get('name', '')
+        self.investor_slug = get('investorSlug', '')
+        self.logo = get('logo', '')
+        self.image = get('image', '')
+        self.country = get('country', {})
+        self.venture_type = get('ventureType', '')
+        self.rank = get('rank')
+        self.rating = get('rating')
+        self.tier = get('tier', '')
+        self.lead = get('lead', False)
+        self.description = get('description', '')
+
+        # 社交媒体和链接
+        self.twitter_url = get('twitterUrl', '')
+        self.links = get('links', [])
+        self.twitter_score = get('twitterScore')
+
+        # 投资统计
+        self.total_investments = get('totalInvestments')
+        self.lead_investments = get('leadInvestments')
+        self.rounds_per_year = get('roundsPerYear')
+        self.public_sales_count = get('publicSalesCount')
+        self.last_round_date = get('lastRoundDate')
+
+        # ROI数据
+        self.avg_public_roi = get('avgPublicRoi', {})
+        self.avg_private_roi = get('avgPrivateRoi', {})
+
+        # 币安上市数据
+        self.binance_listed = get('binanceListed', {})
+
+        # 投资分布
+        self.rounds_distribution = get('roundsDistribution', {})
+
+        # 投资组合项目和销售ID
+        self.portfolio_projects = get('portfolioProjects') or []
+        self.sale_ids = get('saleIds') or []
+        portfolio_count = get('portfolio_count')
+        self.portfolio_count = len(self.portfolio_projects) if portfolio_count is None else portfolio_count
+        sale_ids_count = get('sale_ids_count')
+        self.sale_ids_count = len(self.sale_ids) if sale_ids_count is None else sale_ids_count
+
+        # 元数据
+        self.source = get('source', 'icodrops_api')
+        now = datetime.utcnow()
+        self.scraped_at = get('scraped_at', now)
+        self.timestamp = get('timestamp', now)
+
+        # 兼容旧字段
+        self.type = get('type', '') or self.venture_type
+        self.success_rate = get('success_rate', '')
+        self.success_rate_numeric = get('success_rate_numeric')
+        self.avg_return = get('avg_return', '')
+        self.avg_return_numeric = get('avg_return_numeric')
+        self.median_return = get('median_return', '')
+        self.median_return_numeric = get('median_return_numeric')
+        self.investments_count = get('investments_count', '') or self.total_investments
+        self.investments_count_numeric = get('investments_count_numeric') or self.total_investments
+        self.last_investment = get('last_investment', '')
+        self.days_ago = get('days_ago', '')
+
+    @property
+    def portfolio_key(self) -> Any:
+        """投资组合明细中关联投资者使用的键（优先 investor_id，否则为名称）"""
+        if self.investor_id not in (None, ''):
+            return self.investor_id
+        return self.name or None
+
+    @property
+    def has_embedded_portfolio(self) -> bool:
+        """是否带有内嵌的投资组合数组（尚未迁移到 investor_portfolio 的旧文档）"""
+        return bool(self.portfolio_projects or self.sale_ids)
+
+    def portfolio_entries(self) -> List[Dict[str, Any]]:
+        """拆分为 investor_portfolio 集合的明细记录"""
+        investor_key = self.portfolio_key
+        if investor_key is None:
+            return []
+        entries = {}
+        for kind, items in (('project', self.portfolio_projects), ('sale', self.sale_ids)):
+            for item in items:
+                project = portfolio_project_key(item)
+                if project is None:
+                    continue
+                entries[(kind, project)] = {
+                    'investor_id': investor_key,
+                    'investor_name': self.name,
+                    'project': project,
+                    'kind': kind,
+                    'data': item if isinstance(item, dict) else {},
+                }
+        return list(entries.values())
+
     def to_mongo_dict(self) -> Dict[str, Any]:
-        """转换为MongoDB兼容的字典格式"""
-        data = {
-            # 基础信息
-            'investor_id': self.investor_id,
-            'name': self.name,
-            'investor_slug': self.investor_slug,
-            'logo': self.logo,
-            'image': self.image,
-            'country': self.country,
-            'venture_type': self.venture_type,
-            'rank': self.rank,
-            'rating': self.rating,
-            'tier': self.tier,
-            'lead': self.lead,
-            'description': self.description,
-            
-            # 社交媒体和链接
-            'twitter_url': self.twitter_url,
-            'links': self.links,
-            'twitter_score': self.twitter_score,
-            
-            # 投资统计
-            'total_investments': self.total_investments,
-            'lead_investments': self.lead_investments,
-            'rounds_per_year': self.rounds_per_year,
-            'public_sales_count': self.public_sales_count,
-            'last_round_date': self.last_round_date,
-            
-            # ROI数据
-            'avg_public_roi': self.avg_public_roi,
-            'avg_private_roi': self.avg_private_roi,
-            
-            # 币安上市数据
-            'binance_listed': self.binance_listed,
-            
-            # 投资分布
-            'rounds_distribution': self.rounds_distribution,
-            
-            # 投资组合项目
-            'portfolio_projects': self.portfolio_projects,
-            
-            # 销售ID
-            'sale_ids': self.sale_ids,
-            
-            # 元数据
-            'source': self.source,
-            'scraped_at': self.scraped_at,
-            'timestamp': self.timestamp,
-            
-            # 兼容旧字段
-            'type': self.type,
-            'success_rate': self.success_rate,
-            'success_rate_numeric': self.success_rate_numeric,
-            'avg_return': self.avg_return,
-            'avg_return_numeric': self.avg_return_numeric,
-            'median_return': self.median_return,
-            'median_return_numeric': self.median_return_numeric,
-            'investments_count': self.investments_count,
-            'investments_count_numeric': self.investments_count_numeric,
-            'last_investment': self.last_investment,
-            'days_ago': self.days_ago
-        }
-        
-        # 移除None值
-        return {k: v for k, v in data.items() if v is not None}
-    
+        """转换为MongoDB兼容的字典格式（当前紧凑结构，不含投资组合明细）
+
+        省略 None、空字符串、空字典和空列表，以及与 total_investments 相同的兼容字段；
+        读取时 __init__ 会为缺失字段补上默认值。
+        """
+        data = {}
+        for attr, value in zip(_MONGO_FIELDS, _get_fields(self)):
+            if value is None or (not value and isinstance(value, (str, dict, list))):
+                continue
+            data[attr] = value
+        for attr in _DERIVED_FIELDS:
+            if attr in data and data[attr] == self.total_investments:
+                del data[attr]
+        data['schema_version'] = SCHEMA_VERSION
+        return data
+
     def to_dict(self) -> Dict[str, Any]:
-        """转换为字典格式"""
-        data = self.to_mongo_dict()
+        """转换为 API 字典格式
+
+        与存储结构无关：紧凑结构省略的字段按 __init__ 补回的默认值输出（只省略 None），
+        不含 schema_version 和投资组合明细。
+        """
+        data = {attr: value for attr, value in zip(_MONGO_FIELDS, _get_fields(self)) if value is not None}
         data['_id'] = self._id
         return data
-    
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'InvestorData':
-        """从字典创建InvestorData对象"""
+        """从 MongoDB 文档创建InvestorData对象（任意 schema_version）"""
+        if data:
+            data = {_MONGO_TO_API.get(key, key): value for key, value in data.items()}
         return cls(data)
-    
+
     def __repr__(self):
         return f'<InvestorData {self.name}: {self.venture_type}, 排名: {self.rank}>'
-    
+
     def __str__(self):
-        return self.__repr__()
\ No newline at end of file
+        return self.__repr__()
+
+
+def upgrade_investor_doc(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """读取路径：把任意版本的投资者文档升级为当前结构，并去掉 schema_version
+
+    从未按拆分后的结构写入过（没有 portfolio_count）的旧文档，其投资组合明细还没有
+    同步到 investor_portfolio，升级时保留内嵌数组，直到迁移处理该文档。
+    """
+    if not doc:
+        return doc
+    if doc.get('schema_version') != SCHEMA_VERSION:
+        upgraded = InvestorData.from_dict(doc).to_mongo_dict()
+        if '_id' in doc:
+            upgraded['_id'] = doc['_id']
+        if 'portfolio_count' not in doc:
+            for field in _PORTFOLIO_FIELDS:
+                if doc.get(field):
+                    upgraded[field] = doc[field]
+        doc = upgraded
+    doc.pop('schema_version', None)
+    return doc
@@ -7,19 +7,21 @@ DropsTab 投资者数据爬虫
 import requests
 import time
 import random
-import pandas as pd
 import re
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, List, Optional
 from .base_scraper import BaseScraper
 from datetime import datetime
-from ..database.db import InvestorDataManager
+from ..database.db import InvestorDataManager, InvestorPortfolioManager
 from ..models.investor import InvestorData
 
 class DropstabScraper(BaseScraper):
     """DropsTab 投资者数据爬虫类"""
     
-    def __init__(self, page_delay_min=10.0, page_delay_max=20.0, debug=True):
+    def __init__(self, page_delay_min=10.0, page_delay_max=20.0, debug=True,
+                 on_page: Optional[Callable[[int, int], None]] = None):
         super().__init__('dropstab', 'https://dropstab.com')
+        # 进度回调 on_page(当前页, 最大页数)（默认不做任何事）
+        self.on_page = on_page or (lambda page, total: None)
         self.page_delay_min = page_delay_min
         self.page_delay_max = page_delay_max
         self.base_rate_limit_delay = 5.0
@@ -47,6 +49,7 @@ class DropstabScraper(BaseScraper):
             'Cache-Control': 'max-age=0'
         })
         self.investor_manager = InvestorDataManager()
+        self.portfolio_manager = InvestorPortfolioManager()
         
         if self.debug:
             print("🔧 调试模式已启用")
@@ -81,6 +84,7 @@ class DropstabScraper(BaseScraper):
             for page in range(0, max_pages):  # API页码从0开始
                 display_page = page + 1  # 用于显示的页码（从1开始）
                 print(f"\n🔍 正在爬取第 {display_page}/{max_pages} 页投资者数据...")
+                self.on_page(display_page, max_pages)
                 
                 # 重试机制
                 success = False
@@ -350,6 +354,7 @@ class DropstabScraper(BaseScraper):
             
             # 转换为InvestorData对象
             investor_objects = []
+            investors = []
             conversion_errors = 0
             
             for i, item in enumerate(investors_data, 1):
@@ -357,6 +362,7 @@ class DropstabScraper(BaseScraper):
                     investor_obj = InvestorData(item)
                     mongo_dict = investor_obj.to_mongo_dict()
                     investor_objects.append(mongo_dict)
+                    investors.append(investor_obj)
                     
                     if self.debug and i <= 2:
                         print(f"✅ 第{i}个投资者数据转换成功: {mongo_dict.get('name', 'N/A')}")
@@ -377,47 +383,23 @@ class DropstabScraper(BaseScraper):
                 print(f"❌ 第 {page_num} 页没有有效数据可保存")
                 return 0
             
-            # 保存到数据库
-            saved_count = 0
-            update_count = 0
-            insert_count = 0
-            
+            # 保存到数据库（按 investor_id 或 name 批量 upsert）
             print(f"💾 正在保存 {len(investor_objects)} 条数据到数据库...")
             
-            for i, investor_data in enumerate(investor_objects, 1):
-                try:
-                    # 使用upsert方式，根据investor_id或name更新或插入
-                    query = {}
-                    if investor_data.get('investor_id'):
-                        query['investor_id'] = investor_data['investor_id']
-                    else:
-                        query['name'] = investor_data['name']
-                    
-                    result = self.investor_manager.collection.update_one(
-                        query,
-                        {'$set': investor_data},
-                        upsert=True
-                    )
-                    
-                    if result.upserted_id:
-                        insert_count += 1
-                        saved_count += 1
-                        if self.debug and i <= 2:
-                            print(f"➕ 新插入: {investor_data['name']}")
-                    elif result.modified_count > 0:
-                        update_count += 1
-                        saved_count += 1
-                        if self.debug and i <= 2:
-                            print(f"🔄 已更新: {investor_data['name']}")
-                    elif self.debug and i <= 2:
-                        print(f"➖ 无变化: {investor_data['name']}")
-                except Exception as e:
-                    print(f"❌ 保存投资者数据失败 {investor_data.get('name', 'Unknown')}: {e}")
-                    if self.debug:
-                        print(f"🔍 保存失败的数据: {investor_data}")
+            result = self.investor_manager.upsert_investor_data(investor_objects)
+            insert_count = result['inserted']
+            update_count = result['modified']
+            saved_count = insert_count + update_count
             
             print(f"✅ 第 {page_num} 页数据库保存完成: {saved_count}/{len(investor_objects)} 条记录")
             print(f"📊 保存详情: {insert_count} 新增, {update_count} 更新")
+            if result.get('failed'):
+                print(f"⚠️  第 {page_num} 页 {result['failed']} 条记录写入失败（见上方日志），其余记录已保存")
+            
+            # 投资组合明细单独存放，只写入有变化的记录
+            portfolio_result = self.portfolio_manager.sync_portfolios(investors)
+            print(f"📁 投资组合明细: {portfolio_result['inserted']} 新增, "
+                  f"{portfolio_result['modified']} 更新, {portfolio_result['deleted']} 删除")
             return saved_count
         except Exception as e:
             print(f"❌ 第 {page_num} 页保存数据到数据库时出错: {e}")
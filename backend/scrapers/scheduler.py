@@ -7,10 +7,19 @@
 import time
 import random
 from flask import current_app
-from ..app import scheduler, socketio
-from ..database.db import CryptoDataManager
+from ..app import scheduler
+from ..database.db import CryptoDataManager, MarketSnapshotManager, get_backend
 from ..models.crypto import CryptoData
+from ..analytics.market_store import market_store
+from ..analytics.indicators import indicator_engine
+from ..analytics.alerts import alert_engine
+from ..analytics.correlation import correlation_tracker
+from ..analytics.search import search_index
+from ..analytics.deltas import market_feed
+from ..api.realtime import broadcast_market, push_alerts
+from ..api.log_stream import log_stream
 from .coingecko import CoinGeckoScraper
+from .status import is_scraper_job, scraper_states
 from datetime import datetime, timedelta
 
 # 全局应用实例
@@ -35,24 +44,13 @@ def set_scraper_stop_flag(scraper_type, flag=True):
 
 
 def send_log_to_frontend(message, log_type="info"):
-    """发送日志消息到前端"""
-    try:
-        socketio.emit(
-            "scraper_log",
-            {
-                "message": message,
-                "type": log_type,
-                "timestamp": datetime.now().isoformat(),
-            },
-        )
-    except Exception as e:
-        print(f"发送日志到前端失败: {e}")
+    """发送日志消息到前端（由日志推送线程批量发送）"""
+    log_stream.push(message, log_type, console=False)
 
 
 def log_and_emit(message, log_type="info"):
-    """同时打印到控制台和发送到前端"""
-    print(message)
-    send_log_to_frontend(message, log_type)
+    """同时打印到控制台和发送到前端（只写入内存队列，不阻塞调用方）"""
+    log_stream.push(message, log_type)
 
 
 def get_next_random_interval(min_interval, max_interval):
@@ -97,12 +95,14 @@ def schedule_next_scrape():
         log_and_emit(f"❌ 调度下次爬取任务失败: {e}", "error")
 
 
+@log_stream.scope("coingecko")
 def scrape_crypto_data_and_reschedule():
     """爬取数据并重新调度"""
     scrape_crypto_data()
     schedule_next_scrape()
 
 
+@log_stream.scope("coingecko")
 def scrape_crypto_data():
     """爬取加密货币数据的定时任务（统一为单页爬取）"""
     start_time = datetime.now()
@@ -124,6 +124,7 @@ def scrape_crypto_data():
             crypto_manager = CryptoDataManager()
             if not crypto_manager.test_connection():
                 log_and_emit("❌ 数据库连接失败，终止爬取任务", "error")
+                scraper_states.record_error("coingecko", "数据库连接失败")
                 return
 
             # 获取配置 - 强制设置为单页爬取
@@ -143,6 +144,7 @@ def scrape_crypto_data():
 
             # 爬取单页数据 - 使用正确的方法名
             log_and_emit(f"🔍 正在爬取第 1/1 页...", "info")
+            scraper_states.progress("coingecko", 1, max_pages)
 
             # 使用 scrape_all_crypto_data 方法，但限制为1页
             scraped_data = scraper.scrape_all_crypto_data(
@@ -158,16 +160,9 @@ def scrape_crypto_data():
                     try:
                         crypto_obj = CryptoData(
                             {
-                                "id": item.get("id"),
-                                "symbol": item.get("symbol"),
-                                "name": item.get("name"),
+                                **item,
                                 "price_usd": item.get("current_price"),
-                                "price_change_percentage_24h": item.get(
-                                    "price_change_percentage_24h"
-                                ),
-                                "market_cap": item.get("market_cap"),
                                 "volume_24h": item.get("total_volume"),
-                                "circulating_supply": item.get("circulating_supply"),
                                 "rank": item.get("market_cap_rank"),
                                 "source": "coingecko",
                                 "timestamp": start_time,  # 使用 datetime 对象而不是字符串
@@ -180,14 +175,20 @@ def scrape_crypto_data():
                             "warning",
                         )
 
+                # 获取全球市场数据，与本轮行情一起缓存（失败时沿用上一轮）
+                global_data = scraper.get_global_data()
+                if global_data:
+                    log_and_emit("🌐 全球市场数据获取成功", "success")
+
                 # 保存数据
                 if crypto_objects:
-                    saved_count = _save_scraped_data(crypto_objects, start_time)
+                    saved_count = _save_scraped_data(crypto_objects, start_time, global_data)
                     log_and_emit(f"💾 数据保存完成: {saved_count}条", "success")
                 else:
                     log_and_emit("❌ 没有有效数据可保存", "error")
             else:
                 log_and_emit(f"❌ 第1页爬取失败", "error")
+                scraper_states.record_error("coingecko", "第1页爬取失败")
 
             end_time = datetime.now()
             duration = (end_time - start_time).total_seconds()
@@ -198,12 +199,13 @@ def scrape_crypto_data():
 
     except Exception as e:
         log_and_emit(f"❌ 爬取数据时出错: {e}", "error")
+        scraper_states.record_error("coingecko", e)
         import traceback
 
         traceback.print_exc()
 
 
-def _save_scraped_data(scraped_data, start_time):
+def _save_scraped_data(scraped_data, start_time, global_data=None):
     """保存爬取的数据到数据库"""
     if not scraped_data:
         return 0
@@ -233,26 +235,68 @@ def _save_scraped_data(scraped_data, start_time):
         print(f"  - 预期保存: {len(scraped_data) - duplicate_count}条")
 
         # 在_save_scraped_data方法中，为每条记录设置当前时间戳
+        mongo_docs = []
         for crypto in scraped_data:
             try:
                 # 使用当前时间作为timestamp，确保数据的时效性
                 crypto.timestamp = datetime.now()
-                mongo_data = crypto.to_mongo_dict()
+                mongo_docs.append(crypto.to_mongo_dict())
+            except Exception as e:
+                print(f"❌ 数据序列化失败 {crypto.symbol}: {e}")
 
-                result = crypto_manager.collection.update_one(
-                    {"id": crypto.id}, {"$set": mongo_data}, upsert=True
-                )
+        # 批量 upsert，一次往返写入整页数据
+        result = crypto_manager.upsert_crypto_data(mongo_docs)
+        saved_count = result["inserted"] + result["modified"]
 
-                if result.upserted_id or result.modified_count > 0:
-                    saved_count += 1
+        print(f"✅ 实际保存: {saved_count}条数据")
+        if result.get("failed"):
+            print(f"⚠️  {result['failed']}条数据写入失败（见上方日志），其余数据已保存")
 
-            except Exception as e:
-                print(f"❌ 保存数据失败 {crypto.symbol}: {e}")
+        # 刷新内存中的列式行情快照（供服务端分析使用）
+        previous = market_store.get_snapshot(load=False)
+        snapshot = market_store.refresh(scraped_data, global_data=global_data)
+        print(f"📈 行情快照已刷新: {len(snapshot)}个币种 (代际 {snapshot.generation})")
 
-        print(f"✅ 实际保存: {saved_count}条数据")
+        # 按订阅房间推送相对上一轮的增量
+        try:
+            sent = broadcast_market(snapshot, previous)
+            if sent is not None:
+                print(f"📡 行情增量已推送: {market_feed.last_stats}，房间 {sent}")
+        except Exception as e:
+            print(f"⚠️  推送行情增量失败: {e}")
+
+        # 保存快照历史并增量更新技术指标
+        try:
+            history_days = _app_config.get("MARKET_HISTORY_DAYS", 7) if _app_config else 7
+            snapshot_manager = MarketSnapshotManager()
+            snapshot_manager.save_snapshot(snapshot.to_history_doc())
+            snapshot_manager.delete_old_snapshots(days=history_days)
+            updated = indicator_engine.update(snapshot)
+            correlation_tracker.push(snapshot)
+            print(f"📐 技术指标已更新: {updated}个币种")
+        except Exception as e:
+            print(f"⚠️  更新技术指标失败: {e}")
+
+        try:
+            search_index.update_cryptos(snapshot)
+        except Exception as e:
+            print(f"⚠️  更新搜索索引失败: {e}")
+
+        # 评估告警规则并推送触发的告警
+        try:
+            result = alert_engine.evaluate(snapshot)
+            if result["total"]:
+                rules = push_alerts(result)
+                log_and_emit(
+                    f"🔔 触发 {result['total']} 条告警 (推送 {len(result['alerts'])} 条到 {rules} 个规则房间, "
+                    f"耗时 {alert_engine.last_duration_ms:.1f}ms)",
+                    "warning",
+                )
+        except Exception as e:
+            print(f"⚠️  评估告警规则失败: {e}")
 
         # 验证数据库中的记录数
-        total_in_db = crypto_manager.collection.count_documents({})
+        total_in_db = crypto_manager.count()
         print(f"📊 数据库总记录数: {total_in_db}条")
 
         return saved_count
@@ -262,6 +306,7 @@ def _save_scraped_data(scraped_data, start_time):
         return 0
 
 
+@log_stream.scope("coingecko")
 def scrape_crypto_data_and_reschedule_scheduled():
     """定时调度的爬取任务"""
     scrape_crypto_data()
@@ -362,12 +407,14 @@ def start_tokenomist_scraping_jobs(app):
         schedule_next_tokenomist_scrape()
 
 
+@log_stream.scope("tokenomist")
 def scrape_tokenomist_data_and_reschedule():
     """执行一次 Tokenomist 爬取并调度下一次"""
     scrape_tokenomist_data()
     schedule_next_tokenomist_scrape()
 
 
+@log_stream.scope("tokenomist")
 def scrape_tokenomist_data():
     """Tokenomist 代币解锁爬取任务（调用 Playwright 脚本）"""
     start_time = datetime.now()
@@ -395,13 +442,15 @@ def scrape_tokenomist_data():
             # 传入 should_stop 回调，使运行中的任务也能及时退出
             asyncio.run(
                 TokenomistScraper(
-                    should_stop=lambda: _scraper_stop_flags.get("tokenomist", False)
+                    should_stop=lambda: _scraper_stop_flags.get("tokenomist", False),
+                    backend=get_backend(),
                 ).run()
             )
             log_and_emit("✅ Tokenomist 爬取任务完成", "success")
 
     except Exception as e:
         log_and_emit(f"❌ Tokenomist 爬取失败: {e}", "error")
+        scraper_states.record_error("tokenomist", e)
 
 
 def schedule_next_tokenomist_scrape():
@@ -450,6 +499,93 @@ def schedule_next_tokenomist_scrape():
         log_and_emit(f"❌ 调度下一次 Tokenomist 爬取失败: {e}", "error")
 
 
+def run_parquet_export():
+    """定时增量导出 Parquet 文件"""
+    try:
+        if not _app_instance:
+            print("❌ 应用实例未设置")
+            return
+
+        with _app_instance.app_context():
+            from ..database.export import ParquetExporter
+
+            exporter = ParquetExporter(
+                get_backend(),
+                output_dir=_app_config.get("EXPORT_DIR", "data/exports"),
+                batch_size=_app_config.get("EXPORT_BATCH_SIZE", 5000),
+            )
+            results = exporter.export_all()
+            total = sum(r["rows"] for r in results)
+            log_and_emit(f"📦 Parquet 增量导出完成: {total} 行", "success")
+
+    except Exception as e:
+        log_and_emit(f"❌ Parquet 导出失败: {e}", "error")
+
+
+def start_export_jobs(app):
+    """启动定时 Parquet 增量导出任务"""
+    set_app_instance(app)
+
+    interval = app.config.get("EXPORT_INTERVAL", 3600)
+    scheduler.add_job(
+        func=run_parquet_export,
+        trigger="interval",
+        seconds=interval,
+        id="parquet_export_scheduled",
+        name="定时 Parquet 增量导出",
+        replace_existing=True,
+    )
+    print(f"📦 Parquet 导出任务已启动 (间隔: {interval // 60}分钟)")
+
+
+def run_schema_migration():
+    """后台迁移旧结构的投资者文档（每次运行处理有限批次）"""
+    try:
+        if not _app_instance:
+            print("❌ 应用实例未设置")
+            return
+
+        with _app_instance.app_context():
+            from ..database.migrations import InvestorSchemaMigrator
+
+            migrator = InvestorSchemaMigrator(
+                get_backend(),
+                batch_size=_app_config.get("MIGRATION_BATCH_SIZE", 200),
+                pause=_app_config.get("MIGRATION_BATCH_PAUSE", 1.0),
+            )
+            totals = migrator.run(max_batches=_app_config.get("MIGRATION_BATCHES_PER_RUN", 10))
+            if totals["migrated"]:
+                log_and_emit(
+                    f"🔧 投资者文档结构迁移: {totals['migrated']} 个, 剩余 {totals['remaining']} 个 "
+                    f"({totals['bytes_before'] / 1024:.1f} KB -> {totals['bytes_after'] / 1024:.1f} KB)",
+                    "info",
+                )
+            if not totals["remaining"]:
+                # 全部迁移完成后移除任务
+                if scheduler.get_job("schema_migration"):
+                    scheduler.remove_job("schema_migration")
+                print("✅ 投资者文档结构迁移已完成")
+
+    except Exception as e:
+        log_and_emit(f"❌ 投资者文档结构迁移失败: {e}", "error")
+
+
+def start_migration_jobs(app):
+    """启动后台结构迁移任务"""
+    set_app_instance(app)
+
+    interval = app.config.get("MIGRATION_INTERVAL", 300)
+    scheduler.add_job(
+        func=run_schema_migration,
+        trigger="interval",
+        seconds=interval,
+        id="schema_migration",
+        name="投资者文档结构迁移",
+        replace_existing=True,
+    )
+    print(f"🔧 结构迁移任务已启动 (间隔: {interval // 60}分钟)")
+
+
 # 保持原有的统一启动方法以兼容旧接口
 def start_scraping_jobs(app):
     """启动所有爬虫定时任务"""
@@ -459,12 +595,84 @@ def start_scraping_jobs(app):
     # start_tokenomist_scraping_jobs(app)
 
 
+# 爬虫控制（由 /scraper 接口或集群命令队列调用，只在持有调度器的进程中执行）
+
+
+def describe_jobs():
+    """本进程调度器中的任务（id、名称、下次运行时间）"""
+    return [
+        {
+            "id": job.id,
+            "name": job.name,
+            "next_run": job.next_run_time.isoformat() if job.next_run_time else None,
+        }
+        for job in scheduler.get_jobs()
+    ]
+
+
+def scraper_status(scraper_type, jobs=None):
+    """爬虫运行状态（jobs 为 describe_jobs 的结果，默认读取本进程调度器）"""
+    jobs = describe_jobs() if jobs is None else jobs
+    active_jobs = [job for job in jobs if is_scraper_job(job["id"], scraper_type)]
+    return {
+        "running": len(active_jobs) > 0,
+        "active_jobs": len(active_jobs),
+        "next_run": active_jobs[0]["next_run"] if active_jobs else None,
+        "scraper_type": scraper_type,
+    }
+
+
+def start_scraper(app, scraper_type):
+    """启动特定爬虫，返回 {success, message}"""
+    if scraper_states.get(scraper_type)["running"]:
+        return {"success": False, "message": f"{scraper_type} 爬虫已经在运行中"}
+
+    starters = {
+        "coingecko": start_crypto_scraping_jobs,
+        "dropstab": start_investor_scraping_jobs,
+        "tokenomist": start_tokenomist_scraping_jobs,
+    }
+    starters[scraper_type](app)
+    return {"success": True, "message": f"{scraper_type} 爬虫已启动"}
+
+
+def stop_scraper(scraper_type):
+    """设置停止标志并移除爬虫相关任务，返回 {success, message}"""
+    set_scraper_stop_flag(scraper_type, True)
+
+    removed_count = 0
+    for job in scheduler.get_jobs():
+        if is_scraper_job(job.id, scraper_type):
+            scheduler.remove_job(job.id)
+            removed_count += 1
+    return {
+        "success": True,
+        "message": f"{scraper_type} 爬虫停止信号已发送，移除了 {removed_count} 个任务",
+    }
+
+
+def run_scraper_once(app):
+    """添加一次性加密货币爬取任务，返回 {success, message}"""
+    set_app_instance(app)
+    scheduler.add_job(
+        func=scrape_crypto_data,
+        trigger="date",
+        run_date=datetime.now(),
+        id=f"crypto_scraper_manual_{datetime.now().timestamp()}",
+        name="手动加密货币数据爬取",
+        replace_existing=False,
+    )
+    return {"success": True, "message": "手动爬取任务已启动"}
+
+
+@log_stream.scope("dropstab")
 def scrape_investor_data_and_reschedule():
     """爬取投资者数据并重新调度"""
     scrape_investor_data()
     schedule_next_investor_scrape()
 
 
+@log_stream.scope("dropstab")
 def scrape_investor_data():
     """执行一次 DropsTab 投资者数据爬取"""
     start_time = datetime.now()
@@ -486,7 +694,9 @@ def scrape_investor_data():
             if _app_config:
                 max_pages = _app_config.get("INVESTOR_MAX_PAGES", None)
 
-            scraper = DropstabScraper()
+            scraper = DropstabScraper(
+                on_page=lambda page, total: scraper_states.progress("dropstab", page, total)
+            )
             if max_pages is not None:
                 log_and_emit(f"🚀 正在爬取投资者数据（最多 {max_pages} 页）...", "info")
                 scraper.scrape_investors_data(max_pages=max_pages)
@@ -496,8 +706,15 @@ def scrape_investor_data():
 
             log_and_emit("✅ 投资者数据爬取完成", "success")
 
+            try:
+                stats = search_index.refresh_investors()
+                print(f"🔎 搜索索引已更新: {stats}")
+            except Exception as e:
+                print(f"⚠️  更新搜索索引失败: {e}")
+
     except Exception as e:
         log_and_emit(f"❌ 投资者数据爬取失败: {e}", "error")
+        scraper_states.record_error("dropstab", e)
 
 
 def schedule_next_investor_scrape():
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+爬虫状态机
+
+每个爬虫的状态保存在内存中，由 APScheduler 任务事件和爬取过程驱动，查询时不再
+遍历调度器任务：
+
+    idle ──任务加入──▶ scheduled ──任务开始执行──▶ running ──执行结束──▶ scheduled / idle
+                          ▲                                             （仍有待执行任务时为 scheduled）
+                          └──────────────────── 停止（移除全部任务）──▶ idle
+
+状态字段：state、running（state 不是 idle，兼容旧接口）、current_page / total_pages、
+started_at、last_finished_at、last_duration（秒）、last_error / last_error_at、next_run、
+active_jobs、runs、failures。
+每次变化递增 version 并通过 Socket.IO 'scraper_status' 事件推送该爬虫的状态；
+集群模式下调度进程的同步线程把状态写入 cluster_state，其他进程据此响应查询。
+"""
+
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from apscheduler.events import (
+    EVENT_ALL_JOBS_REMOVED, EVENT_JOB_ADDED, EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_MAX_INSTANCES,
+    EVENT_JOB_MISSED, EVENT_JOB_MODIFIED, EVENT_JOB_REMOVED, EVENT_JOB_SUBMITTED,
+)
+
+SCRAPER_TYPES = ('coingecko', 'dropstab', 'tokenomist')
+# 任务 id 前缀（CoinGecko / DropsTab 的任务以数据类型命名）
+SCRAPER_JOB_PREFIXES = {
+    'coingecko': 'crypto_scraper',
+    'dropstab': 'investor_scraper',
+    'tokenomist': 'tokenomist_scraper',
+}
+
+IDLE = 'idle'
+SCHEDULED = 'scheduled'
+RUNNING = 'running'
+
+JOB_EVENTS = (
+    EVENT_JOB_ADDED | EVENT_JOB_MODIFIED | EVENT_JOB_REMOVED | EVENT_ALL_JOBS_REMOVED
+    | EVENT_JOB_SUBMITTED | EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED | EVENT_JOB_MAX_INSTANCES
+)
+
+
+def is_scraper_job(job_id: str, scraper_type: str) -> bool:
+    job_id = job_id.lower()
+    prefix = SCRAPER_JOB_PREFIXES.get(scraper_type)
+    return scraper_type in job_id or (prefix is not None and job_id.startswith(prefix))
+
+
+def scraper_of_job(job_id: Optional[str]) -> Optional[str]:
+    """任务所属的爬虫类型（非爬虫任务返回 None）"""
+    if not job_id:
+        return None
+    for scraper_type in SCRAPER_TYPES:
+        if is_scraper_job(job_id, scraper_type):
+            return scraper_type
+    return None
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+class ScraperStatusBoard:
+    """各爬虫的状态与变化通知"""
+
+    def __init__(self, scraper_types=()):
+        self._lock = threading.RLock()
+        self._states: Dict[str, Dict[str, Any]] = {}
+        self._running_jobs: Dict[str, datetime] = {}
+        self._job_next: Dict[str, Optional[datetime]] = {}
+        self.scheduler = None
+        self.socketio = None
+        self.version = 0
+        for scraper_type in scraper_types:
+            self._states[scraper_type] = self._initial(scraper_type)
+
+    @staticmethod
+    def _initial(scraper_type: str) -> Dict[str, Any]:
+        return {
+            'scraper_type': scraper_type,
+            'state': IDLE,
+            'running': False,
+            'current_page': None,
+            'total_pages': None,
+            'started_at': None,
+            'last_finished_at': None,
+            'last_duration': None,
+            'last_error': None,
+            'last_error_at': None,
+            'next_run': None,
+            'active_jobs': 0,
+            'runs': 0,
+            'failures': 0,
+            'updated_at': None,
+            'version': 0,
+        }
+
+    # ---- 状态读取 ----
+
+    def get(self, scraper_type: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            state = self._states.get(scraper_type)
+            return dict(state) if state else None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """全部爬虫的状态 {version, scrapers: {类型: 状态}}"""
+        with self._lock:
+            return {'version': self.version, 'scrapers': {k: dict(v) for k, v in self._states.items()}}
+
+    # ---- 状态变化 ----
+
+    def _update(self, scraper_type: str, **fields):
+        """写入字段；有变化时递增 version 并推送"""
+        with self._lock:
+            state = self._states.get(scraper_type)
+            if state is None:
+                state = self._states[scraper_type] = self._initial(scraper_type)
+            changed = {k: v for k, v in fields.items() if state.get(k) != v}
+            if not changed:
+                return
+            state.update(changed)
+            state['running'] = state['state'] != IDLE
+            state['updated_at'] = datetime.now().isoformat()
+            self.version += 1
+            state['version'] = self.version
+            payload = dict(state)
+        if self.socketio is not None:
+            try:
+                self.socketio.emit('scraper_status', payload)
+            except Exception as e:
+                print(f"推送爬虫状态失败: {e}")
+
+    def progress(self, scraper_type: str, page: int, total: Optional[int] = None):
+        """爬取进度（当前页 / 总页数），上报进度说明爬虫正在执行"""
+        self._update(scraper_type, state=RUNNING, current_page=page, total_pages=total)
+
+    def record_error(self, scraper_type: str, error: Any):
+        """记录一次失败（爬虫函数内部捕获的异常不会触发 APScheduler 的 JOB_ERROR）"""
+        self._update(scraper_type, **self._error_fields(scraper_type, error))
+
+    def _error_fields(self, scraper_type: str, error: Any) -> Dict[str, Any]:
+        with self._lock:
+            failures = self._states.get(scraper_type, {}).get('failures', 0) + 1
+        return {'last_error': str(error), 'last_error_at': datetime.now().isoformat(), 'failures': failures}
+
+    # ---- APScheduler 事件 ----
+
+    def attach(self, scheduler, socketio=None):
+        """监听调度器任务事件，并按当前任务初始化状态"""
+        self.scheduler = scheduler
+        self.socketio = socketio
+        scheduler.add_listener(self._on_job_event, JOB_EVENTS)
+        with self._lock:
+            for job in scheduler.get_jobs():
+                self._job_next[job.id] = job.next_run_time
+        for scraper_type in list(self._states):
+            self._sync_jobs(scraper_type)
+
+    def _job_fields(self, scraper_type: str) -> Dict[str, Any]:
+        """按调度器中该爬虫的待执行任务和正在执行的任务得出 state 与 next_run"""
+        jobs = []
+        if self.scheduler is not None:
+            jobs = [job for job in self.scheduler.get_jobs() if is_scraper_job(job.id, scraper_type)]
+        next_runs = sorted(job.next_run_time for job in jobs if job.next_run_time)
+        with self._lock:
+            running = any(scraper_of_job(job_id) == scraper_type for job_id in self._running_jobs)
+        state = RUNNING if running else SCHEDULED if jobs else IDLE
+        fields = {'state': state, 'next_run': _isoformat(next_runs[0]) if next_runs else None,
+                  'active_jobs': len(jobs)}
+        if state == IDLE:
+            fields.update(current_page=None, total_pages=None)
+        return fields
+
+    def _sync_jobs(self, scraper_type: str):
+        self._update(scraper_type, **self._job_fields(scraper_type))
+
+    def _on_job_event(self, event):
+        job_id = getattr(event, 'job_id', None)
+        if event.code == EVENT_ALL_JOBS_REMOVED:
+            with self._lock:
+                self._job_next.clear()
+            for scraper_type in list(self._states):
+                self._sync_jobs(scraper_type)
+            return
+        scraper_type = scraper_of_job(job_id)
+        if scraper_type is None:
+            return
+
+        now = datetime.now()
+        fields = {}
+        with self._lock:
+            if event.code in (EVENT_JOB_ADDED, EVENT_JOB_MODIFIED):
+                job = self.scheduler.get_job(job_id) if self.scheduler is not None else None
+                self._job_next[job_id] = job.next_run_time if job else None
+            elif event.code == EVENT_JOB_REMOVED:
+                # 一次性任务提交执行后立即被移除，且 REMOVED 事件先于 SUBMITTED 分发：
+                # 到期的任务被移除时已经开始执行
+                next_run = self._job_next.pop(job_id, None)
+                if next_run is not None and next_run <= datetime.now(next_run.tzinfo):
+                    self._running_jobs.setdefault(job_id, now)
+            elif event.code == EVENT_JOB_SUBMITTED:
+                self._running_jobs.setdefault(job_id, now)
+            elif event.code in (EVENT_JOB_EXECUTED, EVENT_JOB_ERROR, EVENT_JOB_MISSED, EVENT_JOB_MAX_INSTANCES):
+                started = self._running_jobs.pop(job_id, None)
+                if event.code in (EVENT_JOB_EXECUTED, EVENT_JOB_ERROR):
+                    # 进度在执行结束时清空（执行线程可能先于 SUBMITTED 事件上报第一页）
+                    fields = {'last_finished_at': now.isoformat(), 'runs': self._states[scraper_type]['runs'] + 1,
+                              'current_page': None, 'total_pages': None}
+                    if started is not None:
+                        fields['last_duration'] = round((now - started).total_seconds(), 3)
+            if self._running_jobs.get(job_id) == now:
+                fields['started_at'] = now.isoformat()
+        if event.code == EVENT_JOB_ERROR:
+            fields.update(self._error_fields(scraper_type, event.exception))
+        fields.update(self._job_fields(scraper_type))
+        self._update(scraper_type, **fields)
+
+
+scraper_states = ScraperStatusBoard(SCRAPER_TYPES)
@@ -11,22 +11,51 @@ playwright install chromium
 - 使用 Playwright 处理 JavaScript 动态渲染
 - 遵守 robots.txt 规则 (Allow: /*)
 - 通过 DOM 解析提取数据，避免直接调用 API
+- Playwright 在开始爬取时才导入，未安装时不影响导入本模块
 """
 
+from __future__ import annotations
+
 import asyncio
 import re
-import csv
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Any, Optional, Callable
-from playwright.async_api import async_playwright, Browser, Page
-import pymongo
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Callable
 from pymongo import MongoClient
 import os
 from dotenv import load_dotenv
 
+try:
+    from ..database.backends import MongoBackend
+    from ..database.db import TokenUnlockManager
+    from .unlock_archive import UnlockArchive
+    from ..utils.parsers import TOKEN_UNLOCK_NUMERIC_FIELDS, parse_token_unlock_fields
+except ImportError:
+    # 作为独立脚本运行时
+    from backend.database.backends import MongoBackend
+    from backend.database.db import TokenUnlockManager
+    from backend.scrapers.unlock_archive import UnlockArchive
+    from backend.utils.parsers import TOKEN_UNLOCK_NUMERIC_FIELDS, parse_token_unlock_fields
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, Page
+
+# 入库时生成的类型化字段
+TYPED_FIELDS = tuple(f'{f}_value' for f in TOKEN_UNLOCK_NUMERIC_FIELDS) + (
+    'unlock_amount_unit', 'unlock_at', 'unlock_usd_value'
+)
+
 # 加载环境变量
 load_dotenv()
 
+
+def _load_playwright():
+    """延迟导入 Playwright（启动浏览器前才需要）"""
+    try:
+        from playwright.async_api import async_playwright
+    except ImportError as e:
+        raise RuntimeError('Tokenomist 爬虫需要 Playwright，请先执行: pip install playwright && playwright install chromium') from e
+    return async_playwright
+
 class TokenUnlockData:
     """代币解锁数据模型"""
     
@@ -44,6 +73,8 @@ class TokenUnlockData:
             self.next_7d_emission = data.get('next_7d_emission', '')
             self.source = data.get('source', 'tokenomist.ai')
             self.timestamp = data.get('timestamp', datetime.utcnow())
+            # 类型化字段（缺失时从原始文本解析）
+            self.typed = {k: data[k] for k in TYPED_FIELDS if k in data} or parse_token_unlock_fields(data)
         else:
             self.token_name = ''
             self.unlock_time = ''
@@ -55,6 +86,7 @@ class TokenUnlockData:
             self.circulating_supply = ''
             self.released_percentage = ''
             self.next_7d_emission = ''
+            self.typed = {k: None for k in TYPED_FIELDS}
             self.source = 'tokenomist.ai'
             self.timestamp = datetime.utcnow()
     
@@ -72,13 +104,14 @@ class TokenUnlockData:
             'released_percentage': self.released_percentage,
             'next_7d_emission': self.next_7d_emission,
             'source': self.source,
-            'timestamp': self.timestamp
+            'timestamp': self.timestamp,
+            **self.typed
         }
 
 class TokenomistScraper:
     """Tokenomist.ai 爬虫类"""
     
-    def __init__(self, should_stop: Optional[Callable[[], bool]] = None):
+    def __init__(self, should_stop: Optional[Callable[[], bool]] = None, backend=None):
         self.base_url = "https://tokenomist.ai/"
         self.alt_base_urls = ["https://www.tokenomist.ai/"]
         self.user_agent = (
@@ -101,6 +134,10 @@ class TokenomistScraper:
         # 停止回调（默认始终返回 False）
         self.should_stop = should_stop or (lambda: False)
 
+        # 存储后端（未传入时在 run() 中自行连接 MongoDB）
+        self.backend = backend
+        self._owns_connection = backend is None
+
         # Mongo 相关
         self.client: Optional[MongoClient] = None
         self.db = None
@@ -153,13 +190,9 @@ class TokenomistScraper:
             self.client.admin.command('ping')
             print("✓ MongoDB 连接成功")
             
-            # 创建索引以提高查询性能
-            self.collection.create_index([
-                ('token_name', pymongo.ASCENDING),
-                ('timestamp', pymongo.DESCENDING)
-            ])
-            self.collection.create_index('unlock_time')
-            self.collection.create_index('source')
+            # 包装为存储后端，并创建索引以提高查询性能
+            self.backend = MongoBackend(db=self.db)
+            self.backend.create_indexes()
             
         except Exception as e:
             print(f"✗ MongoDB 连接失败: {e}")
@@ -425,6 +458,8 @@ class TokenomistScraper:
                         'source': 'tokenomist.ai',
                         'timestamp': datetime.utcnow()
                     }
+                    # 入库前解析数值、单位和解锁时间，原始文本保持不变
+                    token_data.update(parse_token_unlock_fields(token_data))
                     
                     # 只要有项目名就记录
                     if token_name:
@@ -443,6 +478,7 @@ class TokenomistScraper:
     
     async def scrape_with_retry(self) -> List[Dict[str, Any]]:
         """带重试机制的爬取方法"""
+        async_playwright = _load_playwright()
         for attempt in range(self.max_retries):
             # 开始尝试前检查停止信号
             if self.should_stop():
@@ -559,130 +595,71 @@ class TokenomistScraper:
                 token_unlock_docs.append(token_unlock.to_dict())
             
             # 批量 upsert，使用简化的去重策略：仅 source + token_name
-            ops = []
+            upsert_docs = []
             for doc in token_unlock_docs:
-                # 去重策略：只使用 source 和 token_name
-                filter_doc = {
+                upsert_docs.append({
+                    # 去重键
                     'source': doc.get('source', 'tokenomist.ai'),
                     'token_name': doc.get('token_name', '').strip(),  # 去除空格
-                }
-                
-                update_doc = {
-                    '$set': {
-                        # 即将解锁相关字段
-                        'unlock_time': doc.get('unlock_time', ''),
-                        'unlock_amount': doc.get('unlock_amount', ''),
-                        'unlock_percentage': doc.get('unlock_percentage', ''),
-                        # 其他字段
-                        'current_price': doc.get('current_price', ''),
-                        'price_change_24h': doc.get('price_change_24h', ''),
-                        'market_cap': doc.get('market_cap', ''),
-                        'circulating_supply': doc.get('circulating_supply', ''),
-                        'released_percentage': doc.get('released_percentage', ''),
-                        'next_7d_emission': doc.get('next_7d_emission', ''),
-                        'timestamp': doc.get('timestamp', datetime.utcnow()),
-                    }
-                }
-                ops.append(pymongo.UpdateOne(filter_doc, update_doc, upsert=True))
+                    # 即将解锁相关字段
+                    'unlock_time': doc.get('unlock_time', ''),
+                    'unlock_amount': doc.get('unlock_amount', ''),
+                    'unlock_percentage': doc.get('unlock_percentage', ''),
+                    # 其他字段
+                    'current_price': doc.get('current_price', ''),
+                    'price_change_24h': doc.get('price_change_24h', ''),
+                    'market_cap': doc.get('market_cap', ''),
+                    'circulating_supply': doc.get('circulating_supply', ''),
+                    'released_percentage': doc.get('released_percentage', ''),
+                    'next_7d_emission': doc.get('next_7d_emission', ''),
+                    'timestamp': doc.get('timestamp', datetime.utcnow()),
+                    # 类型化字段，用于数值排序和区间查询
+                    **{k: doc.get(k) for k in TYPED_FIELDS},
+                })
             
-            if not ops:
+            if not upsert_docs:
                 print("⚠️ 无可写入操作")
                 return False
             
-            result = self.collection.bulk_write(ops, ordered=False)
-            upserted = result.upserted_count
-            modified = result.modified_count
-            matched = result.matched_count
-            print(f"✓ 去重写入完成：upsert={upserted}, modified={modified}, matched={matched}")
+            result = TokenUnlockManager(self.backend).upsert_unlocks(upsert_docs)
+            print(f"✓ 去重写入完成：upsert={result['inserted']}, modified={result['modified']}, matched={result['matched']}")
             return True
         
         except Exception as e:
-            print(f"✗ 保存到 MongoDB 失败: {e}")
+            print(f"✗ 保存到数据库失败: {e}")
             return False
     
-    def save_to_csv(self, data_list: List[Dict[str, Any]], archive_dir: str = 'data/archives') -> bool:
-        """保存数据到 CSV 文件（按时间命名存档）"""
+    def save_to_archive(self, data_list: List[Dict[str, Any]], archive_dir: str = 'data/archives', keep_days: int = 30) -> bool:
+        """追加到按天分区的列式归档，原子更新最新快照，并按索引清理旧分区"""
         if not data_list:
-            print("⚠️ 无数据需要保存到CSV")
+            print("⚠️ 无数据需要归档")
             return False
         
         try:
-            # 创建存档目录
-            os.makedirs(archive_dir, exist_ok=True)
-            
-            # 生成时间戳文件名
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f'tokenomist_unlocks_{timestamp}.csv'
-            filepath = os.path.join(archive_dir, filename)
-            
-            # 保存到时间戳文件
-            with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-                if data_list:
-                    fieldnames = data_list[0].keys()
-                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                    
-                    # 写入表头
-                    writer.writeheader()
-                    
-                    # 写入数据
-                    writer.writerows(data_list)
-            
-            print(f"✓ 数据已存档到: {filepath}")
-            
-            # 同时保存到根目录的最新文件（保持向后兼容）
-            latest_filename = 'token_unlocks.csv'
-            with open(latest_filename, 'w', newline='', encoding='utf-8') as csvfile:
-                if data_list:
-                    fieldnames = data_list[0].keys()
-                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                    writer.writeheader()
-                    writer.writerows(data_list)
+            archive = UnlockArchive(archive_dir, latest_path='token_unlocks.csv')
+            stats = archive.append(data_list)
+            archive.write_latest(data_list)
+            if stats['written']:
+                print(f"✓ 已追加归档: {stats['written']} 行, {stats['bytes']} 字节")
+            else:
+                print("✓ 数据与上一轮相同，跳过归档写入")
             
-            print(f"✓ 最新数据已保存到: {latest_filename}")
+            for filename in archive.prune(keep_days):
+                print(f"🗑️ 已清理旧分区: {filename}")
             return True
         
         except Exception as e:
-            print(f"✗ 保存到 CSV 失败: {e}")
-            return False
-
-    def save_to_csv_with_cleanup(self, data_list: List[Dict[str, Any]], archive_dir: str = 'data/archives', keep_days: int = 30) -> bool:
-        """保存数据到 CSV 文件并清理旧文件"""
-        if not self.save_to_csv(data_list, archive_dir):
+            print(f"✗ 保存归档失败: {e}")
             return False
-        
-        try:
-            # 清理超过指定天数的旧文件
-            import time
-            current_time = time.time()
-            cutoff_time = current_time - (keep_days * 24 * 60 * 60)
-            
-            if os.path.exists(archive_dir):
-                for filename in os.listdir(archive_dir):
-                    if filename.startswith('tokenomist_unlocks_') and filename.endswith('.csv'):
-                        filepath = os.path.join(archive_dir, filename)
-                        file_time = os.path.getctime(filepath)
-                        
-                        if file_time < cutoff_time:
-                            os.remove(filepath)
-                            print(f"🗑️ 已清理旧文件: {filename}")
-            
-            return True
-        
-        except Exception as e:
-            print(f"⚠️ 清理旧文件时出错: {e}")
-            return True  # 保存成功，清理失败不影响主要功能
-        
-        except Exception as e:
-            print(f"⚠️ 清理旧文件时出错: {e}")
-            return True  # 保存成功，清理失败不影响主要功能
 
     async def run(self):
         """主运行方法"""
         print("🚀 Tokenomist.ai 代币解锁信息爬虫启动")
         print("=" * 50)
         
-        # 连接数据库
-        self.connect_to_mongodb()
+        # 连接数据库（已传入存储后端时直接复用）
+        if self._owns_connection:
+            self.connect_to_mongodb()
         
         try:
             # 执行爬取
@@ -692,8 +669,8 @@ class TokenomistScraper:
                 # 保存到 MongoDB
                 self.save_to_mongodb(data)
                 
-                # 保存到 CSV 存档（带自动清理）
-                self.save_to_csv_with_cleanup(data, archive_dir='data/archives', keep_days=30)
+                # 保存到列式归档（带自动清理）
+                self.save_to_archive(data, archive_dir='data/archives', keep_days=30)
                 
                 print(f"🎉 爬取完成！获取 {len(data)} 条代币解锁信息")
             else:
@@ -701,7 +678,8 @@ class TokenomistScraper:
         
         finally:
             # 关闭数据库连接
-            self.close_mongodb_connection()
+            if self._owns_connection:
+                self.close_mongodb_connection()
 
 # 独立运行脚本
 async def main():
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tokenomist 代币解锁列式归档
+
+按天分区的只追加压缩归档：
+- 每天一个文件 unlocks-YYYY-MM-DD.col.gz，每次爬取追加一个独立的 gzip 成员
+  （一行 JSON，按列存储，数值列为 float，时间列为 epoch 秒）
+- 与当天上一次爬取相比未变化的列只记录列名，不重复写入
+- index.json 记录每个分区的运行次数、行数、时间范围和已提交的字节数，用于按时间裁剪与清理；
+  先追加 gzip 成员、后写索引，进程在两者之间退出时留下的未提交成员在下次追加前截掉，
+  读取时也只读到已提交的字节数，因此 "未变化的列" 始终相对索引记录的上一轮
+- 最新快照 token_unlocks.csv 通过临时文件 + os.replace 原子替换
+"""
+
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..utils.parsers import parse_datetime, parse_token_unlock_fields
+
+INDEX_FILE = 'index.json'
+
+# 字段 -> 列类型
+COLUMNS = {
+    'token_name': 'str',
+    'current_price': 'float',
+    'price_change_24h': 'float',
+    'market_cap': 'float',
+    'circulating_supply': 'float',
+    'released_percentage': 'float',
+    'unlock_amount': 'float',
+    'unlock_amount_unit': 'str',
+    'unlock_percentage': 'float',
+    'unlock_time': 'epoch',
+    'next_7d_emission': 'float',
+}
+
+
+def _epoch(value: Optional[datetime]) -> Optional[int]:
+    if value is None:
+        return None
+    return int(value.replace(tzinfo=timezone.utc).timestamp())
+
+
+def _to_columns(data_list: List[Dict[str, Any]]) -> Dict[str, list]:
+    """行数据 -> 带类型的列（优先使用入库时已解析的类型化字段）"""
+    columns = {name: [] for name in COLUMNS}
+    for row in data_list:
+        typed = row if 'unlock_at' in row else {**row, **parse_token_unlock_fields(row)}
+        for name, kind in COLUMNS.items():
+            if kind == 'float':
+                value = typed.get(f'{name}_value')
+            elif kind == 'epoch':
+                value = _epoch(typed.get('unlock_at'))
+            else:
+                value = typed.get(name) or None
+            columns[name].append(value)
+    return columns
+
+
+def _digest(values: list) -> str:
+    return hashlib.sha1(json.dumps(values, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+
+def _write_atomic(path: str, write_func, mode='w'):
+    tmp_path = f'{path}.tmp'
+    kwargs = {'encoding': 'utf-8', 'newline': ''} if 'b' not in mode else {}
+    with open(tmp_path, mode, **kwargs) as f:
+        write_func(f)
+    os.replace(tmp_path, path)
+
+
+def _truncate_uncommitted(path: str, committed: int) -> bool:
+    """截掉索引未记录的尾部数据，返回文件内容是否与索引一致"""
+    if not os.path.exists(path):
+        return committed == 0
+    size = os.path.getsize(path)
+    if size > committed:
+        with open(path, 'r+b') as f:
+            f.truncate(committed)
+        print(f"⚠️  归档 {os.path.basename(path)} 末尾有 {size - committed} 字节未提交的数据，已截掉")
+        return True
+    return size == committed
+
+
+class UnlockArchive:
+    """按天分区的代币解锁列式归档"""
+
+    def __init__(self, archive_dir: str = 'data/archives', latest_path: str = 'token_unlocks.csv'):
+        self.archive_dir = archive_dir
+        self.latest_path = latest_path
+        self.index_path = os.path.join(archive_dir, INDEX_FILE)
+
+    # ---- 索引 ----
+
+    def load_index(self) -> Dict[str, Any]:
+        if not os.path.exists(self.index_path):
+            return {'partitions': {}, 'last': None}
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_index(self, index: Dict[str, Any]):
+        _write_atomic(self.index_path, lambda f: json.dump(index, f, ensure_ascii=False, indent=1))
+
+    # ---- 写入 ----
+
+    def append(self, data_list: List[Dict[str, Any]], run_time: Optional[datetime] = None) -> Dict[str, Any]:
+        """追加一次爬取结果，返回本次写入统计"""
+        if not data_list:
+            return {'written': 0, 'bytes': 0}
+
+        os.makedirs(self.archive_dir, exist_ok=True)
+        run_time = run_time or datetime.now(timezone.utc)
+        if run_time.tzinfo is None:
+            run_time = run_time.replace(tzinfo=timezone.utc)
+        date = run_time.strftime('%Y-%m-%d')
+        filename = f'unlocks-{date}.col.gz'
+
+        index = self.load_index()
+        path = os.path.join(self.archive_dir, filename)
+        partition = index['partitions'].get(date)
+        committed = partition['bytes'] if partition else 0
+        consistent = _truncate_uncommitted(path, committed)
+        if not consistent:
+            # 文件比索引记录的短（被外部改动）：以实际大小为准，本次写入完整的列
+            committed = os.path.getsize(path) if os.path.exists(path) else 0
+            if partition:
+                partition['bytes'] = committed
+        last = index.get('last') or {}
+        same_day = consistent and last.get('date') == date
+        previous_hashes = last.get('hashes', {}) if same_day else {}
+
+        columns = _to_columns(data_list)
+        hashes = {name: _digest(values) for name, values in columns.items()}
+        changed = {name: values for name, values in columns.items() if previous_hashes.get(name) != hashes[name]}
+
+        if same_day and not changed:
+            # 与上一轮完全相同，只更新时间范围
+            index['partitions'][date]['max_ts'] = int(run_time.timestamp())
+            self._save_index(index)
+            return {'written': 0, 'bytes': 0}
+
+        record = {
+            'ts': int(run_time.timestamp()),
+            'n': len(data_list),
+            'cols': changed,
+            'same': [name for name in columns if name not in changed],
+        }
+        payload = gzip.compress(
+            (json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+        )
+        with open(path, 'ab') as f:
+            f.write(payload)
+
+        partition = index['partitions'].setdefault(date, {
+            'file': filename, 'runs': 0, 'rows': 0, 'bytes': 0,
+            'min_ts': record['ts'], 'max_ts': record['ts'],
+        })
+        partition['runs'] += 1
+        partition['rows'] += record['n']
+        partition['bytes'] += len(payload)
+        partition['max_ts'] = record['ts']
+        index['last'] = {'date': date, 'hashes': hashes}
+        self._save_index(index)
+        return {'written': record['n'], 'bytes': len(payload)}
+
+    def write_latest(self, data_list: List[Dict[str, Any]]):
+        """原子替换最新快照 CSV（保持向后兼容）"""
+        if not data_list:
+            return
+        fieldnames = list(data_list[0].keys())
+
+        def _write(f):
+            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(data_list)
+
+        directory = os.path.dirname(os.path.abspath(self.latest_path))
+        os.makedirs(directory, exist_ok=True)
+        _write_atomic(self.latest_path, _write)
+
+    def prune(self, keep_days: int = 30) -> List[str]:
+        """根据索引删除超过保留天数的分区，不扫描目录"""
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=keep_days)).strftime('%Y-%m-%d')
+        index = self.load_index()
+        removed = []
+        for date in sorted(index['partitions']):
+            if date >= cutoff:
+                break
+            partition = index['partitions'].pop(date)
+            path = os.path.join(self.archive_dir, partition['file'])
+            if os.path.exists(path):
+                os.remove(path)
+            removed.append(partition['file'])
+        if removed:
+            self._save_index(index)
+        return removed
+
+    # ---- 查询 ----
+
+    def iter_runs(self, start: Optional[datetime] = None,
+                  end: Optional[datetime] = None) -> Iterator[Tuple[datetime, Dict[str, list]]]:
+        """按时间顺序遍历 [start, end] 内的每次爬取，返回 (时间, 完整列)"""
+        start_ts = _epoch(parse_datetime(start)) if start else None
+        end_ts = _epoch(parse_datetime(end)) if end else None
+        index = self.load_index()
+
+        for date in sorted(index['partitions']):
+            partition = index['partitions'][date]
+            # 利用索引裁剪不相交的分区
+            if start_ts is not None and partition['max_ts'] < start_ts:
+                continue
+            if end_ts is not None and partition['min_ts'] > end_ts:
+                break
+            path = os.path.join(self.archive_dir, partition['file'])
+            if not os.path.exists(path):
+                continue
+
+            # 只读索引已提交的部分，忽略崩溃遗留的未提交成员
+            with open(path, 'rb') as raw:
+                data = raw.read(partition['bytes'])
+            current: Dict[str, list] = {}
+            with gzip.open(io.BytesIO(data), 'rt', encoding='utf-8') as f:
+                for line in f:
+                    record = json.loads(line)
+                    current.update(record['cols'])
+                    ts = record['ts']
+                    if start_ts is not None and ts < start_ts:
+                        continue
+                    if end_ts is not None and ts > end_ts:
+                        break
+                    yield datetime.fromtimestamp(ts, timezone.utc), dict(current)
+
+    def query(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+              token_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """查询区间内的解锁记录（行格式），可按代币过滤"""
+        rows = []
+        for run_time, columns in self.iter_runs(start, end):
+            names = columns.get('token_name', [])
+            for i, name in enumerate(names):
+                if token_name and name != token_name:
+                    continue
+                row = {col: values[i] for col, values in columns.items()}
+                row['run_time'] = run_time
+                rows.append(row)
+        return rows
@@ -5,5 +5,9 @@
 """
 
 from .helpers import format_number, calculate_percentage_change, validate_crypto_data
+from .parsers import parse_amount, parse_percentage, parse_datetime, parse_token_unlock_fields
 
-__all__ = ['format_number', 'calculate_percentage_change', 'validate_crypto_data']
\ No newline at end of file
+__all__ = [
+    'format_number', 'calculate_percentage_change', 'validate_crypto_data',
+    'parse_amount', 'parse_percentage', 'parse_datetime', 'parse_token_unlock_fields'
+]
\ No newline at end of file
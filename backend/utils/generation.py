@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据代际（generation）计数
+
+每个数据集（如 'market'）维护一个单调递增的代际号。数据刷新时调用
+bump_generation，依赖该数据的缓存以代际号作为键的一部分，代际变化后
+旧缓存自然失效，不需要逐个清理。
+
+代际号只在进程内有效，进程重启后从 0 开始；需要跨重启区分的场景（如 HTTP
+ETag）同时使用 epoch（每个进程启动时随机生成）。
+
+多进程部署时（见 backend/cluster.py）开启共享模式：代际号改为不小于当前
+毫秒时间戳的值，各进程各自递增也不会产生相同的代际号；每次递增通过
+publisher 写入数据库，其他进程轮询后用 advance 跟进，epoch 也统一为共享值，
+同一数据在所有进程中得到相同的 ETag。
+"""
+
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Optional
+
+MARKET_GENERATION = 'market'
+INVESTOR_GENERATION = 'investors'
+ALERT_RULES_GENERATION = 'alert_rules'
+
+
+class GenerationRegistry:
+    """线程安全的代际号登记表"""
+
+    def __init__(self):
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.epoch = uuid.uuid4().hex[:8]
+        self.shared = False
+        # 共享模式下每次递增后调用 publisher(name, value)
+        self.publisher: Optional[Callable[[str, int], None]] = None
+
+    def get(self, name: str) -> int:
+        """当前代际号（从未刷新过时为 0）"""
+        return self._generations.get(name, 0)
+
+    def bump(self, name: str) -> int:
+        """代际号递增并返回新值"""
+        with self._lock:
+            value = self._generations.get(name, 0) + 1
+            if self.shared:
+                value = max(value, int(time.time() * 1000))
+            self._generations[name] = value
+        if self.publisher is not None:
+            try:
+                self.publisher(name, value)
+            except Exception as e:
+                print(f"⚠️  发布代际号 {name} 失败: {e}")
+        return value
+
+    def advance(self, name: str, value: int) -> bool:
+        """跟进其他进程发布的代际号（只前进不后退），返回是否变化"""
+        with self._lock:
+            if value <= self._generations.get(name, 0):
+                return False
+            self._generations[name] = value
+            return True
+
+    def snapshot(self) -> Dict[str, int]:
+        """所有数据集的代际号"""
+        return dict(self._generations)
+
+
+generations = GenerationRegistry()
+
+
+def get_generation(name: str = MARKET_GENERATION) -> int:
+    """获取数据集的当前代际号"""
+    return generations.get(name)
+
+
+def bump_generation(name: str = MARKET_GENERATION) -> int:
+    """标记数据集已刷新，返回新的代际号"""
+    return generations.bump(name)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+展示文本解析
+
+把爬取到的 "$1.2m"、"+3.4%"、"5.5m ABC"、"2024-02-01T00:00:00Z" 等展示文本
+转换为 float / 单位 / datetime。正则在模块加载时预编译，相同文本的解析结果
+通过 lru_cache 复用（同一批数据中大量重复的取值只解析一次）。
+"""
+
+import re
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+# 整段匹配：数量级后缀（k/m/b/t）必须紧跟数字，单独的 "T"、"B" 等视为代币符号；
+# 数量级也可以是完整的英文单词；其余无法识别的文本整体视为解析失败
+_AMOUNT_RE = re.compile(
+    r'([+-]?)\s*(\$)?\s*((?:\d[\d,]*\.?\d*|\.\d+)(?:e[+-]?\d+)?)'
+    r'(?:([kmbt])\b|\s*(thousand|million|billion|trillion)\b)?'
+    r'(?:\s+([A-Za-z][\w.-]*))?',
+    re.I,
+)
+_PERCENT_RE = re.compile(r'([+-]?\d[\d,]*\.?\d*|[+-]?\.\d+)\s*%')
+_MULTIPLIERS = {
+    None: 1.0, 'k': 1e3, 'm': 1e6, 'b': 1e9, 't': 1e12,
+    'thousand': 1e3, 'million': 1e6, 'billion': 1e9, 'trillion': 1e12,
+}
+
+# Tokenomist 数值字段 -> 解析方式
+TOKEN_UNLOCK_NUMERIC_FIELDS = {
+    'current_price': 'amount',
+    'market_cap': 'amount',
+    'circulating_supply': 'amount',
+    'unlock_amount': 'amount',
+    'next_7d_emission': 'amount',
+    'price_change_24h': 'percentage',
+    'released_percentage': 'percentage',
+    'unlock_percentage': 'percentage',
+}
+
+
+@lru_cache(maxsize=8192)
+def _parse_amount_text(text: str) -> Tuple[Optional[float], Optional[str]]:
+    m = _AMOUNT_RE.fullmatch(text)
+    if not m:
+        return None, None
+    sign, dollar, number, suffix, word, unit = m.groups()
+    try:
+        value = float(number.replace(',', ''))
+    except ValueError:
+        return None, None
+    magnitude = suffix or word
+    value *= _MULTIPLIERS[magnitude.lower() if magnitude else None]
+    if sign == '-':
+        value = -value
+    if dollar:
+        unit = 'USD'
+    elif unit:
+        unit = unit.upper()
+    return value, unit
+
+
+def parse_amount(text: Any) -> Tuple[Optional[float], Optional[str]]:
+    """解析金额/数量文本，返回 (数值, 单位)；单位为 'USD'、代币符号或 None，无法完整解析时返回 (None, None)"""
+    if text is None or text == '':
+        return None, None
+    if isinstance(text, (int, float)):
+        return float(text), None
+    return _parse_amount_text(str(text).strip())
+
+
+@lru_cache(maxsize=4096)
+def _parse_percentage_text(text: str) -> Optional[float]:
+    m = _PERCENT_RE.search(text)
+    if not m:
+        return None
+    try:
+        return float(m.group(1).replace(',', ''))
+    except ValueError:
+        return None
+
+
+def parse_percentage(text: Any) -> Optional[float]:
+    """解析百分比文本 "+3.4%" -> 3.4"""
+    if text is None or text == '':
+        return None
+    if isinstance(text, (int, float)):
+        return float(text)
+    return _parse_percentage_text(str(text).strip())
+
+
+def parse_datetime(text: Any) -> Optional[datetime]:
+    """解析 ISO 时间文本，统一返回 naive UTC datetime（与 timestamp 字段一致）"""
+    if not text:
+        return None
+    if isinstance(text, datetime):
+        dt = text
+    else:
+        try:
+            dt = datetime.fromisoformat(str(text).strip().replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def parse_token_unlock_fields(row: Dict[str, Any]) -> Dict[str, Any]:
+    """为一行 Tokenomist 数据生成类型化字段（原始文本保持不变）
+
+    生成的字段:
+        <field>_value       各数值字段的 float
+        unlock_amount_unit  解锁数量单位（USD 或代币符号）
+        unlock_at           解锁时间 datetime
+        unlock_usd_value    解锁美元价值（代币数量按当前价格折算）
+    """
+    typed = {}
+    for field, kind in TOKEN_UNLOCK_NUMERIC_FIELDS.items():
+        if kind == 'percentage':
+            typed[f'{field}_value'] = parse_percentage(row.get(field))
+        else:
+            value, unit = parse_amount(row.get(field))
+            typed[f'{field}_value'] = value
+            if field == 'unlock_amount':
+                typed['unlock_amount_unit'] = unit
+
+    typed['unlock_at'] = parse_datetime(row.get('unlock_time'))
+
+    amount = typed['unlock_amount_value']
+    price = typed['current_price_value']
+    if amount is None:
+        typed['unlock_usd_value'] = None
+    elif typed['unlock_amount_unit'] == 'USD':
+        typed['unlock_usd_value'] = amount
+    elif price is not None:
+        typed['unlock_usd_value'] = amount * price
+    else:
+        typed['unlock_usd_value'] = None
+    return typed
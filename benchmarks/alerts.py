@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+告警规则引擎：逐条规则 Python 循环 vs 分组阈值数组批量评估
+
+生成 N 条规则（默认 80% 对所有币种生效、20% 指定币种）和两轮行情快照，
+分别用逐规则循环和 AlertEngine 评估第二轮快照，比较耗时并核对触发数。
+
+用法:
+    python benchmarks/alerts.py [--rules 100000] [--coins 5000] [--loop-rules 1000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.analytics.alerts import ALERT_FIELDS, AlertEngine
+from backend.analytics.market_store import MarketSnapshot
+from backend.models.crypto import CryptoData
+
+FIELDS = ('price', 'change_24h', 'change_7d', 'rank', 'rank_change')
+
+
+def make_snapshots(n, rng):
+    ranks = list(range(1, n + 1))
+    first, second = [], []
+    shuffled = list(ranks)
+    for i in range(n):
+        j = min(n - 1, max(0, i + rng.randint(-20, 20)))
+        shuffled[i], shuffled[j] = shuffled[j], shuffled[i]
+    for i in range(n):
+        price = rng.uniform(0.01, 1000)
+        base = {'id': f'coin-{i}', 'symbol': f'c{i}', 'name': f'Coin {i}', 'volume_24h': rng.uniform(1e3, 1e9)}
+        first.append(CryptoData({**base, 'price_usd': price, 'rank': ranks[i],
+                                 'price_change_percentage_24h': rng.uniform(-20, 20),
+                                 'price_change_percentage_7d': rng.uniform(-40, 40)}))
+        second.append(CryptoData({**base, 'price_usd': price * rng.uniform(0.9, 1.1), 'rank': shuffled[i],
+                                  'price_change_percentage_24h': rng.uniform(-20, 20),
+                                  'price_change_percentage_7d': rng.uniform(-40, 40)}))
+    return MarketSnapshot.from_cryptos(first, generation=1), MarketSnapshot.from_cryptos(second, generation=2)
+
+
+def make_rules(count, coins, rng):
+    rules = []
+    for i in range(count):
+        field = rng.choice(FIELDS)
+        threshold = {
+            'price': rng.uniform(0.01, 1000),
+            'change_24h': rng.uniform(-20, 20),
+            'change_7d': rng.uniform(-40, 40),
+            'rank': rng.randint(1, coins),
+            'rank_change': rng.randint(-20, 20),
+        }[field]
+        coin = f'coin-{rng.randrange(coins)}' if rng.random() < 0.2 else None
+        rules.append({'rule_id': str(i), 'field': field, 'op': rng.choice(('above', 'below')),
+                      'threshold': threshold, 'coin': coin})
+    return rules
+
+
+def loop_evaluate(rules, previous, current):
+    """传统方式：逐条规则遍历币种（每轮先把快照转成 {id: 文档} 字典）"""
+    columns = [column for column in ALERT_FIELDS.values() if column]
+    before = {doc['id']: doc for doc in previous.rows(fields=['id'] + columns)}
+    after = {doc['id']: doc for doc in current.rows(fields=['id'] + columns)}
+    fired = 0
+    for rule in rules:
+        column = ALERT_FIELDS[rule['field']]
+        threshold = rule['threshold']
+        coins = [rule['coin']] if rule['coin'] else after
+        for coin_id in coins:
+            a, b = before[coin_id][column], after[coin_id][column]
+            if a is None or b is None:
+                continue
+            if rule['op'] == 'above' and a <= threshold < b:
+                fired += 1
+            elif rule['op'] == 'below' and b < threshold <= a:
+                fired += 1
+    return fired
+
+
+def main():
+    parser = argparse.ArgumentParser(description='告警规则引擎基准')
+    parser.add_argument('--rules', type=int, default=100000)
+    parser.add_argument('--coins', type=int, default=5000)
+    parser.add_argument('--loop-rules', type=int, default=1000, help='逐规则循环只跑前 N 条规则后按比例估算')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    previous, current = make_snapshots(args.coins, rng)
+    rules = make_rules(args.rules, args.coins, rng)
+
+    engine = AlertEngine()
+    start = time.perf_counter()
+    engine.load_rules(rules)
+    engine._get_compiled()
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    engine.evaluate(previous)
+    start = time.perf_counter()
+    result = engine.evaluate(current)
+    vector_ms = (time.perf_counter() - start) * 1000
+
+    # rank_change 需要三轮数据才有上一轮值，逐规则循环里跳过，核对时同样排除
+    sample = [rule for rule in rules[:args.loop_rules] if rule['field'] != 'rank_change']
+    start = time.perf_counter()
+    loop_fired = loop_evaluate(sample, previous, current)
+    loop_ms = (time.perf_counter() - start) * 1000
+    estimated_loop_ms = loop_ms * args.rules / max(1, len(sample))
+
+    # 用同一批样本规则单独核对触发数
+    checker = AlertEngine(max_alerts=0)
+    checker.load_rules(sample)
+    checker.evaluate(previous)
+    assert checker.evaluate(current)['total'] == loop_fired
+
+    print(f"规则数量: {args.rules}  币种数量: {args.coins}")
+    print(f"  编译规则（规则变化时一次）    {compile_ms:10.1f} ms")
+    print(f"  批量评估（每轮爬取）          {vector_ms:10.1f} ms  触发 {result['total']} 条，推送 {len(result['alerts'])} 条")
+    print(f"  逐规则循环（估算）            {estimated_loop_ms:10.1f} ms  (实测 {len(sample)} 条规则 {loop_ms:.1f} ms)")
+    print(f"  加速比                        {estimated_loop_ms / vector_ms:10.1f} x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+API 序列化与压缩基准
+
+在临时 SQLite 数据库中写入一批币种和投资者数据，通过 Flask 测试客户端请求
+最大的两个接口，比较标准库 JSON / orjson 与不压缩 / gzip / brotli 组合下的
+吞吐量（请求/秒）和传输字节数。压缩结果按 ETag 缓存，另列出不使用缓存
+（每次请求都压缩）时的吞吐量。
+
+端到端吞吐量包含数据库读取，最后单独列出响应体序列化和压缩本身的耗时。
+
+用法:
+    python benchmarks/api_serialization.py [--coins 5000] [--investors 2000] [--requests 20]
+"""
+
+import argparse
+import gzip
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from backend.api.compression import _load_brotli, init_compression
+from backend.api.routes import api_bp
+from backend.api.serialization import _orjson_available, init_json_provider
+from backend.database.backends import SQLiteBackend
+from backend.database.db import CryptoDataManager, InvestorDataManager, InvestorPortfolioManager, set_backend
+from backend.models.crypto import CryptoData
+from backend.models.investor import InvestorData
+
+
+def seed(coins, investors):
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    cryptos = [CryptoData({
+        'id': f'coin-{i}', 'symbol': f'C{i}', 'name': f'Coin {i}', 'image': f'https://example.com/{i}.png',
+        'price_usd': rng.uniform(0.001, 50000), 'market_cap': rng.uniform(1e5, 1e12),
+        'volume_24h': rng.uniform(1e3, 1e10), 'price_change_percentage_24h': rng.uniform(-30, 30),
+        'price_change_percentage_7d': rng.uniform(-50, 50), 'circulating_supply': rng.uniform(1e6, 1e10),
+        'rank': i + 1, 'source': 'coingecko', 'timestamp': now - timedelta(seconds=i),
+    }) for i in range(coins)]
+    CryptoDataManager().upsert_crypto_data([c.to_mongo_dict() for c in cryptos])
+
+    objects = [InvestorData({
+        'investor_id': i, 'name': f'Investor {i}', 'slug': f'investor-{i}', 'type': rng.choice(['VC', 'Angel', 'Fund']),
+        'tier': rng.choice(['1', '2', '3']), 'country': 'US', 'rank': i + 1,
+        'totalInvestments': rng.randint(1, 300), 'description': 'Lorem ipsum ' * 10,
+        'portfolioProjects': [{'slug': f'project-{rng.randrange(5000)}', 'name': 'Project', 'round': 'Seed'}
+                              for _ in range(rng.randint(0, 20))],
+        'timestamp': now,
+    }) for i in range(investors)]
+    InvestorDataManager().upsert_investor_data([inv.to_mongo_dict() for inv in objects])
+    InvestorPortfolioManager().sync_portfolios(objects)
+
+
+def make_app(provider, cache_bytes):
+    app = Flask(__name__)
+    app.config.update(JSON_PROVIDER=provider, COMPRESS_CACHE_BYTES=cache_bytes)
+    init_json_provider(app)
+    init_compression(app)
+    app.register_blueprint(api_bp, url_prefix='/api')
+    return app
+
+
+def measure(client, url, encoding, requests):
+    headers = {'Accept-Encoding': encoding} if encoding else {}
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.status_code
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = client.get(url, headers=headers)
+    elapsed = time.perf_counter() - start
+    return requests / elapsed, len(response.data), response.headers.get('Content-Encoding') or 'identity'
+
+
+def timed(fn, repeat):
+    result = fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='API 序列化与压缩基准')
+    parser.add_argument('--coins', type=int, default=5000)
+    parser.add_argument('--investors', type=int, default=2000)
+    parser.add_argument('--requests', type=int, default=20)
+    args = parser.parse_args()
+
+    backend = SQLiteBackend(os.path.join(tempfile.mkdtemp(), 'bench.db'))
+    backend.create_indexes()
+    set_backend(backend)
+    seed(args.coins, args.investors)
+
+    providers = ['std'] + (['orjson'] if _orjson_available() else [])
+    endpoints = [f'/api/cryptos?limit={args.coins}', f'/api/investors?limit={args.investors}&include=portfolio']
+
+    for url in endpoints:
+        print(f"\n{url}")
+        print(f"  {'JSON':<8}{'编码':<10}{'缓存':<6}{'请求/秒':>10}{'传输字节':>14}")
+        for provider in providers:
+            for encoding in (None, 'gzip', 'br'):
+                for cache_bytes in ((0, 32 * 1024 * 1024) if encoding else (0,)):
+                    client = make_app(provider, cache_bytes).test_client()
+                    rate, size, used = measure(client, url, encoding, args.requests)
+                    if encoding and used != encoding:
+                        continue  # 未安装 brotli
+                    cached = '是' if cache_bytes else '否'
+                    print(f"  {provider:<8}{used:<10}{cached:<6}{rate:>10.1f}{size:>14,}")
+
+    print("\n序列化 / 压缩耗时（不含数据库读取）")
+    print(f"  {'接口':<12}{'步骤':<16}{'耗时(ms)':>10}{'字节':>14}")
+    brotli = _load_brotli()
+    for url in endpoints:
+        name = url.split('?')[0].rsplit('/', 1)[-1]
+        app = make_app('std', 0)
+        with app.test_client() as client:
+            payload = app.json.loads(client.get(url).data)
+        for provider in providers:
+            app = make_app(provider, 0)
+            with app.app_context():
+                elapsed, body = timed(lambda: app.json.response(payload).get_data(), args.requests)
+            print(f"  {name:<12}{provider + ' 序列化':<16}{elapsed:>10.2f}{len(body):>14,}")
+        elapsed, packed = timed(lambda: gzip.compress(body, compresslevel=6), args.requests)
+        print(f"  {name:<12}{'gzip -6':<16}{elapsed:>10.2f}{len(packed):>14,}")
+        if brotli is not None:
+            elapsed, packed = timed(lambda: brotli.compress(body, quality=5), args.requests)
+            print(f"  {name:<12}{'brotli q5':<16}{elapsed:>10.2f}{len(packed):>14,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+相关性矩阵：增量共同矩 vs 每轮按窗口重新计算
+
+逐轮推入随机游走价格，比较 CorrelationTracker 每轮的增量更新 + 矩阵计算
+与每轮从同一环形缓冲区取出窗口收益率后调用 np.corrcoef 的耗时，并核对结果
+一致。JSON 序列化两种方式相同（且按代际缓存），单独列出。
+
+用法:
+    python benchmarks/correlation.py [--coins 250] [--top 200] [--window 288] [--ticks 600]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.analytics.correlation import CorrelationTracker
+
+
+def main():
+    parser = argparse.ArgumentParser(description='相关性矩阵基准')
+    parser.add_argument('--coins', type=int, default=250)
+    parser.add_argument('--top', type=int, default=200)
+    parser.add_argument('--window', type=int, default=288)
+    parser.add_argument('--ticks', type=int, default=600)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    ids = [f'coin-{i}' for i in range(args.coins)]
+    prices = np.exp(np.cumsum(rng.normal(0, 0.01, (args.ticks, args.coins)), axis=0)) * 100
+
+    tracker = CorrelationTracker()
+    tracker._warmed = True
+    warm = args.window + 1
+    for t in range(warm):
+        tracker.push_arrays(ids, ids, prices[t], generation=t)
+    tracker.matrices(args.top, args.window)
+
+    incremental, recompute = 0.0, 0.0
+    for t in range(warm, args.ticks):
+        start = time.perf_counter()
+        tracker.push_arrays(ids, ids, prices[t], generation=t)
+        result = tracker.matrices(args.top, args.window)
+        incremental += time.perf_counter() - start
+
+        # 对照：同一缓冲区上每轮重新计算
+        start = time.perf_counter()
+        window = tracker._window(result['members'], args.window)
+        expected = np.corrcoef(window.T)
+        recompute += time.perf_counter() - start
+        assert np.allclose(result['correlation'], expected, atol=1e-8)
+
+    start = time.perf_counter()
+    tracker.compute(args.top, args.window)
+    serialize_ms = (time.perf_counter() - start) * 1000
+    rounds = args.ticks - warm
+    incremental_ms = incremental / rounds * 1000
+    recompute_ms = recompute / rounds * 1000
+
+    print(f"币种数量: {args.coins}  Top: {args.top}  窗口: {args.window}  轮数: {args.ticks - warm}")
+    print(f"  增量共同矩 + 相关性矩阵（每轮）  {incremental_ms:8.2f} ms")
+    print(f"  取窗口 + np.corrcoef（每轮）     {recompute_ms:8.2f} ms")
+    print(f"  JSON 列表转换（每代际一次）      {serialize_ms:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
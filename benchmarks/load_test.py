@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多 worker 部署压测
+
+在临时 SQLite 数据库中写入一批币种，按 --workers 列出的 worker 数依次用
+gunicorn.conf.py（gevent worker、CLUSTER_MODE）启动服务，由 --clients 个客户端
+进程（每个 --threads 个保持连接的线程）在 --duration 秒内循环请求一组只读接口，
+报告每种 worker 数下的吞吐（req/s）、延迟分位数和相对 1 个 worker 的加速比。
+
+压测客户端与服务运行在同一台机器上，会占用一部分 CPU；吞吐随 worker 数增长的
+上限是机器核数（输出第一行给出），单核机器上增加 worker 不会提高吞吐。
+
+用法:
+    python benchmarks/load_test.py [--workers 1,2,4] [--duration 10] [--coins 2000]
+                                   [--clients 2] [--threads 8] [--message-queue redis://...]
+"""
+
+import argparse
+import http.client
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from backend.analytics.market_store import MarketSnapshot
+from backend.database.backends import SQLiteBackend
+from backend.models.crypto import CryptoData
+
+PATHS = [
+    '/api/cryptos?limit=100',
+    '/api/market/summary',
+    '/api/search?q=bit',
+    '/api/cryptos/batch?symbols=BTC,ETH,SOL,COIN10,COIN20,COIN30',
+]
+
+
+def seed(path, coins):
+    backend = SQLiteBackend(path)
+    backend.create_indexes()
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    symbols = ['BTC', 'ETH', 'SOL']
+    cryptos = [CryptoData({
+        'id': f'coin-{i}', 'symbol': symbols[i] if i < len(symbols) else f'COIN{i}', 'name': f'Bitcoin Fork {i}',
+        'price_usd': rng.uniform(0.01, 1000), 'market_cap': 1e12 / (i + 1), 'volume_24h': rng.uniform(1e5, 1e9),
+        'price_change_percentage_24h': rng.uniform(-10, 10), 'rank': i + 1, 'source': 'coingecko', 'timestamp': now,
+    }) for i in range(coins)]
+    backend.insert_many('crypto_data', [c.to_mongo_dict() for c in cryptos])
+    backend.insert_many('market_snapshots', [MarketSnapshot.from_cryptos(cryptos, 1, now).to_history_doc()])
+
+
+def start_server(workers, port, env):
+    env = dict(env, WEB_CONCURRENCY=str(workers), API_PORT=str(port), API_HOST='127.0.0.1')
+    process = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+                               cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/api/health')
+            response = conn.getresponse()
+            response.read()
+            if response.status == 200:
+                # 每个 worker 预热一次（首个请求加载快照与索引）
+                for _ in range(workers * 4):
+                    for path in PATHS:
+                        conn.request('GET', path)
+                        conn.getresponse().read()
+                conn.close()
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError('gunicorn 启动超时')
+
+
+def client_process(port, threads, duration):
+    """一个客户端进程：threads 个线程各自保持一条连接循环请求，返回 (完成数, 错误数, 延迟秒数组)"""
+    results = []
+    stop_at = time.perf_counter() + duration
+
+    def run():
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        latencies, errors = [], 0
+        i = random.randrange(len(PATHS))
+        while time.perf_counter() < stop_at:
+            path = PATHS[i % len(PATHS)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                conn.request('GET', path, headers={'Accept-Encoding': 'gzip'})
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    errors += 1
+            except (OSError, http.client.HTTPException):
+                errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                continue
+            latencies.append(time.perf_counter() - start)
+        conn.close()
+        results.append((latencies, errors))
+
+    pool = [threading.Thread(target=run) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    latencies = [value for thread_latencies, _ in results for value in thread_latencies]
+    return len(latencies), sum(errors for _, errors in results), latencies
+
+
+def run_load(port, clients, threads, duration):
+    with multiprocessing.Pool(clients) as pool:
+        start = time.perf_counter()
+        outputs = pool.starmap(client_process, [(port, threads, duration)] * clients)
+        elapsed = time.perf_counter() - start
+    done = sum(o[0] for o in outputs)
+    errors = sum(o[1] for o in outputs)
+    latencies = np.array([value for o in outputs for value in o[2]]) * 1000
+    return done / elapsed, errors, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description='多 worker 部署压测')
+    parser.add_argument('--workers', default=None, help='逗号分隔的 worker 数（默认 1、2、4 中不超过核数的值及核数）')
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--coins', type=int, default=2000)
+    parser.add_argument('--clients', type=int, default=2, help='客户端进程数')
+    parser.add_argument('--threads', type=int, default=8, help='每个客户端进程的连接数')
+    parser.add_argument('--worker-class', default='gevent')
+    parser.add_argument('--message-queue', default='', help='SOCKETIO_MESSAGE_QUEUE（默认不启用）')
+    parser.add_argument('--port', type=int, default=5077)
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    if args.workers:
+        worker_counts = [int(w) for w in args.workers.split(',')]
+    else:
+        worker_counts = sorted({1, 2, 4, cores} & set(range(1, cores + 1))) or [1]
+
+    workdir = tempfile.mkdtemp()
+    db_path = os.path.join(workdir, 'load.db')
+    seed(db_path, args.coins)
+    env = dict(os.environ, STORAGE_BACKEND='sqlite', SQLITE_PATH=db_path, CLUSTER_MODE='true',
+               SCHEDULER_LOCK_FILE=os.path.join(workdir, 'scheduler.lock'), ENABLE_SCHEMA_MIGRATION='false',
+               SOCKETIO_MESSAGE_QUEUE=args.message_queue, GUNICORN_WORKER_CLASS=args.worker_class)
+
+    print(f"{args.coins} 个币种，{args.clients} 个客户端进程 × {args.threads} 个连接，每轮 {args.duration:.0f}s，"
+          f"CPU 核数 {cores}，worker 类型 {args.worker_class}")
+    print(f"  {'workers':>8}{'req/s':>10}{'加速比':>8}{'p50(ms)':>10}{'p99(ms)':>10}{'错误':>6}")
+    baseline = None
+    for workers in worker_counts:
+        server = start_server(workers, args.port, env)
+        try:
+            rps, errors, latencies = run_load(args.port, args.clients, args.threads, args.duration)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+        baseline = baseline or rps
+        print(f"  {workers:>8}{rps:>10.0f}{rps / baseline:>8.2f}x{np.percentile(latencies, 50):>10.1f}"
+              f"{np.percentile(latencies, 99):>10.1f}{errors:>6}")
+
+
+if __name__ == '__main__':
+    main()
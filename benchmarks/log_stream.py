@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+爬虫日志推送基准
+
+模拟一次爬取在热循环中写入 --messages 条日志（每 10 条中 9 条 debug、1 条 info），
+--clients 个连接中九成订阅 info、一成订阅 debug，比较：
+- 逐条发送（改造前的 log_and_emit）: 每条 print + socketio.emit 广播给所有连接
+- 批量发送（LogStreamer）: 爬虫线程只写入内存队列，按帧分级别房间发送
+
+报告爬虫线程每条日志的耗时、发送消息数和出口流量。Socket.IO 使用 python-socketio 的
+真实 Manager（发送端替换为计数器），控制台输出写入 os.devnull。
+
+用法:
+    python benchmarks/log_stream.py [--messages 5000] [--clients 200] [--frame 500]
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.api.log_stream import LOG_ROOM_PREFIX, LogStreamer
+from benchmarks.realtime_rooms import make_server
+
+
+def connect(server, clients, rooms):
+    for i in range(clients):
+        sid = server.manager.connect(f'eio-{i}', '/')
+        if rooms:
+            level = 'debug' if i % 10 == 0 else 'info'
+            server.manager.enter_room(sid, '/', f'{LOG_ROOM_PREFIX}{level}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='爬虫日志推送基准')
+    parser.add_argument('--messages', type=int, default=5000)
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--frame', type=int, default=500, help='每帧积累的日志条数（模拟发送间隔内的写入量）')
+    args = parser.parse_args()
+    messages = [(f'📄 第 {i} 页解析完成: 50 条投资者数据', 'debug' if i % 10 else 'info')
+                for i in range(args.messages)]
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        # 逐条发送
+        server, sink = make_server()
+        connect(server, args.clients, rooms=False)
+        start = time.perf_counter()
+        for message, log_type in messages:
+            print(message)
+            server.emit('scraper_log', {'message': message, 'type': log_type,
+                                        'timestamp': datetime.now().isoformat()})
+        direct = time.perf_counter() - start
+        direct_sink = sink
+
+        # 批量发送：爬虫线程写入，按帧发送（发送耗时单独统计，不占用爬虫线程）
+        server, sink = make_server()
+        connect(server, args.clients, rooms=True)
+        streamer = LogStreamer(max_per_frame=200, buffer_size=500)
+        streamer.socketio = server
+        streamer._thread = object()  # 由本基准手动 flush，不启动后台线程
+        push_time = flush_time = 0.0
+        for offset in range(0, len(messages), args.frame):
+            start = time.perf_counter()
+            for message, log_type in messages[offset:offset + args.frame]:
+                streamer.push(message, log_type, scraper='dropstab')
+            push_time += time.perf_counter() - start
+            start = time.perf_counter()
+            streamer.flush()
+            flush_time += time.perf_counter() - start
+
+    print(f"{args.messages} 条日志，{args.clients} 个连接（九成订阅 info，一成订阅 debug），每帧 {args.frame} 条")
+    print(f"  {'':<10}{'爬虫线程(us/条)':>16}{'发送线程(ms)':>14}{'消息数':>10}{'流量(MB)':>10}")
+    print(f"  {'逐条发送':<8}{direct / args.messages * 1e6:>16.1f}{'-':>14}{direct_sink.messages:>10}"
+          f"{direct_sink.bytes / 1024 / 1024:>10.2f}")
+    print(f"  {'批量发送':<8}{push_time / args.messages * 1e6:>16.1f}{flush_time * 1000:>14.1f}{sink.messages:>10}"
+          f"{sink.bytes / 1024 / 1024:>10.2f}  (超出每帧上限省略 {streamer.dropped} 条)")
+
+
+if __name__ == '__main__':
+    main()
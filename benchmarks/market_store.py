@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+行情分析：逐文档 Python 计算 vs NumPy 列式快照
+
+对同一批 5000 个币种分别用字典列表和 MarketSnapshot 计算 Top-N、分位数、
+市值加权涨跌幅和条件过滤，输出每种分析的耗时对比（不含快照构建，构建耗时单独列出）。
+
+用法:
+    python benchmarks/market_store.py [--coins 5000] [--repeat 50]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.analytics.market_store import MarketSnapshot
+from backend.models.crypto import CryptoData
+
+
+def make_cryptos(n):
+    rng = random.Random(42)
+    cryptos = []
+    for i in range(n):
+        cryptos.append(CryptoData({
+            'id': f'coin-{i}',
+            'symbol': f'c{i}',
+            'name': f'Coin {i}',
+            'price_usd': rng.uniform(0.001, 50000),
+            'market_cap': rng.uniform(1e5, 1e12) if i % 20 else None,
+            'volume_24h': rng.uniform(1e3, 1e10),
+            'price_change_percentage_24h': rng.uniform(-30, 30),
+            'price_change_percentage_7d': rng.uniform(-50, 50),
+            'rank': i + 1,
+        }))
+    return cryptos
+
+
+def dict_analytics(docs):
+    """传统方式：每次分析遍历字典列表"""
+    caps = [d for d in docs if d.get('market_cap') is not None]
+    top = sorted(caps, key=lambda d: d['market_cap'], reverse=True)[:10]
+
+    changes = sorted(d['price_change_percentage_24h'] for d in docs
+                     if d.get('price_change_percentage_24h') is not None)
+    quartiles = statistics.quantiles(changes, n=4)
+
+    weight = sum(d['market_cap'] for d in caps)
+    weighted = sum(d['market_cap'] * d['price_change_percentage_24h'] for d in caps) / weight
+
+    screened = sorted(
+        (d for d in caps if d['market_cap'] > 1e9 and d['price_change_percentage_24h'] < -5),
+        key=lambda d: d['volume_24h'], reverse=True
+    )
+    return top, quartiles, weighted, screened
+
+
+def vector_analytics(snapshot):
+    """列式快照：向量化计算"""
+    top = snapshot.top_n('market_cap', 10)
+    quartiles = snapshot.percentiles('price_change_percentage_24h')
+    weighted = snapshot.weighted_mean('price_change_percentage_24h')
+    mask = snapshot.mask('market_cap', '>', 1e9) & snapshot.mask('price_change_percentage_24h', '<', -5)
+    screened = snapshot.sort('volume_24h', descending=True, mask=mask)
+    return top, quartiles, weighted, screened
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='行情分析基准')
+    parser.add_argument('--coins', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    cryptos = make_cryptos(args.coins)
+    docs = [c.to_mongo_dict() for c in cryptos]
+
+    build_ms, snapshot = timed(lambda: MarketSnapshot.from_cryptos(cryptos), 5)
+    dict_ms, dict_result = timed(lambda: dict_analytics(docs), args.repeat)
+    vector_ms, vector_result = timed(lambda: vector_analytics(snapshot), args.repeat)
+
+    # 结果一致性
+    assert [d['id'] for d in dict_result[0]] == [r['id'] for r in snapshot.rows(vector_result[0], ['id'])]
+    assert abs(dict_result[2] - vector_result[2]) < 1e-6
+    assert len(dict_result[3]) == len(vector_result[3])
+
+    print(f"币种数量: {args.coins}")
+    print(f"  构建列式快照（每次爬取一次）  {build_ms:8.2f} ms")
+    print(f"  字典遍历分析（每次查询）      {dict_ms:8.2f} ms")
+    print(f"  向量化分析（每次查询）        {vector_ms:8.2f} ms")
+    print(f"  加速比                        {dict_ms / vector_ms:8.1f} x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据模型内存与转换速度基准
+
+构造 5000 个 CryptoData 和 7400 个 InvestorData（与线上一次完整爬取的规模相当），
+用 tracemalloc 统计每个对象占用的字节数，并测量 dict -> 对象 -> MongoDB 字典 的转换速度。
+
+用法:
+    python benchmarks/model_memory.py [--coins 5000] [--investors 7400]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.models.crypto import CryptoData
+from backend.models.investor import InvestorData
+
+
+def make_coin_dicts(n):
+    now = datetime.utcnow()
+    return [{
+        'id': f'coin-{i}',
+        'symbol': f'c{i}',
+        'name': f'Coin {i}',
+        'price_usd': 1.0 + i,
+        'price_change_24h': 0.1 * i,
+        'price_change_percentage_24h': 1.5,
+        'market_cap': 1e9 - i,
+        'volume_24h': 1e7,
+        'circulating_supply': 1e8,
+        'total_supply': 2e8,
+        'rank': i + 1,
+        'source': 'coingecko',
+        'timestamp': now,
+    } for i in range(n)]
+
+
+def make_investor_dicts(n):
+    return [{
+        'id': f'inv-{i}',
+        'name': f'Investor {i}',
+        'investorSlug': f'investor-{i}',
+        'ventureType': 'VC',
+        'rank': i + 1,
+        'tier': str(i % 5 + 1),
+        'totalInvestments': i % 300,
+        'leadInvestments': i % 50,
+        'country': {'name': 'US'},
+        'links': [{'type': 'web', 'value': f'https://example.com/{i}'}],
+        'portfolioProjects': [f'project-{j}' for j in range(i % 20)],
+        'saleIds': list(range(i % 10)),
+    } for i in range(n)]
+
+
+def measure_memory(cls, dicts):
+    """返回每个对象的平均字节数（只统计对象本身，不含输入字典）"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [cls(d) for d in dicts]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    total = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    # 减去容纳对象的 list 本身
+    total -= sys.getsizeof(objects)
+    return total / len(objects)
+
+
+def measure_throughput(cls, dicts, rounds=3):
+    """返回每秒完成的 dict -> 对象 -> to_mongo_dict 转换次数（取最好的一轮）"""
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for d in dicts:
+            cls(d).to_mongo_dict()
+        best = min(best, time.perf_counter() - start)
+    return len(dicts) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='数据模型内存与转换速度基准')
+    parser.add_argument('--coins', type=int, default=5000)
+    parser.add_argument('--investors', type=int, default=7400)
+    args = parser.parse_args()
+
+    cases = [
+        ('CryptoData', CryptoData, make_coin_dicts(args.coins)),
+        ('InvestorData', InvestorData, make_investor_dicts(args.investors)),
+    ]
+
+    print(f"{'模型':<14}{'对象数':>8}{'字节/对象':>12}{'总计 KB':>10}{'转换/秒':>12}")
+    for name, cls, dicts in cases:
+        per_object = measure_memory(cls, dicts)
+        throughput = measure_throughput(cls, dicts)
+        print(f"{name:<14}{len(dicts):>8}{per_object:>12.0f}{per_object * len(dicts) / 1024:>10.0f}{throughput:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+行情增量推送基准
+
+模拟连续多轮爬取（每轮部分币种价格、市值、成交量变化，少量币种排名进出前 N），比较：
+- 增量计算（diff_snapshots）耗时
+- 每轮推送的增量大小（JSON 原始 / gzip）与 /api/cryptos?limit=N 完整响应大小
+- 按 --clients 个客户端、--scrape-interval 秒一轮爬取、前端每 30 秒轮询一次估算的
+  每轮流量与接口请求数：轮询 = 客户端数 × 每轮轮询次数 × 完整响应，
+  推送 = 客户端数 × 增量（接口请求数为 0）
+
+用法:
+    python benchmarks/realtime_delta.py [--coins 5000] [--top-n 100] [--rounds 20] [--changed 0.6]
+                                        [--clients 500] [--scrape-interval 300]
+"""
+
+import argparse
+import gzip
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import orjson
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from backend.analytics.deltas import MarketDeltaFeed
+from backend.analytics.market_store import MarketSnapshot
+from backend.api.routes import api_bp
+from backend.api.serialization import init_json_provider
+from backend.database.backends import SQLiteBackend
+from backend.database.db import CryptoDataManager, set_backend
+from backend.models.crypto import CryptoData
+
+POLL_INTERVAL = 30
+
+
+def make_market(rng, n):
+    return [{
+        'id': f'coin-{i}', 'symbol': f'C{i}', 'name': f'Coin {i}', 'image': f'https://example.com/{i}.png',
+        'price_usd': rng.uniform(0.01, 1000), 'market_cap': 1e12 / (i + 1), 'volume_24h': rng.uniform(1e5, 1e9),
+        'price_change_percentage_24h': rng.uniform(-10, 10), 'price_change_percentage_7d': rng.uniform(-20, 20),
+        'circulating_supply': rng.uniform(1e6, 1e9), 'rank': i + 1, 'source': 'coingecko',
+    } for i in range(n)]
+
+
+def next_round(rng, market, changed, top_n):
+    """部分币种行情变化，前 N 名边界附近少量币种交换排名"""
+    for coin in market:
+        if rng.random() < changed:
+            factor = 1 + rng.gauss(0, 0.01)
+            coin['price_usd'] *= factor
+            coin['market_cap'] *= factor
+            coin['volume_24h'] *= 1 + rng.gauss(0, 0.05)
+            coin['price_change_percentage_24h'] += rng.gauss(0, 0.2)
+    for _ in range(2):
+        i = rng.randrange(max(1, top_n - 5), min(len(market) - 1, top_n + 5))
+        market[i]['rank'], market[i + 1]['rank'] = market[i + 1]['rank'], market[i]['rank']
+        market[i], market[i + 1] = market[i + 1], market[i]
+
+
+def snapshot_of(market, generation):
+    return MarketSnapshot.from_cryptos([CryptoData(coin) for coin in market], generation)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='行情增量推送基准')
+    parser.add_argument('--coins', type=int, default=5000)
+    parser.add_argument('--top-n', type=int, default=100)
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--changed', type=float, default=0.6, help='每轮行情变化的币种比例')
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--scrape-interval', type=int, default=300, help='爬取间隔（秒）')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    market = make_market(rng, args.coins)
+    feed = MarketDeltaFeed(buckets=(args.top_n,), default_top=args.top_n)
+    feed.publish(snapshot_of(market, 1))
+
+    durations, raw_sizes, gzip_sizes = [], [], []
+    for generation in range(2, args.rounds + 2):
+        next_round(rng, market, args.changed, args.top_n)
+        snapshot = snapshot_of(market, generation)
+        start = time.perf_counter()
+        delta = feed.publish(snapshot)[args.top_n]
+        durations.append(time.perf_counter() - start)
+        payload = orjson.dumps(delta)
+        raw_sizes.append(len(payload))
+        gzip_sizes.append(len(gzip.compress(payload)))
+
+    # 轮询使用的完整响应：/api/cryptos?limit=N（SQLite 中写入最后一轮数据）
+    backend = SQLiteBackend(os.path.join(tempfile.mkdtemp(), 'bench.db'))
+    backend.create_indexes()
+    set_backend(backend)
+    now = datetime.utcnow()
+    CryptoDataManager().upsert_crypto_data([CryptoData(dict(coin, timestamp=now)).to_mongo_dict() for coin in market])
+    app = Flask(__name__)
+    init_json_provider(app)
+    app.register_blueprint(api_bp, url_prefix='/api')
+    body = app.test_client().get(f'/api/cryptos?limit={args.top_n}').data
+    full_raw, full_gzip = len(body), len(gzip.compress(body))
+
+    print(f"{args.coins} 个币种，推送前 {args.top_n} 名，每轮 {args.changed:.0%} 的币种行情变化，共 {args.rounds} 轮")
+    print(f"  增量计算:     平均 {np.mean(durations) * 1000:.2f}ms  最大 {np.max(durations) * 1000:.2f}ms")
+    print(f"  最近一轮增量: {feed.last_stats}")
+    print(f"  {'':<22}{'原始(KB)':>10}{'gzip(KB)':>10}")
+    print(f"  {'每轮增量（平均）':<18}{np.mean(raw_sizes) / 1024:>10.1f}{np.mean(gzip_sizes) / 1024:>10.1f}")
+    print(f"  {'/api/cryptos 完整响应':<18}{full_raw / 1024:>10.1f}{full_gzip / 1024:>10.1f}")
+
+    polls = args.scrape_interval / POLL_INTERVAL
+    poll_bytes = args.clients * polls * full_gzip
+    push_bytes = args.clients * np.mean(gzip_sizes)
+    print(f"\n{args.clients} 个客户端，每 {args.scrape_interval}s 爬取一轮（gzip 后）")
+    print(f"  30s 轮询:  每轮 {poll_bytes / 1024 / 1024:>8.2f}MB  接口请求 {args.clients * polls:>8.0f} 次")
+    print(f"  增量推送:  每轮 {push_bytes / 1024 / 1024:>8.2f}MB  接口请求 {0:>8} 次  "
+          f"(流量为轮询的 {push_bytes / poll_bytes:.1%})")
+
+
+if __name__ == '__main__':
+    main()
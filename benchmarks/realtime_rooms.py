@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+行情推送房间基准
+
+模拟 --clients 个看板连接：约一半订阅前 100 名、两成订阅前 10 名，每个连接另外关注
+--watch 个 symbol（按市值排名的齐夫分布抽取，头部币种被关注得多）。连续多轮爬取后
+用 python-socketio 的真实 Manager（发送端替换为计数器）比较三种推送方式每轮的
+服务端耗时、消息数和出口流量：
+
+- 全量广播: 所有币种的增量广播给每个连接（不区分订阅时覆盖关注币种的唯一方式）
+- 按连接:   为每个连接拼装其档位增量 + 关注币种增量，逐个连接编码发送
+- 按房间:   broadcast_market 的方式，每个有成员的房间只生成并编码一次载荷
+
+用法:
+    python benchmarks/realtime_rooms.py [--coins 5000] [--clients 2000] [--watch 30]
+                                        [--rounds 10] [--changed 0.6]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import socketio
+from socketio import packet
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.analytics.deltas import DEFAULT_TOP_BUCKETS, MarketDeltaFeed, diff_snapshots
+from backend.api.realtime import SYMBOL_ROOM_PREFIX, TOP_ROOM_PREFIX
+from benchmarks.realtime_delta import make_market, next_round, snapshot_of
+
+
+class Sink:
+    """替代 Engine.IO 发送：只统计消息数和字节数"""
+
+    def __init__(self):
+        self.messages = 0
+        self.bytes = 0
+
+    def __call__(self, eio_sid, eio_pkt):
+        self.messages += 1
+        self.bytes += len(eio_pkt.encode())
+
+
+def make_server():
+    server = socketio.Server(async_mode='threading')
+    sink = Sink()
+    server._send_eio_packet = sink
+    return server, sink
+
+
+def make_clients(rng, n_clients, coins, watch):
+    """每个连接的 (top 档位或 None, 关注的 symbol 列表)"""
+    weights = 1 / np.arange(1, coins + 1)
+    weights /= weights.sum()
+    np_rng = np.random.default_rng(rng.randrange(1 << 30))
+    clients = []
+    for _ in range(n_clients):
+        roll = rng.random()
+        top = 100 if roll < 0.5 else 10 if roll < 0.7 else None
+        picks = np_rng.choice(coins, size=watch, replace=False, p=weights)
+        clients.append((top, [f'C{i}' for i in picks.tolist()]))
+    return clients
+
+
+def connect(server, clients, rooms):
+    sids = []
+    for i, (top, symbols) in enumerate(clients):
+        sid = server.manager.connect(f'eio-{i}', '/')
+        sids.append(sid)
+        if rooms:
+            if top:
+                server.manager.enter_room(sid, '/', f'{TOP_ROOM_PREFIX}{top}')
+            for symbol in symbols:
+                server.manager.enter_room(sid, '/', f'{SYMBOL_ROOM_PREFIX}{symbol}')
+    return sids
+
+
+def encode_size(event, data):
+    return len(packet.Packet(packet.EVENT, namespace='/', data=[event, data]).encode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='行情推送房间基准')
+    parser.add_argument('--coins', type=int, default=5000)
+    parser.add_argument('--clients', type=int, default=2000)
+    parser.add_argument('--watch', type=int, default=30, help='每个连接关注的 symbol 数')
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--changed', type=float, default=0.6, help='每轮行情变化的币种比例')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    market = make_market(rng, args.coins)
+    clients = make_clients(rng, args.clients, args.coins, args.watch)
+
+    broadcast_server, broadcast_sink = make_server()
+    connect(broadcast_server, clients, rooms=False)
+    client_server, client_sink = make_server()
+    client_sids = connect(client_server, clients, rooms=False)
+    room_server, room_sink = make_server()
+    connect(room_server, clients, rooms=True)
+    active = [room for room, members in room_server.manager.rooms['/'].items()
+              if isinstance(room, str) and members and room.startswith((TOP_ROOM_PREFIX, SYMBOL_ROOM_PREFIX))]
+
+    feed = MarketDeltaFeed(buckets=DEFAULT_TOP_BUCKETS, default_top=100)
+    previous = snapshot_of(market, 1)
+    feed.publish(previous)
+    timings = {'broadcast': [], 'client': [], 'room': []}
+
+    for generation in range(2, args.rounds + 2):
+        next_round(rng, market, args.changed, 100)
+        snapshot = snapshot_of(market, generation)
+
+        # 全量广播：所有币种的增量编码一次，发给每个连接
+        start = time.perf_counter()
+        broadcast_server.emit('crypto_update', diff_snapshots(previous, snapshot, len(snapshot)))
+        timings['broadcast'].append(time.perf_counter() - start)
+
+        # 按连接：每个连接单独拼装、编码
+        start = time.perf_counter()
+        deltas = feed.publish(snapshot)
+        watched = sorted({symbol for _, symbols in clients for symbol in symbols})
+        symbol_deltas = feed.symbol_deltas(watched)
+        for sid, (top, symbols) in zip(client_sids, clients):
+            payload = {'symbols': {s: symbol_deltas[s] for s in symbols if s in symbol_deltas}}
+            if top:
+                payload['top'] = deltas[top]
+            client_server.emit('market_update', payload, to=sid)
+        timings['client'].append(time.perf_counter() - start)
+
+        # 按房间：与 broadcast_market 相同，每个房间编码一次
+        start = time.perf_counter()
+        symbols = []
+        for room in active:
+            if room.startswith(TOP_ROOM_PREFIX):
+                room_server.emit('crypto_update', deltas[int(room[len(TOP_ROOM_PREFIX):])], to=room)
+            else:
+                symbols.append(room[len(SYMBOL_ROOM_PREFIX):])
+        for symbol, delta in feed.symbol_deltas(symbols).items():
+            room_server.emit('symbol_update', delta, to=f'{SYMBOL_ROOM_PREFIX}{symbol}')
+        timings['room'].append(time.perf_counter() - start)
+        previous = snapshot
+
+    top_rooms = sum(1 for room in active if room.startswith(TOP_ROOM_PREFIX))
+    print(f"{args.coins} 个币种，{args.clients} 个连接（每个关注 {args.watch} 个 symbol），"
+          f"每轮 {args.changed:.0%} 的币种行情变化，共 {args.rounds} 轮")
+    print(f"  有成员的房间: {top_rooms} 个档位 + {len(active) - top_rooms} 个 symbol")
+    print(f"  {'':<10}{'耗时(ms/轮)':>12}{'消息数/轮':>12}{'流量(MB/轮)':>13}")
+    base_bytes = broadcast_sink.bytes
+    for label, key, sink in (('全量广播', 'broadcast', broadcast_sink), ('按连接', 'client', client_sink),
+                             ('按房间', 'room', room_sink)):
+        print(f"  {label:<8}{np.mean(timings[key]) * 1000:>12.1f}{sink.messages / args.rounds:>12.0f}"
+              f"{sink.bytes / args.rounds / 1024 / 1024:>13.2f}  (流量为全量广播的 {sink.bytes / base_bytes:.1%})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+服务端响应缓存基准
+
+在临时 SQLite 数据库中写入一批币种、价格历史和投资者数据，--threads 个线程按
+热点分布（少数投资者和币种被请求得多）并发请求 /api/investors、/api/investors/<name>、
+/api/cryptos/<symbol>/history 和 /api/symbols，比较：
+- 不缓存: 每个请求都查询数据库
+- 缓存:   ResponseCache（同一代际内命中缓存，并发的相同请求合并为一次查询）
+
+每 --write-every 个请求模拟一次爬虫写入（推进投资者和行情代际）。报告吞吐量、
+实际执行的查询次数，以及缓存统计中的命中率和节省的查询耗时。--latency 给每次
+数据库查询附加延迟（毫秒），模拟远程 MongoDB 的往返时间。
+
+用法:
+    python benchmarks/response_cache.py [--investors 2000] [--coins 500] [--requests 4000]
+                                        [--threads 16] [--write-every 1000] [--latency 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from backend.api.caching import init_response_cache
+from backend.api.routes import api_bp
+from backend.database.backends import SQLiteBackend
+from backend.database.db import CryptoDataManager, set_backend
+from backend.utils.generation import INVESTOR_GENERATION, MARKET_GENERATION, bump_generation
+from benchmarks.api_serialization import seed
+
+
+class CountingBackend:
+    """统计查询次数并附加固定延迟的存储后端包装"""
+
+    READS = ('find', 'find_one', 'distinct', 'count')
+
+    def __init__(self, backend, latency):
+        self._backend = backend
+        self.latency = latency
+        self.queries = 0
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        attr = getattr(self._backend, name)
+        if name not in self.READS:
+            return attr
+
+        def read(*args, **kwargs):
+            with self._lock:
+                self.queries += 1
+            if self.latency:
+                time.sleep(self.latency)
+            return attr(*args, **kwargs)
+        return read
+
+
+def seed_history(coins, points):
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    docs = [{'id': f'coin-{i}', 'symbol': f'C{i}', 'name': f'Coin {i}', 'price_usd': rng.uniform(1, 100),
+             'market_cap': rng.uniform(1e6, 1e9), 'timestamp': now - timedelta(minutes=5 * p)}
+            for i in range(coins) for p in range(1, points + 1)]
+    CryptoDataManager().insert_crypto_data(docs)
+
+
+def make_urls(rng, requests, investors, coins):
+    """按齐夫分布抽取的请求序列"""
+    weights = [1 / (i + 1) for i in range(max(investors, coins))]
+    urls = []
+    for _ in range(requests):
+        roll = rng.random()
+        if roll < 0.4:
+            i = rng.choices(range(investors), weights[:investors])[0]
+            urls.append(f'/api/investors/Investor {i}')
+        elif roll < 0.7:
+            i = rng.choices(range(coins), weights[:coins])[0]
+            urls.append(f'/api/cryptos/C{i}/history?hours={rng.choice((24, 168))}')
+        elif roll < 0.9:
+            urls.append(f"/api/investors?limit={rng.choice((50, 100))}&type={rng.choice(('VC', 'Fund'))}")
+        else:
+            urls.append('/api/symbols')
+    return urls
+
+
+def run(app, urls, threads, write_every):
+    position = iter(range(len(urls)))
+    lock = threading.Lock()
+
+    def worker():
+        client = app.test_client()
+        while True:
+            with lock:
+                i = next(position, None)
+            if i is None:
+                return
+            if write_every and i and i % write_every == 0:
+                bump_generation(INVESTOR_GENERATION)
+                bump_generation(MARKET_GENERATION)
+            assert client.get(urls[i]).status_code in (200, 404)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='服务端响应缓存基准')
+    parser.add_argument('--investors', type=int, default=2000)
+    parser.add_argument('--coins', type=int, default=500)
+    parser.add_argument('--points', type=int, default=50, help='每个币种的价格历史条数')
+    parser.add_argument('--requests', type=int, default=4000)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--write-every', type=int, default=1000, help='每多少个请求推进一次代际（0 表示不写入）')
+    parser.add_argument('--latency', type=float, default=5, help='每次数据库查询附加的延迟（毫秒）')
+    args = parser.parse_args()
+
+    backend = SQLiteBackend(os.path.join(tempfile.mkdtemp(), 'bench.db'))
+    backend.create_indexes()
+    set_backend(backend)
+    seed(args.coins, args.investors)
+    seed_history(args.coins, args.points)
+    counting = CountingBackend(backend, args.latency / 1000)
+    set_backend(counting)
+
+    urls = make_urls(random.Random(42), args.requests, args.investors, args.coins)
+    print(f"{args.requests} 个请求，{args.threads} 个线程，每 {args.write_every} 个请求推进一次代际，"
+          f"查询延迟 {args.latency}ms")
+    print(f"  {'':<8}{'耗时(s)':>10}{'请求/秒':>10}{'查询次数':>10}")
+    for label, enabled in (('不缓存', False), ('缓存', True)):
+        app = Flask(__name__)
+        app.config.update(ENABLE_RESPONSE_CACHE=enabled)
+        cache = init_response_cache(app)
+        app.register_blueprint(api_bp, url_prefix='/api')
+        counting.queries = 0
+        elapsed = run(app, urls, args.threads, args.write_every)
+        print(f"  {label:<6}{elapsed:>10.2f}{args.requests / elapsed:>10.0f}{counting.queries:>10}")
+
+    stats = cache.stats()
+    print(f"\n缓存统计: 命中 {stats['hits']}，合并 {stats['coalesced']}，未命中 {stats['misses']}，"
+          f"命中率 {stats['hit_ratio']:.1%}，节省查询耗时 {stats['saved_seconds']:.2f}s，"
+          f"失效 {stats['invalidations']} 条，{stats['entries']} 条 / {stats['bytes'] / 1024:.0f}KB")
+    for route, route_stats in sorted(stats['routes'].items()):
+        print(f"  {route:<28}命中率 {route_stats['hit_ratio']:>6.1%}  合并 {route_stats['coalesced']:>4}  "
+              f"节省 {route_stats['saved_seconds']:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
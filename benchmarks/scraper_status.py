@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+爬虫状态查询基准
+
+在调度器中放入 --jobs 个任务（其中三类爬虫各一个待执行任务），比较：
+- 改造前：前端每 10 秒分别请求三个 /api/scraper/<type>/status，每次遍历调度器任务
+  并按 id 子串匹配（scheduler.scraper_status）
+- 改造后：一次 /api/scraper/status 读取内存状态机；Socket.IO 连接期间不再轮询，
+  只在状态变化时推送
+
+报告单次查询耗时，以及 --clients 个页面每分钟产生的请求数。
+
+用法:
+    python benchmarks/scraper_status.py [--jobs 200] [--iterations 2000] [--clients 500]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from flask import Flask
+
+from backend.api.routes import api_bp
+from backend.scrapers import scheduler as scheduler_module
+from backend.scrapers.status import SCRAPER_JOB_PREFIXES, SCRAPER_TYPES, scraper_states
+
+POLL_INTERVAL = 10
+
+
+def noop():
+    pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='爬虫状态查询基准')
+    parser.add_argument('--jobs', type=int, default=200, help='调度器中的任务总数')
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--clients', type=int, default=500)
+    args = parser.parse_args()
+
+    scheduler = BackgroundScheduler()
+    scheduler.start(paused=True)
+    later = datetime.now() + timedelta(hours=1)
+    for scraper_type in SCRAPER_TYPES:
+        scheduler.add_job(noop, 'date', run_date=later, id=f'{SCRAPER_JOB_PREFIXES[scraper_type]}_scheduled')
+    for i in range(args.jobs - len(SCRAPER_TYPES)):
+        scheduler.add_job(noop, 'date', run_date=later, id=f'export_job_{i}')
+    scheduler_module.scheduler = scheduler
+    scraper_states.attach(scheduler)
+
+    app = Flask(__name__)
+    app.register_blueprint(api_bp, url_prefix='/api')
+    client = app.test_client()
+
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        for scraper_type in SCRAPER_TYPES:
+            scheduler_module.scraper_status(scraper_type)
+    legacy_lookup = (time.perf_counter() - start) / args.iterations
+
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        scraper_states.snapshot()
+    board_lookup = (time.perf_counter() - start) / args.iterations
+
+    start = time.perf_counter()
+    for _ in range(args.iterations // 10):
+        assert client.get('/api/scraper/status').status_code == 200
+    endpoint = (time.perf_counter() - start) / (args.iterations // 10)
+    scheduler.shutdown(wait=False)
+
+    per_minute = 60 / POLL_INTERVAL
+    print(f"调度器中 {args.jobs} 个任务，{args.clients} 个页面")
+    print(f"  三个爬虫状态（遍历任务 + 子串匹配）: {legacy_lookup * 1e6:>8.1f}us")
+    print(f"  三个爬虫状态（内存状态机）:         {board_lookup * 1e6:>8.1f}us")
+    print(f"  GET /api/scraper/status:             {endpoint * 1e6:>8.1f}us")
+    print(f"  每分钟状态请求: 改造前 {args.clients * len(SCRAPER_TYPES) * per_minute:.0f} 次，"
+          f"改造后 0 次（Socket.IO 断开时 {args.clients * per_minute:.0f} 次）")
+
+
+if __name__ == '__main__':
+    main()
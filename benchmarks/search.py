@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+搜索索引基准
+
+生成一批币种和投资者（随机音节拼成的名称），比较：
+- SearchIndex 的构建、增量更新（每轮排名变化 + 少量改名）耗时
+- 输入联想查询（1~6 个字符的前缀、带拼写错误的关键词）的单次耗时，
+  分别统计未命中结果缓存和命中缓存两种情况
+- MongoDB $regex 前缀查询基线（--mongo-uri 指定真实 MongoDB，
+  否则使用 mongomock 内存模拟，仅作参考）
+
+用法:
+    python benchmarks/search.py [--coins 5000] [--investors 10000] [--queries 2000] [--mongo-uri mongodb://...]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.analytics.market_store import MarketSnapshot
+from backend.analytics.search import SearchIndex
+from backend.models.crypto import CryptoData
+
+SYLLABLES = ['bit', 'coin', 'eth', 'er', 'sol', 'ana', 'doge', 'chain', 'link', 'poly', 'gon', 'ava', 'lanche',
+             'lite', 'ri', 'pple', 'car', 'dano', 'ton', 'near', 'arb', 'op', 'sui', 'apt', 'os', 'in', 'ject',
+             'ven', 'ture', 'capital', 'labs', 'fund', 'a16z', 'para', 'digm', 'pan', 'tera', 'multi', 'co']
+
+
+def make_name(rng):
+    words = [''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3))) for _ in range(rng.randint(1, 2))]
+    return ' '.join(word.capitalize() for word in words)
+
+
+def make_cryptos(rng, n):
+    cryptos = []
+    for i in range(n):
+        name = make_name(rng)
+        cryptos.append(CryptoData({
+            'id': f"{name.lower().replace(' ', '-')}-{i}", 'symbol': ''.join(w[:3] for w in name.split()).upper(),
+            'name': name, 'image': f'https://example.com/{i}.png', 'price_usd': rng.uniform(0.01, 100),
+            'market_cap': rng.uniform(1e5, 1e12), 'rank': i + 1,
+        }))
+    return cryptos
+
+
+def make_investors(rng, n):
+    docs = []
+    for i in range(n):
+        name = f'{make_name(rng)} {rng.choice(["Capital", "Ventures", "Labs", "Fund"])} {i}'
+        docs.append({'investor_id': i + 1, 'name': name, 'investor_slug': name.lower().replace(' ', '-'),
+                     'rank': i + 1, 'tier': rng.choice(['1', '2', '3'])})
+    return docs
+
+
+def make_queries(rng, cryptos, investors, count):
+    labels = [c.symbol for c in cryptos] + [c.name for c in cryptos] + [d['name'] for d in investors]
+    queries = []
+    for _ in range(count):
+        label = rng.choice(labels).lower()
+        if rng.random() < 0.2 and len(label) > 5:
+            # 拼写错误：删除一个字符
+            i = rng.randrange(1, len(label) - 1)
+            queries.append(label[:i] + label[i + 1:])
+        else:
+            queries.append(label[:rng.randint(1, min(6, len(label)))])
+    return queries
+
+
+def timed_queries(index, queries, clear_cache):
+    durations = []
+    for q in queries:
+        if clear_cache:
+            index._cache.clear()
+        start = time.perf_counter()
+        index.search(q)
+        durations.append(time.perf_counter() - start)
+    return np.array(durations) * 1e6
+
+
+def regex_baseline(db, queries):
+    durations = []
+    for q in queries:
+        pattern = {'$regex': '^' + re.escape(q), '$options': 'i'}
+        start = time.perf_counter()
+        list(db.crypto_data.find({'$or': [{'symbol': pattern}, {'name': pattern}]}).sort('rank', 1).limit(10))
+        list(db.investor_data.find({'$or': [{'name': pattern}, {'investor_slug': pattern}]}).sort('rank', 1).limit(10))
+        durations.append(time.perf_counter() - start)
+    return np.array(durations) * 1e6
+
+
+def report(name, micros):
+    print(f"  {name:<24}平均 {micros.mean():>9.1f}µs  p50 {np.percentile(micros, 50):>9.1f}µs  "
+          f"p99 {np.percentile(micros, 99):>9.1f}µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='搜索索引基准')
+    parser.add_argument('--coins', type=int, default=5000)
+    parser.add_argument('--investors', type=int, default=10000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--mongo-uri', default=None, help='真实 MongoDB 地址（默认使用 mongomock）')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    cryptos = make_cryptos(rng, args.coins)
+    investors = make_investors(rng, args.investors)
+    queries = make_queries(rng, cryptos, investors, args.queries)
+
+    index = SearchIndex()
+    index.ensure_current = lambda: None  # 只使用基准数据，不读取数据库
+    start = time.perf_counter()
+    index.update_cryptos(MarketSnapshot.from_cryptos(cryptos, generation=1))
+    index.update_investors(investors)
+    print(f"构建索引: {(time.perf_counter() - start) * 1000:.1f}ms  {index.stats()}")
+
+    # 模拟下一轮爬取：排名整体变动，少量币种改名
+    for c in cryptos:
+        c.rank = rng.randint(1, args.coins)
+    for c in rng.sample(cryptos, 10):
+        c.name = make_name(rng)
+    start = time.perf_counter()
+    stats = index.update_cryptos(MarketSnapshot.from_cryptos(cryptos, generation=2))
+    print(f"增量更新: {(time.perf_counter() - start) * 1000:.1f}ms  {stats}")
+
+    print(f"\n{len(queries)} 次查询（每次返回前 10 条）")
+    report('SearchIndex 未缓存', timed_queries(index, queries, clear_cache=True))
+    report('SearchIndex 缓存命中', timed_queries(index, queries, clear_cache=False))
+
+    if args.mongo_uri:
+        from pymongo import MongoClient
+        db = MongoClient(args.mongo_uri)['scrapecoins_search_bench']
+        label = 'MongoDB $regex'
+    else:
+        try:
+            import mongomock
+        except ImportError:
+            print("  （未安装 mongomock 且未指定 --mongo-uri，跳过 $regex 基线）")
+            return
+        db = mongomock.MongoClient()['bench']
+        label = 'mongomock $regex'
+    db.crypto_data.drop()
+    db.investor_data.drop()
+    db.crypto_data.insert_many([{'id': c.id, 'symbol': c.symbol, 'name': c.name, 'rank': c.rank} for c in cryptos])
+    db.investor_data.insert_many([dict(d) for d in investors])
+    for collection in (db.crypto_data, db.investor_data):
+        collection.create_index('name')
+        collection.create_index('rank')
+    sample = queries[:max(1, min(len(queries), 200))]
+    report(label, regex_baseline(db, sample))
+    if args.mongo_uri:
+        db.client.drop_database(db.name)
+
+
+if __name__ == '__main__':
+    main()
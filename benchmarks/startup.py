@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+应用冷启动与导入耗时分析
+
+在全新的子进程中（python -X importtime）导入 backend.app 并调用 create_app，
+重复 --runs 次取中位数，报告：
+- 导入耗时、create_app 耗时和总冷启动耗时
+- 按顶层包汇总的导入耗时，以及耗时最多的模块（累计耗时）
+
+默认使用临时 SQLite 后端，不依赖 MongoDB；--backend mongo 时使用 .env 中的 MONGO_URI。
+
+用法:
+    python benchmarks/startup.py [--runs 5] [--top 20] [--backend sqlite|mongo] [--index-mode background|sync|off]
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD_CODE = """
+import json, time
+start = time.perf_counter()
+from backend.app import create_app
+imported = time.perf_counter()
+create_app()
+done = time.perf_counter()
+print('STARTUP ' + json.dumps({'import': imported - start, 'create_app': done - imported, 'total': done - start}))
+"""
+
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$')
+
+
+def run_once(env):
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', CHILD_CODE], cwd=ROOT, env=env,
+                            capture_output=True, text=True, timeout=300)
+    timings = None
+    for line in result.stdout.splitlines():
+        if line.startswith('STARTUP '):
+            timings = json.loads(line[len('STARTUP '):])
+    if timings is None:
+        raise RuntimeError(f'子进程启动失败:\n{result.stderr[-2000:]}')
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return timings, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description='应用冷启动与导入耗时分析')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=20, help='列出累计耗时最多的模块数')
+    parser.add_argument('--backend', choices=['sqlite', 'mongo'], default='sqlite')
+    parser.add_argument('--index-mode', choices=['background', 'sync', 'off'], default='background')
+    args = parser.parse_args()
+
+    env = dict(os.environ, STORAGE_BACKEND=args.backend, INDEX_BUILD_MODE=args.index_mode,
+               ENABLE_SCHEMA_MIGRATION='false', PYTHONDONTWRITEBYTECODE='')
+    if args.backend == 'sqlite':
+        env['SQLITE_PATH'] = os.path.join(tempfile.mkdtemp(), 'startup.db')
+
+    runs = [run_once(env) for _ in range(args.runs)]
+    print(f"冷启动（{args.runs} 次中位数，后端 {args.backend}，索引 {args.index_mode}）")
+    for key, label in (('import', '导入 backend.app'), ('create_app', 'create_app()'), ('total', '合计')):
+        print(f"  {label:<18}{statistics.median(t[key] for t, _ in runs) * 1000:>8.0f}ms")
+
+    # 取总耗时为中位数的那次运行的导入明细
+    _, modules = sorted(runs, key=lambda r: r[0]['total'])[len(runs) // 2]
+
+    packages = defaultdict(int)
+    for name, (self_us, _, _) in modules.items():
+        packages[name.split('.')[0]] += self_us
+    total_us = sum(packages.values())
+    print(f"\n按顶层包汇总的导入耗时（自身耗时之和，共 {total_us / 1000:.0f}ms）")
+    for package, us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {package:<28}{us / 1000:>8.1f}ms {us / total_us:>7.1%}")
+
+    print(f"\n累计耗时最多的模块（含其导入的子模块）")
+    ranked = sorted(modules.items(), key=lambda item: -item[1][1])[:args.top]
+    for name, (self_us, cumulative_us, depth) in ranked:
+        print(f"  {name:<48}{cumulative_us / 1000:>8.1f}ms  (自身 {self_us / 1000:.1f}ms, 层级 {depth})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+存储后端一致性检查与基准测试
+
+对每个后端运行同一套检查（批量 upsert、按排名取最新、历史区间查询等），
+再测量相同负载下的耗时，便于直接对比。
+
+用法:
+    python benchmarks/storage_backends.py                       # 仅 SQLite
+    python benchmarks/storage_backends.py --mongo-uri mongodb://localhost:27017
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.database.backends import MongoBackend, SQLiteBackend
+from backend.database.db import CryptoDataManager, InvestorDataManager
+
+BENCH_DB = 'scrapecoins_bench'
+
+
+def make_coins(n, now):
+    """生成 n 个币种的模拟快照"""
+    return [{
+        'id': f'coin-{i}',
+        'symbol': f'C{i}',
+        'name': f'Coin {i}',
+        'price_usd': random.uniform(0.01, 50000),
+        'market_cap': random.uniform(1e5, 1e12),
+        'volume_24h': random.uniform(1e3, 1e10),
+        'price_change_percentage_24h': random.uniform(-20, 20),
+        'rank': i + 1,
+        'source': 'coingecko',
+        'timestamp': now,
+    } for i in range(n)]
+
+
+def check(condition, message):
+    if not condition:
+        raise AssertionError(message)
+
+
+def run_conformance(backend):
+    """一致性检查：所有后端必须得到相同结果"""
+    for name in ('crypto_data', 'investor_data'):
+        backend.drop(name)
+    backend.create_indexes()
+
+    cryptos = CryptoDataManager(backend)
+    investors = InvestorDataManager(backend)
+    now = datetime.utcnow().replace(microsecond=0)
+
+    # 批量 upsert：首次全部插入，重复写入无修改，部分修改只计修改条数
+    coins = make_coins(50, now)
+    result = cryptos.upsert_crypto_data(coins)
+    check(result['inserted'] == 50, f'首次 upsert 应插入 50 条: {result}')
+    result = cryptos.upsert_crypto_data(coins)
+    check(result['inserted'] == 0 and result['modified'] == 0, f'重复 upsert 不应产生修改: {result}')
+    changed = [dict(c, price_usd=c['price_usd'] + 1) for c in coins[:5]]
+    result = cryptos.upsert_crypto_data(changed)
+    check(result['modified'] == 5 and result['matched'] == 5, f'应修改 5 条: {result}')
+    check(cryptos.count() == 50, '记录总数应为 50')
+
+    # 按排名取最新
+    top = cryptos.get_top_by_rank(limit=10)
+    check([d['rank'] for d in top] == list(range(1, 11)), '按排名排序错误')
+    check(isinstance(top[0]['timestamp'], datetime), 'timestamp 应还原为 datetime')
+
+    # 历史区间查询
+    history = [dict(coins[0], timestamp=datetime.utcnow() - timedelta(hours=h)) for h in (1, 5, 30, 50)]
+    cryptos.insert_crypto_data(history)
+    rows = cryptos.get_price_history('c0', hours=24)
+    stamps = [d['timestamp'] for d in rows]
+    check(len(rows) == 3 and stamps == sorted(stamps), f'24 小时历史应返回 3 条升序记录: {len(rows)}')
+
+    latest = cryptos.get_crypto_by_symbol('C0')
+    check(latest['timestamp'] == now, 'get_crypto_by_symbol 应返回最新记录')
+    check(sorted(cryptos.get_all_symbols()) == sorted(c['symbol'] for c in coins), 'distinct 结果错误')
+
+    # 运算符
+    check(backend.count('crypto_data', {'symbol': {'$in': ['C1', 'C2', 'C3']}}) == 3, '$in 结果错误')
+    check(backend.count('crypto_data', {'rank': {'$gte': 45, '$lt': 48}}) == 3, '区间查询结果错误')
+    check(backend.count('crypto_data', {'missing': {'$exists': False}}) == 54, '$exists 结果错误')
+
+    # 投资者 upsert（按 investor_id 或 name）与分组统计
+    investors.upsert_investor_data([
+        {'investor_id': 1, 'name': 'A', 'type': 'VC', 'tier': '1'},
+        {'investor_id': 2, 'name': 'B', 'type': 'VC', 'tier': '2'},
+        {'name': 'C', 'type': 'Angel', 'tier': '2'},
+    ])
+    result = investors.upsert_investor_data([{'name': 'C', 'type': 'Angel', 'tier': '1'}])
+    check(result['modified'] == 1 and result['inserted'] == 0, f'按 name upsert 错误: {result}')
+    stats = investors.get_statistics()
+    check(stats['total_count'] == 3, '投资者总数错误')
+    check(stats['type_distribution'][0] == {'_id': 'VC', 'count': 2}, f'分组统计错误: {stats}')
+    # 整文档替换会移除新文档中没有的字段
+    investors.upsert_investor_data([{'investor_id': 1, 'name': 'A', 'type': 'VC'}])
+    check('tier' not in backend.find_one('investor_data', {'investor_id': 1}), 'replace_many 应移除旧字段')
+
+    # 删除
+    check(cryptos.delete_old_data(days=1) == 2, 'delete_old_data 应删除 2 条')
+    check(cryptos.delete_by_symbol('C0') == 3, 'delete_by_symbol 应删除 3 条')
+
+
+def timed(label, func, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"  {label:<32} {elapsed * 1000:10.2f} ms")
+    return elapsed
+
+
+def run_benchmark(backend, coins=5000, snapshots=20):
+    """基准测试：批量 upsert、按排名取最新、历史区间查询"""
+    backend.drop('crypto_data')
+    backend.create_indexes()
+    cryptos = CryptoDataManager(backend)
+    now = datetime.utcnow()
+
+    data = make_coins(coins, now)
+    timed(f'upsert {coins} (insert)', lambda: cryptos.upsert_crypto_data(data))
+    for doc in data:
+        doc['price_usd'] *= 1.01
+    timed(f'upsert {coins} (update)', lambda: cryptos.upsert_crypto_data(data))
+
+    history = []
+    for s in range(snapshots):
+        ts = now - timedelta(hours=s)
+        history.extend(dict(d, timestamp=ts) for d in data[:500])
+    timed(f'insert {len(history)} history rows', lambda: cryptos.insert_crypto_data(history))
+
+    timed('latest top 100 by rank', lambda: cryptos.get_top_by_rank(limit=100), repeat=20)
+    timed('history range 24h (1 symbol)', lambda: cryptos.get_price_history('C10', hours=24), repeat=50)
+    timed('latest by symbol', lambda: cryptos.get_crypto_by_symbol('C10'), repeat=200)
+    backend.drop('crypto_data')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='存储后端一致性检查与基准测试')
+    parser.add_argument('--mongo-uri', help='同时测试 MongoDB 后端')
+    parser.add_argument('--coins', type=int, default=5000)
+    parser.add_argument('--snapshots', type=int, default=20)
+    args = parser.parse_args()
+
+    backends = []
+    tmpdir = tempfile.mkdtemp(prefix='scrapecoins-bench-')
+    backends.append(SQLiteBackend(os.path.join(tmpdir, 'bench.db')))
+    if args.mongo_uri:
+        from pymongo import MongoClient
+        client = MongoClient(args.mongo_uri)
+        backends.append(MongoBackend(db=client[BENCH_DB]))
+
+    for backend in backends:
+        print(f"=== {backend.name} ===")
+        run_conformance(backend)
+        print("  一致性检查通过")
+        run_benchmark(backend, coins=args.coins, snapshots=args.snapshots)
+        for name in ('crypto_data', 'investor_data'):
+            backend.drop(name)
+        backend.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式导出基准
+
+在临时 SQLite 数据库中写入一批投资者数据（含投资组合明细），比较
+/api/investors（整体构建后 jsonify）与 /api/investors/export（NDJSON / CSV
+生成器响应）的首字节时间、总耗时和 Python 峰值内存（tracemalloc）。
+
+用法:
+    python benchmarks/streaming_export.py [--investors 20000] [--projects 10]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from backend.api.routes import api_bp
+from backend.api.serialization import init_json_provider
+from backend.database.backends import SQLiteBackend
+from backend.database.db import set_backend
+from backend.models.investor import InvestorData
+
+
+def seed(backend, investors, projects):
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    docs, entries = [], []
+    for i in range(investors):
+        investor = InvestorData({
+            'id': i + 1, 'name': f'Investor {i}', 'investorSlug': f'investor-{i}', 'rank': i + 1,
+            'tier': rng.choice(['1', '2', '3']), 'country': 'US', 'totalInvestments': rng.randint(1, 300),
+            'description': 'Lorem ipsum ' * 10, 'timestamp': now - timedelta(seconds=i),
+            'portfolioProjects': [{'slug': f'project-{rng.randrange(5000)}', 'name': 'Project', 'round': 'Seed'}
+                                  for _ in range(projects)],
+        })
+        docs.append(investor.to_mongo_dict())
+        entries.extend(investor.portfolio_entries())
+    # 直接批量写入，跳过逐条 upsert 的比对开销
+    backend.insert_many('investor_data', docs)
+    backend.insert_many('investor_portfolio', entries)
+
+
+def measure(client, url):
+    """返回 (首字节秒数, 总秒数, 字节数, 峰值内存 MB)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get(url, buffered=False)
+    first = None
+    size = 0
+    for chunk in response.response:
+        if first is None:
+            first = time.perf_counter() - start
+        size += len(chunk)
+    total = time.perf_counter() - start
+    response.close()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first or total, total, size, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description='流式导出基准')
+    parser.add_argument('--investors', type=int, default=20000)
+    parser.add_argument('--projects', type=int, default=10, help='每个投资者的投资组合项目数')
+    args = parser.parse_args()
+
+    backend = SQLiteBackend(os.path.join(tempfile.mkdtemp(), 'bench.db'))
+    backend.create_indexes()
+    set_backend(backend)
+    seed(backend, args.investors, args.projects)
+
+    app = Flask(__name__)
+    init_json_provider(app)
+    app.register_blueprint(api_bp, url_prefix='/api')
+    client = app.test_client()
+
+    n = args.investors
+    cases = [
+        ('jsonify 列表', f'/api/investors?limit={n}&include=portfolio'),
+        ('NDJSON 流', f'/api/investors/export?limit={n}&include=portfolio'),
+        ('CSV 流', f'/api/investors/export?limit={n}&include=portfolio&format=csv'),
+    ]
+    print(f"{n} 个投资者 × {args.projects} 个项目")
+    print(f"  {'接口':<14}{'首字节(ms)':>12}{'总耗时(s)':>12}{'字节':>16}{'峰值内存(MB)':>14}")
+    for name, url in cases:
+        first, total, size, peak = measure(client, url)
+        print(f"  {name:<14}{first * 1000:>12.1f}{total:>12.2f}{size:>16,}{peak:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
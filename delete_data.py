@@ -19,7 +19,7 @@ def delete_all_crypto_data():
         crypto_manager = CryptoDataManager()
         
         # 获取删除前的数据量
-        count_before = crypto_manager.collection.count_documents({})
+        count_before = crypto_manager.count()
         print(f"删除前共有 {count_before} 条记录")
         
         # 删除所有数据
@@ -7,6 +7,9 @@ class CryptoApp {
         this.tableBody = document.getElementById('crypto-table-body');
         this.currentView = 'log';
         this.currentData = [];
+        // Socket.IO 推送的行情：代际号与 id -> 行
+        this.generation = null;
+        this.cryptoRows = new Map();
         this.sortColumn = 'rank';
         this.sortDirection = 'asc';
         this.scraperStatus = {};
@@ -43,6 +46,16 @@ class CryptoApp {
             });
         }
         
+        // 日志最低级别
+        const logLevelSelect = document.getElementById('log-level');
+        if (logLevelSelect) {
+            logLevelSelect.addEventListener('change', () => {
+                if (typeof wsManager !== 'undefined' && wsManager) {
+                    wsManager.setLogLevel(logLevelSelect.value);
+                }
+            });
+        }
+        
         // 清空日志按钮
         const clearLogsBtn = document.getElementById('clear-logs-btn');
         if (clearLogsBtn) {
@@ -131,7 +144,10 @@ class CryptoApp {
             
             if (data.success) {
                 this.showMessage(`${scraperType} 爬虫${enabled ? '启动' : '停止'}成功`, 'success');
-                setTimeout(() => this.checkScraperStatus(scraperType), 1000);
+                // 状态变化由 Socket.IO 推送；未连接时主动查询一次
+                if (typeof wsManager === 'undefined' || !wsManager || !wsManager.isConnected()) {
+                    setTimeout(() => this.checkAllScrapersStatus(), 1000);
+                }
             } else {
                 this.showError(data.error || `${scraperType} 爬虫${enabled ? '启动' : '停止'}失败`);
                 // 恢复开关状态
@@ -147,27 +163,28 @@ class CryptoApp {
         }
     }
 
-    async checkScraperStatus(scraperType) {
+    async checkAllScrapersStatus() {
         try {
-            const response = await fetch(`/api/scraper/${scraperType}/status`);
+            const response = await fetch('/api/scraper/status');
             const data = await response.json();
             
             if (data.success) {
-                this.scraperStatus[scraperType] = data.data;
-                this.updateScraperStatusDisplay(scraperType);
+                Object.values(data.data.scrapers || {}).forEach(status => this.applyScraperStatus(status, false));
+                this.updateGlobalScraperStatus();
             }
         } catch (error) {
-            console.error(`检查${scraperType}爬虫状态失败:`, error);
+            console.error('检查爬虫状态失败:', error);
         }
     }
 
-    async checkAllScrapersStatus() {
-        await Promise.all([
-            this.checkScraperStatus('coingecko'),
-            this.checkScraperStatus('dropstab'),
-            this.checkScraperStatus('tokenomist') // 新增
-        ]);
-        this.updateGlobalScraperStatus();
+    applyScraperStatus(status, updateGlobal = true) {
+        // 单个爬虫的状态（接口查询结果或 Socket.IO 推送）
+        if (!status || !status.scraper_type) return;
+        const current = this.scraperStatus[status.scraper_type];
+        if (current && status.version && current.version && status.version < current.version) return;
+        this.scraperStatus[status.scraper_type] = status;
+        this.updateScraperStatusDisplay(status.scraper_type);
+        if (updateGlobal) this.updateGlobalScraperStatus();
     }
 
     updateScraperStatusDisplay(scraperType) {
@@ -180,8 +197,15 @@ class CryptoApp {
         }
         
         if (statusSpan && status) {
-            statusSpan.textContent = status.running ? '运行中' : '已停止';
+            let text = '已停止';
+            if (status.state === 'running') {
+                text = status.current_page ? `运行中 (${status.current_page}/${status.total_pages || '?'})` : '运行中';
+            } else if (status.state === 'scheduled' || status.running) {
+                text = status.next_run ? `等待中 (${new Date(status.next_run).toLocaleTimeString()})` : '等待中';
+            }
+            statusSpan.textContent = text;
             statusSpan.className = `scraper-status ${status.running ? 'running' : 'stopped'}`;
+            statusSpan.title = status.last_error ? `上次错误: ${status.last_error}` : '';
         }
     }
 
@@ -296,7 +320,7 @@ class CryptoApp {
             <td>${this.formatMarketCap(crypto.market_cap)}</td>
             <td>${this.formatMarketCap(crypto.volume_24h)}</td>
             <td>${this.formatNumber(crypto.circulating_supply)}</td>
-            <td><span style="text-transform: capitalize;">${crypto.source}</span></td>
+            <td><span style="text-transform: capitalize;">${crypto.source || ''}</span></td>
             <td>${this.formatTimestamp(crypto.timestamp)}</td>
         `;
         
@@ -320,7 +344,14 @@ class CryptoApp {
         const currentTh = document.querySelector(`[data-sort="${column}"]`);
         currentTh.classList.add(`sort-${this.sortDirection}`);
         
-        // 排序数据
+        this.sortCurrentData();
+        
+        // 更新表格显示
+        this.updateCryptoTable(this.currentData);
+    }
+
+    sortCurrentData() {
+        const column = this.sortColumn;
         this.currentData.sort((a, b) => {
             let aVal = a[column];
             let bVal = b[column];
@@ -344,9 +375,42 @@ class CryptoApp {
             
             return 0;
         });
-        
-        // 更新表格显示
-        this.updateCryptoTable(this.currentData);
+    }
+
+    applySnapshot(payload) {
+        // 完整的 Top N 数据（连接时或增量无法衔接时由服务端发送）
+        if (!payload || !Array.isArray(payload.data)) return;
+        if (this.generation !== null && payload.generation < this.generation) return;
+        this.cryptoRows = new Map(payload.data.map(row => [row.id, { ...row, timestamp: payload.timestamp }]));
+        this.generation = payload.generation;
+        this.refreshFromRows();
+    }
+
+    applyDelta(delta) {
+        // 返回 false 表示缺少中间增量，需要重新同步
+        if (!delta) return true;
+        if (this.generation !== null && delta.generation <= this.generation) return true;
+        if (this.generation === null || delta.base !== this.generation) return false;
+
+        (delta.removed || []).forEach(id => this.cryptoRows.delete(id));
+        Object.entries(delta.changed || {}).forEach(([id, fields]) => {
+            const row = this.cryptoRows.get(id);
+            if (row) {
+                Object.assign(row, fields, { timestamp: delta.timestamp });
+            }
+        });
+        (delta.added || []).forEach(row => {
+            this.cryptoRows.set(row.id, { ...row, timestamp: delta.timestamp });
+        });
+        this.generation = delta.generation;
+        this.refreshFromRows();
+        return true;
+    }
+
+    refreshFromRows() {
+        this.currentData = Array.from(this.cryptoRows.values());
+        this.sortCurrentData();
+        this.updateDisplay();
     }
 
     exportData(format) {
@@ -491,27 +555,36 @@ class CryptoApp {
 
     // 日志相关方法
     addLogMessage(message, type = 'info', timestamp = null) {
+        this.addLogMessages([{ message, type, timestamp }]);
+    }
+
+    addLogMessages(entries) {
+        // 一帧日志一次性插入，再统一裁剪条数和滚动
         const logContent = this.logContent;
-        if (!logContent) return;
-        
-        const logMessage = document.createElement('div');
-        logMessage.className = `log-message ${type}`;
-        
-        const timeStr = timestamp ? new Date(timestamp).toLocaleTimeString() : new Date().toLocaleTimeString();
-        
-        logMessage.innerHTML = `
-            <span class="timestamp">[${timeStr}]</span>
-            <span class="message">${message}</span>
-        `;
-        
-        logContent.appendChild(logMessage);
-        
+        if (!logContent || !entries.length) return;
+
+        const fragment = document.createDocumentFragment();
+        entries.forEach(({ message, type = 'info', timestamp = null, scraper = null }) => {
+            const logMessage = document.createElement('div');
+            logMessage.className = `log-message ${type}`;
+
+            const timeStr = timestamp ? new Date(timestamp).toLocaleTimeString() : new Date().toLocaleTimeString();
+            const source = scraper && scraper !== 'system' ? `[${scraper}] ` : '';
+
+            logMessage.innerHTML = `
+                <span class="timestamp">[${timeStr}]</span>
+                <span class="message">${source}${message}</span>
+            `;
+            fragment.appendChild(logMessage);
+        });
+        logContent.appendChild(fragment);
+
         // 限制日志条数
         const messages = logContent.querySelectorAll('.log-message');
-        if (messages.length > this.maxLogMessages) {
-            messages[0].remove();
+        for (let i = 0; i < messages.length - this.maxLogMessages; i++) {
+            messages[i].remove();
         }
-        
+
         // 自动滚动到底部
         const autoScroll = document.getElementById('auto-scroll');
         if (autoScroll && autoScroll.checked) {
@@ -532,14 +605,18 @@ class CryptoApp {
 
     // 添加缺失的 setupAutoRefresh 方法
     setupAutoRefresh() {
-        // 每30秒刷新一次数据
+        // 行情由 Socket.IO 增量推送；连接断开期间每30秒轮询一次
         setInterval(() => {
-            this.loadInitialData();
+            if (typeof wsManager === 'undefined' || !wsManager || !wsManager.isConnected()) {
+                this.loadInitialData();
+            }
         }, 30000);
 
-        // 每10秒检查一次爬虫状态
+        // 爬虫状态由 Socket.IO 推送；连接断开期间每10秒查询一次
         setInterval(() => {
-            this.checkAllScrapersStatus();
+            if (typeof wsManager === 'undefined' || !wsManager || !wsManager.isConnected()) {
+                this.checkAllScrapersStatus();
+            }
         }, 10000);
     }
 }
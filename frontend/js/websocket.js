@@ -6,6 +6,12 @@ class WebSocketManager {
         this.maxReconnectAttempts = 5;
         this.reconnectDelay = 1000;
         this.statusElement = document.getElementById('connection-status');
+        // 行情表格订阅的前 N 名档位（服务端只推送该房间的增量）
+        this.topN = 100;
+        // 日志最低级别与已显示的最大日志序号（重连回放时跳过已显示的日志）
+        const logLevelSelect = document.getElementById('log-level');
+        this.logLevel = logLevelSelect ? logLevelSelect.value : 'info';
+        this.lastLogSeq = 0;
     }
 
     connect() {
@@ -19,7 +25,9 @@ class WebSocketManager {
                 return;
             }
             
-            this.socket = io();
+            // 优先直接建立 WebSocket：多 worker 部署时长轮询需要粘性会话，
+            // WebSocket 连接始终落在同一个 worker 上；不支持时再退回长轮询
+            this.socket = io({ transports: ['websocket', 'polling'] });
             this.setupEventListeners();
         } catch (error) {
             console.error('WebSocket连接失败:', error);
@@ -46,6 +54,13 @@ class WebSocketManager {
             console.log('WebSocket连接成功');
             this.reconnectAttempts = 0;
             this.updateStatus('connected');
+            // 连接（或重连）后加入行情房间，并补齐断开期间错过的增量
+            this.subscribe();
+            this.subscribeLogs(100);
+            // 断开期间可能错过状态推送，重新查询一次
+            if (window.cryptoApp) {
+                window.cryptoApp.checkAllScrapersStatus();
+            }
         });
 
         this.socket.on('disconnect', () => {
@@ -54,15 +69,25 @@ class WebSocketManager {
             this.attemptReconnect();
         });
 
-        this.socket.on('crypto_update', (data) => {
-            console.log('收到加密货币数据更新:', data);
-            this.handleCryptoUpdate(data);
+        this.socket.on('crypto_update', (delta) => {
+            this.handleCryptoUpdate(delta);
         });
 
-        // 添加日志事件监听
-        this.socket.on('scraper_log', (data) => {
-            console.log('收到爬虫日志:', data);
-            this.handleScraperLog(data);
+        this.socket.on('crypto_snapshot', (payload) => {
+            if (window.cryptoApp) {
+                window.cryptoApp.applySnapshot(payload);
+            }
+        });
+
+        this.socket.on('scraper_status', (status) => {
+            if (window.cryptoApp) {
+                window.cryptoApp.applyScraperStatus(status);
+            }
+        });
+
+        // 爬虫日志（服务端按间隔批量发送）
+        this.socket.on('scraper_logs', (frame) => {
+            this.handleScraperLogs(frame);
         });
 
         this.socket.on('connect_error', (error) => {
@@ -72,20 +97,53 @@ class WebSocketManager {
         });
     }
 
-    handleCryptoUpdate(data) {
-        if (data && data.data) {
-            // 直接更新应用数据
-            if (window.cryptoApp) {
-                window.cryptoApp.currentData = data.data;
-                window.cryptoApp.updateDisplay();
-            }
+    handleCryptoUpdate(delta) {
+        // 增量无法衔接本地数据时请求重新同步
+        if (window.cryptoApp && !window.cryptoApp.applyDelta(delta)) {
+            this.requestResync();
         }
     }
 
-    // 新增：处理爬虫日志
-    handleScraperLog(data) {
+    syncPayload() {
+        // 带上本地数据的代际号，服务端能衔接时只补发增量
+        const generation = window.cryptoApp ? window.cryptoApp.generation : null;
+        return generation !== null ? { top: this.topN, since: generation } : { top: this.topN };
+    }
+
+    subscribe() {
+        if (!this.isConnected()) return;
+        this.socket.emit('subscribe', this.syncPayload());
+    }
+
+    requestResync() {
+        if (!this.isConnected()) return;
+        this.socket.emit('crypto_resync', this.syncPayload());
+    }
+
+    isConnected() {
+        return Boolean(this.socket && this.socket.connected);
+    }
+
+    subscribeLogs(replay = 0) {
+        if (!this.isConnected()) return;
+        this.socket.emit('logs_subscribe', { level: this.logLevel, replay });
+    }
+
+    setLogLevel(level) {
+        this.logLevel = level;
+        this.subscribeLogs(0);
+    }
+
+    handleScraperLogs(frame) {
+        if (!frame || !Array.isArray(frame.entries)) return;
+        const entries = frame.entries.filter(entry => entry.seq > this.lastLogSeq);
+        if (!entries.length) return;
+        this.lastLogSeq = entries[entries.length - 1].seq;
         if (window.cryptoApp) {
-            window.cryptoApp.addLogMessage(data.message, data.type || 'info', data.timestamp);
+            window.cryptoApp.addLogMessages(entries);
+            if (frame.dropped) {
+                window.cryptoApp.addLogMessage(`⚠️ 日志过多，已省略 ${frame.dropped} 条`, 'warning');
+            }
         }
     }
 
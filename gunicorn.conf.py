@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+gunicorn 生产部署配置
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+- worker 数默认等于 CPU 核数（WEB_CONCURRENCY 覆盖），使用 gevent 异步 worker，
+  单个 worker 可同时保持大量 Socket.IO 连接和流式导出响应
+- 开启 CLUSTER_MODE：调度器只在一个 worker 中运行，代际号在 worker 间同步
+  （见 backend/cluster.py）
+- 不能开启 preload_app：每个 worker 需要各自执行 create_app 并竞争调度器锁
+"""
+
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+os.environ.setdefault('CLUSTER_MODE', 'true')
+os.environ.setdefault('FLASK_ENV', 'production')
+
+bind = f"{os.getenv('API_HOST', '0.0.0.0')}:{os.getenv('API_PORT', '5000')}"
+workers = int(os.getenv('WEB_CONCURRENCY') or multiprocessing.cpu_count())
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gevent')
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = 30
+keepalive = 5
+preload_app = False
+
+
+def when_ready(server):
+    if workers > 1 and not os.getenv('SOCKETIO_MESSAGE_QUEUE'):
+        server.log.warning('多个 worker 但未配置 SOCKETIO_MESSAGE_QUEUE，'
+                           'Socket.IO 事件只会发送到产生事件的 worker 上的连接')
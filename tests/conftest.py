@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""测试公共夹具：临时 SQLite 存储后端和只注册 API 蓝图的 Flask 应用"""
+
+import pytest
+from flask import Flask
+
+from backend.database.backends import SQLiteBackend
+from backend.database import db as db_module
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / 'test.db'))
+    backend.create_indexes()
+    previous = db_module._backend
+    db_module.set_backend(backend)
+    yield backend
+    db_module.set_backend(previous)
+    backend.close()
+
+
+@pytest.fixture
+def api_app(sqlite_backend, monkeypatch):
+    from backend.api import routes
+    from backend.api.routes import api_bp
+
+    # 模块级的 crypto_manager 会缓存首次解析到的后端
+    monkeypatch.setattr(routes.crypto_manager, '_backend', sqlite_backend)
+    app = Flask(__name__)
+    app.register_blueprint(api_bp, url_prefix='/api')
+    return app
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""存储后端批量写入"""
+
+import sqlite3
+
+import mongomock
+import pytest
+
+from backend.database.backends import MongoBackend, SQLiteBackend
+
+
+def test_mongo_bulk_write_isolates_failed_documents(capsys):
+    db = mongomock.MongoClient().db
+    db.coins.create_index('slug', unique=True)
+    db.coins.insert_one({'id': 'existing', 'slug': 'taken'})
+    backend = MongoBackend(db)
+
+    docs = [{'id': 'a', 'slug': 'a'}, {'id': 'b', 'slug': 'taken'}, {'id': 'c', 'slug': 'c'}]
+    result = backend.upsert_many('coins', docs, key=('id',))
+
+    assert result['inserted'] == 2
+    assert result['failed'] == 1
+    assert sorted(doc['id'] for doc in db.coins.find()) == ['a', 'c', 'existing']
+    assert "{'id': 'b'}" in capsys.readouterr().out
+
+
+def test_mongo_replace_many_reports_no_failures():
+    backend = MongoBackend(mongomock.MongoClient().db)
+    result = backend.replace_many('coins', [{'id': 'a', 'v': 1}, {'id': 'b', 'v': 2}], key=('id',))
+    assert result == {'inserted': 2, 'modified': 0, 'matched': 0, 'failed': 0}
+    result = backend.replace_many('coins', [{'id': 'a', 'v': 3}], key=('id',))
+    assert result['modified'] == 1
+
+
+def test_sqlite_upsert_merges_and_replace_removes_fields(sqlite_backend):
+    sqlite_backend.upsert_many('crypto_data', [{'id': 'a', 'price_usd': 1.0, 'extra': 'x'}], key=('id',))
+    result = sqlite_backend.upsert_many('crypto_data', [{'id': 'a', 'price_usd': 2.0}], key=('id',))
+    assert result == {'inserted': 0, 'modified': 1, 'matched': 1, 'failed': 0}
+    assert sqlite_backend.find_one('crypto_data', {'id': 'a'})['extra'] == 'x'
+
+    sqlite_backend.replace_many('crypto_data', [{'id': 'a', 'price_usd': 3.0}], key=('id',))
+    doc = sqlite_backend.find_one('crypto_data', {'id': 'a'})
+    assert doc['price_usd'] == 3.0
+    assert 'extra' not in doc
+
+
+
+def _portfolio_entry(project, data='x'):
+    return {'investor_id': 'inv-1', 'kind': 'project', 'project': project, 'data': data}
+
+
+def _sqlite_indexes(backend, name):
+    rows = backend._conn().execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (backend._table(name).strip('"'),)
+    ).fetchall()
+    return {row[0] for row in rows}
+
+
+def test_sqlite_portfolio_key_is_unique(sqlite_backend):
+    sqlite_backend.insert_many('investor_portfolio', [_portfolio_entry('alpha')])
+    with pytest.raises(sqlite3.IntegrityError):
+        sqlite_backend.insert_many('investor_portfolio', [_portfolio_entry('alpha', 'dup')])
+
+    result = sqlite_backend.upsert_many('investor_portfolio', [_portfolio_entry('alpha', 'new')],
+                                        key=('investor_id', 'kind', 'project'))
+    assert result['modified'] == 1
+    assert sqlite_backend.count('investor_portfolio') == 1
+
+
+def test_sqlite_unique_index_replaces_plain_index(tmp_path, capsys):
+    backend = SQLiteBackend(str(tmp_path / 'legacy.db'))
+    unique = 'ux_investor_portfolio_investor_id_1_kind_1_project_1'
+    plain = 'ix' + unique[2:]
+    backend.create_indexes()
+    backend._conn().execute(f'DROP INDEX "{unique}"')
+
+    # 旧版本只有普通索引，且已经写入了重复数据
+    backend.insert_many('investor_portfolio', [_portfolio_entry('alpha'), _portfolio_entry('alpha')])
+    backend.create_indexes()
+    assert plain in _sqlite_indexes(backend, 'investor_portfolio')
+    assert unique not in _sqlite_indexes(backend, 'investor_portfolio')
+    assert '创建唯一索引失败' in capsys.readouterr().out
+
+    backend.delete_many('investor_portfolio')
+    backend.create_indexes()
+    indexes = _sqlite_indexes(backend, 'investor_portfolio')
+    assert unique in indexes and plain not in indexes
+    backend.close()
+
+
+def test_mongo_unique_index_replaces_plain_index():
+    db = mongomock.MongoClient().db
+    keys = [('investor_id', 1), ('kind', 1), ('project', 1)]
+    db.investor_portfolio.create_index(keys)
+    MongoBackend(db).create_indexes()
+
+    matching = [info for info in db.investor_portfolio.index_information().values()
+                if [tuple(k) for k in info['key']] == keys]
+    assert len(matching) == 1 and matching[0].get('unique')
+
+
+def test_mongo_keeps_plain_index_when_duplicates_exist(capsys):
+    db = mongomock.MongoClient().db
+    db.investor_portfolio.insert_many([_portfolio_entry('alpha'), _portfolio_entry('alpha')])
+    MongoBackend(db).create_indexes()
+
+    keys = [('investor_id', 1), ('kind', 1), ('project', 1)]
+    matching = [info for info in db.investor_portfolio.index_information().values()
+                if [tuple(k) for k in info['key']] == keys]
+    assert len(matching) == 1 and not matching[0].get('unique')
+    assert '创建唯一索引失败' in capsys.readouterr().out
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""增量共同矩：与直接计算的协方差 / 相关性一致，预热不重复计入快照"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from backend.analytics.correlation import CorrelationTracker
+from backend.analytics.market_store import MarketSnapshot
+from backend.database.db import MarketSnapshotManager
+from backend.models.crypto import CryptoData
+
+START = datetime(2024, 1, 1)
+RNG = np.random.default_rng(7)
+PRICES = 100 * np.exp(np.cumsum(RNG.normal(0, 0.02, size=(12, 3)), axis=0))
+
+
+def snapshot_at(i):
+    coins = [CryptoData({'id': f'coin-{j}', 'symbol': f'C{j}', 'rank': j + 1, 'price_usd': float(PRICES[i, j])})
+             for j in range(PRICES.shape[1])]
+    return MarketSnapshot.from_cryptos(coins, generation=i + 1, timestamp=START + timedelta(minutes=5 * i))
+
+
+def scrape(tracker, i):
+    """与调度器相同的顺序：先保存快照历史，再推入"""
+    snapshot = snapshot_at(i)
+    MarketSnapshotManager().save_snapshot(snapshot.to_history_doc())
+    tracker.push(snapshot)
+
+
+def expected(scrapes, window):
+    returns = np.diff(np.log(PRICES[:scrapes]), axis=0)[-window:]
+    return returns, np.cov(returns, rowvar=False), np.corrcoef(returns, rowvar=False)
+
+
+def assert_matches(result, scrapes, window):
+    returns, covariance, correlation = expected(scrapes, window)
+    assert result['samples'] == len(returns)
+    assert np.allclose(result['covariance'], covariance)
+    assert np.allclose(result['correlation'], correlation, atol=1e-6)
+    assert np.allclose(result['mean_return'], returns.mean(axis=0))
+
+
+def test_incremental_co_moments_match_direct_computation():
+    tracker = CorrelationTracker()
+    tracker._warmed = True
+    tracker.push(snapshot_at(0))
+    tracker.push(snapshot_at(1))
+    tracker.push(snapshot_at(2))
+    # 建立累加器后继续增量推入，窗口已满后开始滑出旧收益率
+    tracker.compute(top=3, window=4)
+    for i in range(3, len(PRICES)):
+        tracker.push(snapshot_at(i))
+        assert_matches(tracker.compute(top=3, window=4), i + 1, 4)
+
+
+def test_saved_snapshot_is_not_counted_twice_on_warm_up(sqlite_backend):
+    tracker = CorrelationTracker()
+    for i in range(5):
+        scrape(tracker, i)
+    assert_matches(tracker.compute(top=3, window=60), 5, 60)
+
+    # 重启：新实例在第一次推入时从历史预热，不应多出一行全零收益率
+    restarted = CorrelationTracker()
+    scrape(restarted, 5)
+    result = restarted.compute(top=3, window=60)
+    assert_matches(result, 6, 60)
+    assert result['samples'] == 5
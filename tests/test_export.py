@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""Parquet 导出的固定 schema"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.database.export import EXPORT_COLLECTIONS, ParquetExporter, export_schema
+
+pa = pytest.importorskip('pyarrow')
+pq = pytest.importorskip('pyarrow.parquet')
+
+
+def test_batches_share_one_schema_per_partition(sqlite_backend, tmp_path):
+    backend = sqlite_backend
+    base = datetime(2024, 1, 1, 12)
+    docs = [
+        # 第一批：market_cap 全为空、rank 为整数
+        {'id': 'a', 'symbol': 'A', 'price_usd': 1, 'market_cap': None, 'rank': 1, 'source': 'coingecko',
+         'timestamp': base},
+        {'id': 'b', 'symbol': 'B', 'price_usd': 2, 'rank': 2, 'source': 'coingecko',
+         'timestamp': base + timedelta(seconds=1)},
+        # 第二批：market_cap 为浮点数、rank 为浮点数，另有未知字段
+        {'id': 'c', 'symbol': 'C', 'price_usd': 3.5, 'market_cap': 1e9, 'rank': 3.0, 'source': 'coingecko',
+         'timestamp': base + timedelta(seconds=2), 'note': {'x': 1}},
+        {'id': 'd', 'symbol': 'D', 'price_usd': '4.5', 'market_cap': 2e9, 'rank': 'n/a', 'source': 'coingecko',
+         'timestamp': base + timedelta(seconds=3)},
+    ]
+    backend.insert_many('crypto_data', docs)
+
+    output = str(tmp_path / 'exports')
+    stats = ParquetExporter(backend, output, batch_size=2).export_collection('crypto_data')
+    assert stats == {'collection': 'crypto_data', 'rows': 4, 'files': 2, 'bytes': stats['bytes']}
+
+    partition = tmp_path / 'exports' / 'crypto_data' / 'date=2024-01-01' / 'source=coingecko'
+    files = sorted(partition.iterdir())
+    schemas = [pq.read_schema(str(path)) for path in files]
+    assert all(schema.equals(schemas[0]) for schema in schemas)
+
+    table = pq.read_table(str(partition)).sort_by('id')
+    assert table.schema.field('market_cap').type == pa.float64()
+    assert table.column('market_cap').to_pylist() == [None, None, 1e9, 2e9]
+    assert table.column('rank').to_pylist() == [1, 2, 3, None]
+    assert table.column('price_usd').to_pylist() == [1.0, 2.0, 3.5, 4.5]
+    assert table.column('_extra').to_pylist()[2] == '{"note": {"x": 1}}'
+
+
+def test_every_collection_has_a_fixed_schema():
+    for collection in EXPORT_COLLECTIONS:
+        schema = export_schema(pa, collection)
+        assert schema.names[0] == '_id' and schema.names[-1] == '_extra'
+        assert len(set(schema.names)) == len(schema.names)
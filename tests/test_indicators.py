@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""增量技术指标：滚动统计与历史预热"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from backend.analytics.indicators import IndicatorEngine
+from backend.analytics.market_store import MarketSnapshot
+from backend.database.db import MarketSnapshotManager
+from backend.models.crypto import CryptoData
+
+START = datetime(2024, 1, 1)
+PRICES = [100.0, 102.0, 101.0, 105.0, 104.0, 108.0, 110.0]
+
+
+def snapshot_at(i):
+    coins = [
+        CryptoData({'id': 'bitcoin', 'symbol': 'BTC', 'rank': 1, 'price_usd': PRICES[i],
+                    'volume_24h': 1000.0 + i, 'price_change_percentage_24h': float(i)}),
+        CryptoData({'id': 'ethereum', 'symbol': 'ETH', 'rank': 2, 'price_usd': PRICES[i] / 10,
+                    'volume_24h': 500.0, 'price_change_percentage_24h': -float(i)}),
+    ]
+    return MarketSnapshot.from_cryptos(coins, generation=i + 1, timestamp=START + timedelta(minutes=5 * i))
+
+
+def scrape(engine, i):
+    """与调度器相同的顺序：先保存快照历史，再增量更新"""
+    snapshot = snapshot_at(i)
+    MarketSnapshotManager().save_snapshot(snapshot.to_history_doc())
+    engine.update(snapshot)
+
+
+def test_rolling_statistics_match_direct_computation():
+    engine = IndicatorEngine(capacity=4)
+    engine._warmed = True
+    for i in range(len(PRICES)):
+        engine.update(snapshot_at(i))
+    btc = engine.get('BTC')
+    assert btc['samples'] == len(PRICES)
+    assert btc['sma']['5'] == pytest.approx(np.mean(PRICES[-5:]))
+    assert btc['sma']['20'] == pytest.approx(np.mean(PRICES))
+    returns = np.diff(np.log(PRICES))
+    assert btc['volatility'] == pytest.approx(np.std(returns, ddof=1) * 100)
+    volumes = np.array([1000.0 + i for i in range(len(PRICES))])
+    assert btc['vwap'] == pytest.approx(np.sum(np.array(PRICES) * volumes) / volumes.sum())
+
+
+def test_saved_snapshot_is_not_counted_twice_on_warm_up(sqlite_backend):
+    engine = IndicatorEngine()
+    for i in range(3):
+        scrape(engine, i)
+    assert engine.get('bitcoin')['samples'] == 3
+    assert engine.get('bitcoin')['sma']['5'] == pytest.approx(np.mean(PRICES[:3]))
+
+    # 重启：新引擎在第一次更新时从历史预热
+    restarted = IndicatorEngine()
+    scrape(restarted, 3)
+    assert restarted.get('bitcoin')['samples'] == 4
+    assert restarted.get('bitcoin')['sma']['5'] == pytest.approx(np.mean(PRICES[:4]))
+
+    # 重启后先查询（预热全部历史），之后的更新照常推入
+    queried = IndicatorEngine()
+    assert queried.get('bitcoin')['samples'] == 4
+    scrape(queried, 4)
+    assert queried.get('bitcoin')['samples'] == 5
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""投资者接口的响应结构（与存储结构版本无关）"""
+
+from datetime import datetime
+
+from backend.models.investor import InvestorData
+
+LEGACY_DOC = {
+    'investor_id': 7, 'name': 'Legacy Capital', 'investor_slug': '', 'venture_type': 'VC', 'rank': 3,
+    'description': '', 'total_investments': 12, 'type': 'VC', 'investments_count': 12,
+    'portfolio_projects': [{'slug': 'alpha', 'round': 'Seed'}], 'sale_ids': ['s1'],
+    'source': 'dropstab', 'scraped_at': datetime(2024, 1, 1), 'timestamp': datetime(2024, 1, 1),
+}
+
+
+def test_unmigrated_document_keeps_shape_and_embedded_portfolio(api_app, sqlite_backend):
+    sqlite_backend.insert_many('investor_data', [dict(LEGACY_DOC)])
+    client = api_app.test_client()
+
+    data = client.get('/api/investors/Legacy Capital?include=portfolio').get_json()['data']
+    assert 'schema_version' not in data
+    assert data['description'] == '' and data['investor_slug'] == ''
+    assert data['portfolio']['projects'] == [{'project': 'alpha', 'data': {'slug': 'alpha', 'round': 'Seed'}}]
+    assert data['portfolio']['sales'] == [{'project': 's1', 'data': {}}]
+
+    listed = client.get('/api/investors?include=portfolio').get_json()['data']
+    assert listed[0]['portfolio'] == data['portfolio']
+    assert client.get('/api/investors/Legacy Capital/portfolio?kind=sale').get_json()['count'] == 1
+
+
+def test_compact_document_has_same_shape_as_legacy(api_app, sqlite_backend):
+    sqlite_backend.insert_many('investor_data', [dict(LEGACY_DOC)])
+    client = api_app.test_client()
+    before = client.get('/api/investors/Legacy Capital').get_json()['data']
+
+    compact = InvestorData.from_dict(dict(LEGACY_DOC)).to_mongo_dict()
+    sqlite_backend.delete_many('investor_data')
+    sqlite_backend.insert_many('investor_data', [compact])
+    after = client.get('/api/investors/Legacy Capital').get_json()['data']
+
+    before.pop('_id'), after.pop('_id')
+    assert after == before
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""数据模型序列化"""
+
+from datetime import datetime
+
+from backend.models.crypto import CRYPTO_SCHEMA, CryptoData
+from backend.models.investor import SCHEMA_VERSION, InvestorData, upgrade_investor_doc
+
+
+def test_crypto_mongo_dict_keeps_required_and_omits_empty_optional_fields():
+    doc = CryptoData({'id': 'bitcoin', 'symbol': 'btc', 'market_cap': 5, 'rank': None}).to_mongo_dict()
+    assert doc['symbol'] == 'BTC'
+    assert doc['name'] == 'BTC'
+    assert doc['price_usd'] == 0
+    assert doc['source'] == 'coingecko'
+    assert doc['market_cap'] == 5
+    assert 'rank' not in doc
+    assert isinstance(doc['timestamp'], datetime)
+
+
+def test_crypto_mongo_dict_writes_every_schema_field_when_set():
+    data = {name: f'v-{name}' for name, _ in CRYPTO_SCHEMA}
+    data['price_usd'] = 1.5
+    doc = CryptoData(data).to_mongo_dict()
+    assert set(doc) == {name for name, _ in CRYPTO_SCHEMA} | {'timestamp'}
+
+
+def _legacy_investor_doc():
+    """schema_version 1：全部兼容字段（含空字符串）和内嵌投资组合数组"""
+    return {
+        '_id': 'legacy-1', 'investor_id': 7, 'name': 'Legacy Capital', 'investor_slug': '', 'logo': '',
+        'venture_type': 'VC', 'rank': 3, 'tier': '1', 'lead': False, 'description': '', 'country': {},
+        'total_investments': 12, 'type': 'VC', 'success_rate': '', 'investments_count': 12,
+        'portfolio_projects': [{'slug': 'alpha', 'round': 'Seed'}, {'slug': 'beta'}], 'sale_ids': ['s1'],
+        'source': 'dropstab', 'scraped_at': datetime(2024, 1, 1), 'timestamp': datetime(2024, 1, 1),
+    }
+
+
+def test_investor_api_shape_does_not_depend_on_storage_layout():
+    legacy = InvestorData.from_dict(_legacy_investor_doc())
+    compact_doc = legacy.to_mongo_dict()
+    assert compact_doc['schema_version'] == SCHEMA_VERSION
+    assert 'description' not in compact_doc and 'investments_count' not in compact_doc
+
+    expected = legacy.to_dict()
+    compact = InvestorData.from_dict(upgrade_investor_doc(dict(compact_doc, _id='legacy-1'))).to_dict()
+    assert compact == expected
+    assert 'schema_version' not in compact
+    assert compact['description'] == '' and compact['investor_slug'] == '' and compact['country'] == {}
+    assert compact['investments_count'] == 12
+    assert 'portfolio_projects' not in compact
+
+
+def test_upgrade_keeps_embedded_portfolio_until_migrated():
+    upgraded = upgrade_investor_doc(_legacy_investor_doc())
+    assert 'schema_version' not in upgraded
+    investor = InvestorData.from_dict(upgraded)
+    assert investor.has_embedded_portfolio
+    assert sorted((entry['kind'], entry['project']) for entry in investor.portfolio_entries()) == [
+        ('project', 'alpha'), ('project', 'beta'), ('sale', 's1')]
+
+    # 拆分后写入过的文档（有 portfolio_count）以 investor_portfolio 为准，残留的内嵌数组不再使用
+    written = dict(_legacy_investor_doc(), portfolio_count=2, sale_ids_count=1)
+    assert not InvestorData.from_dict(upgrade_investor_doc(written)).has_embedded_portfolio
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""展示文本解析和 Tokenomist 类型化字段"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.database.db import TokenUnlockManager
+from backend.utils.parsers import parse_amount, parse_datetime, parse_percentage, parse_token_unlock_fields
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('$1.2m', (1.2e6, 'USD')),
+    ('-$3.4k', (-3400.0, 'USD')),
+    ('5.5m ABC', (5.5e6, 'ABC')),
+    ('250B', (2.5e11, None)),
+    ('.5m', (5e5, None)),
+    ('1.2e6', (1.2e6, None)),
+    ('1e-3 BTC', (0.001, 'BTC')),
+    ('1.5 billion', (1.5e9, None)),
+    ('2,500,000 USDC.e', (2.5e6, 'USDC.E')),
+    # 与数字之间有空格的单字母是代币符号而不是数量级
+    ('1,000 T', (1000.0, 'T')),
+    ('250 B', (250.0, 'B')),
+    (42, (42.0, None)),
+])
+def test_parse_amount(text, expected):
+    value, unit = parse_amount(text)
+    assert value == pytest.approx(expected[0])
+    assert unit == expected[1]
+
+
+@pytest.mark.parametrize('text', [None, '', 'abc', '1.5e', '5ABC', '10 tokens left', '$'])
+def test_parse_amount_rejects_partial_matches(text):
+    assert parse_amount(text) == (None, None)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('+3.4%', 3.4),
+    ('-0.5 %', -0.5),
+    ('1,250%', 1250.0),
+    (7, 7.0),
+    ('n/a', None),
+    (None, None),
+])
+def test_parse_percentage(text, expected):
+    assert parse_percentage(text) == expected
+
+
+def test_parse_datetime_normalizes_to_naive_utc():
+    assert parse_datetime('2024-02-01T00:00:00Z') == datetime(2024, 2, 1)
+    assert parse_datetime('2024-02-01T08:00:00+08:00') == datetime(2024, 2, 1)
+    assert parse_datetime(datetime(2024, 2, 1, 3)) == datetime(2024, 2, 1, 3)
+    assert parse_datetime('soon') is None
+    assert parse_datetime('') is None
+
+
+def test_unlock_usd_value_uses_price_only_for_token_amounts():
+    tokens = parse_token_unlock_fields({
+        'current_price': '$2.5', 'unlock_amount': '4m ABC', 'unlock_percentage': '1.2%',
+        'unlock_time': '2024-02-01T00:00:00Z',
+    })
+    assert tokens['unlock_amount_unit'] == 'ABC'
+    assert tokens['unlock_usd_value'] == pytest.approx(1e7)
+    assert tokens['unlock_percentage_value'] == 1.2
+    assert tokens['unlock_at'] == datetime(2024, 2, 1)
+
+    usd = parse_token_unlock_fields({'current_price': '$2.5', 'unlock_amount': '$4m'})
+    assert usd['unlock_amount_unit'] == 'USD'
+    assert usd['unlock_usd_value'] == pytest.approx(4e6)
+
+    no_price = parse_token_unlock_fields({'unlock_amount': '4m ABC'})
+    assert no_price['unlock_usd_value'] is None
+
+    # 无法解析的数量不参与排序
+    garbled = parse_token_unlock_fields({'current_price': '$2.5', 'unlock_amount': '1.5e'})
+    assert garbled['unlock_amount_value'] is None
+    assert garbled['unlock_usd_value'] is None
+
+
+def test_largest_upcoming_unlocks_ordered_by_usd_within_window(sqlite_backend):
+    now = datetime.utcnow()
+    rows = [
+        ('small', now + timedelta(days=1), 1e6),
+        ('large', now + timedelta(days=3), 5e8),
+        ('medium', now + timedelta(days=6), 2e7),
+        ('unknown', now + timedelta(days=2), None),
+        ('past', now - timedelta(days=1), 9e9),
+        ('later', now + timedelta(days=10), 9e9),
+    ]
+    TokenUnlockManager().upsert_unlocks([
+        {'source': 'tokenomist', 'token_name': name, 'unlock_at': at, 'unlock_usd_value': usd, 'timestamp': now}
+        for name, at, usd in rows
+    ])
+
+    upcoming = TokenUnlockManager().get_largest_upcoming_unlocks(days=7)
+    assert [doc['token_name'] for doc in upcoming] == ['large', 'medium', 'small']
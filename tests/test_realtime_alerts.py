@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""告警按规则房间推送：连接只收到自己订阅的规则触发的告警"""
+
+import pytest
+from flask import Flask
+from flask_socketio import SocketIO
+
+from backend.analytics.alerts import AlertEngine
+from backend.api import realtime
+
+
+@pytest.fixture
+def socketio_app(monkeypatch):
+    engine = AlertEngine(manager=object())
+    engine.load_rules([
+        {'rule_id': 'btc-high', 'field': 'price', 'op': 'above', 'threshold': 100000, 'coin': 'bitcoin'},
+        {'rule_id': 'eth-low', 'field': 'price', 'op': 'below', 'threshold': 1000, 'coin': 'ethereum'},
+    ])
+    monkeypatch.setattr(realtime, 'alert_engine', engine)
+    monkeypatch.setattr(realtime, '_socketio', None)
+    monkeypatch.setattr(realtime, '_max_alert_rules', realtime._max_alert_rules)
+
+    app = Flask(__name__)
+    app.config['REALTIME_MAX_ALERT_RULES'] = 1
+    socketio = SocketIO(app, async_mode='threading')
+    realtime.init_realtime(app, socketio)
+    return app, socketio
+
+
+def _alert(rule_id, coin):
+    return {'rule_id': rule_id, 'coin': coin, 'value': 1.0}
+
+
+def _result(*alerts):
+    return {'generation': 7, 'timestamp': '2024-01-01T00:00:00', 'total': len(alerts), 'alerts': list(alerts)}
+
+
+def _received_alerts(client):
+    return [msg['args'][0] for msg in client.get_received() if msg['name'] == 'alerts']
+
+
+def test_alerts_only_reach_rule_subscribers(socketio_app):
+    app, socketio = socketio_app
+    btc = socketio.test_client(app)
+    eth = socketio.test_client(app)
+    idle = socketio.test_client(app)
+
+    assert btc.emit('alerts_subscribe', {'rules': ['btc-high']}, callback=True) == {
+        'success': True, 'rules': ['btc-high']}
+    eth.emit('alerts_subscribe', {'rules': 'eth-low'}, callback=True)
+    for client in (btc, eth, idle):
+        client.get_received()
+
+    sent = realtime.push_alerts(_result(_alert('btc-high', 'bitcoin'), _alert('eth-low', 'ethereum'),
+                                        _alert('btc-high', 'bitcoin')))
+    assert sent == 2
+
+    [btc_payload] = _received_alerts(btc)
+    assert btc_payload['rule_id'] == 'btc-high'
+    assert btc_payload['total'] == 2
+    assert {a['rule_id'] for a in btc_payload['alerts']} == {'btc-high'}
+
+    [eth_payload] = _received_alerts(eth)
+    assert eth_payload['rule_id'] == 'eth-low'
+    assert [a['coin'] for a in eth_payload['alerts']] == ['ethereum']
+
+    assert _received_alerts(idle) == []
+
+
+def test_subscribe_rejects_unknown_rules_and_enforces_limit(socketio_app):
+    app, socketio = socketio_app
+    client = socketio.test_client(app)
+
+    ack = client.emit('alerts_subscribe', {'rules': ['missing', 'btc-high', 'eth-low']}, callback=True)
+    assert ack['rules'] == ['btc-high']
+    assert ack['rejected'] == ['missing', 'eth-low']
+
+    assert client.emit('alerts_unsubscribe', callback=True) == {'success': True, 'rules': []}
+    client.get_received()
+    realtime.push_alerts(_result(_alert('btc-high', 'bitcoin')))
+    assert _received_alerts(client) == []
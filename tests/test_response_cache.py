@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""服务端响应缓存：代际失效、LRU 字节上限和并发未命中的合并（single-flight）"""
+
+import threading
+import time
+
+import pytest
+from flask import Flask, jsonify
+
+from backend.api.caching import ResponseCache, cached, init_response_cache
+from backend.utils.generation import MARKET_GENERATION, generations
+
+
+class _Response:
+    def __init__(self, body: bytes, status: int = 200):
+        self._body = body
+        self.status_code = status
+        self.mimetype = 'application/json'
+
+    def get_data(self):
+        return self._body
+
+
+@pytest.fixture
+def cache_app():
+    app = Flask(__name__)
+    calls = []
+
+    @app.route('/items')
+    @cached(MARKET_GENERATION)
+    def items():
+        calls.append(1)
+        return jsonify({'calls': len(calls)})
+
+    @app.route('/items/<name>')
+    @cached(MARKET_GENERATION)
+    def item(name):
+        calls.append(1)
+        return jsonify({'success': False, 'error': f'{name} 不存在'}), 404
+
+    init_response_cache(app)
+    return app, calls
+
+
+def test_hit_until_generation_changes(cache_app):
+    app, calls = cache_app
+    client = app.test_client()
+
+    assert client.get('/items?a=1&b=2').get_json()['calls'] == 1
+    # 参数顺序不同的相同请求命中同一条目
+    assert client.get('/items?b=2&a=1').get_json()['calls'] == 1
+    assert len(calls) == 1
+
+    generations.bump(MARKET_GENERATION)
+    assert client.get('/items?a=1&b=2').get_json()['calls'] == 2
+
+    stats = app.extensions['response_cache'].stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 2, 1)
+    assert stats['invalidations'] == 1
+
+
+def test_not_found_is_cached(cache_app):
+    app, calls = cache_app
+    client = app.test_client()
+
+    for _ in range(3):
+        response = client.get('/items/nobody')
+        assert response.status_code == 404
+        assert response.get_json()['success'] is False
+    assert len(calls) == 1
+
+
+def test_lru_evicts_by_bytes():
+    cache = ResponseCache(max_bytes=10)
+    for name in ('a', 'b', 'c'):
+        cache.fetch('route', ('route', name, (1,)), (1,), lambda: _Response(b'x' * 4))
+    # 访问 b 使其成为最近使用，写入 d 时淘汰最久未用的 c
+    cache.fetch('route', ('route', 'b', (1,)), (1,), lambda: pytest.fail('b 应当命中'))
+    cache.fetch('route', ('route', 'd', (1,)), (1,), lambda: _Response(b'x' * 4))
+
+    stats = cache.stats()
+    assert stats['bytes'] <= 10
+    assert stats['evictions'] == 2
+    assert [key[1] for key in cache._data] == ['b', 'd']
+
+    # 超过上限的单个响应不缓存
+    cache.fetch('route', ('route', 'big', (1,)), (1,), lambda: _Response(b'x' * 11))
+    assert ('route', 'big', (1,)) not in cache._data
+
+
+def test_stale_generation_is_not_stored():
+    cache = ResponseCache()
+    cache.fetch('route', ('route', 'x', (2,)), (2,), lambda: _Response(b'new'))
+    # 以旧代际开始的查询晚于新代际完成，结果不写入
+    cache.fetch('route', ('route', 'y', (1,)), (1,), lambda: _Response(b'old'))
+    assert list(cache._data) == [('route', 'x', (2,))]
+
+
+def test_concurrent_misses_run_view_once():
+    cache = ResponseCache()
+    key = ('route', 'hot', (1,))
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return _Response(b'payload')
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(cache.fetch('route', key, (1,), compute)))
+    leader.start()
+    while not calls:
+        time.sleep(0.001)
+    followers = [threading.Thread(target=lambda: results.append(cache.fetch('route', key, (1,), compute)))
+                 for _ in range(8)]
+    for thread in followers:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == [(b'payload', 200, 'application/json')] * 9
+    stats = cache.stats()['routes']['route']
+    assert stats['misses'] == 1
+    assert stats['hits'] + stats['coalesced'] == 8
+    assert cache.stats()['inflight'] == 0
+
+
+def test_followers_compute_when_leader_fails():
+    cache = ResponseCache()
+    key = ('route', 'flaky', (1,))
+    entered, release = threading.Event(), threading.Event()
+
+    def failing():
+        entered.set()
+        release.wait(5)
+        raise RuntimeError('数据库不可用')
+
+    errors = []
+
+    def lead():
+        try:
+            cache.fetch('route', key, (1,), failing)
+        except RuntimeError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=lead)
+    leader.start()
+    entered.wait(5)
+    results = []
+    follower = threading.Thread(
+        target=lambda: results.append(cache.fetch('route', key, (1,), lambda: _Response(b'fallback'))))
+    follower.start()
+    time.sleep(0.05)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert len(errors) == 1
+    assert results == [(b'fallback', 200, 'application/json')]
+    # 失败的查询不留下进行中的记录，下一个请求重新执行并写入缓存
+    assert cache.stats()['inflight'] == 0
+    assert cache.fetch('route', key, (1,), lambda: _Response(b'ok'))[0] == b'ok'
+    assert key in cache._data
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""筛选表达式：缺失值语义与结果缓存统计"""
+
+from backend.analytics import screener
+from backend.analytics.market_store import MarketSnapshot
+from backend.analytics.screener import run_screener
+from backend.models.crypto import CryptoData
+
+
+def make_snapshot(generation=1):
+    coins = [
+        {'id': 'a', 'symbol': 'A', 'rank': 1, 'price_usd': 5, 'market_cap': 2e9, 'volume_24h': 1e6},
+        {'id': 'b', 'symbol': 'B', 'rank': 2, 'price_usd': 20, 'market_cap': 5e8, 'volume_24h': None},
+        {'id': 'c', 'symbol': 'C', 'rank': 3, 'price_usd': 1, 'market_cap': None, 'volume_24h': 3e6},
+    ]
+    return MarketSnapshot.from_cryptos([CryptoData(coin) for coin in coins], generation=generation)
+
+
+def symbols(result):
+    return [row['symbol'] for row in result['data']]
+
+
+def test_not_never_matches_missing_values():
+    snapshot = make_snapshot()
+    assert symbols(run_screener(snapshot, 'market_cap > 1e9')) == ['A']
+    assert symbols(run_screener(snapshot, 'not market_cap > 1e9')) == ['B']
+    assert symbols(run_screener(snapshot, 'not (market_cap > 1e9 or volume_24h > 2e6)')) == []
+    assert symbols(run_screener(snapshot, 'not not market_cap > 1e9')) == ['A']
+    assert symbols(run_screener(snapshot, 'not price < 2')) == ['A', 'B']
+
+
+def test_not_equal_against_missing_column_does_not_match():
+    snapshot = make_snapshot()
+    assert symbols(run_screener(snapshot, 'market_cap != volume_24h')) == ['A']
+
+
+def test_result_cache_counts_hits_and_misses(monkeypatch):
+    cache = screener._ResultCache()
+    monkeypatch.setattr(screener, '_results', cache)
+    snapshot = make_snapshot(generation=42)
+    run_screener(snapshot, 'price > 2')
+    run_screener(snapshot, 'price > 2')
+    run_screener(make_snapshot(generation=43), 'price > 2')
+    assert (cache.hits, cache.misses) == (1, 2)
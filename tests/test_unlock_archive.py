@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""代币解锁列式归档：追加、增量列、按天分区、清理和崩溃后的恢复"""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.scrapers import unlock_archive as archive_module
+from backend.scrapers.unlock_archive import UnlockArchive
+
+
+def _rows(price_a='$1.5', price_b='$0.2'):
+    return [
+        {'token_name': 'AAA', 'current_price': price_a, 'unlock_amount': '4m AAA',
+         'unlock_percentage': '1.2%', 'unlock_time': '2024-02-01T00:00:00Z'},
+        {'token_name': 'BBB', 'current_price': price_b, 'unlock_amount': '$3m',
+         'unlock_percentage': '0.5%', 'unlock_time': '2024-02-03T12:00:00Z'},
+    ]
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return UnlockArchive(str(tmp_path / 'archives'), str(tmp_path / 'token_unlocks.csv'))
+
+
+def test_same_day_runs_store_only_changed_columns(archive):
+    day = datetime(2024, 1, 10, 8, tzinfo=timezone.utc)
+    first = archive.append(_rows(), day)
+    second = archive.append(_rows(price_a='$1.8'), day + timedelta(hours=1))
+    assert first['written'] == second['written'] == 2
+    assert second['bytes'] < first['bytes']
+
+    # 完全相同的一轮不写入，只推进时间范围
+    assert archive.append(_rows(price_a='$1.8'), day + timedelta(hours=2)) == {'written': 0, 'bytes': 0}
+    partition = archive.load_index()['partitions']['2024-01-10']
+    assert partition['runs'] == 2
+    assert partition['bytes'] == os.path.getsize(os.path.join(archive.archive_dir, partition['file']))
+    assert partition['max_ts'] == int((day + timedelta(hours=2)).timestamp())
+
+    runs = list(archive.iter_runs())
+    assert [ts for ts, _ in runs] == [day, day + timedelta(hours=1)]
+    assert runs[0][1]['current_price'] == [1.5, 0.2]
+    assert runs[1][1]['current_price'] == [1.8, 0.2]
+    # 未变化的列沿用上一轮的值
+    assert runs[1][1]['unlock_amount'] == [4e6, 3e6]
+    assert runs[1][1]['unlock_amount_unit'] == ['AAA', 'USD']
+
+
+def test_day_rollover_writes_full_columns_and_query_filters(archive):
+    day = datetime(2024, 1, 10, 23, tzinfo=timezone.utc)
+    archive.append(_rows(), day)
+    archive.append(_rows(), day + timedelta(hours=2))
+
+    assert sorted(archive.load_index()['partitions']) == ['2024-01-10', '2024-01-11']
+    rows = archive.query(start=day + timedelta(hours=1), token_name='BBB')
+    assert len(rows) == 1
+    assert rows[0]['run_time'] == day + timedelta(hours=2)
+    assert rows[0]['current_price'] == 0.2
+    assert rows[0]['unlock_time'] == int(datetime(2024, 2, 3, 12, tzinfo=timezone.utc).timestamp())
+
+
+def test_prune_removes_old_partitions_through_index(archive):
+    now = datetime.now(timezone.utc)
+    archive.append(_rows(), now - timedelta(days=40))
+    archive.append(_rows(), now)
+    old_file = f"unlocks-{(now - timedelta(days=40)).strftime('%Y-%m-%d')}.col.gz"
+
+    assert archive.prune(keep_days=30) == [old_file]
+    assert not os.path.exists(os.path.join(archive.archive_dir, old_file))
+    assert list(archive.load_index()['partitions']) == [now.strftime('%Y-%m-%d')]
+    assert len(list(archive.iter_runs())) == 1
+
+
+def test_uncommitted_member_is_discarded_after_crash(archive, monkeypatch):
+    day = datetime(2024, 1, 10, 8, tzinfo=timezone.utc)
+    archive.append(_rows(), day)
+
+    # 进程在追加 gzip 成员之后、写索引之前退出
+    def crash(index):
+        raise SystemExit
+    monkeypatch.setattr(archive, '_save_index', crash)
+    with pytest.raises(SystemExit):
+        archive.append(_rows(price_a='$9', price_b='$9'), day + timedelta(hours=1))
+    monkeypatch.undo()
+
+    # 未提交的成员不会被读出
+    assert [columns['current_price'] for _, columns in archive.iter_runs()] == [[1.5, 0.2]]
+
+    archive.append(_rows(price_a='$1.8'), day + timedelta(hours=2))
+    runs = list(archive.iter_runs())
+    assert [columns['current_price'] for _, columns in runs] == [[1.5, 0.2], [1.8, 0.2]]
+    partition = archive.load_index()['partitions']['2024-01-10']
+    assert partition['bytes'] == os.path.getsize(os.path.join(archive.archive_dir, partition['file']))
+
+
+def test_shorter_file_than_index_rewrites_full_columns(archive):
+    day = datetime(2024, 1, 10, 8, tzinfo=timezone.utc)
+    archive.append(_rows(), day)
+    path = os.path.join(archive.archive_dir, archive.load_index()['partitions']['2024-01-10']['file'])
+    os.remove(path)
+
+    archive.append(_rows(price_a='$1.8'), day + timedelta(hours=1))
+    [(_, columns)] = list(archive.iter_runs())
+    assert columns['current_price'] == [1.8, 0.2]
+    assert columns['token_name'] == ['AAA', 'BBB']
+
+
+def test_truncate_keeps_committed_prefix(tmp_path):
+    path = tmp_path / 'part.gz'
+    path.write_bytes(b'committed-orphan')
+    assert archive_module._truncate_uncommitted(str(path), len(b'committed'))
+    assert path.read_bytes() == b'committed'
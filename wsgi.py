@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WSGI 入口（生产部署）
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+from backend.app import create_app
+
+app = create_app()